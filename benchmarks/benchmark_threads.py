@@ -0,0 +1,83 @@
+"""Бенчмарк параллельного чтения нескольких файлов в ThreadPoolExecutor
+
+Токенизация выполняется без GIL, поэтому потоки перекрываются в нативном коде;
+создание Python объектов по-прежнему последовательное (под GIL). Ускорение
+ограничено числом ядер и долей токенизации: у read_columns и parse_chunk она больше,
+чем у чтения строк списками (Python строка на каждое поле).
+
+Запуск: python benchmarks/benchmark_threads.py [число файлов] [строк в файле]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import fastcsv
+from fastcsv import _native
+
+
+def generate_files(num_files, num_rows):
+    """Создает num_files временных CSV файлов с полями в кавычках"""
+    paths = []
+    for n in range(num_files):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+            f.write('id,name,text,value\n')
+            f.write(''.join(f'{i},"name {i}","text, with comma",{i * 1.5}\n' for i in range(num_rows)))
+            paths.append(f.name)
+    return paths
+
+
+def count_rows_native(path):
+    """Только токенизация: CSVParser.parse_chunk без создания строк полей"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return len(_native.CSVParser(_native.ParserConfig()).parse_chunk(data))
+
+
+def read_columns(path):
+    """Колоночное чтение: значения сразу в типизированные буферы"""
+    columns = fastcsv.read_columns(path, dtypes={'id': 'int64', 'value': 'float64'})
+    return len(columns['id'])
+
+
+def read_rows(path):
+    """Строки списками через mmap_reader.batches"""
+    with fastcsv.mmap_reader(path) as reader:
+        return sum(len(batch) for batch in reader.batches(65536))
+
+
+def run(fn, paths, workers):
+    """Время обработки всех файлов пулом из workers потоков"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        total = sum(pool.map(fn, paths))
+    return time.perf_counter() - start, total
+
+
+def run_benchmarks(num_files=8, num_rows=500000):
+    print("=" * 60)
+    print(f"ThreadPoolExecutor: {num_files} files x {num_rows} rows, {os.cpu_count()} CPUs")
+    print("=" * 60)
+
+    paths = generate_files(num_files, num_rows)
+    try:
+        for fn in (count_rows_native, read_columns, read_rows):
+            print(f"\n{fn.__name__}: {fn.__doc__}")
+            print("-" * 60)
+            run(fn, paths[:1], 1)  # Разогрев
+            base = None
+            for workers in (1, 2, 4, 8):
+                elapsed, total = run(fn, paths, workers)
+                base = base or elapsed
+                print(f"{workers:2d} threads: {elapsed * 1000:8.1f} ms ({total} rows), "
+                      f"speedup {base / elapsed:5.2f}x")
+    finally:
+        for path in paths:
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    run_benchmarks(*args)
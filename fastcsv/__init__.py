@@ -2,8 +2,8 @@
 FastCSV - High-performance CSV parsing library for Python.
 
 This module provides a drop-in replacement for Python's csv module
-with SIMD optimizations (AVX2/SSE4.2) and batch processing for efficient
-handling of large CSV files.
+with SIMD optimizations (SSE4.2/AVX2/AVX-512, chosen at import by CPUID)
+and batch processing for efficient handling of large CSV files.
 
 Features:
 - Full compatibility with Python csv module API
@@ -15,7 +15,12 @@ Features:
 """
 
 try:
-    from fastcsv._native import CSVParser, ParserConfig, ParsedRow, parse_chunk_to_python
+    from fastcsv._native import (CSVParser, ParserConfig, ParsedRow, parse_chunk_to_python,
+                                 parse_buffer_to_python, parse_buffer_parallel,
+                                 CSVWriter, WriterConfig, ColumnParser, ColumnType,
+                                 FieldConverter, ConvertKind, ConditionKind, StreamTokenizer,
+                                 RecordScanner, ReadStats,
+                                 simd_level, build_row_index, skip_records, Charset, Utf16Decoder)
 except ImportError as e:
     raise ImportError(
         "FastCSV native module not found. Please build the extension module first:\n"
@@ -25,16 +30,28 @@ except ImportError as e:
     ) from e
 
 from typing import Iterator, TextIO, Optional, Dict, List, Any, Union
+import array
+import codecs
+import datetime
 import io
+import itertools
 import mmap
 import os
+import queue
+import stat
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 import csv as std_csv
 
 __version__ = "0.2.0"
 __all__ = ['reader', 'DictReader', 'writer', 'DictWriter', 'QUOTE_ALL', 'QUOTE_MINIMAL', 
            'QUOTE_NONNUMERIC', 'QUOTE_NONE', 'Error', 'register_dialect', 'unregister_dialect',
            'get_dialect', 'list_dialects', 'Dialect', 'Sniffer', 'excel', 'excel_tab', 'unix',
-           'mmap_reader', 'mmap_DictReader']
+           'mmap_reader', 'mmap_DictReader', 'read_columns', 'StringColumn', 'simd_level',
+           'build_index', 'RowIndex', 'read_many', 'iter_many', 'Prefix', 'Range', 'open_reader']
 
 
 # Константы для совместимости с csv модулем
@@ -365,60 +382,523 @@ def _convert_dialect_to_config(dialect=None, **kwargs):
     return config
 
 
+def _make_parser_config(dialect, fmtparams):
+    """ParserConfig для файловых reader'ов: fmtparams переопределяют delimiter и quotechar диалекта"""
+    config = _convert_dialect_to_config(dialect, **fmtparams)
+    
+    if isinstance(dialect, Dialect):
+        delimiter_val = fmtparams.get('delimiter', dialect.delimiter)
+        quote_val = fmtparams.get('quotechar', dialect.quotechar)
+        quoting_val = fmtparams.get('quoting', dialect.quoting)
+    elif isinstance(dialect, str) and dialect in _dialects:
+        dialect_obj = _dialects[dialect]
+        delimiter_val = fmtparams.get('delimiter', dialect_obj.delimiter)
+        quote_val = fmtparams.get('quotechar', dialect_obj.quotechar)
+        quoting_val = fmtparams.get('quoting', dialect_obj.quoting)
+    else:
+        delimiter_val = fmtparams.get('delimiter', ',')
+        quote_val = fmtparams.get('quotechar', '"')
+        quoting_val = fmtparams.get('quoting', QUOTE_MINIMAL)
+    
+    if isinstance(delimiter_val, str):
+        config.delimiter = delimiter_val
+    if isinstance(quote_val, str):
+        config.quote = quote_val
+    config.quoting = int(quoting_val)
+    return config
+
+
+# Допустимые значения convert= (None и str - поле остается строкой)
+_CONVERT_KINDS = {
+    None: ConvertKind.STR, str: ConvertKind.STR, 'str': ConvertKind.STR,
+    int: ConvertKind.INT, 'int': ConvertKind.INT,
+    float: ConvertKind.FLOAT, 'float': ConvertKind.FLOAT,
+    bool: ConvertKind.BOOL, 'bool': ConvertKind.BOOL,
+    datetime.date: ConvertKind.DATE, 'date': ConvertKind.DATE,
+    'infer': ConvertKind.INFER,
+}
+
+# Сколько первых строк используется для вывода типов колонок
+_CONVERT_INFER_ROWS = 100
+
+
+def _convert_kind(value, column=None):
+    """Возвращает ConvertKind для значения convert="""
+    try:
+        return _CONVERT_KINDS[value]
+    except (KeyError, TypeError):
+        where = f" for column {column!r}" if column is not None else ""
+        raise ValueError(f"convert: unsupported converter {value!r}{where}") from None
+
+
+def _intern_columns(intern):
+    """Возвращает (индексы колонок, все колонки) для intern="""
+    if intern is None or intern is False:
+        return [], False
+    if intern is True:
+        return [], True
+    if isinstance(intern, (str, bytes)) or not hasattr(intern, '__iter__'):
+        raise ValueError(f"intern: expected True or column indexes, got {intern!r}")
+    columns = list(intern)
+    for column in columns:
+        if not isinstance(column, int) or isinstance(column, bool) or column < 0:
+            raise ValueError(f"intern: columns must be non-negative indexes, got {column!r}")
+    return columns, False
+
+
+def _read_stats(stats):
+    """Возвращает (ReadStats, callback) для stats= (None, None - счетчики выключены)"""
+    if stats is None or stats is False:
+        return None, None
+    if stats is True:
+        return ReadStats(), None
+    if callable(stats):
+        return ReadStats(), stats
+    raise ValueError(f"stats: expected True or a callable, got {stats!r}")
+
+
+class Prefix:
+    """Условие where=: значение поля начинается с одного из префиксов"""
+    
+    __slots__ = ('prefixes',)
+    
+    def __init__(self, *prefixes: str):
+        if not prefixes or not all(isinstance(prefix, str) for prefix in prefixes):
+            raise ValueError(f"Prefix: expected one or more strings, got {prefixes!r}")
+        self.prefixes = prefixes
+    
+    def __repr__(self):
+        return f"Prefix({', '.join(map(repr, self.prefixes))})"
+
+
+class Range:
+    """Условие where=: поле - число в диапазоне [low, high] (None - без границы)"""
+    
+    __slots__ = ('low', 'high')
+    
+    def __init__(self, low: Optional[float] = None, high: Optional[float] = None):
+        for bound in (low, high):
+            if bound is not None and (isinstance(bound, bool) or not isinstance(bound, (int, float))):
+                raise ValueError(f"Range: bounds must be numbers or None, got {bound!r}")
+        self.low = low
+        self.high = high
+    
+    def __repr__(self):
+        return f"Range({self.low!r}, {self.high!r})"
+
+
+def _where_conditions(where) -> list:
+    """
+    Проверяет where= и возвращает условия [(колонка, ConditionKind, значения, low, high)].
+    
+    where - словарь {индекс или имя колонки: условие}; условие - строка (равенство),
+    множество или список строк (одно из значений), число (равенство числу), Prefix или Range.
+    """
+    if where is None:
+        return []
+    if not isinstance(where, dict) or not where:
+        raise ValueError(f"where: expected a non-empty dict {{column: condition}}, got {where!r}")
+    conditions = []
+    for column, condition in where.items():
+        if not isinstance(column, str) and (not isinstance(column, int) or isinstance(column, bool)
+                                            or column < 0):
+            raise ValueError(f"where: columns must be non-negative indexes or names, got {column!r}")
+        low = high = 0.0
+        if isinstance(condition, str):
+            kind, values = ConditionKind.VALUES, [condition]
+        elif isinstance(condition, (set, frozenset, list, tuple)) and condition and \
+                all(isinstance(value, str) for value in condition):
+            kind, values = ConditionKind.VALUES, list(condition)
+        elif isinstance(condition, Prefix):
+            kind, values = ConditionKind.PREFIX, list(condition.prefixes)
+        elif isinstance(condition, Range):
+            kind, values = ConditionKind.RANGE, []
+            low = float('-inf') if condition.low is None else float(condition.low)
+            high = float('inf') if condition.high is None else float(condition.high)
+        elif isinstance(condition, (int, float)) and not isinstance(condition, bool):
+            kind, values = ConditionKind.RANGE, []
+            low = high = float(condition)
+        else:
+            raise ValueError(f"where: unsupported condition {condition!r} for column {column!r}")
+        conditions.append((column, kind, values, low, high))
+    return conditions
+
+
+def _usecols(usecols) -> Optional[list]:
+    """Проверяет usecols= и возвращает список колонок (индексы и имена) или None"""
+    if usecols is None:
+        return None
+    if isinstance(usecols, (str, bytes)) or not hasattr(usecols, '__iter__'):
+        raise ValueError(f"usecols: expected a list of column indexes or names, got {usecols!r}")
+    columns = list(usecols)
+    if not columns:
+        raise ValueError("usecols: at least one column is required")
+    for column in columns:
+        if isinstance(column, str):
+            continue
+        if not isinstance(column, int) or isinstance(column, bool) or column < 0:
+            raise ValueError(f"usecols: columns must be non-negative indexes or names, got {column!r}")
+    return columns
+
+
+def _dict_reader_columns(fieldnames, usecols, where):
+    """
+    usecols и where для reader'а DictReader: возвращает (usecols, where, fieldnames).
+    
+    С заданными fieldnames (описывают все колонки файла) имена заменяются индексами, fieldnames -
+    только выбранные колонки. Без fieldnames имена ищутся в заголовке файла.
+    """
+    if fieldnames is None:
+        return usecols, where, None
+    
+    fieldnames = list(fieldnames)
+    
+    def index(column, option):
+        if not isinstance(column, str):
+            return column
+        try:
+            return fieldnames.index(column)
+        except ValueError:
+            raise ValueError(f"{option}: unknown column {column!r}") from None
+    
+    if where is not None:
+        _where_conditions(where)
+        where = {index(column, 'where'): condition for column, condition in where.items()}
+    if usecols is not None:
+        usecols = [index(column, 'usecols') for column in _usecols(usecols)]
+        fieldnames = [fieldnames[i] if i < len(fieldnames) else None for i in usecols]
+    return usecols, where, fieldnames
+
+
+def _make_converter(convert, config, intern=None, usecols=None, where=None, encoding=None):
+    """
+    Создает нативный FieldConverter или None, если конвертация не нужна.
+    
+    convert может быть True / 'infer' (вывод типов всех колонок), одним конвертером
+    для всех колонок, списком конвертеров по позициям или словарем {индекс: конвертер}.
+    QUOTE_NONNUMERIC в config тоже реализуется конвертером.
+    
+    intern - True (все колонки) или индексы колонок, строковые значения которых берутся
+    из кэша: повторяющееся значение возвращается одним и тем же объектом str.
+    
+    usecols - колонки строк (индексы или имена из заголовка - первой строки): Python
+    объекты для остальных полей не создаются. Индексы convert и intern - номера колонок файла.
+    
+    where - условия на поля (см. _where_conditions): строки, которые им не удовлетворяют,
+    отбрасываются нативно до создания Python объектов. Значения сравниваются с байтами
+    полей в encoding (None - UTF-8). Если колонки usecols или where заданы именами,
+    первая строка - заголовок: она не фильтруется.
+    """
+    nonnumeric = config.quoting == QUOTE_NONNUMERIC
+    intern_columns, intern_all = _intern_columns(intern)
+    usecols = _usecols(usecols) or []
+    conditions = _where_conditions(where)
+    header = any(isinstance(column, str) for column in usecols) or \
+        any(isinstance(condition[0], str) for condition in conditions)
+    if convert is None or convert is False:
+        if not (nonnumeric or intern_columns or intern_all or usecols or conditions):
+            return None
+        converter = FieldConverter([], ConvertKind.STR, 0, nonnumeric, intern_columns, intern_all,
+                                   usecols, header)
+    else:
+        converter = FieldConverter(*_convert_kinds(convert), _CONVERT_INFER_ROWS, nonnumeric,
+                                   intern_columns, intern_all, usecols, header)
+    for column, kind, values, low, high in conditions:
+        values = [value.encode(encoding or 'utf-8', 'replace') for value in values]
+        converter.add_condition(column, kind, values, low, high)
+    return converter
+
+
+def _dict_converter(converter, fieldnames, restkey, restval):
+    """
+    Переключает FieldConverter (или создает новый) на выдачу словарей для DictReader.
+    
+    Словари создаются нативно из полей блока с общими объектами ключей, без списка полей
+    на строку. fieldnames=None - ключи из первой строки, она не выдается.
+    """
+    if converter is None:
+        converter = FieldConverter([], ConvertKind.STR, 0, False)
+    converter.set_dict(fieldnames, restkey, restval, Error)
+    return converter
+
+
+def _rows_before_error(error: Error) -> list:
+    """Строки блока до строки словаря с ошибкой (Error.rows, см. _dict_converter)
+    
+    Ошибку поднимает reader, когда выдаст эти строки, как csv.DictReader; прочие
+    ошибки поднимаются сразу.
+    """
+    rows = getattr(error, 'rows', None)
+    if rows is None:
+        raise error
+    error.rows = None
+    return rows
+
+
+def _rename_pending_keys(source, old, new):
+    """Новые fieldnames для уже созданных, но еще не выданных словарей блока (ключи - по позиции)"""
+    if getattr(source, '_use_mmap', False):
+        source = source._mmap_reader
+    rename = dict(zip(old, new))
+    for rows_attr, pos_attr in (('_pending_rows', '_pending_pos'), ('_all_rows', '_all_rows_pos')):
+        rows = getattr(source, rows_attr, None)
+        if rows:
+            pos = getattr(source, pos_attr)
+            rows[pos:] = [{rename.get(key, key): value for key, value in row.items()} for row in rows[pos:]]
+
+
+def _convert_kinds(convert):
+    """(типы колонок по позициям, тип остальных колонок) для convert="""
+    kinds = []
+    default_kind = ConvertKind.STR
+    if convert is True:
+        default_kind = ConvertKind.INFER
+    elif isinstance(convert, dict):
+        for column, value in convert.items():
+            if not isinstance(column, int) or column < 0:
+                raise ValueError(f"convert: column keys must be non-negative indexes, got {column!r}")
+            if column >= len(kinds):
+                kinds.extend([ConvertKind.STR] * (column + 1 - len(kinds)))
+            kinds[column] = _convert_kind(value, column)
+    elif isinstance(convert, (list, tuple)):
+        kinds = [_convert_kind(value, column) for column, value in enumerate(convert)]
+    else:
+        default_kind = _convert_kind(convert)
+    
+    return kinds, default_kind
+
+
+# Кодировки UTF-16, которые перекодируются нативно (значение - порядок байт для Utf16Decoder)
+_UTF16_BYTEORDER = {'utf-16': '', 'utf-16-le': 'little', 'utf-16-be': 'big'}
+
+
+def _charset_table(info: codecs.CodecInfo) -> Optional[str]:
+    """Таблица байт -> символ однобайтовой ASCII-совместимой кодировки или None"""
+    if info.name == 'iso8859-1':
+        return ''.join(map(chr, range(256)))
+    if info.name == 'ascii':
+        return ''.join(map(chr, range(128))) + '\ufffd' * 128
+    module = sys.modules.get(getattr(info.incrementaldecoder, '__module__', ''))
+    table = getattr(module, 'decoding_table', None)
+    if not isinstance(table, str) or len(table) != 256:
+        return None
+    if table[:128] != ''.join(map(chr, range(128))):
+        # Например, EBCDIC: разделители и кавычки нельзя искать в исходных байтах
+        return None
+    # Неопределенные в кодировке байты - U+FFFD, как errors='replace'
+    return table.replace('\ufffe', '\ufffd')
+
+
+class _ByteDecoding:
+    """
+    Разбор байтов в кодировке encoding через StreamTokenizer.
+    
+    UTF-8 передается токенизатору как есть. Однобайтовые ASCII-совместимые кодировки
+    (cp1251, koi8-r, latin-1, ...) - тоже как есть, строки полей создаются нативно по
+    таблице (Charset). UTF-16 перекодируется в UTF-8 нативно (Utf16Decoder), остальные
+    кодировки - инкрементальным декодером codecs. Байты, которых нет в кодировке,
+    заменяются на U+FFFD.
+    """
+    
+    def __init__(self, encoding: str):
+        info = codecs.lookup(encoding)
+        self.name = info.name
+        self.charset = None
+        self.decoder = None
+        if self.name == 'utf-8':
+            return
+        if self.name in _UTF16_BYTEORDER:
+            self.decoder = Utf16Decoder(_UTF16_BYTEORDER[self.name])
+            return
+        table = _charset_table(info)
+        if table is not None:
+            self.charset = Charset(table)
+        else:
+            self.decoder = info.incrementaldecoder('replace')
+    
+    @property
+    def field_encoding(self) -> str:
+        """Кодировка байт полей после токенизации (перекодированные блоки - UTF-8)"""
+        return self.name if self.charset is not None else 'utf-8'
+    
+    @property
+    def transcodes(self) -> bool:
+        """Байты перекодируются перед токенизацией (позиции в файле не совпадают с UTF-8)"""
+        return self.decoder is not None
+    
+    def feed(self, tokenizer, data, is_final, converter, stats=None):
+        """Передает следующие байты токенизатору и возвращает завершенные записи"""
+        if self.decoder is not None:
+            if stats is not None:
+                start = time.perf_counter_ns()
+                data = self.decoder.decode(data, is_final)
+                stats.decode_ns += time.perf_counter_ns() - start
+            else:
+                data = self.decoder.decode(data, is_final)
+        rows, _ = tokenizer.feed(data, is_final, converter, self.charset, stats)
+        return rows
+
+
+def _batched(chunks, size):
+    """Нарезает поток блоков строк на списки ровно по size строк (последний может быть короче)"""
+    if not isinstance(size, int) or size < 1:
+        raise ValueError(f"batches: size must be a positive integer, got {size!r}")
+    return _iter_batches(chunks, size)
+
+
+def _iter_batches(chunks, size):
+    rest = []
+    try:
+        for rows in chunks:
+            if rest:
+                rows = rest + rows
+            start = 0
+            end = len(rows)
+            while end - start >= size:
+                yield rows[start:start + size]
+                start += size
+            rest = rows[start:]
+    except Error:
+        # Строки до строки словаря с ошибкой выдаются неполным списком перед ошибкой
+        if rest:
+            yield rest
+        raise
+    if rest:
+        yield rest
+
+
+# Файловые объекты модулей сжатия: seekable() эмулирует seek распаковкой заново,
+# а name и fileno() относятся к сжатому файлу
+_COMPRESSED_FILE_TYPES = (('gzip', 'GzipFile'), ('bz2', 'BZ2File'), ('lzma', 'LZMAFile'),
+                          ('compression.zstd', 'ZstdFile'))
+
+
+def _is_compressed_file(csvfile) -> bool:
+    """Файл gzip / bz2 / lzma, в том числе открытый в текстовом режиме (TextIOWrapper)"""
+    raw = getattr(csvfile, 'buffer', csvfile)
+    for module, name in _COMPRESSED_FILE_TYPES:
+        # Модуль не импортирован - его файлов быть не может
+        file_type = getattr(sys.modules.get(module), name, None)
+        if file_type is not None and isinstance(raw, file_type):
+            return True
+    return False
+
+
+def _is_stream(csvfile) -> bool:
+    """Вход без размера и произвольного доступа: pipe, сокет, stdin или объект только с read()"""
+    if _is_compressed_file(csvfile):
+        # Размер и путь сжатого файла: иначе mmap_reader разбирал бы сжатые байты
+        return True
+    seekable = getattr(csvfile, 'seekable', None)
+    if seekable is None:
+        return not hasattr(csvfile, 'getvalue')
+    try:
+        if not seekable():
+            return True
+    except (OSError, ValueError):
+        return True
+    try:
+        mode = os.fstat(csvfile.fileno()).st_mode
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        return False
+    # fstat pipe или сокета возвращает размер 0: по нему файл считался бы пустым
+    return not stat.S_ISREG(mode)
+
+
+def _probe_file(csvfile):
+    """Размер и путь файла для выбора способа чтения (None, если не определяются)"""
+    file_size = None
+    filepath = None
+    
+    # Улучшенное определение размера файла и пути
+    # 1. Пытаемся получить путь из атрибута name (у файла, открытого по дескриптору, name - int)
+    if hasattr(csvfile, 'name') and csvfile.name and not isinstance(csvfile.name, int):
+        try:
+            filepath = csvfile.name
+            # Проверяем, что это реальный файл (не StringIO и т.д.)
+            if os.path.exists(filepath) and os.path.isfile(filepath):
+                file_size = os.path.getsize(filepath)
+        except (OSError, AttributeError, TypeError):
+            pass
+    
+    # 2. Если не получилось, пытаемся через fileno
+    if file_size is None and hasattr(csvfile, 'fileno'):
+        try:
+            fileno = csvfile.fileno()
+            stat_info = os.fstat(fileno)
+            file_size = stat_info.st_size
+            # Пытаемся получить путь через /proc/self/fd (Linux) или другие способы
+            if filepath is None:
+                # На Windows можно попробовать получить путь через другие методы
+                # Но для простоты используем только если уже есть filepath
+                pass
+        except (OSError, AttributeError, ValueError):
+            pass
+    
+    # 3. Для StringIO и подобных объектов пытаемся определить размер через getvalue
+    # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: для StringIO используем getvalue() напрямую (быстрее чем seek/tell)
+    if file_size is None and hasattr(csvfile, 'getvalue'):
+        try:
+            # Для StringIO getvalue() быстрее чем seek/tell
+            all_data = csvfile.getvalue()
+            file_size = len(all_data)
+        except (OSError, AttributeError, io.UnsupportedOperation):
+            # Fallback на seek/tell если getvalue() не работает
+            try:
+                current_pos = csvfile.tell()
+                csvfile.seek(0, 2)  # SEEK_END
+                file_size = csvfile.tell()
+                csvfile.seek(current_pos)
+            except (OSError, AttributeError, io.UnsupportedOperation):
+                pass
+    
+    return file_size, filepath
+
+
 class reader:
     """
     CSV reader, совместимый с csv.reader
     
     Для больших файлов (>10MB) автоматически использует mmap_reader для лучшей производительности.
+    
+    convert= включает конвертацию полей в C++ (int/float/bool/date, пустое поле -> None):
+    True или 'infer' - вывод типов колонок по первым строкам, один конвертер для всех колонок,
+    список конвертеров по позициям или словарь {индекс: конвертер}. Значения, которые не
+    разбираются как тип колонки, остаются строками. quoting=QUOTE_NONNUMERIC превращает
+    поля без кавычек во float, как csv.reader.
+    
+    С encoding= reader работает в байтовом режиме: csvfile открыт в 'rb', блоки байтов
+    разбираются нативно без слоя codecs (см. mmap_reader(encoding=)).
+    
+    intern=True или индексы колонок включают кэш строк для колонок с небольшим числом
+    различных значений: повторяющееся значение - один и тот же объект str.
+    
+    usecols - список колонок (индексы или имена из заголовка) в нужном порядке: строки
+    содержат только эти поля, для остальных Python объекты не создаются.
+    
+    where - условия на поля ({колонка: условие}, см. Prefix и Range): строки, которые им
+    не удовлетворяют, отбрасываются нативно, Python объекты для них не создаются.
+    
+    csvfile - файловый объект, объект с read(n) или дескриптор файла (int). Потоки без
+    произвольного доступа (pipe, сокет, stdin) читаются блоками без определения размера и seek.
+    
+    stats=True включает счетчики чтения (reader.stats()), stats=callback - еще и вызов
+    callback(reader.stats()) после каждого разобранного блока. Без stats счетчики
+    не ведутся.
     """
     
-    def __init__(self, csvfile: TextIO, dialect='excel', **fmtparams):
+    def __init__(self, csvfile: TextIO, dialect='excel', convert=None, encoding: Optional[str] = None,
+                 intern=None, usecols=None, where=None, stats=None, **fmtparams):
+        # Поток без размера и произвольного доступа (pipe, сокет, stdin) читается только
+        # блоками: размер не определяется, seek не вызывается
+        if isinstance(csvfile, int):
+            # Буферизованный файл: read(n) возвращает n байт, даже если pipe отдает их частями
+            csvfile = open(csvfile, 'rb', closefd=False)
+        streaming = _is_stream(csvfile)
+        
         # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для больших файлов: проверяем размер файла
         # Если файл большой, используем mmap_reader
-        file_size = None
-        filepath = None
-        
-        # Улучшенное определение размера файла и пути
-        # 1. Пытаемся получить путь из атрибута name
-        if hasattr(csvfile, 'name') and csvfile.name:
-            try:
-                filepath = csvfile.name
-                # Проверяем, что это реальный файл (не StringIO и т.д.)
-                if os.path.exists(filepath) and os.path.isfile(filepath):
-                    file_size = os.path.getsize(filepath)
-            except (OSError, AttributeError, TypeError):
-                pass
-        
-        # 2. Если не получилось, пытаемся через fileno
-        if file_size is None and hasattr(csvfile, 'fileno'):
-            try:
-                fileno = csvfile.fileno()
-                stat_info = os.fstat(fileno)
-                file_size = stat_info.st_size
-                # Пытаемся получить путь через /proc/self/fd (Linux) или другие способы
-                if filepath is None:
-                    # На Windows можно попробовать получить путь через другие методы
-                    # Но для простоты используем только если уже есть filepath
-                    pass
-            except (OSError, AttributeError, ValueError):
-                pass
-        
-        # 3. Для StringIO и подобных объектов пытаемся определить размер через getvalue
-        # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: для StringIO используем getvalue() напрямую (быстрее чем seek/tell)
-        if file_size is None and hasattr(csvfile, 'getvalue'):
-            try:
-                # Для StringIO getvalue() быстрее чем seek/tell
-                all_data = csvfile.getvalue()
-                file_size = len(all_data)
-            except (OSError, AttributeError, io.UnsupportedOperation):
-                # Fallback на seek/tell если getvalue() не работает
-                try:
-                    current_pos = csvfile.tell()
-                    csvfile.seek(0, 2)  # SEEK_END
-                    file_size = csvfile.tell()
-                    csvfile.seek(current_pos)
-                except (OSError, AttributeError, io.UnsupportedOperation):
-                    pass
+        file_size, filepath = (None, None) if streaming else _probe_file(csvfile)
         
         # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для больших файлов: используем mmap_reader
         # Адаптивный порог: для файлов >512KB используем mmap_reader
@@ -447,7 +927,12 @@ class reader:
                 pass
             
             # Создаем mmap_reader вместо обычного reader
-            self._mmap_reader = mmap_reader(filepath, dialect, **fmtparams)
+            # Текстовый файл, открытый не в UTF-8 (например, cp1251), читается в своей кодировке
+            if encoding is None:
+                encoding = getattr(csvfile, 'encoding', None)
+            self._mmap_reader = mmap_reader(filepath, dialect, convert=convert, encoding=encoding,
+                                            intern=intern, usecols=usecols, where=where, stats=stats,
+                                            **fmtparams)
             self._use_mmap = True
             return
         
@@ -459,14 +944,27 @@ class reader:
         self._dialect = dialect
         self._fmtparams = fmtparams
         self._config = None  # Создаем только при необходимости
+        self._convert = convert
+        # Неверные intern=, usecols= и where= - ValueError сразу, а не при первом чтении
+        _intern_columns(intern)
+        _where_conditions(where)
+        self._intern = intern
+        self._usecols = _usecols(usecols)
+        self._where = where
+        self._stats, self._on_chunk = _read_stats(stats)
+        self._dict_args = None  # (fieldnames, restkey, restval) для DictReader
+        self._converter = None
+        self._converter_ready = False
         
         # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для маленьких файлов: ленивая инициализация parser
         # Создаем parser только при первом использовании для уменьшения overhead
         self._parser = None
         self.line_num = 0
         self._eof = False
-        self._buffer = ""
+        self._row_error = None  # Ошибка строки словаря, поднимается после строк блока до нее
+        self._tokenizer = None  # StreamTokenizer для блочного чтения (создается лениво)
         self._pending_rows = []  # Буфер для предварительно распарсенных строк
+        self._pending_pos = 0  # Индекс следующей строки в _pending_rows
         
         # Адаптивный размер чанка: будет определен при первой проверке размера файла
         # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: кэшируем размер файла только для маленьких файлов (<1MB)
@@ -479,28 +977,20 @@ class reader:
         self._all_rows = None  # Кэш для маленьких файлов
         self._all_rows_pos = 0
         self._file_size_checked = False
+        
+        # Байтовый режим: блоки бинарного файла разбираются StreamTokenizer в кодировке encoding
+        self._decoding = _ByteDecoding(encoding) if encoding is not None else None
+        # Потоки и бинарные файлы без encoding= (байты - UTF-8, как в mmap_reader) тоже
+        # читаются только блоками: разбор всего файла сразу рассчитан на str
+        if (self._decoding is not None or streaming
+                or isinstance(csvfile, (io.RawIOBase, io.BufferedIOBase))):
+            self._file_size_checked = True
     
     @property
     def config(self):
         """Ленивая инициализация ParserConfig для уменьшения overhead"""
         if self._config is None:
-            self._config = _convert_dialect_to_config(self._dialect, **self._fmtparams)
-            # Убеждаемся, что delimiter и quote правильно установлены
-            if isinstance(self._dialect, Dialect):
-                delimiter_val = self._fmtparams.get('delimiter', self._dialect.delimiter)
-                quote_val = self._fmtparams.get('quotechar', self._dialect.quotechar)
-            elif isinstance(self._dialect, str) and self._dialect in _dialects:
-                dialect_obj = _dialects[self._dialect]
-                delimiter_val = self._fmtparams.get('delimiter', dialect_obj.delimiter)
-                quote_val = self._fmtparams.get('quotechar', dialect_obj.quotechar)
-            else:
-                delimiter_val = self._fmtparams.get('delimiter', ',')
-                quote_val = self._fmtparams.get('quotechar', '"')
-            
-            if isinstance(delimiter_val, str):
-                self._config.delimiter = delimiter_val
-            if isinstance(quote_val, str):
-                self._config.quote = quote_val
+            self._config = _make_parser_config(self._dialect, self._fmtparams)
         return self._config
     
     @property
@@ -510,6 +1000,34 @@ class reader:
             self._parser = CSVParser(self.config)
         return self._parser
     
+    @property
+    def converter(self):
+        """FieldConverter для convert=, intern=, usecols=, where= и QUOTE_NONNUMERIC (None, если не нужен)"""
+        if not self._converter_ready:
+            encoding = self._decoding.field_encoding if self._decoding is not None else None
+            self._converter = _make_converter(self._convert, self.config, self._intern, self._usecols,
+                                              self._where, encoding)
+            if self._dict_args is not None:
+                self._converter = _dict_converter(self._converter, *self._dict_args)
+            self._converter_ready = True
+        return self._converter
+    
+    def _read_dicts(self, fieldnames, restkey, restval):
+        """Переключает reader на выдачу словарей (DictReader) до начала чтения, возвращает FieldConverter"""
+        if self._use_mmap:
+            return self._mmap_reader._read_dicts(fieldnames, restkey, restval)
+        self._dict_args = (fieldnames, restkey, restval)
+        return self.converter
+    
+    def _rows_from_results(self, results):
+        """Списки полей из ParsedRow (с конвертацией, если она включена)"""
+        converter = self.converter
+        if converter is None:
+            return [row.fields for row in results]
+        rows = [converter.convert_row(row) for row in results]
+        # convert_row возвращает None для строк, не прошедших where, и заголовка словарей
+        return [row for row in rows if row is not None]
+    
     def __iter__(self):
         # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: если используется mmap_reader, возвращаем его
         if hasattr(self, '_use_mmap') and self._use_mmap:
@@ -561,7 +1079,9 @@ class reader:
                 # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: для очень маленьких файлов (<3KB) используем встроенный csv
                 # Overhead инициализации FastCSV больше времени парсинга для таких файлов
                 # Увеличен порог с 2KB до 3KB для лучшей производительности (Small 10 rows ~1.5KB)
-                if file_size < 3072:  # <3KB - очень маленький файл
+                if (file_size < 3072 and self._convert is None and not self._intern and self._usecols is None
+                        and self._where is None and self._dict_args is None
+                        and self._stats is None):  # <3KB - очень маленький файл
                     # Для очень маленьких файлов используем встроенный csv.reader
                     # Это быстрее из-за отсутствия overhead инициализации
                     # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: используем StringIO напрямую для избежания seek(0)
@@ -581,6 +1101,7 @@ class reader:
                             std_fmtparams['quotechar'] = std_fmtparams.get('quotechar', dialect_obj.quotechar)
                             std_fmtparams['lineterminator'] = std_fmtparams.get('lineterminator', dialect_obj.lineterminator)
                             std_fmtparams['skipinitialspace'] = std_fmtparams.get('skipinitialspace', dialect_obj.skipinitialspace)
+                            std_fmtparams['quoting'] = std_fmtparams.get('quoting', dialect_obj.quoting)
                             std_dialect = None  # Используем fmtparams вместо dialect
                         elif isinstance(self._dialect, Dialect):
                             # Если это объект Dialect, преобразуем в параметры
@@ -588,6 +1109,7 @@ class reader:
                             std_fmtparams['quotechar'] = std_fmtparams.get('quotechar', self._dialect.quotechar)
                             std_fmtparams['lineterminator'] = std_fmtparams.get('lineterminator', self._dialect.lineterminator)
                             std_fmtparams['skipinitialspace'] = std_fmtparams.get('skipinitialspace', self._dialect.skipinitialspace)
+                            std_fmtparams['quoting'] = std_fmtparams.get('quoting', self._dialect.quoting)
                             std_dialect = None
                         
                         # Используем std_csv.reader с правильными параметрами
@@ -608,7 +1130,7 @@ class reader:
                         self._all_rows_pos = 0
                         self._eof = True
                         return True
-                    except Exception:
+                    except (TypeError, std_csv.Error):
                         # Если fallback не сработал из-за проблем с dialect/fmtparams, пробуем упрощенный вариант
                         try:
                             csvfile_new2 = io.StringIO(all_data)
@@ -623,11 +1145,11 @@ class reader:
                 # Для маленьких файлов (<1KB) сразу парсим без дополнительных проверок
                 elif file_size < 1024:  # <1KB - маленький файл
                     try:
-                        self._all_rows = parse_chunk_to_python(self.parser, all_data)
+                        self._all_rows = self._parse_all(all_data)
                         self._all_rows_pos = 0
                         self._eof = True
                         return True
-                    except Exception:
+                    except MemoryError:
                         pass
             except (io.UnsupportedOperation, AttributeError, OSError):
                 pass
@@ -657,11 +1179,13 @@ class reader:
                 try:
                     # Парсим весь файл сразу для лучшей производительности
                     # Это уменьшает количество вызовов parse_chunk_to_python
-                    self._all_rows = parse_chunk_to_python(self.parser, all_data)
+                    # Файл уже возвращен в current_pos: читаем остаток целиком
+                    all_data = self.file.read()
+                    self._all_rows = self._parse_all(all_data)
                     self._all_rows_pos = 0
                     self._eof = True
                     return True
-                except (MemoryError, Exception):
+                except MemoryError:
                     # Fallback на обычный способ при ошибках памяти
                     try:
                         self.file.seek(0)
@@ -706,38 +1230,17 @@ class reader:
                 self._all_rows_pos = 0
                 return True
             
-            # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для файлов с кавычками: для маленьких/средних файлов (<500KB)
-            # пропускаем проверку has_unclosed_quotes и всегда используем batch обработку
-            # Это значительно ускоряет файлы с кавычками, так как избегает построчного чтения
-            quote_char = self.config.quote
-            if quote_char in all_data:
-                # Есть кавычки - для маленьких файлов пропускаем проверку
-                # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: для файлов <500KB всегда используем batch обработку
-                # Проверка has_unclosed_quotes может быть медленной и давать ложные срабатывания
-                if file_size >= 512000:  # >=500KB - проверяем только для больших файлов
-                    if CSVParser.has_unclosed_quotes(all_data, quote_char):
-                        # Есть незакрытые кавычки - возможно многострочное поле
-                        # Не используем оптимизацию, используем построчное чтение
-                        try:
-                            self.file.seek(0)
-                        except (io.UnsupportedOperation, AttributeError, OSError):
-                            pass
-                        return False
-                # Для маленьких файлов (<500KB) всегда используем batch обработку
-                # Все кавычки закрыты (или пропускаем проверку) - можем использовать оптимизацию!
-            # Если кавычек нет, сразу используем оптимизацию (самый быстрый путь)
-            
             # Парсим весь файл за один вызов C++
             # Используем оптимизированную функцию для batch создания Python объектов
             try:
-                self._all_rows = parse_chunk_to_python(self.parser, all_data)
-            except (MemoryError, Exception) as e:
-                # Fallback на обычный способ при ошибках памяти или других ошибках
+                self._all_rows = self._parse_all(all_data)
+            except MemoryError:
+                # Fallback на обычный способ при ошибках памяти
                 try:
                     results = self.parser.parse_chunk(all_data)
-                    self._all_rows = [row.fields for row in results]
-                except (MemoryError, Exception):
-                    # Если и это не работает, возвращаемся к построчному чтению
+                    self._all_rows = self._rows_from_results(results)
+                except MemoryError:
+                    # Если и это не работает, возвращаемся к чтению блоками
                     try:
                         self.file.seek(0)
                     except (io.UnsupportedOperation, AttributeError, OSError):
@@ -749,223 +1252,72 @@ class reader:
             self._all_rows_pos = 0
             return True
         
+        # Большой файл в памяти уже прочитан для определения размера -
+        # возвращаемся к началу, дальше он читается блоками
+        if all_data is not None:
+            try:
+                self.file.seek(0)
+            except (io.UnsupportedOperation, AttributeError, OSError):
+                pass
         return False
     
+    def _parse_all(self, data):
+        """Парсит весь файл, уже прочитанный в память, одним вызовом C++"""
+        try:
+            rows = parse_chunk_to_python(self.parser, data, self.converter, self._stats)
+        except Error as e:
+            rows = _rows_before_error(e)
+            self._row_error, self._eof = e, True
+        if self._on_chunk is not None:
+            self._on_chunk(self.stats())
+        return rows
+    
     def _read_and_parse_chunk(self):
-        """Читает и парсит блок данных с учетом многострочных полей"""
-        # Адаптивный размер чанка: оптимизирован для разных размеров файлов
-        # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: увеличен размер чанка для больших файлов
-        # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: ленивое определение размера для больших файлов (если не кэширован)
-        # Кэшируем результат в локальной переменной для избежания повторных вызовов seek/tell
-        file_size = self._file_size
-        if file_size is None:
-            # Для больших файлов определяем размер лениво один раз (не кэшируем в self._file_size)
-            try:
-                current_pos = self.file.tell()
-                self.file.seek(0, 2)  # SEEK_END
-                file_size = self.file.tell()
-                self.file.seek(current_pos)
-                # Не кэшируем для больших файлов (>=1MB), но используем для адаптации в этом методе
-            except (OSError, AttributeError, io.UnsupportedOperation):
-                file_size = None
-        
-        if file_size is not None:
-            # Адаптируем размер чанка на основе размера файла
-            if file_size < 51200:  # <50KB - маленький файл
-                self._chunk_size = 65536  # 64KB для маленьких файлов
-            elif file_size < 512000:  # <500KB - средний файл
-                self._chunk_size = 65536  # 64KB для средних файлов (меньше overhead)
-            elif file_size < 1048576:  # <1MB - большой файл
-                self._chunk_size = 262144  # 256KB для больших файлов
-            elif file_size < 5242880:  # <5MB - очень большой файл
-                self._chunk_size = 524288  # 512KB для очень больших файлов
-            else:  # >=5MB - огромный файл
-                self._chunk_size = 1048576  # 1MB для огромных файлов (критическая оптимизация)
-        
-        # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для больших файлов: адаптивный минимальный размер буфера
-        # Для больших файлов накапливаем больше данных перед парсингом для уменьшения overhead
-        # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: используем уже определенный размер из предыдущего блока
-        if file_size is not None:
-            if file_size >= 5242880:  # >=5MB - огромный файл
-                min_buffer_size = 32768  # 32KB для огромных файлов (увеличено для уменьшения вызовов)
-            elif file_size >= 1048576:  # >=1MB - очень большой файл
-                min_buffer_size = 16384  # 16KB для очень больших файлов (увеличено)
-            else:
-                min_buffer_size = 2048  # 2KB для остальных файлов
-        else:
-            min_buffer_size = 2048  # 2KB по умолчанию
-        
-        # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: для больших файлов накапливаем больше данных
-        # Обрабатываем буфер только когда он достиг определенного размера
-        if len(self._buffer) < min_buffer_size:
-            # Для маленьких буферов читаем больше данных
-            # Но если файл маленький, можем начать парсинг раньше
-            return []
-        
-        # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для больших файлов в памяти: накапливаем больше данных
-        # Для файлов в памяти (StringIO) нет file_size, но мы можем определить размер по буферу
-        # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: уменьшен порог до 512KB для лучшей производительности
-        if self._file_size is None:
-            # Файл в памяти - используем размер буфера для определения стратегии
-            if len(self._buffer) >= 524288:  # >=512KB в буфере (уменьшен порог)
-                # Для больших буферов в памяти накапливаем до 2MB перед обработкой (уменьшено с 4MB)
-                if not self._eof and len(self._buffer) < 2097152:  # <2MB
-                    return []
-        elif self._file_size >= 5242880:  # >=5MB - огромный файл
-            if not self._eof and len(self._buffer) < 4194304:  # <4MB - продолжаем накапливать
-                return []
-        elif self._file_size >= 1048576:  # >=1MB - очень большой файл
-            # Для больших файлов накапливаем до 2MB
-            if not self._eof and len(self._buffer) < 2097152:  # <2MB
-                return []
-        
-        # Читаем блок данных
+        """Читает блок данных и возвращает завершенные записи
+        
+        StreamTokenizer хранит незавершенную запись и состояние кавычек между вызовами:
+        каждый байт просматривается один раз, даже если многострочное поле в кавычках
+        растянуто на много блоков.
+        """
+        if self._tokenizer is None:
+            self._tokenizer = StreamTokenizer(self.config)
+        
         chunk = self.file.read(self._chunk_size)
         if not chunk:
             self._eof = True
-            if not self._buffer:
-                return []
-            # Парсим остаток буфера - оптимизация: используем parse_chunk_to_python если возможно
-            try:
-                parsed_rows = parse_chunk_to_python(self.parser, self._buffer)
-                self._buffer = ""
-                return parsed_rows
-            except Exception:
-                # Fallback на обычный способ
-                results = self.parser.parse_chunk(self._buffer)
-                self._buffer = ""
-                return [row.fields for row in results]
-        
-        # Добавляем к буферу
-        self._buffer += chunk
-        
-        # Используем parse_chunk для batch processing
-        # parse_chunk теперь правильно обрабатывает кавычки и многострочные поля
-        # Он обрабатывает строки до тех пор, пока не встретит незавершенное многострочное поле
-        
-        # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для больших файлов: адаптивная проверка незакрытых кавычек
-        # Для огромных файлов (>5MB) пропускаем проверку для ускорения
-        has_unclosed = False
-        if self._file_size is None or self._file_size < 5242880:  # <5MB - проверяем
-            has_unclosed = CSVParser.has_unclosed_quotes(self._buffer, self.config.quote)
-        # Для огромных файлов предполагаем, что кавычки закрыты (оптимизация)
-        
-        if has_unclosed:
-            # Есть незакрытые кавычки - возможно многострочное поле
-            # Для средних файлов все равно пытаемся использовать parse_chunk
-            # parse_chunk обработает завершенные строки и вернет bytes_processed
-            try:
-                results = self.parser.parse_chunk(self._buffer)
-                parsed_rows = [row.fields for row in results]
-                # Если обработали что-то, используем это
-                if parsed_rows:
-                    # Нужно обновить буфер - оставляем необработанную часть
-                    # parse_chunk обрабатывает до последней завершенной строки
-                    last_newline = CSVParser.find_last_newline(self._buffer)
-                    if last_newline < len(self._buffer):
-                        # Нашли newline - все до него обработано
-                        if last_newline + 1 < len(self._buffer) and self._buffer[last_newline] == '\r' and self._buffer[last_newline + 1] == '\n':
-                            self._buffer = self._buffer[last_newline + 2:]
-                        else:
-                            self._buffer = self._buffer[last_newline + 1:]
-                    else:
-                        # Не нашли newline - оставляем последние 2000 символов
-                        if len(self._buffer) > 2000:
-                            self._buffer = self._buffer[-2000:]
-                    return parsed_rows
-            except Exception:
-                pass
-            # Если не получилось, используем построчное чтение
-            return []
-        
-        # Все кавычки закрыты (или их нет) - можем парсить весь буфер
-        # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для больших файлов в памяти: обрабатываем большие части буфера за раз
-        buffer_to_process = self._buffer
-        max_process_size = None
-        
-        # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для больших файлов в памяти: определяем размер обработки
-        # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: используем уже определенный размер из начала метода
-        if file_size is None:
-            # Файл в памяти - используем размер буфера для определения стратегии
-            # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: уменьшен порог до 512KB для лучшей производительности
-            if len(self._buffer) >= 524288:  # >=512KB в буфере (уменьшен порог)
-                max_process_size = 2097152  # 2MB для больших буферов в памяти (уменьшено с 4MB)
-            else:
-                max_process_size = None
-        elif file_size >= 5242880:  # >=5MB - огромный файл
-            max_process_size = 4194304  # 4MB
-        elif file_size >= 1048576:  # >=1MB - очень большой файл
-            max_process_size = 2097152  # 2MB
-        else:
-            max_process_size = None
-        
-        if max_process_size and len(buffer_to_process) > max_process_size:
-            # Обрабатываем только часть буфера
-            # Находим последний newline в пределах max_process_size
-            search_end = max_process_size
-            last_newline_in_range = buffer_to_process.rfind('\n', 0, search_end)
-            if last_newline_in_range == -1:
-                # Нет newline в пределах - ищем \r
-                last_newline_in_range = buffer_to_process.rfind('\r', 0, search_end)
-            
-            if last_newline_in_range != -1:
-                # Нашли newline - обрабатываем до него
-                if last_newline_in_range + 1 < len(buffer_to_process) and buffer_to_process[last_newline_in_range] == '\r' and buffer_to_process[last_newline_in_range + 1] == '\n':
-                    buffer_to_process = buffer_to_process[:last_newline_in_range + 2]
-                else:
-                    buffer_to_process = buffer_to_process[:last_newline_in_range + 1]
-            else:
-                # Не нашли newline - обрабатываем весь max_process_size
-                buffer_to_process = buffer_to_process[:max_process_size]
-        
-        # Используем оптимизированную функцию для batch создания Python объектов
-        # Это работает даже если есть кавычки, но они все правильно закрыты
+        if self._decoding is not None and isinstance(chunk, str):
+            raise TypeError("reader: encoding= requires a file opened in binary mode")
         try:
-            parsed_rows = parse_chunk_to_python(self.parser, buffer_to_process)
-        except Exception:
-            # Fallback на обычный способ при ошибках
-            results = self.parser.parse_chunk(buffer_to_process)
-            parsed_rows = [row.fields for row in results]
-        
-        if not parsed_rows:
-            # Ничего не обработано - продолжаем читать
-            return []
-        
-        # Обновляем буфер - удаляем обработанную часть
-        # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: parse_chunk_to_python обрабатывает до последнего завершенного newline
-        # Находим последний newline в обработанной части для правильного обновления буфера
-        last_newline = buffer_to_process.rfind('\n')
-        if last_newline == -1:
-            last_newline = buffer_to_process.rfind('\r')
-        
-        if last_newline != -1:
-            # Нашли newline - все до него (включительно) было обработано
-            processed_len = last_newline + 1
-            # Проверяем, не \r\n ли это
-            if last_newline + 1 < len(buffer_to_process) and buffer_to_process[last_newline] == '\r' and buffer_to_process[last_newline + 1] == '\n':
-                processed_len = last_newline + 2
-            self._buffer = self._buffer[processed_len:]
-        else:
-            # Нет newline в обработанной части - обработали все что могли
-            # Оставляем остаток для следующей итерации
-            processed_len = len(buffer_to_process)
-            if processed_len < len(self._buffer):
-                self._buffer = self._buffer[processed_len:]
+            if self._decoding is not None:
+                rows = self._decoding.feed(self._tokenizer, chunk, self._eof, self.converter, self._stats)
             else:
-                # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для больших файлов: адаптивный размер остатка
-                # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: используем уже определенный размер из начала метода
-                max_remainder = 2000  # По умолчанию
-                if file_size is not None:
-                    if file_size >= 5242880:  # >=5MB - огромный файл
-                        max_remainder = 8192  # Еще больше для огромных файлов
-                    elif file_size >= 1048576:  # >=1MB - очень большой файл
-                        max_remainder = 4096  # Больше для очень больших файлов
-                buffer_len = len(self._buffer)
-                if buffer_len > max_remainder:
-                    self._buffer = self._buffer[-max_remainder:]
-                # Если буфер маленький, оставляем весь
-        
-        return parsed_rows
+                rows, _ = self._tokenizer.feed(chunk, self._eof, self.converter, None, self._stats)
+        except Error as e:
+            rows = _rows_before_error(e)
+            self._row_error, self._eof = e, True
+        if self._on_chunk is not None:
+            self._on_chunk(self.stats())
+        return rows
+    
+    def stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Счетчики чтения (reader(stats=True)) или None, если они не включены.
+        
+        Словарь: bytes - обработанные байты (для str - в UTF-8), chunks - разобранные блоки,
+        rows - выданные строки, parse_time / decode_time / build_time - время токенизации,
+        определения кодировки и перекодирования, создания Python объектов (секунды).
+        """
+        if self._use_mmap:
+            return self._mmap_reader.stats()
+        return self._stats.as_dict() if self._stats is not None else None
+    
+    def __getattr__(self, name):
+        # line_num на пути mmap - счетчик mmap_reader. __getattr__ вызывается только для
+        # отсутствующих атрибутов: line_num остальных путей - обычный атрибут без накладных
+        # расходов на каждую строку
+        if name == 'line_num' and self.__dict__.get('_use_mmap'):
+            return self._mmap_reader.line_num
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
     
     def __next__(self):
         # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для больших файлов: используем mmap_reader
@@ -975,6 +1327,7 @@ class reader:
         # Для маленьких файлов используем оптимизированный путь
         if self._all_rows is not None:
             if self._all_rows_pos >= len(self._all_rows):
+                self._raise_row_error()
                 raise StopIteration
             self.line_num = self._all_rows_pos + 1
             row = self._all_rows[self._all_rows_pos]
@@ -987,168 +1340,197 @@ class reader:
                 # Файл был маленьким и уже распарсен
                 return self.__next__()
         
-        if self._eof and not self._pending_rows and not self._buffer:
-            raise StopIteration
-        
-        # Если есть предварительно распарсенные строки, возвращаем их
-        if self._pending_rows:
+        # Строки блока выдаются по индексу: pop(0) сдвигал бы весь остаток списка
+        pos = self._pending_pos
+        if pos < len(self._pending_rows):
+            self._pending_pos = pos + 1
             self.line_num += 1
-            return self._pending_rows.pop(0)
+            return self._pending_rows[pos]
         
-        # Пытаемся прочитать и распарсить новый блок
-        if not self._eof:
+        # Читаем блоки, пока не появится хотя бы одна завершенная запись
+        while not self._eof:
             new_rows = self._read_and_parse_chunk()
             if new_rows:
-                # Сохраняем все кроме первой в буфер, возвращаем первую
-                if len(new_rows) > 1:
-                    self._pending_rows.extend(new_rows[1:])
+                self._pending_rows = new_rows
+                self._pending_pos = 1
                 self.line_num += 1
                 return new_rows[0]
         
-        # Fallback на построчное чтение (для маленьких файлов или многострочных полей)
-        if not self._eof or self._buffer:
-            # Собираем строку, обрабатывая многострочные поля в кавычках
-            line_parts = []
-            in_quotes = False
-            quote_char = self.config.quote
-            
-            # Используем буфер если есть
-            if self._buffer:
-                line_parts.append(self._buffer)
-                quote_count = self._buffer.count(quote_char)
-                if quote_count % 2 == 1:
-                    in_quotes = not in_quotes
-                self._buffer = ""
-            
-            while True:
-                chunk = self.file.readline() if not self._eof else None
-                if not chunk:
-                    if not line_parts:
-                        self._eof = True
-                        raise StopIteration
-                    self._eof = True
-                    break
-                
-                self.line_num += 1
-                line_parts.append(chunk)
-                
-                # Подсчитываем кавычки для определения, закрыто ли поле
-                quote_count = chunk.count(quote_char)
-                if quote_count % 2 == 1:
-                    in_quotes = not in_quotes
-                
-                if not in_quotes:
-                    break
-            
-            # Объединяем части строки
-            if len(line_parts) == 1:
-                full_line = line_parts[0]
-            else:
-                full_line = ''.join(line_parts)
-            
-            # Парсим строку
-            try:
-                result = self.parser.parse_line(full_line.rstrip('\r\n'))
-                if not result.success:
-                    raise Error(f"Error parsing line {self.line_num}")
-                
-                return result.fields
-            except UnicodeDecodeError as e:
-                # Обрабатываем ошибки декодирования
-                raise Error(f"Unicode decode error at line {self.line_num}: {e}")
+        self._raise_row_error()
+        raise StopIteration
+    
+    def _raise_row_error(self):
+        """Поднимает ошибку строки словаря, если строки до нее уже выданы"""
+        if self._row_error is not None:
+            error, self._row_error = self._row_error, None
+            raise error
+    
+    def _row_chunks(self):
+        """Отдает оставшиеся строки списками в том виде, в каком они распарсены"""
+        if self._all_rows is None and not self._file_size_checked:
+            self._check_and_parse_small_file()
         
-        # Если есть строки в буфере, возвращаем их
-        if self._pending_rows:
-            self.line_num += 1
-            return self._pending_rows.pop(0)
+        if self._all_rows is not None:
+            rows = self._all_rows[self._all_rows_pos:]
+            self._all_rows_pos = len(self._all_rows)
+            if rows:
+                self.line_num += len(rows)
+                yield rows
+            self._raise_row_error()
+            return
         
-        raise StopIteration
+        if self._pending_pos < len(self._pending_rows):
+            rows = self._pending_rows[self._pending_pos:]
+            self._pending_rows = []
+            self._pending_pos = 0
+            self.line_num += len(rows)
+            yield rows
+        
+        while not self._eof:
+            rows = self._read_and_parse_chunk()
+            if rows:
+                self.line_num += len(rows)
+                yield rows
+        self._raise_row_error()
+    
+    def batches(self, size: int = 10000) -> Iterator[List[List[str]]]:
+        """
+        Возвращает оставшиеся строки списками по size строк (последний список может быть короче).
+        
+        Строки не проходят через __next__ по одной: списки нарезаются из распарсенных блоков.
+        Чтение можно продолжить через __next__ после частичного обхода batches().
+        """
+        if self._use_mmap:
+            return self._mmap_reader.batches(size)
+        return _batched(self._row_chunks(), size)
 
 
 class DictReader:
-    """CSV DictReader, совместимый с csv.DictReader"""
+    """CSV DictReader, совместимый с csv.DictReader
+    
+    С usecols= словари содержат только выбранные колонки, с where= - только строки,
+    удовлетворяющие условиям. Заданные fieldnames описывают все колонки файла, имена
+    usecols и where ищутся в них.
+    
+    Словари создаются нативно прямо из полей блока (FieldConverter.set_dict): заголовок
+    разбирается в C++, списки полей на строку не создаются.
+    """
     
     def __init__(self, csvfile: TextIO, fieldnames: Optional[List[str]] = None,
                  restkey: Optional[str] = None, restval: Optional[str] = None,
-                 dialect='excel', **fmtparams):
-        self.reader = reader(csvfile, dialect, **fmtparams)
-        self.fieldnames = fieldnames
+                 dialect='excel', usecols=None, where=None, stats=None, **fmtparams):
+        usecols, where, fieldnames = _dict_reader_columns(fieldnames, usecols, where)
+        self.reader = reader(csvfile, dialect, usecols=usecols, where=where, stats=stats, **fmtparams)
+        self._fieldnames = fieldnames
         self.restkey = restkey
         self.restval = restval
         self.line_num = 0
-        # Кэшируем длину fieldnames для оптимизации (будет установлено при первом чтении)
-        self._fieldnames_len = len(fieldnames) if fieldnames is not None else 0
+        self._converter = self.reader._read_dicts(fieldnames, restkey, restval)
+        # Заголовок файла reader не выдает, но он учитывается в line_num
+        self._header_lines = 1 if fieldnames is None else 0
+    
+    @property
+    def fieldnames(self) -> Optional[List[str]]:
+        """Имена полей (из первой строки - после первого чтения)"""
+        if self._fieldnames is None:
+            self._fieldnames = self._converter.fieldnames
+        return self._fieldnames
+    
+    @fieldnames.setter
+    def fieldnames(self, value: List[str]):
+        value = list(value)
+        old = self._converter.fieldnames
+        if old is None:
+            # Имена заданы до чтения заголовка: первая строка файла - данные, как у csv.DictReader
+            self._header_lines = 0
+        else:
+            _rename_pending_keys(self.reader, old, value)
+        self._converter.fieldnames = value
+        self._fieldnames = value
     
     def __iter__(self):
         return self
     
     def __next__(self):
-        if self.fieldnames is None:
-            # Первая строка - заголовки
-            self.fieldnames = next(self.reader)
-            self.line_num = self.reader.line_num
-            # Кэшируем длину fieldnames для оптимизации
-            self._fieldnames_len = len(self.fieldnames)
-        
         row = next(self.reader)
-        self.line_num = self.reader.line_num
-        
-        # Оптимизированное создание словаря
-        row_len = len(row)
-        fieldnames_len = self._fieldnames_len  # Используем кэшированное значение
-        
-        if row_len == fieldnames_len:
-            # Самый частый случай - используем dict() с zip для лучшей производительности
-            # dict(zip()) быстрее чем dict comprehension для этого случая
-            return dict(zip(self.fieldnames, row))
-        elif row_len > fieldnames_len:
-            if self.restkey is None:
-                raise Error(f"Too many fields in row {self.line_num}")
-            # Используем dict() с zip для основной части
-            result = dict(zip(self.fieldnames, row[:fieldnames_len]))
-            result[self.restkey] = row[fieldnames_len:]
-            return result
-        else:
-            # Меньше полей чем заголовков
-            result = dict(zip(self.fieldnames[:row_len], row))
-            if self.restval is not None:
-                # Используем dict.fromkeys для быстрого создания недостающих полей
-                missing_keys = self.fieldnames[row_len:]
-                if missing_keys:
-                    result.update(dict.fromkeys(missing_keys, self.restval))
-            return result
+        self.line_num = self.reader.line_num + self._header_lines
+        return row
+    
+    def stats(self) -> Optional[Dict[str, Any]]:
+        """Счетчики чтения (см. reader.stats)"""
+        return self.reader.stats()
 
 
 class writer:
-    """CSV writer, совместимый с csv.writer (базовая реализация)"""
+    """CSV writer, совместимый с csv.writer
     
-    def __init__(self, csvfile: TextIO, dialect='excel', **fmtparams):
-        self.file = csvfile
+    Сериализация выполняется нативным CSVWriter: writerows собирает строки
+    в один буфер и пишет в файл блоками по 1MB вместо write() на каждую строку.
+    
+    compression='gzip' / 'bz2' / 'xz' / 'zstd' сжимает вывод при записи: csvfile - бинарный
+    файл, блоки кодируются в encoding и сжимаются в фоновом потоке, пока сериализуется
+    следующий блок (threaded=None - если процессоров больше одного). close() или выход
+    из with дописывает конец сжатого потока; файл остается открытым.
+    """
+    
+    def __init__(self, csvfile: TextIO, dialect='excel', compression: Optional[str] = None,
+                 compresslevel: Optional[int] = None, encoding: str = 'utf-8',
+                 threaded: Optional[bool] = None, **fmtparams):
+        self._sink = None
+        if compression is not None:
+            if compression not in _COMPRESSORS:
+                raise ValueError(f"compression must be None or one of {sorted(_COMPRESSORS)}, "
+                                 f"got {compression!r}")
+            if isinstance(csvfile, io.TextIOBase):
+                raise ValueError("compression requires a file opened in binary mode")
+            if threaded is None:
+                threaded = (os.cpu_count() or 1) > 1
+            self._sink = _CompressingSink(csvfile, compression, compresslevel, encoding, threaded)
+        self.file = csvfile if self._sink is None else self._sink
         self.delimiter = fmtparams.get('delimiter', ',')
         self.quotechar = fmtparams.get('quotechar', '"')
         self.quoting = fmtparams.get('quoting', QUOTE_MINIMAL)
+        self.lineterminator = fmtparams.get('lineterminator', '\n')
+        self._writer = CSVWriter(_convert_params_to_writer_config(
+            self.delimiter, self.quotechar, self.quoting, self.lineterminator))
     
     def writerow(self, row: List[Any]):
         """Записывает строку"""
-        quoted_row = []
-        for field in row:
-            field_str = str(field)
-            if self.quoting == QUOTE_MINIMAL:
-                if self.delimiter in field_str or self.quotechar in field_str or '\n' in field_str:
-                    quoted_row.append(f'{self.quotechar}{field_str.replace(self.quotechar, self.quotechar * 2)}{self.quotechar}')
-                else:
-                    quoted_row.append(field_str)
-            elif self.quoting == QUOTE_ALL:
-                quoted_row.append(f'{self.quotechar}{field_str}{self.quotechar}')
-            else:
-                quoted_row.append(field_str)
-        
-        self.file.write(self.delimiter.join(quoted_row) + '\n')
+        return self.file.write(self._writer.format_row(row))
     
     def writerows(self, rows: List[List[Any]]):
         """Записывает несколько строк"""
-        for row in rows:
-            self.writerow(row)
+        self._writer.write_rows(rows, self.file.write)
+    
+    def close(self):
+        """С compression= - сжимает оставшиеся строки и дописывает конец сжатого потока"""
+        if self._sink is not None:
+            sink, self._sink = self._sink, None
+            sink.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+    
+    def __del__(self):
+        try:
+            self.close()
+        except:
+            pass
+
+
+def _convert_params_to_writer_config(delimiter=',', quotechar='"', quoting=QUOTE_MINIMAL,
+                                     lineterminator='\n'):
+    """Конвертирует параметры writer'а в WriterConfig"""
+    config = WriterConfig()
+    config.delimiter = str(delimiter) if delimiter else ','
+    config.quote = str(quotechar) if quotechar else '"'
+    config.quoting = quoting
+    config.lineterminator = lineterminator
+    return config
 
 
 class DictWriter:
@@ -1164,29 +1546,38 @@ class DictWriter:
     
     def writeheader(self):
         """Записывает заголовки"""
-        self.writer.writerow(self.fieldnames)
+        return self.writer.writerow(self.fieldnames)
     
-    def writerow(self, rowdict: Dict[str, Any]):
-        """Записывает строку из словаря"""
-        row = []
-        for fieldname in self.fieldnames:
-            if fieldname in rowdict:
-                row.append(rowdict[fieldname])
-            else:
-                row.append(self.restval)
-        
+    def _dict_to_list(self, rowdict: Dict[str, Any]) -> List[Any]:
+        """Преобразует словарь в список значений в порядке fieldnames"""
         # Проверка на лишние поля
         if self.extrasaction == 'raise':
-            extra_fields = set(rowdict.keys()) - set(self.fieldnames)
+            extra_fields = rowdict.keys() - self.fieldnames
             if extra_fields:
                 raise ValueError(f"Extra fields: {extra_fields}")
         
-        self.writer.writerow(row)
+        restval = self.restval
+        return [rowdict.get(fieldname, restval) for fieldname in self.fieldnames]
+    
+    def writerow(self, rowdict: Dict[str, Any]):
+        """Записывает строку из словаря"""
+        return self.writer.writerow(self._dict_to_list(rowdict))
     
     def writerows(self, rowdicts: List[Dict[str, Any]]):
         """Записывает несколько строк"""
-        for rowdict in rowdicts:
-            self.writerow(rowdict)
+        # Генератор: нативный writer забирает строки пакетно
+        self.writer.writerows(map(self._dict_to_list, rowdicts))
+    
+    def close(self):
+        """Завершает сжатый вывод (см. writer.close)"""
+        self.writer.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
 
 
 class mmap_reader:
@@ -1196,10 +1587,18 @@ class mmap_reader:
     
     Использует mmap для отображения файла в память без полной загрузки,
     что позволяет эффективно обрабатывать файлы, которые не помещаются в RAM.
+    
+    С parallel=N блоки файла делятся на N частей по границам записей
+    и парсятся в N нативных потоках без GIL; строки выдаются в порядке файла.
+    
+    С index (см. build_index) доступны seek_row(n), rows(start, stop) и len()
+    без просмотра файла с начала.
     """
     
     def __init__(self, filepath: Union[str, os.PathLike], dialect='excel', 
-                 access: int = mmap.ACCESS_READ, **fmtparams):
+                 access: int = mmap.ACCESS_READ, parallel: int = 1, convert=None,
+                 index=None, parser: Optional[CSVParser] = None, encoding: Optional[str] = None,
+                 intern=None, usecols=None, where=None, stats=None, **fmtparams):
         """
         Инициализирует mmap reader.
         
@@ -1207,193 +1606,263 @@ class mmap_reader:
             filepath: Путь к CSV файлу
             dialect: Диалект для парсинга
             access: Режим доступа mmap (по умолчанию ACCESS_READ)
+            parallel: Количество потоков для парсинга (1 - последовательный режим)
+            convert: Конвертация полей в C++ (см. reader)
+            index: Индекс строк - RowIndex, путь к файлу индекса или True
+                (файл индекса рядом с CSV, см. build_index)
+            parser: Готовый CSVParser с тем же диалектом (например, один на поток
+                для многих файлов, см. iter_many); по умолчанию создается новый
+            encoding: Кодировка файла. None - UTF-8 (невалидные поля - latin-1).
+                Однобайтовые кодировки (cp1251, koi8-r, latin-1, ...) декодируются
+                нативно по таблице, UTF-16 перекодируется нативно, остальные - через codecs
+            intern: Кэш строк колонок (True - все колонки или индексы колонок, см. reader)
+            usecols: Колонки строк - индексы или имена из заголовка (см. reader)
+            where: Условия на поля - только подходящие строки (см. reader)
+            stats: True или callback(stats) - счетчики чтения (см. reader.stats)
             **fmtparams: Дополнительные параметры форматирования
+        
+        Raises:
+            Error: Индекс построен для другой версии файла (размер или mtime не совпадают)
+                или с другим quotechar
+            ValueError: parallel или index с кодировкой, несовместимой с ASCII (UTF-16 и т.п.)
         """
         self.filepath = filepath
-        self.config = _convert_dialect_to_config(dialect, **fmtparams)
-        
-        # Убеждаемся, что delimiter и quote правильно установлены
-        if isinstance(dialect, Dialect):
-            delimiter_val = fmtparams.get('delimiter', dialect.delimiter)
-            quote_val = fmtparams.get('quotechar', dialect.quotechar)
-        elif isinstance(dialect, str) and dialect in _dialects:
-            dialect_obj = _dialects[dialect]
-            delimiter_val = fmtparams.get('delimiter', dialect_obj.delimiter)
-            quote_val = fmtparams.get('quotechar', dialect_obj.quotechar)
-        else:
-            delimiter_val = fmtparams.get('delimiter', ',')
-            quote_val = fmtparams.get('quotechar', '"')
-        
-        if isinstance(delimiter_val, str):
-            self.config.delimiter = delimiter_val
-        if isinstance(quote_val, str):
-            self.config.quote = quote_val
+        self.config = _make_parser_config(dialect, fmtparams)
         
-        self.parser = CSVParser(self.config)
+        self.parser = parser if parser is not None else CSVParser(self.config)
         self.line_num = 0
         self._eof = False
         
+        # Кодировка: однобайтовая - таблица для строк полей, UTF-16 и прочие - перекодирование
+        # блоков перед токенизацией (границы записей в байтах файла тогда неизвестны)
+        self._decoding = _ByteDecoding(encoding) if encoding is not None else None
+        self._charset = self._decoding.charset if self._decoding is not None else None
+        self.converter = _make_converter(convert, self.config, intern, usecols, where,
+                                         self._decoding.field_encoding if self._decoding else None)
+        self._filters = where is not None
+        self._stats, self._on_chunk = _read_stats(stats)
+        self._tokenizer = None
+        if self._decoding is not None and self._decoding.transcodes:
+            if parallel > 1 or (index is not None and index is not False):
+                raise ValueError(f"parallel and index are not supported with encoding {self._decoding.name!r}")
+            self._tokenizer = StreamTokenizer(self.config)
+        
         # Открываем файл и создаем mmap
         self._file = open(filepath, 'rb')
         self._mmap = mmap.mmap(self._file.fileno(), 0, access=access)
         
         # КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для больших файлов: не декодируем весь файл сразу
-        # Используем чанковое чтение и парсинг для эффективной работы с большими файлами
+        # Парсим блоки прямо из mmap, позиция _pos всегда на границе записи
         self._file_size = len(self._mmap)
         self._pos = 0
-        self._buffer = ""
         self._pending_rows = []
+        self._pending_pos = 0
+        self._row_error = None  # Ошибка строки словаря, поднимается после строк блока до нее
+        # Поиск конца записи, которая длиннее окна (состояние сохраняется между окнами)
+        self._scanner = RecordScanner(self.config.quote)
         self._chunk_size = 1048576  # 1MB чанки для mmap
+        self._parallel = max(1, int(parallel or 1))
+        if self._parallel > 1:
+            # Параллельный режим: по 4MB на поток за один вызов
+            self._window = self._parallel * 4 * self._chunk_size
+        else:
+            self._window = self._chunk_size
+        
+        self._index = None
+        if index is not None and index is not False:
+            if index is True:
+                index = _default_index_path(filepath)
+            if not isinstance(index, RowIndex):
+                index = RowIndex.load(index)
+            index.check(os.fstat(self._file.fileno()), self.config.quote)
+            self._index = index
     
     def __iter__(self):
         return self
     
+    def __len__(self):
+        """Количество строк в файле (по индексу)"""
+        if self._index is None:
+            raise TypeError("len() of mmap_reader requires index=")
+        return len(self._index)
+    
+    def seek_row(self, n: int) -> None:
+        """
+        Переходит к строке n (нумерация с 0): следующий next() вернет эту строку.
+        
+        С индексом чтение начинается с ближайшей сохраненной строки, до нужной
+        пропускается меньше every записей; без индекса записи пропускаются с начала
+        файла (нативным сканером, без создания строк).
+        """
+        if not isinstance(n, int) or n < 0:
+            raise ValueError(f"seek_row: row number must be a non-negative integer, got {n!r}")
+        if self._tokenizer is not None:
+            raise ValueError(f"seek_row is not supported with encoding {self._decoding.name!r}")
+        if self.converter is not None and self.converter.header_pending:
+            self._resolve_header()
+        pos, skip = 0, n
+        if self._index is not None:
+            n = min(n, len(self._index))
+            pos, skip = self._index.locate(n)
+        if skip:
+            pos = skip_records(self._mmap, pos, skip, self.config.quote)
+        self._pos = pos
+        self._pending_rows = []
+        self._pending_pos = 0
+        self._scanner.reset()
+        self._eof = False
+        self.line_num = n
+    
+    def _read_dicts(self, fieldnames, restkey, restval):
+        """Переключает reader на выдачу словарей (DictReader) до начала чтения, возвращает FieldConverter"""
+        self.converter = _dict_converter(self.converter, fieldnames, restkey, restval)
+        return self.converter
+    
+    def _resolve_header(self):
+        """Сопоставляет имена usecols и where с заголовком до перехода к строке, а не с первой прочитанной"""
+        end = skip_records(self._mmap, 0, 1, self.config.quote)
+        header, _ = parse_buffer_to_python(self.parser, self._mmap, 0, end, True, None, self._charset)
+        self.converter.resolve_columns(header[0] if header else [])
+    
+    def rows(self, start: int, stop: Optional[int] = None) -> List[List[str]]:
+        """Возвращает строки с номерами [start, stop) (stop=None - до конца файла)
+        
+        С where= stop не поддерживается: номера строк - номера в файле, а не среди подходящих.
+        """
+        if self._filters and stop is not None:
+            raise ValueError("rows(start, stop) is not supported with where=; use rows(start)")
+        self.seek_row(start)
+        if stop is None:
+            return [row for rows in self._row_chunks() for row in rows]
+        return list(itertools.islice(self, max(0, stop - start)))
+    
     def _read_and_parse_chunk(self):
-        """Читает и парсит блок данных из mmap"""
-        # Если есть строки в буфере, возвращаем их
-        if self._pending_rows:
-            return self._pending_rows
+        """Читает и парсит блок данных из mmap
         
-        # Если достигли конца файла
-        if self._pos >= self._file_size:
-            self._eof = True
-            if self._buffer:
-                # Парсим остаток буфера
-                try:
-                    parsed_rows = parse_chunk_to_python(self.parser, self._buffer)
-                    self._buffer = ""
-                    return parsed_rows
-                except Exception:
-                    results = self.parser.parse_chunk(self._buffer)
-                    self._buffer = ""
-                    return [row.fields for row in results]
-            return []
-        
-        # Читаем чанк из mmap
-        chunk_end = min(self._pos + self._chunk_size, self._file_size)
-        chunk_bytes = self._mmap[self._pos:chunk_end]
-        self._pos = chunk_end
-        
-        # Декодируем чанк в UTF-8
-        try:
-            chunk = chunk_bytes.decode('utf-8')
-        except UnicodeDecodeError:
-            try:
-                chunk = chunk_bytes.decode('latin-1')
-            except UnicodeDecodeError:
-                chunk = chunk_bytes.decode('utf-8', errors='replace')
-        
-        # Добавляем к буферу
-        self._buffer += chunk
-        
-        # Проверяем, есть ли незакрытые кавычки
-        has_unclosed = CSVParser.has_unclosed_quotes(self._buffer, self.config.quote)
-        
-        if has_unclosed:
-            # Есть незакрытые кавычки - возможно многострочное поле
-            # Продолжаем читать
-            return []
-        
-        # Все кавычки закрыты - можем парсить
-        # КРИТИЧЕСКАЯ ИСПРАВЛЕНИЕ: используем parse_chunk напрямую для получения bytes_processed
-        # Это необходимо для правильной обработки многострочных полей
-        # #region agent log
-        import json
-        import os
-        log_path = r"c:\Users\Admin\PycharmProjects\FastCSV\.cursor\debug.log"
-        try:
-            with open(log_path, 'a', encoding='utf-8') as f:
-                f.write(json.dumps({"sessionId": "debug-session", "runId": "run1", "hypothesisId": "A", "location": "fastcsv/__init__.py:1300", "message": "Before parse_chunk", "data": {"buffer_len": len(self._buffer), "buffer_preview": repr(self._buffer[:100])}, "timestamp": __import__('time').time() * 1000}) + "\n")
-        except: pass
-        # #endregion
-        try:
-            results = self.parser.parse_chunk(self._buffer)
-            parsed_rows = [row.fields for row in results]
-            # #region agent log
-            try:
-                with open(log_path, 'a', encoding='utf-8') as f:
-                    f.write(json.dumps({"sessionId": "debug-session", "runId": "run1", "hypothesisId": "A", "location": "fastcsv/__init__.py:1305", "message": "After parse_chunk", "data": {"num_rows": len(parsed_rows), "first_row": parsed_rows[0] if parsed_rows else None, "first_row_len": len(parsed_rows[0]) if parsed_rows else 0, "bytes_processed": [r.bytes_processed for r in results] if results else None}, "timestamp": __import__('time').time() * 1000}) + "\n")
-            except: pass
-            # #endregion
-        except Exception as e:
-            # #region agent log
-            try:
-                with open(log_path, 'a', encoding='utf-8') as f:
-                    f.write(json.dumps({"sessionId": "debug-session", "runId": "run1", "hypothesisId": "A", "location": "fastcsv/__init__.py:1310", "message": "parse_chunk exception", "data": {"error": str(e)}, "timestamp": __import__('time').time() * 1000}) + "\n")
-            except: pass
-            # #endregion
-            # Fallback на parse_chunk_to_python при ошибках
-            parsed_rows = parse_chunk_to_python(self.parser, self._buffer)
-            results = None
-        
-        if not parsed_rows:
-            return []
-        
-        # КРИТИЧЕСКАЯ ИСПРАВЛЕНИЕ: используем bytes_processed для правильного обновления буфера
-        # Это необходимо для правильной обработки многострочных полей, где \n внутри кавычек
-        # не является концом строки CSV
-        if results and len(results) > 0:
-            # Используем bytes_processed из последней обработанной строки
-            total_bytes_processed = 0
-            for result in results:
-                total_bytes_processed += result.bytes_processed
-            
-            # Обновляем буфер - удаляем обработанную часть
-            if total_bytes_processed > 0 and total_bytes_processed <= len(self._buffer):
-                self._buffer = self._buffer[total_bytes_processed:]
-            elif total_bytes_processed >= len(self._buffer):
-                # Обработали весь буфер
-                self._buffer = ""
-        else:
-            # Fallback: используем старую логику с подсчетом строк
-            # Это не идеально для многострочных полей, но лучше чем ничего
-            num_processed_rows = len(parsed_rows)
-            
-            # Находим все позиции \n в буфере
-            newline_positions = []
-            pos = 0
-            while True:
-                pos = self._buffer.find('\n', pos)
-                if pos == -1:
-                    break
-                newline_positions.append(pos)
-                pos += 1
-            
-            # Если обработано строк меньше чем newline, значит обработали до последнего newline
-            if num_processed_rows <= len(newline_positions):
-                # Находим позицию последнего обработанного newline
-                last_processed_newline = newline_positions[num_processed_rows - 1]
-                
-                # Проверяем, не \r\n ли это (Windows line ending)
-                if last_processed_newline > 0 and self._buffer[last_processed_newline - 1] == '\r':
-                    # Это \r\n - удаляем оба символа и все что после
-                    self._buffer = self._buffer[last_processed_newline + 1:]
-                else:
-                    # Обычный \n
-                    self._buffer = self._buffer[last_processed_newline + 1:]
+        Байты парсятся прямо из отображенных страниц (buffer protocol) без копирования
+        в bytes/str: Python строки создаются только для полей. Обрабатывается блок до
+        границы последней завершенной записи, остаток читается со следующим блоком.
+        """
+        if self._tokenizer is not None:
+            return self._read_and_transcode_chunk()
+        window = self._window
+        while self._pos < self._file_size:
+            length = min(window, self._file_size - self._pos)
+            at_end = self._pos + length >= self._file_size
+            is_final = at_end
+            if self._scanner.scanned:
+                # Продолжаем длинную запись: сканер просматривает только новые байты окна
+                end = self._scanner.scan(self._mmap, self._pos, length)
+                if not end and not at_end:
+                    window *= 2
+                    continue
+                self._scanner.reset()
+                if end:
+                    length, is_final = end, True
+            if self._parallel > 1:
+                rows, consumed = parse_buffer_parallel(self.parser, self._mmap, self._pos, length,
+                                                       self._parallel, is_final, self.converter,
+                                                       self._charset, self._stats)
             else:
-                # Обработали все строки - очищаем буфер
-                self._buffer = ""
+                rows, consumed = parse_buffer_to_python(self.parser, self._mmap, self._pos, length,
+                                                        is_final, self.converter, self._charset,
+                                                        self._stats)
+            self._pos += consumed
+            if self._on_chunk is not None:
+                self._on_chunk(self.stats())
+            if rows:
+                return rows
+            if not is_final:
+                # Запись длиннее окна (например, огромное многострочное поле) - увеличиваем окно,
+                # а ее конец ищем сканером без повторного просмотра уже проверенных байт
+                self._scanner.scan(self._mmap, self._pos, length)
+                window *= 2
+                continue
+            if at_end:
+                self._pos = self._file_size
+        
+        self._eof = True
+        return []
+    
+    def _read_and_transcode_chunk(self):
+        """Кодировки, несовместимые с ASCII (UTF-16 и т.п.): блок mmap перекодируется в UTF-8
+        и передается StreamTokenizer, незавершенная запись переносится токенизатором"""
+        while self._pos < self._file_size:
+            end = min(self._pos + self._chunk_size, self._file_size)
+            with memoryview(self._mmap) as view:
+                data = view[self._pos:end]
+                self._pos = end
+                rows = self._decoding.feed(self._tokenizer, data, end >= self._file_size, self.converter,
+                                           self._stats)
+                data.release()
+            if self._on_chunk is not None:
+                self._on_chunk(self.stats())
+            if rows:
+                return rows
         
-        return parsed_rows
+        self._eof = True
+        return []
     
     def __next__(self):
         """Возвращает следующую строку"""
-        # Если есть строки в буфере, возвращаем их
-        if self._pending_rows:
+        # Строки блока выдаются по индексу: pop(0) сдвигал бы весь остаток списка
+        pos = self._pending_pos
+        if pos < len(self._pending_rows):
+            self._pending_pos = pos + 1
             self.line_num += 1
-            return self._pending_rows.pop(0)
+            return self._pending_rows[pos]
         
         # Читаем и парсим следующий чанк
         while not self._eof:
-            rows = self._read_and_parse_chunk()
+            rows = self._next_rows()
             if rows:
                 self._pending_rows = rows
+                self._pending_pos = 1
                 self.line_num += 1
-                return self._pending_rows.pop(0)
+                return rows[0]
         
+        self._raise_row_error()
         raise StopIteration
     
+    def _next_rows(self):
+        """Строки следующего блока; ошибка строки словаря откладывается до выдачи строк перед ней"""
+        try:
+            return self._read_and_parse_chunk()
+        except Error as e:
+            rows = _rows_before_error(e)
+            self._row_error, self._eof = e, True
+            return rows
+    
+    def _raise_row_error(self):
+        """Поднимает ошибку строки словаря, если строки до нее уже выданы"""
+        if self._row_error is not None:
+            error, self._row_error = self._row_error, None
+            raise error
+    
+    def _row_chunks(self):
+        """Отдает оставшиеся строки списками в том виде, в каком они распарсены"""
+        if self._pending_pos < len(self._pending_rows):
+            rows = self._pending_rows[self._pending_pos:]
+            self._pending_rows = []
+            self._pending_pos = 0
+            self.line_num += len(rows)
+            yield rows
+        
+        while not self._eof:
+            rows = self._next_rows()
+            if rows:
+                self.line_num += len(rows)
+                yield rows
+        self._raise_row_error()
+    
+    def batches(self, size: int = 10000) -> Iterator[List[List[str]]]:
+        """Возвращает оставшиеся строки списками по size строк (см. reader.batches)"""
+        return _batched(self._row_chunks(), size)
+    
+    def stats(self) -> Optional[Dict[str, Any]]:
+        """Счетчики чтения (см. reader.stats); с parallel=N время частей суммируется по потокам"""
+        return self._stats.as_dict() if self._stats is not None else None
+    
     def __enter__(self):
         """Поддержка context manager"""
         return self
@@ -1436,7 +1905,7 @@ class mmap_DictReader:
                  fieldnames: Optional[List[str]] = None,
                  restkey: Optional[str] = None, 
                  restval: Optional[str] = None,
-                 dialect='excel', **fmtparams):
+                 dialect='excel', usecols=None, where=None, stats=None, **fmtparams):
         """
         Инициализирует mmap DictReader.
         
@@ -1446,40 +1915,57 @@ class mmap_DictReader:
             restkey: Ключ для лишних полей
             restval: Значение для отсутствующих полей
             dialect: Диалект для парсинга
+            usecols: Колонки словарей - индексы или имена (см. DictReader)
+            where: Условия на поля (см. DictReader)
+            stats: Счетчики чтения (см. reader)
             **fmtparams: Дополнительные параметры
         """
-        self.reader = mmap_reader(filepath, dialect, **fmtparams)
-        self.fieldnames = fieldnames
+        usecols, where, fieldnames = _dict_reader_columns(fieldnames, usecols, where)
+        self.reader = mmap_reader(filepath, dialect, usecols=usecols, where=where, stats=stats,
+                                  **fmtparams)
+        self._fieldnames = fieldnames
         self.restkey = restkey
         self.restval = restval
         self.line_num = 0
+        # Словари создаются нативно (см. DictReader)
+        self._converter = self.reader._read_dicts(fieldnames, restkey, restval)
+        self._header_lines = 1 if fieldnames is None else 0
+    
+    @property
+    def fieldnames(self) -> Optional[List[str]]:
+        """Имена полей (из первой строки - после первого чтения)"""
+        if self._fieldnames is None:
+            self._fieldnames = self._converter.fieldnames
+        return self._fieldnames
+    
+    @fieldnames.setter
+    def fieldnames(self, value: List[str]):
+        value = list(value)
+        old = self._converter.fieldnames
+        if old is None:
+            # Имена заданы до чтения заголовка: первая строка файла - данные, как у csv.DictReader
+            self._header_lines = 0
+        else:
+            _rename_pending_keys(self.reader, old, value)
+        self._converter.fieldnames = value
+        self._fieldnames = value
     
     def __iter__(self):
         return self
     
     def __next__(self):
         """Возвращает следующую строку как словарь"""
-        if self.fieldnames is None:
-            # Первая строка - заголовки
-            self.fieldnames = next(self.reader)
-            self.line_num = self.reader.line_num
-        
         row = next(self.reader)
-        self.line_num = self.reader.line_num
-        
-        # Создаем словарь
-        if len(row) > len(self.fieldnames):
-            if self.restkey is None:
-                raise Error(f"Too many fields in row {self.line_num}")
-            result = dict(zip(self.fieldnames, row[:len(self.fieldnames)]))
-            result[self.restkey] = row[len(self.fieldnames):]
-        else:
-            result = dict(zip(self.fieldnames, row))
-            if len(row) < len(self.fieldnames) and self.restval is not None:
-                for key in self.fieldnames[len(row):]:
-                    result[key] = self.restval
-        
-        return result
+        self.line_num = self.reader.line_num + self._header_lines
+        return row
+    
+    def batches(self, size: int = 10000) -> Iterator[List[Dict[str, Any]]]:
+        """Возвращает оставшиеся строки списками словарей по size штук (см. reader.batches)"""
+        return self.reader.batches(size)
+    
+    def stats(self) -> Optional[Dict[str, Any]]:
+        """Счетчики чтения (см. reader.stats)"""
+        return self.reader.stats()
     
     def __enter__(self):
         """Поддержка context manager"""
@@ -1501,3 +1987,778 @@ class mmap_DictReader:
             self.close()
         except:
             pass
+
+
+# Допустимые значения dtypes для read_columns
+_COLUMN_TYPES = {
+    'str': ColumnType.STR, str: ColumnType.STR,
+    'int64': ColumnType.INT64, 'int': ColumnType.INT64, int: ColumnType.INT64,
+    'float64': ColumnType.FLOAT64, 'float': ColumnType.FLOAT64, float: ColumnType.FLOAT64,
+}
+
+
+def _decode_field(data: bytes) -> str:
+    """Декодирует поле как UTF-8, невалидный UTF-8 - как latin-1 (как reader'ы)"""
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return data.decode('latin-1')
+
+
+class StringColumn:
+    """
+    Строковая колонка read_columns.
+    
+    Все значения лежат в одном буфере data (bytes), значение i - это
+    data[offsets[i]:offsets[i + 1]]. Python строки создаются только при обращении.
+    """
+    
+    __slots__ = ('offsets', 'data')
+    
+    def __init__(self, offsets, data: bytes):
+        self.offsets = offsets
+        self.data = data
+    
+    def __len__(self):
+        return len(self.offsets) - 1
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("StringColumn index out of range")
+        return _decode_field(self.data[self.offsets[index]:self.offsets[index + 1]])
+    
+    def __iter__(self):
+        offsets = self.offsets
+        data = self.data
+        for i in range(len(self)):
+            yield _decode_field(data[offsets[i]:offsets[i + 1]])
+    
+    def tolist(self) -> List[str]:
+        """Возвращает все значения списком строк"""
+        return list(self)
+    
+    def __repr__(self):
+        return f"StringColumn(len={len(self)})"
+
+
+def read_columns(filepath: Union[str, os.PathLike], dtypes=None, header: bool = True,
+                 dialect='excel', **fmtparams):
+    """
+    Читает CSV файл по колонкам в непрерывные типизированные буферы.
+    
+    Файл парсится из mmap блоками прямо в буферы колонок: списки строк и
+    Python объекты на каждое поле не создаются.
+    
+    Args:
+        filepath: Путь к CSV файлу
+        dtypes: Типы колонок - словарь {имя или индекс: тип} или список типов по порядку.
+            Типы: 'int64' / int, 'float64' / float, 'str' / str. Не указанные колонки - str
+        header: Первая запись - заголовок (имена колонок)
+        dialect: Диалект для парсинга
+        **fmtparams: Дополнительные параметры форматирования
+    
+    Returns:
+        При header=True - словарь {имя: колонка}, иначе список колонок.
+        int64 и float64 колонки - array.array('q') и array.array('d'),
+        строковые - StringColumn.
+    
+    Raises:
+        ValueError: Значение не преобразуется в тип колонки, неверное число полей
+            в записи или dtypes ссылается на несуществующую колонку
+    """
+    if dtypes is None:
+        spec = {}
+    elif isinstance(dtypes, dict):
+        spec = dict(dtypes)
+    else:
+        spec = {i: dtype for i, dtype in enumerate(dtypes) if dtype is not None}
+    
+    for key, dtype in spec.items():
+        if isinstance(key, str) and not header:
+            raise ValueError(f"dtypes: column name {key!r} requires header=True")
+        try:
+            spec[key] = _COLUMN_TYPES[dtype]
+        except (KeyError, TypeError):
+            raise ValueError(f"dtypes: unsupported type {dtype!r} for column {key!r}") from None
+    
+    parser = ColumnParser(_make_parser_config(dialect, fmtparams), spec, header)
+    
+    with open(filepath, 'rb') as f:
+        file_size = os.fstat(f.fileno()).st_size
+        if file_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                pos = 0
+                window = 4 * 1048576  # 4MB
+                while pos < file_size:
+                    length = min(window, file_size - pos)
+                    is_final = pos + length >= file_size
+                    consumed = parser.feed(mm, pos, length, is_final)
+                    if consumed == 0 and not is_final:
+                        # Запись длиннее окна - увеличиваем окно
+                        window *= 2
+                        continue
+                    pos += consumed
+                    if is_final:
+                        break
+    
+    columns = [StringColumn(*column) if isinstance(column, tuple) else column
+               for column in parser.take_columns()]
+    if not header:
+        return columns
+    return dict(zip(parser.header or [], columns))
+
+
+# Файл индекса: заголовок и смещения строк (uint64 little-endian)
+_INDEX_MAGIC = b'FCSVIDX1'
+_INDEX_HEADER = struct.Struct('<8sQqQQc7x')
+_INDEX_SUFFIX = '.fcidx'
+
+
+def _default_index_path(filepath) -> str:
+    """Путь к файлу индекса рядом с CSV файлом"""
+    return os.fspath(filepath) + _INDEX_SUFFIX
+
+
+class RowIndex:
+    """
+    Индекс строк CSV файла для произвольного доступа (см. build_index).
+    
+    offsets[k] - смещение в байтах начала строки k * every. Индекс привязан
+    к размеру и mtime файла, для которого построен.
+    """
+    
+    __slots__ = ('offsets', 'rows', 'every', 'file_size', 'mtime_ns', 'quote', 'path')
+    
+    def __init__(self, offsets, rows: int, every: int, file_size: int, mtime_ns: int,
+                 quote: str = '"', path: Optional[str] = None):
+        self.offsets = offsets
+        self.rows = rows
+        self.every = every
+        self.file_size = file_size
+        self.mtime_ns = mtime_ns
+        self.quote = quote
+        self.path = path
+    
+    def __len__(self):
+        return self.rows
+    
+    def locate(self, n: int):
+        """Возвращает (смещение ближайшей сохраненной строки <= n, сколько записей пропустить)"""
+        k = min(n // self.every, len(self.offsets) - 1)
+        return self.offsets[k], n - k * self.every
+    
+    def check(self, stat: os.stat_result, quote: str = '"') -> None:
+        """Проверяет, что индекс построен для файла с этими размером и mtime"""
+        if stat.st_size != self.file_size or stat.st_mtime_ns != self.mtime_ns:
+            raise Error(f"row index {self.path or ''!s} is stale: file size or mtime changed")
+        if quote != self.quote:
+            raise Error(f"row index was built with quotechar {self.quote!r}, not {quote!r}")
+    
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        """Записывает индекс в файл"""
+        offsets = array.array('Q', self.offsets)
+        if sys.byteorder == 'big':
+            offsets.byteswap()
+        with open(path, 'wb') as f:
+            f.write(_INDEX_HEADER.pack(_INDEX_MAGIC, self.file_size, self.mtime_ns,
+                                       self.every, self.rows, self.quote.encode('latin-1')))
+            offsets.tofile(f)
+        self.path = os.fspath(path)
+    
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike]) -> 'RowIndex':
+        """Читает индекс из файла"""
+        with open(path, 'rb') as f:
+            header = f.read(_INDEX_HEADER.size)
+            if len(header) != _INDEX_HEADER.size or not header.startswith(_INDEX_MAGIC):
+                raise Error(f"{os.fspath(path)!r} is not a fastcsv row index")
+            _, file_size, mtime_ns, every, rows, quote = _INDEX_HEADER.unpack(header)
+            offsets = array.array('Q')
+            offsets.frombytes(f.read())
+        if sys.byteorder == 'big':
+            offsets.byteswap()
+        return cls(offsets, rows, every, file_size, mtime_ns, quote.decode('latin-1'), os.fspath(path))
+    
+    def __repr__(self):
+        return f"RowIndex(rows={self.rows}, every={self.every})"
+
+
+def build_index(filepath: Union[str, os.PathLike], every: int = 1000,
+                index_path: Optional[Union[str, os.PathLike]] = None,
+                dialect='excel', **fmtparams) -> RowIndex:
+    """
+    Строит индекс строк CSV файла и записывает его в файл рядом с CSV.
+    
+    Файл просматривается один раз нативным сканером (структурные символы по
+    64 байта, кавычки учитываются): сохраняется смещение каждой every-й строки.
+    Индекс используется mmap_reader(filepath, index=...) для seek_row, rows и len.
+    
+    Args:
+        filepath: Путь к CSV файлу
+        every: Шаг индекса в строках; файл индекса занимает 8 байт на every строк
+        index_path: Путь к файлу индекса (по умолчанию filepath + '.fcidx')
+        dialect: Диалект для парсинга
+        **fmtparams: Дополнительные параметры форматирования
+    
+    Returns:
+        RowIndex
+    """
+    if not isinstance(every, int) or every < 1:
+        raise ValueError(f"build_index: every must be a positive integer, got {every!r}")
+    config = _make_parser_config(dialect, fmtparams)
+    
+    with open(filepath, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        offsets = array.array('Q', [0])
+        rows = 0
+        if stat.st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                packed, rows = build_row_index(mm, config.quote, every)
+            offsets = array.array('Q')
+            offsets.frombytes(packed)
+    
+    index = RowIndex(offsets, rows, every, stat.st_size, stat.st_mtime_ns, config.quote)
+    index.save(index_path if index_path is not None else _default_index_path(filepath))
+    return index
+
+
+# Маркер конца файла в очереди iter_many
+_FILE_DONE = object()
+
+
+class _WorkerError:
+    """Исключение потока iter_many, передается потребителю через очередь"""
+    
+    __slots__ = ('error',)
+    
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def _file_chunks(path, parser, batch_size, dialect, convert, fmtparams):
+    """Строки одного файла блоками из mmap (по batch_size строк, если задан)"""
+    if os.path.getsize(path) == 0:
+        # mmap пустого файла невозможен
+        return
+    with mmap_reader(path, dialect, convert=convert, parser=parser, **fmtparams) as file_reader:
+        chunks = file_reader._row_chunks()
+        yield from chunks if batch_size is None else _batched(chunks, batch_size)
+
+
+def _iter_many_threads(paths, workers, batch_size, ordered, max_pending, dialect, convert, fmtparams):
+    """
+    Потоки берут файлы по очереди, у каждого потока свой CSVParser на все его файлы.
+    
+    Токенизация выполняется без GIL, поэтому потоки перекрываются. Блоки строк
+    передаются через ограниченные очереди: с ordered - очередь на файл (потребитель
+    читает файлы по порядку, поток, опередивший его, ждет), иначе - общая очередь.
+    """
+    config = _make_parser_config(dialect, fmtparams)
+    stop = threading.Event()
+    lock = threading.Lock()
+    next_file = iter(range(len(paths)))
+    if ordered:
+        queues = [queue.Queue(max_pending) for _ in paths]
+    else:
+        shared = queue.Queue(max_pending * workers)
+    
+    def put(target, item):
+        # Ждем места в очереди, пока потребитель не прекратил чтение
+        while not stop.is_set():
+            try:
+                target.put(item, timeout=0.05)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    def work():
+        parser = CSVParser(config)
+        while not stop.is_set():
+            with lock:
+                i = next(next_file, None)
+            if i is None:
+                break
+            target = queues[i] if ordered else shared
+            try:
+                for rows in _file_chunks(paths[i], parser, batch_size, dialect, convert, fmtparams):
+                    if not put(target, (paths[i], rows)):
+                        return
+            except BaseException as e:
+                put(target, _WorkerError(e))
+                return
+            if ordered and not put(target, _FILE_DONE):
+                return
+        if not ordered:
+            put(shared, _FILE_DONE)
+    
+    threads = [threading.Thread(target=work, name=f'fastcsv-read-{n}', daemon=True)
+               for n in range(min(workers, len(paths)))]
+    for thread in threads:
+        thread.start()
+    try:
+        if ordered:
+            for target in queues:
+                while True:
+                    item = target.get()
+                    if item is _FILE_DONE:
+                        break
+                    if isinstance(item, _WorkerError):
+                        raise item.error
+                    yield item
+        else:
+            running = len(threads)
+            while running:
+                item = shared.get()
+                if item is _FILE_DONE:
+                    running -= 1
+                elif isinstance(item, _WorkerError):
+                    raise item.error
+                else:
+                    yield item
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+# CSVParser процесса-исполнителя iter_many(executor='process')
+_process_parser = None
+
+
+def _init_process_worker(dialect, fmtparams):
+    global _process_parser
+    _process_parser = CSVParser(_make_parser_config(dialect, fmtparams))
+
+
+def _read_file_in_process(path, batch_size, dialect, convert, fmtparams):
+    return list(_file_chunks(path, _process_parser, batch_size, dialect, convert, fmtparams))
+
+
+def _iter_many_processes(paths, workers, batch_size, ordered, max_pending, dialect, convert, fmtparams):
+    """
+    Файлы читаются целиком в процессах-исполнителях (по CSVParser на процесс),
+    одновременно в работе не больше max_pending файлов.
+    """
+    pool = ProcessPoolExecutor(min(workers, len(paths)) or 1, initializer=_init_process_worker,
+                               initargs=(dialect, fmtparams))
+    files = iter(paths)
+    pending = {}
+    
+    def submit():
+        for path in itertools.islice(files, max_pending - len(pending)):
+            future = pool.submit(_read_file_in_process, path, batch_size, dialect, convert, fmtparams)
+            pending[future] = path
+    
+    try:
+        submit()
+        while pending:
+            if ordered:
+                # Словарь хранит порядок добавления: первый ключ - самый ранний файл
+                done = [next(iter(pending))]
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                for rows in future.result():
+                    yield path, rows
+            submit()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _many_chunks(paths, workers, batch_size, ordered, max_pending, executor, dialect, convert, fmtparams):
+    """Проверяет параметры и возвращает поток (путь, блок строк) от пула"""
+    paths = list(paths)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if not isinstance(workers, int) or workers < 1:
+        raise ValueError(f"workers must be a positive integer, got {workers!r}")
+    if not isinstance(max_pending, int) or max_pending < 1:
+        raise ValueError(f"max_pending must be a positive integer, got {max_pending!r}")
+    if batch_size is not None and (not isinstance(batch_size, int) or batch_size < 1):
+        raise ValueError(f"batch_size must be a positive integer, got {batch_size!r}")
+    if executor == 'thread':
+        iterate = _iter_many_threads
+    elif executor == 'process':
+        iterate = _iter_many_processes
+    else:
+        raise ValueError(f"executor must be 'thread' or 'process', got {executor!r}")
+    return iterate(paths, workers, batch_size, ordered, max_pending, dialect, convert, fmtparams)
+
+
+def iter_many(paths, workers: Optional[int] = None, batch_size: Optional[int] = None,
+              ordered: bool = True, max_pending: int = 4, executor: str = 'thread',
+              dialect='excel', convert=None, **fmtparams) -> Iterator[tuple]:
+    """
+    Читает много CSV файлов пулом потоков или процессов.
+    
+    Каждый исполнитель использует один CSVParser для всех своих файлов; файлы
+    парсятся из mmap, как в mmap_reader. Строки возвращаются с путем файла,
+    из которого прочитаны.
+    
+    Args:
+        paths: Пути к CSV файлам
+        workers: Количество потоков или процессов (по умолчанию os.cpu_count())
+        batch_size: None - по одной строке (path, row), иначе списками
+            (path, rows) по batch_size строк (последний список файла может быть короче)
+        ordered: Файлы в порядке paths, строки каждого файла - в порядке файла.
+            Без ordered файлы возвращаются по мере готовности (строки одного
+            файла по-прежнему по порядку)
+        max_pending: Ограничение памяти: сколько блоков строк на поток (для
+            executor='process' - сколько файлов) ждут потребителя
+        executor: 'thread' (токенизация без GIL, строки потоково) или 'process'
+            (файл читается в процессе целиком и передается pickle; dialect и convert
+            должны сериализоваться)
+        dialect: Диалект для парсинга
+        convert: Конвертация полей (см. reader), типы выводятся для каждого файла отдельно
+        **fmtparams: Дополнительные параметры форматирования
+    
+    Returns:
+        Итератор (path, row) или (path, rows). Исключение при чтении файла
+        передается потребителю; если итерация прекращена, исполнители останавливаются.
+    """
+    chunks = _many_chunks(paths, workers, batch_size, ordered, max_pending, executor,
+                          dialect, convert, fmtparams)
+    if batch_size is not None:
+        return chunks
+    return ((path, row) for path, rows in chunks for row in rows)
+
+
+def read_many(paths, workers: Optional[int] = None, executor: str = 'thread',
+              dialect='excel', convert=None, **fmtparams) -> Dict[Any, List[List[str]]]:
+    """
+    Читает много CSV файлов целиком пулом потоков или процессов (см. iter_many).
+    
+    Returns:
+        Словарь {path: строки файла} в порядке paths; повторяющийся путь читается один раз
+    """
+    # Блоки читаются без порядка и собираются по пути: повторный путь перемешал бы
+    # блоки двух чтений одного файла
+    paths = list(dict.fromkeys(paths))
+    result = {path: [] for path in paths}
+    for path, rows in _many_chunks(paths, workers, None, False, 4, executor,
+                                   dialect, convert, fmtparams):
+        result[path].extend(rows)
+    return result
+
+
+# Сигнатуры сжатых файлов: первые байты -> формат
+_COMPRESSION_MAGIC = ((b'\x1f\x8b', 'gzip'), (b'BZh', 'bz2'), (b'\xfd7zXZ\x00', 'xz'),
+                      (b'\x28\xb5\x2f\xfd', 'zstd'))
+
+
+def _detect_compression(filepath) -> Optional[str]:
+    """Формат сжатия файла по сигнатуре (None - файл не сжат)"""
+    with open(filepath, 'rb') as f:
+        head = f.read(6)
+    for magic, compression in _COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def _open_gzip(filepath):
+    try:
+        # python-isal (ISA-L): распаковка в несколько раз быстрее zlib
+        from isal import igzip as gzip_module
+    except ImportError:
+        import gzip as gzip_module
+    return gzip_module.open(filepath, 'rb')
+
+
+def _open_bz2(filepath):
+    import bz2
+    return bz2.open(filepath, 'rb')
+
+
+def _open_xz(filepath):
+    import lzma
+    return lzma.open(filepath, 'rb')
+
+
+def _import_zstd():
+    """Модуль zstd: пакет zstandard или compression.zstd (Python 3.14+)"""
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        pass
+    try:
+        from compression import zstd
+        return zstd
+    except ImportError:
+        raise ImportError(
+            "zstd compression requires the zstandard package (Python < 3.14):\n"
+            "  pip install zstandard"
+        ) from None
+
+
+def _open_zstd(filepath):
+    return _import_zstd().open(filepath, 'rb')
+
+
+_DECOMPRESSORS = {'gzip': _open_gzip, 'bz2': _open_bz2, 'xz': _open_xz, 'zstd': _open_zstd}
+
+
+class _DecompressedStream:
+    """
+    Распакованные блоки сжатого файла из фонового потока.
+    
+    Поток распаковки заполняет ограниченную очередь блоками по block_size байт;
+    zlib / bz2 / lzma распаковывают без GIL, поэтому распаковка следующих блоков
+    идет одновременно с разбором текущего. Объект только с read(): reader читает
+    его блоками, как pipe (read(n) возвращает очередной блок, n не учитывается).
+    """
+    
+    def __init__(self, fileobj, block_size: int, max_pending: int):
+        self._file = fileobj
+        self._block_size = block_size
+        self._queue = queue.Queue(max_pending)
+        self._stop = threading.Event()
+        self._eof = False
+        self._thread = threading.Thread(target=self._decompress, name='fastcsv-decompress', daemon=True)
+        self._thread.start()
+    
+    def _put(self, item) -> bool:
+        # Ждем места в очереди, пока поток не остановлен close()
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.05)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    def _decompress(self):
+        try:
+            while not self._stop.is_set():
+                block = self._file.read(self._block_size)
+                if not block:
+                    break
+                if not self._put(block):
+                    return
+        except BaseException as e:
+            # Поврежденный или обрезанный файл - исключение при чтении
+            self._put(_WorkerError(e))
+            return
+        self._put(b'')
+    
+    def read(self, size: int = -1) -> bytes:
+        if self._eof:
+            return b''
+        item = self._queue.get()
+        if isinstance(item, _WorkerError):
+            self._eof = True
+            raise item.error
+        if not item:
+            self._eof = True
+        return item
+    
+    def close(self):
+        """Останавливает поток распаковки и закрывает файл"""
+        self._stop.set()
+        self._thread.join()
+        self._file.close()
+
+
+class _CompressedReader(reader):
+    """reader по потоку распаковки: close() и выход из with закрывают его"""
+    
+    def __init__(self, stream, dialect='excel', **kwargs):
+        self._stream = stream
+        super().__init__(stream, dialect, **kwargs)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+    
+    def close(self):
+        """Закрывает поток распаковки"""
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+    
+    def __del__(self):
+        try:
+            self.close()
+        except:
+            pass
+
+
+def open_reader(filepath: Union[str, os.PathLike], dialect='excel', compression: Optional[str] = 'infer',
+                block_size: int = 1048576, max_pending: int = 4, threaded: Optional[bool] = None,
+                **kwargs):
+    """
+    Открывает CSV файл, в том числе сжатый gzip, bz2, xz или zstd.
+    
+    Формат сжатия определяется по первым байтам файла. Сжатый файл распаковывается
+    в фоновом потоке блоками в ограниченную очередь, из которой их разбирает
+    StreamTokenizer; несжатый открывается mmap_reader. На одном процессоре распаковка
+    и разбор не перекрываются, поэтому по умолчанию файл распаковывается по мере чтения.
+    
+    gzip распаковывается python-isal, если он установлен, иначе модулем gzip;
+    zstd - пакетом zstandard или compression.zstd (Python 3.14+).
+    
+    Args:
+        filepath: Путь к CSV файлу
+        dialect: Диалект для парсинга
+        compression: 'infer' (по сигнатуре), 'gzip', 'bz2', 'xz', 'zstd' или None (не сжат)
+        block_size: Размер блока распакованных данных
+        max_pending: Ограничение памяти: сколько распакованных блоков ждут разбора
+        threaded: Распаковка в фоновом потоке; None - если процессоров больше одного
+        **kwargs: Параметры reader (convert, encoding, intern, usecols, where, stats,
+            параметры форматирования); для несжатого файла - параметры mmap_reader
+    
+    Returns:
+        Reader с close() и поддержкой with: mmap_reader или reader по потоку распаковки
+    """
+    if compression == 'infer':
+        compression = _detect_compression(filepath)
+    if compression is None:
+        return mmap_reader(filepath, dialect, **kwargs)
+    if compression not in _DECOMPRESSORS:
+        raise ValueError(f"compression must be 'infer', None or one of {sorted(_DECOMPRESSORS)}, "
+                         f"got {compression!r}")
+    if block_size < 1 or max_pending < 1:
+        raise ValueError("block_size and max_pending must be positive")
+    if threaded is None:
+        threaded = (os.cpu_count() or 1) > 1
+    stream = _DECOMPRESSORS[compression](filepath)
+    if threaded:
+        stream = _DecompressedStream(stream, block_size, max_pending)
+    try:
+        return _CompressedReader(stream, dialect, **kwargs)
+    except BaseException:
+        stream.close()
+        raise
+
+
+def _gzip_compressor(level):
+    if level is None:
+        try:
+            # python-isal: уровень по умолчанию сжимает в несколько раз быстрее zlib
+            from isal import isal_zlib
+            return isal_zlib.compressobj(wbits=31)
+        except ImportError:
+            pass
+    import zlib
+    # wbits=31: заголовок и контрольная сумма gzip
+    return zlib.compressobj(-1 if level is None else level, zlib.DEFLATED, 31)
+
+
+def _bz2_compressor(level):
+    import bz2
+    return bz2.BZ2Compressor(9 if level is None else level)
+
+
+def _xz_compressor(level):
+    import lzma
+    return lzma.LZMACompressor(preset=level)
+
+
+def _zstd_compressor(level):
+    zstd = _import_zstd()
+    if zstd.__name__ == 'zstandard':
+        return zstd.ZstdCompressor(level=3 if level is None else level).compressobj()
+    return zstd.ZstdCompressor(level=level)
+
+
+# Компрессоры writer(compression=): compress(data) и flush() в конце потока
+_COMPRESSORS = {'gzip': _gzip_compressor, 'bz2': _bz2_compressor, 'xz': _xz_compressor,
+                'zstd': _zstd_compressor}
+
+
+class _CompressingSink:
+    """
+    Сжатый вывод writer(compression=): write(str) принимает сериализованные блоки.
+    
+    Блоки копятся до block_size байт и сжимаются в фоновом потоке: очередь на один
+    блок дает двойную буферизацию - пока поток сжимает и пишет в файл один блок,
+    writer сериализует следующий (zlib / bz2 / lzma сжимают без GIL). Ошибка потока
+    поднимается при следующей записи или в close().
+    """
+    
+    def __init__(self, fileobj, compression: str, compresslevel: Optional[int], encoding: str,
+                 threaded: bool, block_size: int = 1048576):
+        self._file = fileobj
+        self._compressor = _COMPRESSORS[compression](compresslevel)
+        self._encoding = encoding
+        self._block_size = block_size
+        self._pending = []
+        self._pending_size = 0
+        self._error = None
+        self._thread = None
+        if threaded:
+            self._queue = queue.Queue(1)
+            self._thread = threading.Thread(target=self._compress_blocks, name='fastcsv-compress',
+                                            daemon=True)
+            self._thread.start()
+    
+    def _compress_blocks(self):
+        while True:
+            block = self._queue.get()
+            if block is None:
+                return
+            if self._error is not None:
+                # После ошибки блоки только забираются из очереди, чтобы writer не ждал
+                continue
+            try:
+                self._write_compressed(block)
+            except BaseException as e:
+                self._error = e
+    
+    def _write_compressed(self, block: bytes):
+        data = self._compressor.compress(block)
+        if data:
+            self._file.write(data)
+    
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+    
+    def write(self, text: str) -> int:
+        if self._compressor is None:
+            raise ValueError("write to a closed compressed writer")
+        data = text.encode(self._encoding)
+        self._pending.append(data)
+        self._pending_size += len(data)
+        if self._pending_size >= self._block_size:
+            self._submit()
+        return len(text)
+    
+    def _submit(self):
+        if not self._pending:
+            return
+        block = self._pending[0] if len(self._pending) == 1 else b''.join(self._pending)
+        self._pending = []
+        self._pending_size = 0
+        if self._thread is None:
+            self._write_compressed(block)
+        else:
+            self._raise_error()
+            self._queue.put(block)
+    
+    def close(self):
+        """Сжимает оставшиеся данные и дописывает конец сжатого потока (файл не закрывается)"""
+        if self._compressor is None:
+            return
+        try:
+            self._submit()
+        finally:
+            if self._thread is not None:
+                self._queue.put(None)
+                self._thread.join()
+                self._thread = None
+        compressor, self._compressor = self._compressor, None
+        self._raise_error()
+        self._file.write(compressor.flush())
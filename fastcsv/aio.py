@@ -0,0 +1,182 @@
+"""
+Асинхронное чтение CSV из asyncio потоков.
+
+AsyncReader читает блоки из asyncio.StreamReader (или любого объекта с
+корутиной read(n)) и парсит их нативным StreamTokenizer в пуле потоков:
+токенизация выполняется без GIL, цикл событий не блокируется.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastcsv import StreamTokenizer, _make_converter, _make_parser_config, _read_stats
+
+__all__ = ['AsyncReader']
+
+
+class AsyncReader:
+    """
+    Асинхронный CSV reader: async for по строкам или reader.batches(size) по спискам строк.
+
+    Чтение потока и парсинг выполняются фоновой задачей, которая опережает
+    потребителя не больше чем на max_pending распарсенных блоков: если потребитель
+    медленнее, задача перестает читать поток (для asyncio.StreamReader это
+    приостанавливает чтение из сокета).
+
+    Пример:
+        reader = fastcsv.aio.AsyncReader(stream)
+        async for row in reader:
+            ...
+    """
+
+    def __init__(self, stream, dialect='excel', convert=None, chunk_size: int = 262144,
+                 max_pending: int = 4, executor=None, intern=None, usecols=None, where=None,
+                 stats=None, **fmtparams):
+        """
+        Инициализирует асинхронный reader.
+
+        Args:
+            stream: asyncio.StreamReader или объект с корутиной read(n), возвращающей
+                bytes (или str); пустой результат - конец потока
+            dialect: Диалект для парсинга
+            convert: Конвертация полей в C++ (см. reader)
+            chunk_size: Сколько байт запрашивается у потока за раз
+            max_pending: Сколько распарсенных блоков может ждать потребителя
+            executor: concurrent.futures.Executor для парсинга (по умолчанию - пул
+                цикла событий)
+            intern: Кэш строк колонок (см. reader)
+            usecols: Колонки строк - индексы или имена из заголовка (см. reader)
+            where: Условия на поля - только подходящие строки (см. reader)
+            stats: True или callback(stats) - счетчики чтения (см. reader.stats); callback
+                вызывается в цикле событий после каждого разобранного блока
+            **fmtparams: Дополнительные параметры форматирования
+        """
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValueError(f"chunk_size must be a positive integer, got {chunk_size!r}")
+        if not isinstance(max_pending, int) or max_pending < 1:
+            raise ValueError(f"max_pending must be a positive integer, got {max_pending!r}")
+        self.stream = stream
+        self.config = _make_parser_config(dialect, fmtparams)
+        self.converter = _make_converter(convert, self.config, intern, usecols, where)
+        self._stats, self._on_chunk = _read_stats(stats)
+        self.line_num = 0
+        self._tokenizer = StreamTokenizer(self.config)
+        self._chunk_size = chunk_size
+        self._executor = executor
+        self._queue = asyncio.Queue(max_pending)
+        self._producer = None
+        self._done = False
+        self._pending_rows = []
+        self._pending_pos = 0
+
+    async def _produce(self):
+        """Фоновая задача: читает поток и кладет непустые блоки строк в очередь (None - конец)"""
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                chunk = await self.stream.read(self._chunk_size)
+                is_final = not chunk
+                rows, _ = await loop.run_in_executor(self._executor, self._tokenizer.feed,
+                                                     chunk, is_final, self.converter, None,
+                                                     self._stats)
+                if self._on_chunk is not None:
+                    self._on_chunk(self.stats())
+                if rows:
+                    await self._queue.put(rows)
+                if is_final:
+                    break
+        except Exception as e:
+            # Ошибка чтения или парсинга поднимается у потребителя
+            await self._queue.put(e)
+            return
+        await self._queue.put(None)
+
+    async def _next_rows(self) -> Optional[List[list]]:
+        """Следующий распарсенный блок строк или None в конце потока"""
+        if self._done:
+            return None
+        if self._producer is None:
+            self._producer = asyncio.ensure_future(self._produce())
+        item = await self._queue.get()
+        if item is None or isinstance(item, Exception):
+            self._done = True
+            if item is not None:
+                raise item
+        return item
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        """Возвращает следующую строку"""
+        pos = self._pending_pos
+        if pos < len(self._pending_rows):
+            self._pending_pos = pos + 1
+            self.line_num += 1
+            return self._pending_rows[pos]
+
+        rows = await self._next_rows()
+        if rows is None:
+            raise StopAsyncIteration
+        self._pending_rows = rows
+        self._pending_pos = 1
+        self.line_num += 1
+        return rows[0]
+
+    async def _row_chunks(self) -> AsyncIterator[List[list]]:
+        """Отдает оставшиеся строки списками в том виде, в каком они распарсены"""
+        if self._pending_pos < len(self._pending_rows):
+            rows = self._pending_rows[self._pending_pos:]
+            self._pending_rows = []
+            self._pending_pos = 0
+            self.line_num += len(rows)
+            yield rows
+
+        while True:
+            rows = await self._next_rows()
+            if rows is None:
+                return
+            self.line_num += len(rows)
+            yield rows
+
+    def batches(self, size: int = 10000) -> AsyncIterator[List[list]]:
+        """Возвращает оставшиеся строки списками по size строк (см. reader.batches)"""
+        if not isinstance(size, int) or size < 1:
+            raise ValueError(f"batches: size must be a positive integer, got {size!r}")
+        return self._iter_batches(size)
+
+    async def _iter_batches(self, size):
+        rest = []
+        async for rows in self._row_chunks():
+            if rest:
+                rows = rest + rows
+            start = 0
+            end = len(rows)
+            while end - start >= size:
+                yield rows[start:start + size]
+                start += size
+            rest = rows[start:]
+        if rest:
+            yield rest
+
+    def stats(self) -> Optional[Dict[str, Any]]:
+        """Счетчики чтения (см. reader.stats) или None, если они не включены"""
+        return self._stats.as_dict() if self._stats is not None else None
+    
+    async def aclose(self):
+        """Останавливает фоновое чтение (поток не закрывается)"""
+        self._done = True
+        producer, self._producer = self._producer, None
+        if producer is not None and not producer.done():
+            producer.cancel()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+        return False
@@ -0,0 +1,70 @@
+#pragma once
+
+#include "fastcsv/csv_parser.hpp"
+#include <vector>
+#include <string>
+#include <string_view>
+#include <unordered_map>
+#include <cstdint>
+#include <cstddef>
+
+namespace fastcsv {
+
+// Типы колонок для колоночного режима
+enum ColumnType {
+    COLUMN_STR = 0,
+    COLUMN_INT64 = 1,
+    COLUMN_FLOAT64 = 2
+};
+
+// Типы колонок по индексу и по имени из заголовка (не указанные колонки - строки)
+struct ColumnSpec {
+    std::unordered_map<std::size_t, ColumnType> by_index;
+    std::unordered_map<std::string, ColumnType> by_name;
+};
+
+// Непрерывный буфер одной колонки
+struct ColumnData {
+    ColumnType type = COLUMN_STR;
+    std::vector<std::int64_t> ints;
+    std::vector<double> floats;
+    // Строки: поле i - это data[offsets[i], offsets[i + 1])
+    std::vector<std::int64_t> offsets{0};
+    std::string data;
+};
+
+// Парсер, который складывает значения сразу в буферы колонок
+// Данные подаются блоками через feed(); объекты на строку не создаются
+class ColumnParser {
+public:
+    ColumnParser(const ParserConfig& config, ColumnSpec spec, bool header);
+
+    // Парсит завершенные записи блока и возвращает количество обработанных байт
+    // Если is_final == false, незавершенная последняя запись остается для следующего вызова
+    // Ошибки преобразования и неверное число полей - std::invalid_argument
+    std::size_t feed(std::string_view data, bool is_final);
+
+    bool has_header() const { return header_done_ && use_header_; }
+    const std::vector<std::string>& header() const { return header_; }
+    std::vector<ColumnData>& columns() { return columns_; }
+    std::size_t num_rows() const { return num_rows_; }
+
+private:
+    CSVParser parser_;
+    // Записи текущего блока (массивы переиспользуются между вызовами feed)
+    RowBatch batch_;
+    ColumnSpec spec_;
+    bool use_header_;
+    bool header_done_ = false;
+    std::vector<std::string> header_;
+    std::vector<ColumnData> columns_;
+    std::size_t num_rows_ = 0;
+    // Номер записи в файле (с учетом заголовка) - для сообщений об ошибках
+    std::size_t record_num_ = 0;
+
+    void init_columns(std::size_t count);
+    void append_row(std::size_t row);
+    std::string column_label(std::size_t index) const;
+};
+
+} // namespace fastcsv
@@ -1,5 +1,6 @@
 #pragma once
 
+#include "fastcsv/parse_profile.hpp"
 #include <vector>
 #include <string>
 #include <string_view>
@@ -8,6 +9,14 @@
 
 namespace fastcsv {
 
+// Режимы квотирования (совпадают с константами csv.QUOTE_*)
+enum QuoteStyle {
+    QUOTE_MINIMAL = 0,
+    QUOTE_ALL = 1,
+    QUOTE_NONNUMERIC = 2,
+    QUOTE_NONE = 3
+};
+
 // Конфигурация парсера
 struct ParserConfig {
     char delimiter = ',';
@@ -15,15 +24,67 @@ struct ParserConfig {
     bool skip_initial_space = false;
     bool strict = false;
     std::string lineterminator = "\r\n";
+    // QUOTE_NONNUMERIC: парсер отмечает поля в кавычках (ParsedRow::quoted)
+    int quoting = QUOTE_MINIMAL;
 };
 
 // Результат парсинга строки
 struct ParsedRow {
     std::vector<std::string> fields;
+    // Флаги "поле было в кавычках"; заполняются только при quoting == QUOTE_NONNUMERIC,
+    // пустой вектор означает, что в строке нет полей в кавычках
+    std::vector<char> quoted;
     bool success = true;
     std::size_t bytes_processed = 0;
 };
 
+// Блок записей без выделения памяти на каждое поле
+// Поля - срезы входных данных; поля с кавычками после разбора хранятся в общем буфере arena.
+// Массивы переиспользуются между вызовами CSVParser::parse_batch (clear() сохраняет емкость)
+struct RowBatch {
+    // Флаг в старшем бите смещения: поле лежит в arena, а не во входных данных
+    static constexpr std::size_t IN_ARENA = std::size_t(1) << (sizeof(std::size_t) * 8 - 1);
+    
+    struct Field {
+        std::size_t offset;
+        std::size_t length;
+    };
+    
+    struct Record {
+        // Конец полей записи в fields (начало - конец предыдущей записи)
+        std::size_t fields_end;
+        // Байт входных данных, включая перевод строки
+        std::size_t bytes;
+    };
+    
+    std::string_view data;
+    std::vector<Field> fields;
+    std::vector<Record> records;
+    // Флаги "поле было в кавычках" по индексу в fields (только QUOTE_NONNUMERIC);
+    // короче fields, если в конце нет полей в кавычках
+    std::vector<char> quoted;
+    std::string arena;
+    // Кавычки последней записи закрыты
+    bool success = true;
+    
+    std::size_t size() const { return records.size(); }
+    bool empty() const { return records.empty(); }
+    std::size_t row_begin(std::size_t row) const { return row == 0 ? 0 : records[row - 1].fields_end; }
+    std::size_t row_end(std::size_t row) const { return records[row].fields_end; }
+    
+    std::string_view field(std::size_t index) const {
+        const Field& f = fields[index];
+        if (f.offset & IN_ARENA) {
+            return std::string_view(arena.data() + (f.offset & ~IN_ARENA), f.length);
+        }
+        return std::string_view(data.data() + f.offset, f.length);
+    }
+    
+    bool is_quoted(std::size_t index) const { return index < quoted.size() && quoted[index]; }
+    
+    void clear();
+};
+
 // Основной класс парсера CSV
 class CSVParser {
 public:
@@ -41,11 +102,20 @@ public:
     // Парсинг блока данных (для streaming)
     std::vector<ParsedRow> parse_chunk(std::string_view data);
     
+    // Парсинг блока в RowBatch: поля ссылаются на data, которые должны жить, пока используется batch
+    void parse_batch(std::string_view data, RowBatch& batch);
+    
+    // То же со счетчиками в profile (nullptr - без профилирования) вместо профиля парсера:
+    // состояние парсера не меняется, вызовы из нескольких потоков без GIL безопасны
+    std::vector<ParsedRow> parse_chunk(std::string_view data, ParseProfile* profile) const;
+    void parse_batch(std::string_view data, RowBatch& batch, ParseProfile* profile) const;
+    
     // Парсинг всего файла
     std::vector<ParsedRow> parse_all(std::string_view data);
     
     // Обновление конфигурации
     void set_config(const ParserConfig& config);
+    const ParserConfig& config() const { return config_; }
     
     // Вспомогательные функции для оптимизации batch processing
     // Проверяет, есть ли нечетное количество кавычек (многострочное поле)
@@ -54,14 +124,38 @@ public:
     // Находит последний newline в данных
     static std::size_t find_last_newline(std::string_view data);
     
+    // Профилирование parse_batch по этапам (см. ParseProfile). Включение в сборке
+    // с FASTCSV_PROFILE=0 - std::runtime_error
+    // profile() не синхронизирован: вызовы без GIL профилируют в свой ParseProfile
+    // (parse_batch / parse_chunk с profile) и добавляют его сюда через merge() под GIL
+    void set_profiling(bool enabled);
+    bool profiling() const { return profiling_; }
+    ParseProfile& profile() { return profile_; }
+    const ParseProfile& profile() const { return profile_; }
+    void reset_profile() { profile_ = ParseProfile(); }
+    
 private:
     ParserConfig config_;
+    bool profiling_ = false;
+    ParseProfile profile_;
+    
+    // parse_batch с профилированием этапов в profile (kProfile) или без него
+    template <bool kProfile>
+    void parse_batch_impl(std::string_view data, RowBatch& batch, ParseProfile* profile) const;
     
     // Вспомогательные методы
     std::string unescape_field(std::string_view field);
     bool is_whitespace(char c) const;
     void trim_whitespace(std::string& str) const;
     
+    // Добавляет поле data[begin, end) записи (has_quotes - в поле есть кавычки)
+    template <bool kProfile>
+    void append_field(RowBatch& batch, std::size_t begin, std::size_t end, bool has_quotes,
+                      ParseProfile* profile) const;
+    
+    // Заполняет row.quoted по исходному тексту строки (только для QUOTE_NONNUMERIC)
+    void mark_quoted_fields(std::string_view line, ParsedRow& row) const;
+    
     // SIMD-оптимизированные методы
     std::size_t find_delimiter_simd(std::string_view data, std::size_t start_pos) const;
     std::size_t find_quote_simd(std::string_view data, std::size_t start_pos) const;
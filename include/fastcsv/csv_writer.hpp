@@ -0,0 +1,52 @@
+#pragma once
+
+#include "fastcsv/csv_parser.hpp"
+#include <string>
+#include <string_view>
+#include <cstddef>
+
+namespace fastcsv {
+
+// Конфигурация writer'а
+struct WriterConfig {
+    char delimiter = ',';
+    char quote = '"';
+    int quoting = QUOTE_MINIMAL;
+    std::string lineterminator = "\n";
+    // Размер блока, после которого буфер сбрасывается в файл
+    std::size_t buffer_size = 1048576;  // 1MB
+};
+
+// Сериализатор CSV: накапливает строки в одном растущем буфере
+class CSVWriter {
+public:
+    explicit CSVWriter(const WriterConfig& config = WriterConfig());
+
+    // Добавляет поле в текущую строку (разделитель вставляется автоматически)
+    void write_field(std::string_view field, bool is_numeric = false);
+
+    // Завершает текущую строку (добавляет lineterminator)
+    void end_row();
+
+    // Доступ к накопленному буферу
+    std::string_view buffer() const { return buffer_; }
+    std::size_t size() const { return buffer_.size(); }
+    bool should_flush() const { return buffer_.size() >= config_.buffer_size; }
+    void clear();
+
+    // Откатывает буфер до заданного размера (отмена недописанной строки)
+    void truncate(std::size_t size);
+
+    const WriterConfig& config() const { return config_; }
+    void set_config(const WriterConfig& config);
+
+private:
+    WriterConfig config_;
+    std::string buffer_;
+    bool row_started_ = false;
+
+    bool needs_quoting(std::string_view field) const;
+    void append_quoted(std::string_view field);
+};
+
+} // namespace fastcsv
@@ -0,0 +1,46 @@
+#pragma once
+
+#include <string_view>
+#include <cstdint>
+#include <cstddef>
+
+namespace fastcsv {
+
+// Разбор значений полей (без Python API, можно вызывать без GIL)
+// Пробелы и табуляции по краям пропускаются, как в int() и float()
+bool parse_int64(std::string_view field, std::int64_t& value);
+bool parse_float64(std::string_view field, double& value);
+// true/false без учета регистра
+bool parse_bool(std::string_view field, bool& value);
+// ISO дата YYYY-MM-DD (проверяются только диапазоны месяца и дня)
+bool parse_date(std::string_view field, int& year, int& month, int& day);
+
+// Целевые типы конвертации полей
+enum ConvertKind {
+    CONVERT_STR = 0,
+    CONVERT_INT = 1,
+    CONVERT_FLOAT = 2,
+    CONVERT_BOOL = 3,
+    CONVERT_DATE = 4,
+    // Тип определяется по первым строкам
+    CONVERT_INFER = 5
+};
+
+// Вывод типа колонки по выборке значений
+// Пустые значения не учитываются; из подходящих типов выбирается int > float > bool > date
+class TypeInference {
+public:
+    void observe(std::string_view field);
+    ConvertKind result() const;
+
+private:
+    static constexpr unsigned CAN_INT = 1;
+    static constexpr unsigned CAN_FLOAT = 2;
+    static constexpr unsigned CAN_BOOL = 4;
+    static constexpr unsigned CAN_DATE = 8;
+
+    unsigned candidates_ = CAN_INT | CAN_FLOAT | CAN_BOOL | CAN_DATE;
+    std::size_t observed_ = 0;
+};
+
+} // namespace fastcsv
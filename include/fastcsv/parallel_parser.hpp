@@ -0,0 +1,39 @@
+#pragma once
+
+#include "fastcsv/csv_parser.hpp"
+#include "fastcsv/read_stats.hpp"
+#include "fastcsv/simd_utils.hpp"
+#include <vector>
+#include <string_view>
+#include <cstddef>
+
+namespace fastcsv {
+
+// Результат параллельного парсинга блока
+struct ParallelParseResult {
+    // Строки каждой части в порядке файла (поля ссылаются на исходный блок)
+    std::vector<RowBatch> parts;
+    // Кодировка каждой части (simd::TextEncoding, определяет создание Python строк)
+    std::vector<simd::TextEncoding> parts_encoding;
+    // Сколько байт блока обработано (до границы последней завершенной записи)
+    std::size_t bytes_consumed = 0;
+};
+
+// Находит конец последней завершенной записи (позиция после '\n' вне кавычек)
+// Данные должны начинаться на границе записи. Возвращает 0, если завершенных записей нет.
+std::size_t find_last_record_end(std::string_view data, char quote);
+
+// Вариант с уже известной четностью количества кавычек во всем блоке
+std::size_t find_last_record_end(std::string_view data, char quote, bool total_quote_parity);
+
+// Парсит блок в несколько потоков. Блок делится на num_threads частей по границам
+// записей с учетом кавычек; каждая часть парсится CSVParser::parse_batch в своем потоке.
+// Если is_final == false, незавершенная последняя запись не обрабатывается.
+// Функция не использует Python API и может вызываться без GIL.
+// stats (если задан) получает время токенизации и определения кодировки, просуммированное
+// по потокам частей; profile (если задан) - профили парсеров частей (CSVParser::profile)
+ParallelParseResult parse_chunk_parallel(const ParserConfig& config, std::string_view data,
+                                         std::size_t num_threads, bool is_final,
+                                         ReadStats* stats = nullptr, ParseProfile* profile = nullptr);
+
+} // namespace fastcsv
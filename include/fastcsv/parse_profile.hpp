@@ -0,0 +1,111 @@
+#pragma once
+
+#include <chrono>
+#include <cstdint>
+
+// Профилирование CSVParser (CSVParser::set_profiling) компилируется, если FASTCSV_PROFILE != 0.
+// Сборка с -DFASTCSV_PROFILE=0 убирает его полностью; включенное при сборке профилирование
+// ничего не стоит, пока не включено во время выполнения (один выбор ветки на блок)
+#ifndef FASTCSV_PROFILE
+#define FASTCSV_PROFILE 1
+#endif
+
+#if FASTCSV_PROFILE && (defined(__x86_64__) || defined(__i386__) || defined(_M_X64) || defined(_M_IX86))
+#define FASTCSV_PROFILE_RDTSC 1
+#ifdef _MSC_VER
+#include <intrin.h>
+#else
+#include <x86intrin.h>
+#endif
+#endif
+
+namespace fastcsv {
+
+// Счетчики этапов разбора: время в тиках (rdtsc на x86, иначе наносекунды steady_clock)
+// и количество байт / записей / полей
+struct ParseProfile {
+    enum Phase {
+        // simd::index_structurals: поиск разделителей и переводов строк вне кавычек
+        SCAN = 0,
+        // Нарезка полей записей без кавычек
+        UNQUOTED_ROWS,
+        // Нарезка полей записей, в которых есть поле в кавычках (включая UNESCAPE)
+        QUOTED_ROWS,
+        // Разбор кавычек поля ("" -> ") в arena
+        UNESCAPE,
+        // Создание Python объектов строк (parse_chunk_to_python, parse_buffer_*)
+        MATERIALIZE,
+        PHASE_COUNT
+    };
+
+    std::uint64_t ticks[PHASE_COUNT] = {};
+    std::uint64_t bytes = 0;
+    std::uint64_t rows = 0;
+    std::uint64_t quoted_rows = 0;
+    std::uint64_t fields = 0;
+    std::uint64_t quoted_fields = 0;
+    // Байт полей, прошедших разбор кавычек
+    std::uint64_t unescaped_bytes = 0;
+    std::uint64_t materialized_rows = 0;
+    // Калибровка тиков: тики и наносекунды steady_clock всех вызовов parse_batch
+    std::uint64_t calibration_ticks = 0;
+    std::uint64_t calibration_ns = 0;
+
+    void merge(const ParseProfile& other) {
+        for (int i = 0; i < PHASE_COUNT; ++i) {
+            ticks[i] += other.ticks[i];
+        }
+        bytes += other.bytes;
+        rows += other.rows;
+        quoted_rows += other.quoted_rows;
+        fields += other.fields;
+        quoted_fields += other.quoted_fields;
+        unescaped_bytes += other.unescaped_bytes;
+        materialized_rows += other.materialized_rows;
+        calibration_ticks += other.calibration_ticks;
+        calibration_ns += other.calibration_ns;
+    }
+
+    // Время этапа в секундах по калибровке
+    double seconds(Phase phase) const {
+        if (calibration_ticks == 0) {
+            return 0.0;
+        }
+        double ns_per_tick = static_cast<double>(calibration_ns) / static_cast<double>(calibration_ticks);
+        return static_cast<double>(ticks[phase]) * ns_per_tick / 1e9;
+    }
+
+    static std::uint64_t now_ns() {
+        return static_cast<std::uint64_t>(std::chrono::duration_cast<std::chrono::nanoseconds>(
+            std::chrono::steady_clock::now().time_since_epoch()).count());
+    }
+
+    static std::uint64_t now_ticks() {
+#ifdef FASTCSV_PROFILE_RDTSC
+        return static_cast<std::uint64_t>(__rdtsc());
+#else
+        return now_ns();
+#endif
+    }
+};
+
+// Прибавляет тики от создания до разрушения к этапу профиля (profile == nullptr - ничего не делает)
+class ProfileScope {
+public:
+    ProfileScope(ParseProfile* profile, ParseProfile::Phase phase)
+        : profile_(profile), phase_(phase), start_(profile ? ParseProfile::now_ticks() : 0) {}
+    ~ProfileScope() {
+        if (profile_) {
+            profile_->ticks[phase_] += ParseProfile::now_ticks() - start_;
+        }
+    }
+    ProfileScope(const ProfileScope&) = delete;
+    ProfileScope& operator=(const ProfileScope&) = delete;
+
+private:
+    ParseProfile* profile_;
+    ParseProfile::Phase phase_;
+    std::uint64_t start_;
+};
+
+} // namespace fastcsv
@@ -0,0 +1,61 @@
+#pragma once
+
+#include <chrono>
+#include <cstdint>
+
+namespace fastcsv {
+
+// Счетчики чтения (reader(stats=...)): передаются в функции парсинга необязательным
+// указателем. Без счетчиков (nullptr) часы не вызываются и ничего не считается
+struct ReadStats {
+    // Обработанные байты (вход токенизатора до границы последней завершенной записи)
+    std::uint64_t bytes = 0;
+    // Блоки, переданные парсеру
+    std::uint64_t chunks = 0;
+    // Выданные строки (после where= и без заголовка словарей)
+    std::uint64_t rows = 0;
+    // Токенизация: поиск границ записей и нарезка полей
+    std::uint64_t parse_ns = 0;
+    // Определение кодировки блока (ASCII / UTF-8 / прочее) и перекодирование
+    std::uint64_t decode_ns = 0;
+    // Создание Python объектов строк, включая отбор строк where=
+    std::uint64_t build_ns = 0;
+};
+
+// Замеряет время от создания до разрушения и прибавляет его к счетчику
+// counter == nullptr - ничего не делает
+class StageTimer {
+public:
+    explicit StageTimer(std::uint64_t* counter) : counter_(counter) {
+        if (counter_) {
+            start_ = now();
+        }
+    }
+    ~StageTimer() { stop(); }
+    StageTimer(const StageTimer&) = delete;
+    StageTimer& operator=(const StageTimer&) = delete;
+
+    // Останавливает замер раньше конца области видимости
+    void stop() {
+        if (counter_) {
+            *counter_ += now() - start_;
+            counter_ = nullptr;
+        }
+    }
+
+    static std::uint64_t now() {
+        return static_cast<std::uint64_t>(std::chrono::duration_cast<std::chrono::nanoseconds>(
+            std::chrono::steady_clock::now().time_since_epoch()).count());
+    }
+
+private:
+    std::uint64_t* counter_;
+    std::uint64_t start_ = 0;
+};
+
+// Указатель на счетчик stats->*field или nullptr без stats
+inline std::uint64_t* stat_counter(ReadStats* stats, std::uint64_t ReadStats::*field) {
+    return stats ? &(stats->*field) : nullptr;
+}
+
+} // namespace fastcsv
@@ -0,0 +1,52 @@
+#pragma once
+
+#include "fastcsv/csv_parser.hpp"
+#include <cstddef>
+#include <string>
+#include <string_view>
+#include <vector>
+
+namespace fastcsv {
+
+// Условие на значение поля (where=)
+// Проверяется на срезе поля (байты файла после разбора кавычек), без Python API
+struct FieldCondition {
+    enum Kind {
+        // Значение равно одному из values (равенство - один элемент)
+        VALUES = 0,
+        // Значение начинается с одного из values
+        PREFIX = 1,
+        // Значение - число в [low, high] (границы включительно, +-inf - без границы)
+        RANGE = 2
+    };
+    
+    Kind kind = VALUES;
+    std::vector<std::string> values;
+    double low = 0;
+    double high = 0;
+    
+    bool matches(std::string_view field) const;
+};
+
+// Фильтр строк блока: строка проходит, если выполняются все условия (AND)
+// Поле, которого нет в строке, не проходит ни одно условие
+// Без Python API, можно вызывать без GIL
+class RowFilter {
+public:
+    void add(std::size_t column, FieldCondition condition);
+    void clear() { conditions_.clear(); }
+    bool empty() const { return conditions_.empty(); }
+    
+    bool matches(const RowBatch& batch, std::size_t row) const;
+    // Дописывает в rows номера строк блока с first, которые проходят фильтр
+    void select(const RowBatch& batch, std::size_t first, std::vector<std::size_t>& rows) const;
+
+private:
+    struct Entry {
+        std::size_t column;
+        FieldCondition condition;
+    };
+    std::vector<Entry> conditions_;
+};
+
+} // namespace fastcsv
@@ -0,0 +1,47 @@
+#pragma once
+
+#include "fastcsv/simd_utils.hpp"
+#include <cstddef>
+#include <cstdint>
+#include <string_view>
+#include <vector>
+
+namespace fastcsv {
+
+// Построение индекса "номер строки -> смещение в байтах" для произвольного доступа к файлу
+// Записи считаются так же, как их выдает CSVParser::parse_chunk: конец записи - \n, \r или \r\n
+// вне кавычек, пустая строка - тоже запись
+class RowIndexBuilder {
+public:
+    // every - шаг индекса: сохраняется смещение каждой every-й строки (0, every, 2 * every, ...)
+    RowIndexBuilder(char quote, std::size_t every);
+
+    // Дописывает следующие байты файла (блоки подаются подряд)
+    void feed(std::string_view data);
+
+    // Завершает индекс: учитывает последнюю запись без перевода строки
+    void finish();
+
+    const std::vector<std::uint64_t>& offsets() const { return offsets_; }
+    // Количество строк (действительно после finish())
+    std::uint64_t rows() const { return rows_; }
+
+private:
+    char quote_;
+    std::uint64_t every_;
+    std::vector<std::uint64_t> offsets_;
+    std::vector<std::uint64_t> structurals_;
+    simd::StructuralState state_;
+    std::uint64_t size_ = 0;
+    std::uint64_t rows_ = 0;
+    // Начало текущей (еще не завершенной) записи
+    std::uint64_t row_start_ = 0;
+    // Позиция сразу после \r, завершившего запись: \n в ней относится к той же записи
+    std::uint64_t cr_end_ = UINT64_MAX;
+};
+
+// Пропускает count записей с начала data (data начинается на границе записи)
+// Возвращает смещение начала записи с номером count или data.size(), если записей меньше
+std::size_t skip_records(std::string_view data, char quote, std::size_t count);
+
+} // namespace fastcsv
@@ -1,35 +1,45 @@
 #pragma once
 
 #include <cstddef>
+#include <cstdint>
 #include <string_view>
 #include <vector>
 
-#ifdef __AVX2__
-#include <immintrin.h>
-#endif
-
-#ifdef __SSE4_2__
-#include <nmmintrin.h>
-#endif
-
 namespace fastcsv {
 namespace simd {
 
-// Проверка доступности SIMD инструкций
+// Варианты реализации SIMD функций
+// Вариант выбирается один раз при загрузке модуля по CPUID (максимальный, который
+// поддерживают процессор и ОС); сборка не зависит от набора инструкций машины сборки
+enum SimdLevel {
+    SIMD_SCALAR = 0,
+    SIMD_SSE42 = 1,
+    SIMD_AVX2 = 2,
+    // AVX-512BW: 64 байта за шаг
+    SIMD_AVX512 = 3
+};
+
+// Активный вариант
+SimdLevel simd_level();
+
+// Максимальный вариант, доступный на этом процессоре
+SimdLevel detected_simd_level();
+
+// Переключает вариант (для тестов и сравнения производительности)
+// Уровень ограничивается доступным; возвращает фактически установленный
+// Не потокобезопасно: вызывать, пока парсинг не выполняется
+SimdLevel set_simd_level(SimdLevel level);
+
+// Имя варианта: "scalar", "sse4.2", "avx2", "avx512"
+const char* simd_level_name(SimdLevel level);
+
+// Проверка доступности SIMD инструкций (по активному варианту)
 inline bool has_avx2() {
-#ifdef __AVX2__
-    return true;
-#else
-    return false;
-#endif
+    return simd_level() >= SIMD_AVX2;
 }
 
 inline bool has_sse42() {
-#ifdef __SSE4_2__
-    return true;
-#else
-    return false;
-#endif
+    return simd_level() >= SIMD_SSE42;
 }
 
 // Поиск символа с использованием SIMD
@@ -50,7 +60,41 @@ void find_all_chars_simd(std::string_view data, char target, std::vector<std::si
 // Используется для оптимизации создания Python строк
 bool is_ascii_simd(std::string_view data);
 
-} // namespace simd
-} // namespace fastcsv
+// Проверка UTF-8 (RFC 3629: без overlong, суррогатов и значений > U+10FFFF, как строгий декодер Python)
+// Возвращает длину наибольшего валидного префикса: data.size(), если весь блок валиден,
+// иначе смещение первой неверной или незавершенной последовательности (граница последнего целого символа)
+// ASCII блоки пропускаются векторной проверкой старших битов, последовательности проверяются скалярно
+std::size_t validate_utf8_simd(std::string_view data);
+
+// Кодировка блока: определяет, как создаются Python строки полей
+enum TextEncoding : char {
+    // Все байты < 0x80
+    TEXT_ASCII = 0,
+    // Валидный UTF-8
+    TEXT_UTF8 = 1,
+    // Невалидный UTF-8 (например, latin-1 файл): кодировка определяется для каждого поля
+    TEXT_MIXED = 2
+};
+
+TextEncoding classify_text(std::string_view data);
+
+// Этап индексации структурных символов (по схеме simdjson)
+// Позиция в старшем бите несет флаг: поле, которое заканчивается этим символом, содержит кавычки
+constexpr std::uint64_t STRUCTURAL_QUOTED = 1ull << 63;
 
+// Состояние индексации между вызовами (данные можно подавать частями)
+struct StructuralState {
+    // Позиция внутри кавычек
+    bool in_quotes = false;
+    // В текущем (еще не завершенном) поле встретилась кавычка
+    bool quote_seen = false;
+};
 
+// Дописывает в out позиции разделителей, \n и \r вне кавычек из data[begin, end)
+// Блоки по 64 байта: маски кавычек, разделителей и переводов строк строятся за один проход,
+// области в кавычках находятся префиксным XOR маски кавычек (carry-less умножение на AVX2/AVX-512)
+void index_structurals(std::string_view data, std::size_t begin, std::size_t end, char quote, char delim,
+                       StructuralState& state, std::vector<std::uint64_t>& out);
+
+} // namespace simd
+} // namespace fastcsv
@@ -0,0 +1,69 @@
+#pragma once
+
+#include "fastcsv/csv_parser.hpp"
+#include <string>
+#include <string_view>
+#include <cstddef>
+
+namespace fastcsv {
+
+// Инкрементальный поиск границ записей
+// Состояние кавычек сохраняется между вызовами, поэтому каждый байт потока
+// просматривается ровно один раз, как бы записи ни пересекали границы блоков
+class RecordScanner {
+public:
+    explicit RecordScanner(char quote) : quote_(quote) {}
+
+    // data - необработанный хвост потока (начинается на границе записи) с дописанными байтами;
+    // просматриваются только байты начиная с scanned()
+    // Возвращает конец последней завершенной записи в data (позиция после '\n'), 0 - если ее нет
+    std::size_t scan(std::string_view data);
+
+    // Отбрасывает первые n байт хвоста; n - граница записи, возвращенная scan()
+    void consume(std::size_t n);
+
+    void reset();
+
+    std::size_t scanned() const { return scanned_; }
+    bool in_quotes() const { return in_quotes_; }
+
+private:
+    char quote_;
+    bool in_quotes_ = false;
+    std::size_t scanned_ = 0;
+    std::size_t last_end_ = 0;
+};
+
+// Потоковый токенизатор: данные подаются блоками произвольного размера через feed()
+// Незавершенная запись хранится во внутреннем буфере до следующего вызова
+class StreamTokenizer {
+public:
+    explicit StreamTokenizer(const ParserConfig& config);
+
+    // Дописывает данные и возвращает область завершенных записей (начало внутреннего буфера)
+    // Если is_final == true, возвращается весь остаток. Область действительна до следующего feed()
+    std::string_view feed(std::string_view data, bool is_final);
+
+    // Парсит завершенные записи; consumed - размер обработанной области в байтах
+    std::vector<ParsedRow> feed_rows(std::string_view data, bool is_final, std::size_t& consumed);
+    
+    // Парсит область, возвращенную feed(), во внутренний RowBatch (массивы переиспользуются
+    // между вызовами). Результат действителен до следующего feed()
+    const RowBatch& parse_region(std::string_view region);
+
+    // Байты незавершенной записи, ожидающие продолжения
+    std::size_t pending() const { return buffer_.size() - returned_; }
+    bool in_quotes() const { return scanner_.in_quotes(); }
+
+    CSVParser& parser() { return parser_; }
+
+private:
+    CSVParser parser_;
+    RecordScanner scanner_;
+    RowBatch batch_;
+    std::string buffer_;
+    // Размер области, возвращенной предыдущим feed() (удаляется при следующем вызове)
+    std::size_t returned_ = 0;
+};
+
+} // namespace fastcsv
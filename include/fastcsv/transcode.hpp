@@ -0,0 +1,41 @@
+#pragma once
+
+#include <cstddef>
+#include <string>
+#include <string_view>
+
+namespace fastcsv {
+
+// Потоковое перекодирование UTF-16 в UTF-8 (для кодировок, несовместимых с ASCII,
+// разделители и кавычки ищутся уже в UTF-8)
+// Данные подаются частями произвольной длины: нечетный последний байт и старшая половина
+// суррогатной пары переносятся в следующий вызов
+class Utf16Decoder {
+public:
+    enum ByteOrder {
+        // По BOM (FF FE / FE FF, BOM отбрасывается); без BOM - little-endian
+        DETECT,
+        LITTLE,
+        BIG
+    };
+
+    explicit Utf16Decoder(ByteOrder order = DETECT);
+
+    // Дописывает UTF-8 в out. Непарные суррогаты и (при is_final) обрезанный конец -> U+FFFD
+    void decode(std::string_view data, bool is_final, std::string& out);
+
+    // Возвращает в начальное состояние (BOM снова определяется при DETECT)
+    void reset();
+
+private:
+    void put_unit(char16_t unit, char*& dst);
+
+    ByteOrder initial_order_;
+    ByteOrder order_;
+    // Байт, оставшийся от предыдущего вызова (-1 - нет)
+    int pending_byte_ = -1;
+    // Старшая половина суррогатной пары, ожидающая младшую (0 - нет)
+    char16_t high_surrogate_ = 0;
+};
+
+} // namespace fastcsv
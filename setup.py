@@ -12,28 +12,37 @@ import pybind11
 pybind11_path = pybind11.get_include()
 
 # Настройки компиляции
+# Флаги -march/-mavx2 не используются: SIMD вариант (SSE4.2 / AVX2 / AVX-512) выбирается
+# при загрузке модуля по CPUID, поэтому собранный модуль работает на любом x86-64
 if sys.platform == 'win32':
-    compile_args = ['/std:c++17', '/O2', '/DNDEBUG', '/D__AVX2__', '/D__SSE4_2__']
+    compile_args = ['/std:c++17', '/O2', '/DNDEBUG']
     link_args = []
 elif sys.platform == 'darwin':
-    # macOS: проверяем архитектуру
-    import platform
-    machine = platform.machine()
-    if machine == 'arm64':
-        # Apple Silicon (M1, M2, M3, etc.) - не поддерживает x86 SIMD инструкции
-        compile_args = ['-std=c++17', '-O3']
-    else:
-        # Intel Mac - поддерживает AVX2/SSE4.2
-        compile_args = ['-std=c++17', '-O3', '-mavx2', '-msse4.2']
+    # macOS: на Apple Silicon используется скалярный вариант SIMD функций
+    compile_args = ['-std=c++17', '-O3']
     link_args = []
 else:
     # Linux и другие Unix-системы
-    compile_args = ['-std=c++17', '-O3', '-march=native', '-mavx2', '-msse4.2']
-    link_args = []
+    # -pthread нужен для std::thread (параллельный парсинг) на старых glibc
+    compile_args = ['-std=c++17', '-O3', '-pthread']
+    link_args = ['-pthread']
+
+# Профилирование CSVParser (CSVParser.profiling) можно убрать из сборки: FASTCSV_PROFILE=0
+define_macros = []
+if os.environ.get('FASTCSV_PROFILE') == '0':
+    define_macros.append(('FASTCSV_PROFILE', '0'))
 
 # Список исходных файлов
 sources = [
     'src/csv_parser.cpp',
+    'src/csv_writer.cpp',
+    'src/parallel_parser.cpp',
+    'src/column_parser.cpp',
+    'src/field_conversions.cpp',
+    'src/stream_tokenizer.cpp',
+    'src/row_index.cpp',
+    'src/transcode.cpp',
+    'src/row_filter.cpp',
     'src/simd_utils.cpp',
     'src/python_bindings.cpp',
 ]
@@ -50,6 +59,7 @@ ext_modules = [
         language='c++',
         extra_compile_args=compile_args,
         extra_link_args=link_args,
+        define_macros=define_macros,
     ),
 ]
 
@@ -0,0 +1,133 @@
+#include "fastcsv/column_parser.hpp"
+#include "fastcsv/field_conversions.hpp"
+#include "fastcsv/parallel_parser.hpp"
+#include <stdexcept>
+
+namespace fastcsv {
+
+namespace {
+
+const char* type_name(ColumnType type) {
+    switch (type) {
+        case COLUMN_INT64:
+            return "int64";
+        case COLUMN_FLOAT64:
+            return "float64";
+        default:
+            return "str";
+    }
+}
+
+} // namespace
+
+ColumnParser::ColumnParser(const ParserConfig& config, ColumnSpec spec, bool header)
+    : parser_(config), spec_(std::move(spec)), use_header_(header) {}
+
+std::size_t ColumnParser::feed(std::string_view data, bool is_final) {
+    std::size_t end = data.size();
+    if (!is_final) {
+        end = find_last_record_end(data, parser_.config().quote);
+        if (end == 0) {
+            return 0;
+        }
+    }
+
+    // Записи блока живут только до конца вызова: значения сразу переносятся в колонки
+    parser_.parse_batch(data.substr(0, end), batch_);
+    for (std::size_t row = 0; row < batch_.size(); ++row) {
+        ++record_num_;
+        std::size_t begin = batch_.row_begin(row);
+        std::size_t count = batch_.row_end(row) - begin;
+        // Пустая строка файла не является записью (как в csv.reader)
+        if (count == 0 || (count == 1 && batch_.field(begin).empty())) {
+            continue;
+        }
+        if (!header_done_) {
+            header_done_ = true;
+            if (use_header_) {
+                for (std::size_t j = begin; j < begin + count; ++j) {
+                    header_.emplace_back(batch_.field(j));
+                }
+                init_columns(count);
+                continue;
+            }
+            init_columns(count);
+        }
+        append_row(row);
+    }
+    return end;
+}
+
+void ColumnParser::init_columns(std::size_t count) {
+    columns_.resize(count);
+
+    for (const auto& item : spec_.by_index) {
+        if (item.first >= count) {
+            throw std::invalid_argument("dtypes: column index " + std::to_string(item.first) +
+                                        " is out of range (file has " + std::to_string(count) + " columns)");
+        }
+        columns_[item.first].type = item.second;
+    }
+
+    for (const auto& item : spec_.by_name) {
+        bool found = false;
+        for (std::size_t i = 0; i < header_.size(); ++i) {
+            if (header_[i] == item.first) {
+                columns_[i].type = item.second;
+                found = true;
+            }
+        }
+        if (!found) {
+            throw std::invalid_argument("dtypes: unknown column '" + item.first + "'");
+        }
+    }
+}
+
+std::string ColumnParser::column_label(std::size_t index) const {
+    if (index < header_.size()) {
+        return "'" + header_[index] + "'";
+    }
+    return std::to_string(index);
+}
+
+void ColumnParser::append_row(std::size_t row) {
+    std::size_t begin = batch_.row_begin(row);
+    std::size_t count = batch_.row_end(row) - begin;
+    if (count != columns_.size()) {
+        throw std::invalid_argument("record " + std::to_string(record_num_) + " has " +
+                                    std::to_string(count) + " fields, expected " +
+                                    std::to_string(columns_.size()));
+    }
+
+    for (std::size_t i = 0; i < columns_.size(); ++i) {
+        ColumnData& column = columns_[i];
+        std::string_view field = batch_.field(begin + i);
+        bool ok = true;
+        switch (column.type) {
+            case COLUMN_INT64: {
+                std::int64_t value = 0;
+                ok = parse_int64(field, value);
+                column.ints.push_back(value);
+                break;
+            }
+            case COLUMN_FLOAT64: {
+                double value = 0.0;
+                ok = parse_float64(field, value);
+                column.floats.push_back(value);
+                break;
+            }
+            default:
+                column.data.append(field);
+                column.offsets.push_back(static_cast<std::int64_t>(column.data.size()));
+                break;
+        }
+        if (!ok) {
+            throw std::invalid_argument("record " + std::to_string(record_num_) + ", column " +
+                                        column_label(i) + ": cannot convert '" + std::string(field) + "' to " +
+                                        type_name(column.type));
+        }
+    }
+    ++num_rows_;
+}
+
+} // namespace fastcsv
@@ -2,16 +2,29 @@
 #include "fastcsv/simd_utils.hpp"
 #include <algorithm>
 #include <cctype>
+#include <cstdint>
 #include <sstream>
 #include <vector>
 #include <fstream>
 #include <chrono>
 #include <cstdio>
+#include <stdexcept>
 
 namespace fastcsv {
 
 CSVParser::CSVParser(const ParserConfig& config) : config_(config) {}
 
+// Учитывает завершенную запись в профиле: тики нарезки полей - в QUOTED_ROWS или UNQUOTED_ROWS
+static void end_profiled_row(ParseProfile& profile, std::uint64_t ticks, bool quoted) {
+    profile.rows++;
+    if (quoted) {
+        profile.quoted_rows++;
+        profile.ticks[ParseProfile::QUOTED_ROWS] += ticks;
+    } else {
+        profile.ticks[ParseProfile::UNQUOTED_ROWS] += ticks;
+    }
+}
+
 // Вспомогательная функция: проверяет, есть ли экранированные кавычки в строке
 static bool has_escaped_quotes(std::string_view line, char quote_char) {
     if (line.length() < 2) {
@@ -82,7 +95,11 @@ ParsedRow CSVParser::parse_line(std::string_view line) {
     bool has_escaped = has_escaped_quotes(line, config_.quote);
     if (!has_escaped) {
         // Нет экранированных кавычек - используем оптимизированный путь
-        return parse_line_quotes_no_escape(line);
+        ParsedRow row = parse_line_quotes_no_escape(line);
+        if (config_.quoting == QUOTE_NONNUMERIC) {
+            mark_quoted_fields(line, row);
+        }
+        return row;
     }
     
     // Есть экранированные кавычки - используем полный путь
@@ -215,6 +232,9 @@ ParsedRow CSVParser::parse_line(std::string_view line) {
     result.bytes_processed = pos;
     result.success = !in_quotes;
     
+    if (config_.quoting == QUOTE_NONNUMERIC) {
+        mark_quoted_fields(line, result);
+    }
     return result;
 }
 
@@ -635,795 +655,239 @@ ParsedRow CSVParser::parse_line_quotes_no_escape(std::string_view line) {
     return result;
 }
 
+void RowBatch::clear() {
+    data = std::string_view();
+    fields.clear();
+    records.clear();
+    quoted.clear();
+    arena.clear();
+    success = true;
+}
+
 std::vector<ParsedRow> CSVParser::parse_chunk(std::string_view data) {
-    std::vector<ParsedRow> results;
-    
-    // Улучшенное резервирование: более точная оценка количества строк
-    // Подсчитываем количество newline символов для более точной оценки
-    std::size_t newline_count = 0;
-    if (data.length() >= 16) {
-        // Используем SIMD для подсчета newline - это быстрее чем простой цикл
-        newline_count = simd::count_chars_simd(data, '\n');
-        // Также учитываем \r\n - проверяем количество \r
-        std::size_t cr_count = simd::count_chars_simd(data, '\r');
-        // Для Windows (\r\n) количество строк = количество \n
-        // Для старых Mac (\r) количество строк = количество \r
-        // Берем максимум для консервативной оценки
-        if (cr_count > newline_count) {
-            // Возможно старый Mac формат или смешанный
-            newline_count = cr_count;
+    return parse_chunk(data, profiling_ ? &profile_ : nullptr);
+}
+
+std::vector<ParsedRow> CSVParser::parse_chunk(std::string_view data, ParseProfile* profile) const {
+    RowBatch batch;
+    parse_batch(data, batch, profile);
+    
+    std::vector<ParsedRow> results(batch.size());
+    for (std::size_t i = 0; i < batch.size(); ++i) {
+        ParsedRow& row = results[i];
+        std::size_t begin = batch.row_begin(i);
+        std::size_t end = batch.row_end(i);
+        row.fields.reserve(end - begin);
+        for (std::size_t j = begin; j < end; ++j) {
+            row.fields.emplace_back(batch.field(j));
         }
-    } else {
-        // Для маленьких блоков используем простой подсчет
-        for (char c : data) {
-            if (c == '\n') {
-                newline_count++;
-            }
+        if (begin < batch.quoted.size()) {
+            row.quoted.assign(batch.quoted.begin() + begin,
+                              batch.quoted.begin() + std::min(end, batch.quoted.size()));
+            row.quoted.resize(end - begin, 0);
         }
+        row.bytes_processed = batch.records[i].bytes;
     }
-    
-    // Оценка: количество строк ≈ количество newline + 1 (последняя строка может не иметь newline)
-    std::size_t estimated_rows = newline_count + 1;
-    
-    // Адаптивное резервирование: упрощенная версия для лучшей производительности
-    // Используем более простую оценку без полного анализа первых строк
-    std::size_t avg_fields_per_row = 16; // Значение по умолчанию
-    if (data.length() > 100 && estimated_rows > 0) {
-        // Быстрая оценка: используем SIMD для подсчета разделителей в первых 512 байтах
-        std::size_t sample_size = std::min(data.length(), std::size_t(512));
-        std::size_t sample_delimiters = 0;
-        if (sample_size >= 16) {
-            std::string_view sample(data.data(), sample_size);
-            sample_delimiters = simd::count_chars_simd(sample, config_.delimiter);
-        } else {
-            for (std::size_t i = 0; i < sample_size; ++i) {
-                if (data[i] == config_.delimiter) {
-                    sample_delimiters++;
-                }
-            }
-        }
-        
-        // Оцениваем количество строк в выборке
-        std::size_t sample_newlines = 0;
-        for (std::size_t i = 0; i < sample_size && i < data.length(); ++i) {
-            if (data[i] == '\n') {
-                sample_newlines++;
-            }
-        }
-        
-        if (sample_newlines > 0) {
-            // Среднее количество полей на строку
-            avg_fields_per_row = (sample_delimiters / sample_newlines) + 1;
-            // Ограничиваем разумными пределами
-            avg_fields_per_row = std::max(std::size_t(1), std::min(avg_fields_per_row, std::size_t(256)));
-        }
+    if (!results.empty()) {
+        results.back().success = batch.success;
     }
-    
-    const char* ptr = data.data();
-    std::size_t pos = 0;
-    std::size_t len = data.length();
-    
-    // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для больших файлов: увеличиваем максимальное резервирование
-    // Для больших чанков резервируем больше памяти для уменьшения реаллокаций
-    std::size_t max_reserve = 2048; // По умолчанию
-    if (len >= 1048576) {  // >=1MB - огромный чанк
-        max_reserve = 8192;  // Максимальное резервирование для огромных чанков
-    } else if (len >= 524288) {  // >=512KB - очень большой чанк
-        max_reserve = 4096;  // Увеличиваем для больших чанков
-    } else if (len >= 262144) {  // >=256KB - большой чанк
-        max_reserve = 3072;  // Среднее значение
+    return results;
+}
+
+void CSVParser::set_profiling(bool enabled) {
+#if FASTCSV_PROFILE
+    profiling_ = enabled;
+#else
+    if (enabled) {
+        throw std::runtime_error("CSVParser profiling is disabled in this build (FASTCSV_PROFILE=0)");
     }
-    results.reserve(std::min(estimated_rows, max_reserve));
-    bool in_quotes = false;
-    std::size_t line_start = 0;
-    
-    // Оптимизация: предварительно проверяем, есть ли кавычки в чанке
-    // Если кавычек нет, можем использовать более быстрый путь
-    bool chunk_has_quotes = false;
-    if (len >= 16) {
-        std::size_t quote_pos = simd::find_char_simd(data, config_.quote, 0);
-        chunk_has_quotes = (quote_pos != std::string_view::npos);
-    } else {
-        for (std::size_t k = 0; k < len; ++k) {
-            if (ptr[k] == config_.quote) {
-                chunk_has_quotes = true;
-                break;
-            }
-        }
+#endif
+}
+
+void CSVParser::parse_batch(std::string_view data, RowBatch& batch) {
+    parse_batch(data, batch, profiling_ ? &profile_ : nullptr);
+}
+
+void CSVParser::parse_batch(std::string_view data, RowBatch& batch, ParseProfile* profile) const {
+#if FASTCSV_PROFILE
+    if (profile) {
+        // Калибровка тиков по steady_clock за весь вызов
+        std::uint64_t start_ns = ParseProfile::now_ns();
+        std::uint64_t start_ticks = ParseProfile::now_ticks();
+        parse_batch_impl<true>(data, batch, profile);
+        profile->calibration_ticks += ParseProfile::now_ticks() - start_ticks;
+        profile->calibration_ns += ParseProfile::now_ns() - start_ns;
+        profile->bytes += data.size();
+        return;
     }
-    
-    
-    
-    // Если кавычек нет, используем оптимизированный путь для всех строк
-    if (!chunk_has_quotes) {
-        // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: умное резервирование в зависимости от размера файла
-        // Для маленьких файлов полное резервирование полезно (исправляет регрессии)
-        // Для больших файлов ограничиваем резервирование (избегаем overhead)
-        std::size_t reserve_size = newline_count > 0 ? newline_count : 1;
-        if (reserve_size > 5000) {
-            // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для очень больших файлов (>5000 строк)
-            // Используем менее агрессивное ограничение для лучшего баланса между overhead и реаллокациями
-            // Формула: базовое (2000) + средний диапазон (3000/2=1500) + остаток/4
-            reserve_size = 2000 + (3000) / 2 + (reserve_size - 5000) / 4;
-            // Для 10000 строк: 2000 + 1500 + 5000/4 = 2000 + 1500 + 1250 = 4750
-        } else if (reserve_size > 2000) {
-            // Для средних больших файлов (2000-5000 строк) используем текущую формулу
-            reserve_size = 2000 + (reserve_size - 2000) / 4;
-        }
-        // Проверяем, не было ли уже резервирование на строке 670
-        // Если уже резервировали больше, не перезаписываем
-        if (results.capacity() < reserve_size) {
-            results.reserve(reserve_size);
-        }
-        
-        // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для больших файлов: предварительно находим все newline позиции
-        // Для очень больших файлов (>1MB) используем более агрессивную оптимизацию
-        bool is_very_large = (len >= 1048576);  // >=1MB
-        // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: уменьшен порог до 256KB для лучшей производительности
-        // Для больших чанков (>256KB) это быстрее чем искать каждый раз
-        std::vector<std::size_t> newline_positions;
-        if (len >= 262144) {  // >=256KB - большой чанк (уменьшен порог)
-            // Предварительно находим все позиции \n за один проход
-            simd::find_all_chars_simd(data, '\n', newline_positions, 0);
-        }
-        
-        // Быстрый путь: обрабатываем все строки без кавычек пакетно
-        std::size_t line_start = 0;
-        std::size_t newline_idx = 0;
-        
-        while (line_start < len) {
-            // Ищем следующий newline
-            std::size_t line_end = std::string_view::npos;
-            
-            if (len >= 262144 && !newline_positions.empty() && newline_idx < newline_positions.size()) {
-                // Используем предварительно найденные позиции (уменьшен порог)
-                line_end = newline_positions[newline_idx++];
-            } else {
-                // Для средних чанков ищем каждый раз
-                std::size_t newline_pos = simd::find_char_simd(data, '\n', line_start);
-                if (newline_pos != std::string_view::npos) {
-                    line_end = newline_pos;
-                } else {
-                    // Нет \n - ищем \r (только если нужно)
-                    std::size_t cr_pos = simd::find_char_simd(data, '\r', line_start);
-                    if (cr_pos != std::string_view::npos) {
-                        if (cr_pos + 1 < len && ptr[cr_pos + 1] == '\n') {
-                            line_end = cr_pos + 1;
-                        } else {
-                            line_end = cr_pos;
-                        }
-                    }
-                }
+#endif
+    parse_batch_impl<false>(data, batch, nullptr);
+}
+
+template <bool kProfile>
+void CSVParser::parse_batch_impl(std::string_view data, RowBatch& batch, ParseProfile* profile) const {
+    batch.clear();
+    batch.data = data;
+    const std::size_t len = data.length();
+    const char* ptr = data.data();
+
+    // Двухэтапный разбор (как в simdjson):
+    // 1. simd::index_structurals за один проход находит разделители и переводы строк вне кавычек
+    // 2. поля нарезаются между соседними позициями; кавычки разбираются только в полях
+    //    с флагом STRUCTURAL_QUOTED
+    // Данные обрабатываются сегментами, чтобы массив позиций оставался в кеше
+    constexpr std::size_t kSegment = 65536;
+    std::vector<std::uint64_t> structurals;
+    structurals.reserve(kSegment / 4);
+    simd::StructuralState state;
+
+    std::size_t row_start = 0;
+    std::size_t field_start = 0;
+    // Позиция сразу после \r, завершившего запись: \n в ней относится к той же записи
+    std::size_t cr_end = std::string_view::npos;
+
+    // Профилирование: тики текущей записи (без поиска структурных символов) и есть ли в ней
+    // поле в кавычках
+    std::uint64_t row_ticks = 0;
+    std::uint64_t row_mark = 0;
+    bool row_quoted = false;
+
+    for (std::size_t segment = 0; segment < len; segment += kSegment) {
+        std::size_t segment_end = std::min(len, segment + kSegment);
+        structurals.clear();
+        if constexpr (kProfile) {
+            std::uint64_t scan_start = ParseProfile::now_ticks();
+            if (segment > 0) {
+                row_ticks += scan_start - row_mark;
             }
-            
-            if (line_end == std::string_view::npos) {
-                // Последняя строка без newline
-                line_end = len;
+            simd::index_structurals(data, segment, segment_end, config_.quote, config_.delimiter, state, structurals);
+            row_mark = ParseProfile::now_ticks();
+            profile->ticks[ParseProfile::SCAN] += row_mark - scan_start;
+        } else {
+            simd::index_structurals(data, segment, segment_end, config_.quote, config_.delimiter, state, structurals);
+        }
+
+        for (std::uint64_t entry : structurals) {
+            std::size_t pos = static_cast<std::size_t>(entry & ~simd::STRUCTURAL_QUOTED);
+            char c = ptr[pos];
+            if (c == '\n' && pos == cr_end) {
+                // \r\n
+                batch.records.back().bytes++;
+                row_start = field_start = pos + 1;
+                continue;
             }
-            
-            // Парсим строку без кавычек
-            std::size_t line_len = line_end - line_start;
-            
-            
-            
-            // КРИТИЧЕСКАЯ ИСПРАВЛЕНИЕ: для Windows \r\n нужно исключить \r из строки
-            // line_end указывает на позицию \n, а line_len включает все до \n (включая \r, если он есть)
-            // Для \r\n нужно исключить \r из line_len
-            bool is_crlf = false;
-            if (line_len > 0 && line_end > line_start && ptr[line_end - 1] == '\r') {
-                // Это \r\n - исключаем \r из line_len
-                line_len--;
-                is_crlf = true;
+            bool has_quotes = (entry & simd::STRUCTURAL_QUOTED) != 0;
+            append_field<kProfile>(batch, field_start, pos, has_quotes, profile);
+            field_start = pos + 1;
+            if constexpr (kProfile) {
+                row_quoted = row_quoted || has_quotes;
             }
-            
-            
-            // Для обычного \n line_len уже не включает \n (так как line_end указывает на позицию \n, а не после него)
-            
-            if (line_len > 0) {
-                // КРИТИЧЕСКАЯ ИСПРАВЛЕНИЕ: убеждаемся, что line не выходит за границы данных
-                // Это защита от выхода за границы буфера
-                // КРИТИЧЕСКАЯ ИСПРАВЛЕНИЕ: если is_crlf == true, то line_len уже не включает \r,
-                // и мы НЕ должны использовать len - line_start, так как оно включает \r\n
-                // Проверяем границы только если is_crlf == false
-                if (!is_crlf && line_start + line_len > len) {
-                    // Ошибка: line выходит за границы данных
-                    // Это не должно происходить, но на всякий случай ограничиваем
-                    line_len = len - line_start;
-                }
-                // АЛЬТЕРНАТИВНЫЙ ПОДХОД: создаем string_view с явной проверкой границ
-                // Убеждаемся, что line_len не превышает доступные данные
-                // КРИТИЧЕСКАЯ ИСПРАВЛЕНИЕ: line_len уже был уменьшен на 1 для \r\n (если is_crlf == true)
-                // Поэтому actual_line_len должен быть равен line_len, а не min(line_len, len - line_start)
-                // Потому что len - line_start может включать \r\n, а line_len уже не включает \r
-                // КРИТИЧЕСКАЯ ИСПРАВЛЕНИЕ: line_len уже был уменьшен на 1 для \r\n (если is_crlf == true)
-                // Поэтому actual_line_len должен быть равен line_len
-                // НЕ используем len - line_start, так как для многострочного буфера оно включает следующие строки
-                std::size_t actual_line_len = line_len;
-                std::string line_str(ptr + line_start, actual_line_len);
-                
-                std::string_view line(line_str);
-                
-                
-                
-                ParsedRow row = parse_line_no_quotes(line);
-                
-                // Вычисляем bytes_processed: учитываем newline символы
-                std::size_t bytes_processed = actual_line_len;
-                if (is_crlf) {
-                    // Это \r\n - пропускаем оба символа
-                    // line_end указывает на \n, поэтому пропускаем line_end + 1 (пропускаем \n)
-                    // \r уже был исключен из line_len, поэтому он не попадет в следующую строку
-                    bytes_processed += 2;
-                    line_start = line_end + 1;  // line_end указывает на \n, пропускаем его
-                } else if (line_end < len && ptr[line_end] == '\r' && line_end + 1 < len && ptr[line_end + 1] == '\n') {
-                    // Это \r\n, но line_end указывает на \r
-                    bytes_processed += 2;
-                    line_start = line_end + 2;
-                } else if (line_end < len && (ptr[line_end] == '\n' || ptr[line_end] == '\r')) {
-                    bytes_processed += 1;
-                    line_start = line_end + 1;
-                } else {
-                    line_start = line_end;
-                }
-                
-                row.bytes_processed = bytes_processed;
-                results.push_back(std::move(row));
-            } else {
-                // Пустая строка
-                ParsedRow row;
-                row.fields.push_back("");
-                row.success = true;
-                if (line_end < len && ptr[line_end] == '\r' && line_end + 1 < len && ptr[line_end + 1] == '\n') {
-                    line_start = line_end + 2;
-                    row.bytes_processed = 2;
-                } else if (line_end < len && (ptr[line_end] == '\n' || ptr[line_end] == '\r')) {
-                    line_start = line_end + 1;
-                    row.bytes_processed = 1;
-                } else {
-                    line_start = line_end;
-                    row.bytes_processed = 0;
-                }
-                results.push_back(std::move(row));
+            if (c == config_.delimiter) {
+                continue;
             }
-        }
-        
-        return results;
-    }
-    
-    // Есть кавычки - проверяем, есть ли экранированные кавычки в чанке
-    // Если экранированных кавычек нет, можем использовать быстрый путь
-    // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: используем SIMD для больших чанков
-    bool chunk_has_escaped_quotes = false;
-    if (chunk_has_quotes && len >= 2) {
-        if (len >= 64) {
-            // Для больших чанков используем оптимизированный поиск
-            // Ищем первую кавычку, затем проверяем следующую
-            std::size_t quote_pos = 0;
-            while (quote_pos < len - 1) {
-                std::string_view search_view(ptr + quote_pos, len - quote_pos);
-                std::size_t next_quote = simd::find_char_simd(search_view, config_.quote, 0);
-                if (next_quote == std::string_view::npos) {
-                    break;
-                }
-                std::size_t actual_pos = quote_pos + next_quote;
-                if (actual_pos + 1 < len && ptr[actual_pos + 1] == config_.quote) {
-                    chunk_has_escaped_quotes = true;
-                    break;
-                }
-                quote_pos = actual_pos + 1;
+
+            // Конец записи (пустая строка дает запись из одного пустого поля)
+            if (c == '\r') {
+                cr_end = pos + 1;
             }
-        } else {
-            // Для маленьких чанков используем прямой поиск
-            for (std::size_t k = 0; k < len - 1; ++k) {
-                if (ptr[k] == config_.quote && ptr[k + 1] == config_.quote) {
-                    chunk_has_escaped_quotes = true;
-                    break;
-                }
+            batch.records.push_back({batch.fields.size(), pos + 1 - row_start});
+            row_start = field_start;
+            if constexpr (kProfile) {
+                std::uint64_t now = ParseProfile::now_ticks();
+                end_profiled_row(*profile, row_ticks + (now - row_mark), row_quoted);
+                row_ticks = 0;
+                row_mark = now;
+                row_quoted = false;
             }
         }
-    }
-    
-    // ВКЛЮЧЕНО: упрощенная batch обработка для файлов с кавычками (но без экранированных)
-    // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: используем batch обработку для ускорения файлов с кавычками
-    // Это критично для производительности - без этого файлы с кавычками в 3x медленнее
-    if (chunk_has_quotes && !chunk_has_escaped_quotes) {
-        // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: предварительно резервируем место для результатов
-        // Оцениваем количество строк на основе количества newline
-        std::size_t estimated_rows = newline_count;
-        if (estimated_rows == 0) {
-            estimated_rows = 1; // Минимум одна строка
+
+        if (segment == 0 && segment_end < len) {
+            // Оценка размера массивов по первому сегменту
+            std::size_t scale = len / segment_end + 1;
+            batch.fields.reserve(batch.fields.size() * scale);
+            batch.records.reserve(batch.records.size() * scale);
         }
-        results.reserve(estimated_rows);
-        
-        // Быстрый путь: обрабатываем все строки с кавычками (но без экранированных) пакетно
-        std::size_t line_start = 0;
-        while (line_start < len) {
-            // Ищем следующий newline (учитывая, что newline внутри кавычек не является концом строки)
-            std::size_t line_end = std::string_view::npos;
-            bool in_quotes_line = false;
-            
-            // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: упрощенный и быстрый поиск концов строк для файлов с кавычками
-            // Используем прямой поиск с отслеживанием состояния кавычек - это быстрее для большинства случаев
-            std::size_t i = line_start;
-            std::size_t remaining = len - line_start;
-            
-            // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: для больших блоков используем SIMD для одновременного поиска кавычек и newline
-            // Для маленьких блоков прямой поиск быстрее из-за меньшего overhead
-            // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: уменьшен порог с 64 до 48 байт для более частого использования SIMD
-            if (remaining >= 48) {
-                // Для больших блоков используем оптимизированный поиск с SIMD
-                // Ищем кавычки и newline одновременно, отслеживая состояние кавычек
-                std::size_t pos = 0;
-                while (pos < remaining) {
-                    std::size_t search_remaining = remaining - pos;
-                    // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: уменьшен порог с 32 до 24 байт для более частого использования SIMD
-                    if (search_remaining >= 24) {
-                        // Используем SIMD для одновременного поиска кавычек и newline
-                        std::string_view sub_view(ptr + line_start + pos, search_remaining);
-                        std::size_t quote_pos = simd::find_char_simd(sub_view, config_.quote, 0);
-                        std::size_t newline_pos = simd::find_char_simd(sub_view, '\n', 0);
-                        
-                        // Находим ближайший специальный символ
-                        std::size_t next_special = std::string_view::npos;
-                        bool is_quote = false;
-                        if (quote_pos != std::string_view::npos) {
-                            next_special = quote_pos;
-                            is_quote = true;
-                        }
-                        if (newline_pos != std::string_view::npos && 
-                            (next_special == std::string_view::npos || newline_pos < next_special)) {
-                            next_special = newline_pos;
-                            is_quote = false;
-                        }
-                        
-                        if (next_special != std::string_view::npos) {
-                            pos += next_special;
-                            if (is_quote) {
-                                in_quotes_line = !in_quotes_line;
-                                pos++;
-                            } else {
-                                // Нашли newline
-                                if (!in_quotes_line) {
-                                    line_end = line_start + pos;
-                                    break;
-                                } else {
-                                    // Newline внутри кавычек - пропускаем
-                                    pos++;
-                                }
-                            }
-                        } else {
-                            // Не нашли специальных символов - до конца
-                            break;
-                        }
-                    } else {
-                        // Для маленьких блоков используем прямой поиск
-                        bool found = false;
-                        for (std::size_t j = pos; j < remaining; ++j) {
-                            char c = ptr[line_start + j];
-                            if (c == config_.quote) {
-                                in_quotes_line = !in_quotes_line;
-                                pos = j + 1;
-                                found = true;
-                                break;
-                            } else if (c == '\n' && !in_quotes_line) {
-                                line_end = line_start + j;
-                                found = true;
-                                break;
-                            } else if (c == '\r' && !in_quotes_line) {
-                                if (j + 1 < remaining && ptr[line_start + j + 1] == '\n') {
-                                    line_end = line_start + j + 1;
-                                } else {
-                                    line_end = line_start + j;
-                                }
-                                found = true;
-                                break;
-                            }
-                        }
-                        if (!found) {
-                            break;
-                        }
-                    }
-                }
-            } else {
-                // Для маленьких и средних блоков используем прямой поиск - это быстрее
-                while (i < len) {
-                    char c = ptr[i];
-                    
-                    if (c == config_.quote) {
-                        // Нашли кавычку - переключаем состояние
-                        in_quotes_line = !in_quotes_line;
-                        i++;
-                    } else if (!in_quotes_line) {
-                        // Вне кавычек - проверяем на newline
-                        if (c == '\n') {
-                            line_end = i;
-                            break;
-                        } else if (c == '\r') {
-                            // Проверяем, не является ли это \r\n
-                            if (i + 1 < len && ptr[i + 1] == '\n') {
-                                // Это \r\n - используем позицию \n
-                                line_end = i + 1;
-                            } else {
-                                // Это просто \r
-                                line_end = i;
-                            }
-                            break;
-                        } else {
-                            i++;
-                        }
-                    } else {
-                        // Внутри кавычек - просто пропускаем символ
-                        i++;
-                    }
-                }
-            }
-            
-            if (line_end == std::string_view::npos) {
-                // Не нашли newline - до конца данных
-                line_end = len;
-            }
-            
-            // Парсим строку с кавычками (но без экранированных)
-            std::size_t line_len = line_end - line_start;
-            
-            // КРИТИЧЕСКАЯ ИСПРАВЛЕНИЕ: для Windows \r\n нужно исключить \r из строки
-            // Если line_end указывает на \n, а перед ним \r, то исключаем \r из line_len
-            bool is_crlf = false;
-            if (line_len > 0 && line_end > line_start && ptr[line_end - 1] == '\r') {
-                line_len--;
-                is_crlf = true;
-            }
-            
-            if (line_len > 0) {
-                // АЛЬТЕРНАТИВНЫЙ ПОДХОД: используем std::string для гарантии границ
-                std::size_t actual_line_len = std::min(line_len, len - line_start);
-                std::string line_str(ptr + line_start, actual_line_len);
-                
-                
-                
-                std::string_view line(line_str);
-                ParsedRow row = parse_line_quotes_no_escape(line);
-                
-                // Вычисляем bytes_processed
-                std::size_t bytes_processed = line_len;
-                if (is_crlf) {
-                    // Это \r\n - пропускаем оба символа
-                    bytes_processed += 2;
-                    line_start = line_end + 1;  // line_end указывает на \n, пропускаем его
-                } else if (line_end < len && ptr[line_end] == '\r' && line_end + 1 < len && ptr[line_end + 1] == '\n') {
-                    bytes_processed += 2;
-                    line_start = line_end + 2;
-                } else if (line_end < len && (ptr[line_end] == '\n' || ptr[line_end] == '\r')) {
-                    bytes_processed += 1;
-                    line_start = line_end + 1;
-                } else {
-                    // line_end == len - конец данных, цикл завершится
-                    line_start = line_end;
-                }
-                
-                row.bytes_processed = bytes_processed;
-                results.push_back(std::move(row));
-            } else {
-                // Пустая строка
-                ParsedRow row;
-                row.fields.push_back("");
-                row.success = true;
-                // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: гарантируем, что line_start всегда увеличивается
-                if (line_end < len && ptr[line_end] == '\r' && line_end + 1 < len && ptr[line_end + 1] == '\n') {
-                    line_start = line_end + 2;
-                    row.bytes_processed = 2;
-                } else if (line_end < len && (ptr[line_end] == '\n' || ptr[line_end] == '\r')) {
-                    line_start = line_end + 1;
-                    row.bytes_processed = 1;
-                } else {
-                    // line_end == len - конец данных, цикл завершится
-                    line_start = line_end;
-                    row.bytes_processed = 0;
-                }
-                results.push_back(std::move(row));
-            }
+    }
+
+    // Последняя запись без перевода строки
+    std::size_t row_fields_begin = batch.records.empty() ? 0 : batch.records.back().fields_end;
+    if (field_start < len || batch.fields.size() > row_fields_begin) {
+        append_field<kProfile>(batch, field_start, len, state.quote_seen, profile);
+        batch.records.push_back({batch.fields.size(), len - row_start});
+        batch.success = !state.in_quotes;
+        if constexpr (kProfile) {
+            end_profiled_row(*profile, row_ticks + (ParseProfile::now_ticks() - row_mark),
+                             row_quoted || state.quote_seen);
         }
-        
-        return results;
     }
-    
-    // Есть экранированные кавычки - используем полный путь
-    
-    
-    while (pos < len) {
-        // Ищем конец строки, учитывая кавычки
-        // Если мы внутри кавычек, newline не является концом строки
-        std::size_t line_end = std::string_view::npos;
-        
-        // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: оптимизированный поиск конца строки с учетом кавычек
-        // Используем SIMD для ускорения поиска кавычек и newline
-        std::size_t i = pos;
-        const char* search_ptr = ptr + i;
-        std::size_t remaining = len - i;
-        
-        // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для больших файлов: используем SIMD для больших блоков
-        // Для очень больших чанков (>512KB) используем более агрессивный SIMD
-        if (remaining >= 16) {
-            std::string_view search_view(search_ptr, remaining);
-            
-            if (!in_quotes) {
-                // Вне кавычек - ищем newline и кавычку одновременно
-                // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: используем find_any_char_simd для поиска обоих символов за один проход
-                std::size_t quote_or_newline = simd::find_any_char_simd(search_view, config_.quote, '\n', 0);
-                std::size_t cr_pos = std::string_view::npos;
-                // Для больших блоков (>64 байт) ищем \r отдельно, для маленьких - объединяем проверки
-                if (remaining >= 64) {
-                    cr_pos = simd::find_char_simd(search_view, '\r', 0);
-                } else {
-                    // Для маленьких блоков проверяем \r вручную при необходимости
-                    if (quote_or_newline != std::string_view::npos) {
-                        for (std::size_t k = 0; k < remaining && k < quote_or_newline; ++k) {
-                            if (search_ptr[k] == '\r') {
-                                cr_pos = k;
-                                break;
-                            }
-                        }
-                    } else {
-                        // quote_or_newline не найден - проверяем весь блок
-                        for (std::size_t k = 0; k < remaining; ++k) {
-                            if (search_ptr[k] == '\r') {
-                                cr_pos = k;
-                                break;
-                            }
-                        }
-                    }
-                }
-                
-                // Находим ближайший из найденных символов
-                std::size_t first_special = quote_or_newline;
-                if (cr_pos != std::string_view::npos && (first_special == std::string_view::npos || cr_pos < first_special)) {
-                    first_special = cr_pos;
-                }
-                
-                if (first_special != std::string_view::npos) {
-                    // Проверяем, что это за символ
-                    char found_char = search_ptr[first_special];
-                    if (found_char == '\n' || found_char == '\r') {
-                        // Найден newline - это конец строки
-                        line_end = i + first_special;
-                    } else if (found_char == config_.quote) {
-                        // Найдена кавычка - переходим в режим кавычек и продолжаем поиск
-                        in_quotes = true;
-                        i += first_special + 1;
-                        // Продолжаем поиск с новой позиции
-                        search_ptr = ptr + i;
-                        remaining = len - i;
-                        if (remaining >= 16) {
-                            search_view = std::string_view(search_ptr, remaining);
-                            std::size_t quote_pos = simd::find_char_simd(search_view, config_.quote, 0);
-                            if (quote_pos != std::string_view::npos) {
-                                // Проверяем, не экранированная ли это кавычка
-                                if (i + quote_pos + 1 < len && ptr[i + quote_pos + 1] == config_.quote) {
-                                    // Экранированная кавычка "" - пропускаем обе
-                                    i += quote_pos + 2;
-                                } else {
-                                    // Обычная закрывающая кавычка
-                                    in_quotes = false;
-                                    i += quote_pos + 1;
-                                }
-                                // Продолжаем поиск newline - обновляем pos и продолжаем
-                                pos = i;
-                                continue;
-                            }
-                        }
-                        // Обновляем pos для следующей итерации
-                        pos = i;
-                    }
-                } else {
-                    // Не нашли ни newline, ни кавычку - пропускаем большой блок
-                    i += (remaining & ~15); // Выравниваем на 16 байт
-                    pos = i; // Обновляем pos перед continue
-                    continue;
-                }
-            } else {
-                // Внутри кавычек - ищем только кавычку
-                std::size_t quote_pos = simd::find_char_simd(search_view, config_.quote, 0);
-                
-                if (quote_pos != std::string_view::npos) {
-                    // Проверяем, не экранированная ли это кавычка
-                    if (i + quote_pos + 1 < len && ptr[i + quote_pos + 1] == config_.quote) {
-                        // Экранированная кавычка "" - пропускаем обе
-                        i += quote_pos + 2;
-                        pos = i; // Обновляем pos перед continue
-                        continue;
-                    } else {
-                        // Обычная закрывающая кавычка
-                        in_quotes = false;
-                        i += quote_pos + 1;
-                        pos = i; // Обновляем pos перед continue
-                        continue;
-                    }
-                } else {
-                    // Не нашли кавычку - пропускаем большой блок
-                    i += (remaining & ~15);
-                    pos = i; // Обновляем pos перед continue
-                    continue;
-                }
-            }
-        } else {
-            // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: для маленьких блоков используем прямой поиск
-            for (; i < len; ++i) {
-                char c = ptr[i];
-                
-                if (c == config_.quote) {
-                    // Обрабатываем кавычки
-                    if (in_quotes && i + 1 < len && ptr[i + 1] == config_.quote) {
-                        // Экранированная кавычка "" - пропускаем следующую кавычку
-                        i++;
-                        continue;
-                    }
-                    in_quotes = !in_quotes;
-                } else if (!in_quotes && (c == '\n' || c == '\r')) {
-                    // Нашли конец строки вне кавычек
-                    line_end = i;
-                    break;
+}
+
+template <bool kProfile>
+void CSVParser::append_field(RowBatch& batch, std::size_t begin, std::size_t end, bool has_quotes,
+                             ParseProfile* profile) const {
+    std::string_view field = batch.data.substr(begin, end - begin);
+    RowBatch::Field span{begin, end - begin};
+    std::string_view value = field;
+    if (has_quotes) {
+        if (config_.quoting == QUOTE_NONNUMERIC) {
+            // Поле в кавычках начинается с кавычки (после пробелов при skip_initial_space)
+            std::size_t start = 0;
+            if (config_.skip_initial_space) {
+                while (start < field.size() && field[start] == ' ') {
+                    ++start;
                 }
             }
-        }
-        
-        if (line_end == std::string_view::npos) {
-            // Не нашли конец строки (последняя строка или многострочное поле)
-            // Если мы не внутри кавычек, это последняя строка
-            if (!in_quotes) {
-                line_end = len;
-            } else {
-                // Многострочное поле - не можем обработать в этом чанке
-                // Возвращаем то, что уже распарсили
-                break;
+            if (start < field.size() && field[start] == config_.quote) {
+                batch.quoted.resize(batch.fields.size() + 1, 0);
+                batch.quoted.back() = 1;
             }
         }
-        
-        // Нашли конец строки (или конец данных)
-        // line_end указывает на позицию \n или \r (или на конец данных)
-        // line_len не включает символы конца строки, так как line_end указывает на них
-        std::size_t line_len = line_end - line_start;
-        
-        
-        
-        // КРИТИЧЕСКАЯ ИСПРАВЛЕНИЕ: для Windows \r\n нужно исключить \r из строки
-        // Если line_end указывает на \n, а перед ним \r, то исключаем \r из line_len
-        // ИЛИ если line_end указывает на \r, а следующий символ - \n, то это \r\n
-        bool is_crlf = false;
-        if (line_end < len && ptr[line_end] == '\r' && line_end + 1 < len && ptr[line_end + 1] == '\n') {
-            // line_end указывает на \r, следующий символ - \n
-            // Это \r\n - исключаем \r из line_len
-            line_len--;
-            is_crlf = true;
-        } else if (line_len > 0 && line_end > line_start && ptr[line_end - 1] == '\r') {
-            // line_end указывает на \n, перед ним \r
-            // Это \r\n - исключаем \r из line_len
-            line_len--;
-            is_crlf = true;
+
+        // Кавычки переключают состояние, "" внутри кавычек - одна кавычка
+        ProfileScope unescape(kProfile ? profile : nullptr, ParseProfile::UNESCAPE);
+        if constexpr (kProfile) {
+            profile->quoted_fields++;
+            profile->unescaped_bytes += field.size();
         }
-        
-        
-        
-        // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для больших файлов: отладочный код удален
-        
-        // Определяем, сколько символов нужно пропустить после line_end
-        std::size_t next_pos = line_end;
-        if (is_crlf) {
-            // Это \r\n - пропускаем оба символа
-            next_pos = line_end + 1;  // line_end указывает на \n, пропускаем его
-        } else if (line_end < len) {
-            if (ptr[line_end] == '\r' && line_end + 1 < len && ptr[line_end + 1] == '\n') {
-                // \r\n
-                next_pos = line_end + 2;
-            } else if (ptr[line_end] == '\n' || ptr[line_end] == '\r') {
-                // \n или \r
-                next_pos = line_end + 1;
+        std::string& arena = batch.arena;
+        std::size_t arena_start = arena.size();
+        bool in_quotes = false;
+        std::size_t pos = 0;
+        while (true) {
+            std::size_t quote_pos = field.find(config_.quote, pos);
+            if (quote_pos == std::string_view::npos) {
+                arena.append(field.data() + pos, field.size() - pos);
+                break;
             }
-        }
-        
-        // Парсим строку (line_len уже не включает символы конца строки)
-        if (line_len > 0) {
-            // parse_len = line_len (line_end указывает на позицию \n или \r, поэтому line_len не включает их)
-            std::size_t parse_len = line_len;
-            
-            if (parse_len > 0) {
-                // АЛЬТЕРНАТИВНЫЙ ПОДХОД: используем std::string для гарантии границ
-                // КРИТИЧЕСКАЯ ИСПРАВЛЕНИЕ: parse_len уже был уменьшен на 1 для \r\n (если is_crlf == true)
-                // Поэтому actual_parse_len должен быть равен parse_len, а не min(parse_len, len - line_start)
-                // Потому что len - line_start может включать следующие строки для многострочного буфера
-                std::size_t actual_parse_len = parse_len;
-                
-                std::string line_str(ptr + line_start, actual_parse_len);
-                
-                std::string_view line(line_str);
-                
-                
-                
-                // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для больших файлов: отладочный код удален
-                // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: используем знание о чанке для пропуска проверок
-                // Если в чанке есть кавычки, все строки тоже имеют кавычки (для упрощения)
-                // Если в чанке нет кавычек, все строки тоже не имеют кавычек
-                ParsedRow row;
-                
-                // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: резервируем память заранее на основе статистики
-                row.fields.reserve(avg_fields_per_row);
-                
-                // Выбираем оптимальный путь парсинга на основе знания о чанке
-                if (!chunk_has_quotes) {
-                    // Нет кавычек в чанке - используем быстрый путь
-                    row = parse_line_no_quotes(line);
-                } else {
-                    // Есть кавычки в чанке
-                    // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: проверяем, есть ли кавычки в текущей строке
-                    // Если в строке нет кавычек, используем быстрый путь parse_line_no_quotes
-                    bool line_has_quotes = false;
-                    if (parse_len >= 16) {
-                        std::size_t quote_pos = simd::find_char_simd(line, config_.quote, 0);
-                        line_has_quotes = (quote_pos != std::string_view::npos);
-                    } else {
-                        for (std::size_t k = 0; k < parse_len; ++k) {
-                            if (ptr[line_start + k] == config_.quote) {
-                                line_has_quotes = true;
-                                break;
-                            }
-                        }
-                    }
-                    
-                    
-                    
-                    if (!line_has_quotes) {
-                        // В строке нет кавычек - используем быстрый путь
-                        row = parse_line_no_quotes(line);
-                    } else {
-                        // В строке есть кавычки
-                        // Если мы уже знаем, что в чанке нет экранированных кавычек,
-                        // используем быстрый путь без проверки
-                        if (!chunk_has_escaped_quotes) {
-                            row = parse_line_quotes_no_escape(line);
-                        } else {
-                            // Есть экранированные кавычки - проверяем строку
-                            // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: используем быструю проверку для маленьких строк
-                            bool has_escaped = false;
-                            if (parse_len >= 16) {
-                                has_escaped = has_escaped_quotes(line, config_.quote);
-                            } else {
-                                // Для маленьких строк используем быструю проверку
-                                for (std::size_t k = 0; k < parse_len - 1; ++k) {
-                                    if (ptr[line_start + k] == config_.quote && ptr[line_start + k + 1] == config_.quote) {
-                                        has_escaped = true;
-                                        break;
-                                    }
-                                }
-                            }
-                            
-                            if (!has_escaped) {
-                                row = parse_line_quotes_no_escape(line);
-                            } else {
-                                row = parse_line(line);
-                            }
-                        }
-                    }
-                }
-                results.push_back(std::move(row));
+            arena.append(field.data() + pos, quote_pos - pos);
+            if (in_quotes && quote_pos + 1 < field.size() && field[quote_pos + 1] == config_.quote) {
+                arena += config_.quote;
+                pos = quote_pos + 2;
             } else {
-                // Пустая строка
-                ParsedRow row;
-                row.fields.push_back("");
-                results.push_back(std::move(row));
+                in_quotes = !in_quotes;
+                pos = quote_pos + 1;
             }
-        } else {
-            // Пустая строка
-            ParsedRow row;
-            row.fields.push_back("");
-            results.push_back(std::move(row));
         }
-        
-        // Переходим к следующей строке
-        pos = next_pos;
-        line_start = next_pos;  // Исправлено: используем next_pos напрямую
-        in_quotes = false; // Сбрасываем состояние кавычек для новой строки
+        span = RowBatch::Field{arena_start | RowBatch::IN_ARENA, arena.size() - arena_start};
+        value = std::string_view(arena.data() + arena_start, span.length);
+    }
+    if (config_.skip_initial_space) {
+        // Пробелы и табуляции по краям поля (как trim_whitespace)
+        std::size_t first = 0;
+        std::size_t last = value.size();
+        while (first < last && is_whitespace(value[first])) {
+            ++first;
+        }
+        while (last > first && is_whitespace(value[last - 1])) {
+            --last;
+        }
+        span.offset += first;
+        span.length = last - first;
+    }
+    batch.fields.push_back(span);
+    if constexpr (kProfile) {
+        profile->fields++;
     }
-    
-    return results;
 }
 
 std::vector<ParsedRow> CSVParser::parse_all(std::string_view data) {
@@ -1434,6 +898,35 @@ void CSVParser::set_config(const ParserConfig& config) {
     config_ = config;
 }
 
+void CSVParser::mark_quoted_fields(std::string_view line, ParsedRow& row) const {
+    // Поле в кавычках начинается с кавычки (после пробелов при skip_initial_space)
+    // Кавычки внутри поля переключают состояние парами, поэтому "" учитывается автоматически
+    row.quoted.assign(row.fields.size(), 0);
+    std::size_t pos = 0;
+    std::size_t len = line.length();
+    for (std::size_t field = 0; field < row.fields.size() && pos <= len; ++field) {
+        std::size_t start = pos;
+        if (config_.skip_initial_space) {
+            while (start < len && line[start] == ' ') {
+                ++start;
+            }
+        }
+        row.quoted[field] = (start < len && line[start] == config_.quote) ? 1 : 0;
+        
+        bool in_quotes = false;
+        while (pos < len) {
+            char c = line[pos];
+            if (c == config_.quote) {
+                in_quotes = !in_quotes;
+            } else if (c == config_.delimiter && !in_quotes) {
+                break;
+            }
+            ++pos;
+        }
+        ++pos;  // Пропускаем разделитель
+    }
+}
+
 std::string CSVParser::unescape_field(std::string_view field) {
     std::string result;
     result.reserve(field.length());
@@ -0,0 +1,98 @@
+#include "fastcsv/csv_writer.hpp"
+#include "fastcsv/simd_utils.hpp"
+
+namespace fastcsv {
+
+CSVWriter::CSVWriter(const WriterConfig& config) : config_(config) {
+    // Резервируем буфер с запасом, чтобы последняя строка блока не вызывала реаллокацию
+    buffer_.reserve(config_.buffer_size + config_.buffer_size / 8);
+}
+
+void CSVWriter::set_config(const WriterConfig& config) {
+    config_ = config;
+}
+
+void CSVWriter::clear() {
+    // clear() сохраняет capacity - следующий блок пишется без аллокаций
+    buffer_.clear();
+}
+
+void CSVWriter::truncate(std::size_t size) {
+    if (size < buffer_.size()) {
+        buffer_.resize(size);
+    }
+    row_started_ = false;
+}
+
+bool CSVWriter::needs_quoting(std::string_view field) const {
+    // Для коротких полей прямой поиск быстрее из-за меньшего overhead
+    if (field.length() < 16) {
+        for (char c : field) {
+            if (c == config_.delimiter || c == config_.quote || c == '\n' || c == '\r') {
+                return true;
+            }
+        }
+        return false;
+    }
+
+    // SIMD: ищем delimiter/quote и символы конца строки
+    if (simd::find_any_char_simd(field, config_.delimiter, config_.quote, 0) != std::string_view::npos) {
+        return true;
+    }
+    return simd::find_any_char_simd(field, '\n', '\r', 0) != std::string_view::npos;
+}
+
+void CSVWriter::append_quoted(std::string_view field) {
+    buffer_.push_back(config_.quote);
+
+    // Копируем блоки между кавычками, удваивая каждую кавычку
+    std::size_t pos = 0;
+    while (pos < field.length()) {
+        std::size_t quote_pos = simd::find_char_simd(field, config_.quote, pos);
+        if (quote_pos == std::string_view::npos) {
+            buffer_.append(field.data() + pos, field.length() - pos);
+            break;
+        }
+        buffer_.append(field.data() + pos, quote_pos - pos + 1);
+        buffer_.push_back(config_.quote);
+        pos = quote_pos + 1;
+    }
+
+    buffer_.push_back(config_.quote);
+}
+
+void CSVWriter::write_field(std::string_view field, bool is_numeric) {
+    if (row_started_) {
+        buffer_.push_back(config_.delimiter);
+    }
+    row_started_ = true;
+
+    bool quote_field = false;
+    switch (config_.quoting) {
+        case QUOTE_ALL:
+            quote_field = true;
+            break;
+        case QUOTE_NONNUMERIC:
+            quote_field = !is_numeric;
+            break;
+        case QUOTE_NONE:
+            quote_field = false;
+            break;
+        default:
+            quote_field = needs_quoting(field);
+            break;
+    }
+
+    if (quote_field) {
+        append_quoted(field);
+    } else {
+        buffer_.append(field.data(), field.length());
+    }
+}
+
+void CSVWriter::end_row() {
+    buffer_.append(config_.lineterminator);
+    row_started_ = false;
+}
+
+} // namespace fastcsv
@@ -0,0 +1,156 @@
+#include "fastcsv/field_conversions.hpp"
+#include <charconv>
+#include <cstdlib>
+#include <string>
+
+namespace fastcsv {
+
+namespace {
+
+std::string_view strip_spaces(std::string_view field) {
+    std::size_t begin = 0;
+    std::size_t end = field.size();
+    while (begin < end && (field[begin] == ' ' || field[begin] == '\t')) {
+        ++begin;
+    }
+    while (end > begin && (field[end - 1] == ' ' || field[end - 1] == '\t')) {
+        --end;
+    }
+    return field.substr(begin, end - begin);
+}
+
+bool equals_ignore_case(std::string_view field, std::string_view lower) {
+    if (field.size() != lower.size()) {
+        return false;
+    }
+    for (std::size_t i = 0; i < field.size(); ++i) {
+        char c = field[i];
+        if (c >= 'A' && c <= 'Z') {
+            c = static_cast<char>(c - 'A' + 'a');
+        }
+        if (c != lower[i]) {
+            return false;
+        }
+    }
+    return true;
+}
+
+bool parse_digits(std::string_view digits, int& value) {
+    const char* end = digits.data() + digits.size();
+    auto result = std::from_chars(digits.data(), end, value);
+    return result.ec == std::errc() && result.ptr == end;
+}
+
+} // namespace
+
+bool parse_int64(std::string_view field, std::int64_t& value) {
+    field = strip_spaces(field);
+    if (!field.empty() && field[0] == '+') {
+        field.remove_prefix(1);
+        if (!field.empty() && field[0] == '-') {
+            return false;
+        }
+    }
+    if (field.empty()) {
+        return false;
+    }
+    const char* end = field.data() + field.size();
+    auto result = std::from_chars(field.data(), end, value);
+    return result.ec == std::errc() && result.ptr == end;
+}
+
+bool parse_float64(std::string_view field, double& value) {
+    field = strip_spaces(field);
+    if (field.empty()) {
+        return false;
+    }
+    // strtod принимает шестнадцатеричную запись, float() в Python - нет
+    if (field.find_first_of("xX") != std::string_view::npos) {
+        return false;
+    }
+    // strtod требует завершающий ноль; числа короткие, поэтому копия на стеке
+    char buffer[64];
+    std::string heap_buffer;
+    const char* str;
+    if (field.size() < sizeof(buffer)) {
+        field.copy(buffer, field.size());
+        buffer[field.size()] = '\0';
+        str = buffer;
+    } else {
+        heap_buffer.assign(field);
+        str = heap_buffer.c_str();
+    }
+    char* parsed_end = nullptr;
+    value = std::strtod(str, &parsed_end);
+    return parsed_end == str + field.size();
+}
+
+bool parse_bool(std::string_view field, bool& value) {
+    field = strip_spaces(field);
+    if (equals_ignore_case(field, "true")) {
+        value = true;
+        return true;
+    }
+    if (equals_ignore_case(field, "false")) {
+        value = false;
+        return true;
+    }
+    return false;
+}
+
+bool parse_date(std::string_view field, int& year, int& month, int& day) {
+    field = strip_spaces(field);
+    if (field.size() != 10 || field[4] != '-' || field[7] != '-') {
+        return false;
+    }
+    if (!parse_digits(field.substr(0, 4), year) || !parse_digits(field.substr(5, 2), month) ||
+        !parse_digits(field.substr(8, 2), day)) {
+        return false;
+    }
+    return year >= 1 && month >= 1 && month <= 12 && day >= 1 && day <= 31;
+}
+
+void TypeInference::observe(std::string_view field) {
+    if (strip_spaces(field).empty()) {
+        return;
+    }
+    ++observed_;
+
+    std::int64_t int_value;
+    double float_value;
+    bool bool_value;
+    int year, month, day;
+    if ((candidates_ & CAN_INT) && !parse_int64(field, int_value)) {
+        candidates_ &= ~CAN_INT;
+    }
+    if ((candidates_ & CAN_FLOAT) && !parse_float64(field, float_value)) {
+        candidates_ &= ~CAN_FLOAT;
+    }
+    if ((candidates_ & CAN_BOOL) && !parse_bool(field, bool_value)) {
+        candidates_ &= ~CAN_BOOL;
+    }
+    if ((candidates_ & CAN_DATE) && !parse_date(field, year, month, day)) {
+        candidates_ &= ~CAN_DATE;
+    }
+}
+
+ConvertKind TypeInference::result() const {
+    if (observed_ == 0) {
+        return CONVERT_STR;
+    }
+    if (candidates_ & CAN_INT) {
+        return CONVERT_INT;
+    }
+    if (candidates_ & CAN_FLOAT) {
+        return CONVERT_FLOAT;
+    }
+    if (candidates_ & CAN_BOOL) {
+        return CONVERT_BOOL;
+    }
+    if (candidates_ & CAN_DATE) {
+        return CONVERT_DATE;
+    }
+    return CONVERT_STR;
+}
+
+} // namespace fastcsv
@@ -0,0 +1,190 @@
+#include "fastcsv/parallel_parser.hpp"
+#include "fastcsv/simd_utils.hpp"
+#include <algorithm>
+#include <exception>
+#include <thread>
+
+namespace fastcsv {
+
+namespace {
+
+// Минимальный размер части: меньшие блоки не окупают запуск потока
+constexpr std::size_t MIN_PART_SIZE = 65536;  // 64KB
+
+// Запускает fn(i) для i в [0, count) в отдельных потоках (i == 0 - в текущем потоке)
+// Исключения из потоков пробрасываются после join
+template <typename Fn>
+void run_in_threads(std::size_t count, Fn&& fn) {
+    if (count == 0) {
+        return;
+    }
+    if (count == 1) {
+        fn(0);
+        return;
+    }
+
+    std::vector<std::exception_ptr> errors(count);
+    auto guarded = [&](std::size_t i) {
+        try {
+            fn(i);
+        } catch (...) {
+            errors[i] = std::current_exception();
+        }
+    };
+
+    std::vector<std::thread> threads;
+    threads.reserve(count - 1);
+    for (std::size_t i = 1; i < count; ++i) {
+        threads.emplace_back(guarded, i);
+    }
+    guarded(0);
+    for (auto& thread : threads) {
+        thread.join();
+    }
+
+    for (const auto& error : errors) {
+        if (error) {
+            std::rethrow_exception(error);
+        }
+    }
+}
+
+// Находит начало следующей записи (позиция после '\n' вне кавычек), начиная с pos
+// in_quotes - состояние кавычек в позиции pos
+std::size_t find_next_record_start(std::string_view data, char quote, std::size_t pos, bool in_quotes) {
+    while (pos < data.size()) {
+        std::size_t next = simd::find_any_char_simd(data, quote, '\n', pos);
+        if (next == std::string_view::npos) {
+            return data.size();
+        }
+        if (data[next] == quote) {
+            in_quotes = !in_quotes;
+        } else if (!in_quotes) {
+            return next + 1;
+        }
+        pos = next + 1;
+    }
+    return data.size();
+}
+
+} // namespace
+
+std::size_t find_last_record_end(std::string_view data, char quote) {
+    bool total_quote_parity = (simd::count_chars_simd(data, quote) & 1) != 0;
+    return find_last_record_end(data, quote, total_quote_parity);
+}
+
+std::size_t find_last_record_end(std::string_view data, char quote, bool total_quote_parity) {
+    // Идем с конца: состояние кавычек перед позицией p равно
+    // четности всего блока XOR четность кавычек после p
+    // Экранированные кавычки "" не меняют четность, поэтому учитываются автоматически
+    bool quotes_after = false;
+    for (std::size_t i = data.size(); i > 0; --i) {
+        char c = data[i - 1];
+        if (c == quote) {
+            quotes_after = !quotes_after;
+        } else if (c == '\n' && quotes_after == total_quote_parity) {
+            return i;
+        }
+    }
+    return 0;
+}
+
+ParallelParseResult parse_chunk_parallel(const ParserConfig& config, std::string_view data,
+                                         std::size_t num_threads, bool is_final, ReadStats* stats,
+                                         ParseProfile* profile) {
+    ParallelParseResult result;
+    const std::size_t len = data.size();
+    if (len == 0) {
+        return result;
+    }
+    // Шаги 1-3 (разбиение на части) относятся к токенизации
+    StageTimer split_timer(stat_counter(stats, &ReadStats::parse_ns));
+
+    std::size_t num_parts = std::max<std::size_t>(1, std::min(num_threads, len / MIN_PART_SIZE));
+
+    // Шаг 1: четность количества кавычек в каждой номинальной части (параллельно)
+    std::vector<std::size_t> nominal(num_parts + 1);
+    for (std::size_t i = 0; i <= num_parts; ++i) {
+        nominal[i] = len / num_parts * i;
+    }
+    nominal[num_parts] = len;
+
+    std::vector<char> parity(num_parts, 0);
+    run_in_threads(num_parts, [&](std::size_t i) {
+        std::string_view part = data.substr(nominal[i], nominal[i + 1] - nominal[i]);
+        parity[i] = static_cast<char>(simd::count_chars_simd(part, config.quote) & 1);
+    });
+
+    bool total_parity = false;
+    for (char p : parity) {
+        total_parity = total_parity != (p != 0);
+    }
+
+    // Шаг 2: конец обрабатываемой области - граница последней завершенной записи
+    std::size_t end = len;
+    if (!is_final) {
+        end = find_last_record_end(data, config.quote, total_parity);
+        if (end == 0) {
+            return result;
+        }
+    }
+    std::string_view region = data.substr(0, end);
+
+    // Шаг 3: сдвигаем номинальные границы к ближайшему началу записи
+    // Состояние кавычек в начале части известно из префиксной четности
+    std::vector<std::size_t> bounds;
+    bounds.reserve(num_parts + 1);
+    bounds.push_back(0);
+    bool prefix_parity = false;
+    for (std::size_t i = 1; i < num_parts; ++i) {
+        prefix_parity = prefix_parity != (parity[i - 1] != 0);
+        if (nominal[i] >= end) {
+            break;
+        }
+        std::size_t start = find_next_record_start(region, config.quote, nominal[i], prefix_parity);
+        if (start > bounds.back() && start < end) {
+            bounds.push_back(start);
+        }
+    }
+    bounds.push_back(end);
+
+    split_timer.stop();
+
+    // Шаг 4: парсим части параллельно (у каждого потока свой CSVParser)
+    // Время частей считается в своих счетчиках каждого потока и суммируется после join
+    std::size_t num_ranges = bounds.size() - 1;
+    result.parts.resize(num_ranges);
+    result.parts_encoding.resize(num_ranges, simd::TEXT_ASCII);
+    std::vector<ReadStats> part_stats(stats ? num_ranges : 0);
+    std::vector<ParseProfile> part_profiles(profile ? num_ranges : 0);
+    run_in_threads(num_ranges, [&](std::size_t i) {
+        std::string_view part = region.substr(bounds[i], bounds[i + 1] - bounds[i]);
+        ReadStats* times = stats ? &part_stats[i] : nullptr;
+        {
+            StageTimer timer(stat_counter(times, &ReadStats::parse_ns));
+            CSVParser parser(config);
+            if (profile) {
+                parser.set_profiling(true);
+            }
+            parser.parse_batch(part, result.parts[i]);
+            if (profile) {
+                part_profiles[i] = parser.profile();
+            }
+        }
+        StageTimer timer(stat_counter(times, &ReadStats::decode_ns));
+        result.parts_encoding[i] = simd::classify_text(part);
+    });
+    for (const ParseProfile& part_profile : part_profiles) {
+        profile->merge(part_profile);
+    }
+    for (const ReadStats& times : part_stats) {
+        stats->parse_ns += times.parse_ns;
+        stats->decode_ns += times.decode_ns;
+    }
+
+    result.bytes_consumed = end;
+    return result;
+}
+
+} // namespace fastcsv
@@ -2,19 +2,1022 @@
 #include <pybind11/stl.h>
 #include <pybind11/functional.h>
 #include "fastcsv/csv_parser.hpp"
+#include "fastcsv/csv_writer.hpp"
+#include "fastcsv/parallel_parser.hpp"
+#include "fastcsv/column_parser.hpp"
+#include "fastcsv/field_conversions.hpp"
+#include "fastcsv/stream_tokenizer.hpp"
+#include "fastcsv/row_index.hpp"
+#include "fastcsv/transcode.hpp"
+#include "fastcsv/row_filter.hpp"
+#include "fastcsv/read_stats.hpp"
 #include "fastcsv/simd_utils.hpp"
 #include <vector>
 #include <string>
 #include <sstream>
+#include <array>
+#include <memory>
+#include <unordered_set>
+#include <variant>
+#include <algorithm>
 #include <cstring>  // Для std::memcpy
 #include <Python.h>  // Для прямого использования Python C API
+#include <datetime.h>  // PyDate_FromDate для convert='date'
 
 namespace py = pybind11;
 using namespace fastcsv;
 
+// Однобайтовая ASCII-совместимая кодировка (cp1251, koi8-r, latin-1, ...): таблица байт -> символ
+// Таблица строится в Python из codecs; ASCII байты отображаются сами в себя, поэтому
+// разделители и кавычки ищутся в исходных байтах, а Python строки полей создаются по таблице
+// без слоя codecs. Используется только под GIL
+class Charset {
+public:
+    explicit Charset(const std::u16string& table) {
+        if (table.size() != table_.size()) {
+            throw py::value_error("charset table must contain 256 characters");
+        }
+        for (std::size_t i = 0; i < table_.size(); ++i) {
+            table_[i] = static_cast<Py_UCS2>(table[i]);
+        }
+    }
+    
+    // Новая ссылка или nullptr с установленной ошибкой
+    PyObject* decode(std::string_view field) const {
+        scratch_.resize(field.size());
+        for (std::size_t i = 0; i < field.size(); ++i) {
+            scratch_[i] = table_[static_cast<unsigned char>(field[i])];
+        }
+        // Python выбирает самое узкое представление по максимальному символу
+        return PyUnicode_FromKindAndData(PyUnicode_2BYTE_KIND, scratch_.data(),
+                                         static_cast<Py_ssize_t>(field.size()));
+    }
+
+private:
+    std::array<Py_UCS2, 256> table_;
+    mutable std::vector<Py_UCS2> scratch_;
+};
+
+// Как создаются Python строки полей блока
+struct FieldText {
+    // Кодировка блока (simd::classify_text)
+    simd::TextEncoding encoding;
+    // Однобайтовая кодировка блока, nullptr - UTF-8
+    const Charset* charset = nullptr;
+};
+
+// Создает Python строку для поля
+// TEXT_ASCII: PyUnicode_FromKindAndData без декодирования (самый быстрый путь, ASCII одинаков
+// во всех поддерживаемых кодировках)
+// charset: символы по таблице однобайтовой кодировки
+// TEXT_UTF8: блок уже проверен, строгий декодер не может завершиться ошибкой
+// TEXT_MIXED: поле проверяется нативно; невалидный UTF-8 (например, latin-1 файл) декодируется
+// как latin-1 без попытки UTF-8 декодирования и исключения на каждое поле
+static PyObject* make_field_string(std::string_view field, FieldText text) {
+    if (field.empty()) {
+        // Кэшируем пустую строку - объект живет до конца программы
+        static PyObject* cached_empty_string = PyUnicode_FromStringAndSize("", 0);
+        Py_XINCREF(cached_empty_string);
+        return cached_empty_string;
+    }
+    
+    Py_ssize_t size = static_cast<Py_ssize_t>(field.size());
+    if (text.encoding == simd::TEXT_ASCII) {
+        return PyUnicode_FromKindAndData(PyUnicode_1BYTE_KIND, field.data(), size);
+    }
+    if (text.charset) {
+        return text.charset->decode(field);
+    }
+    if (text.encoding == simd::TEXT_MIXED && simd::validate_utf8_simd(field) != field.size()) {
+        return PyUnicode_DecodeLatin1(field.data(), size, nullptr);
+    }
+    return PyUnicode_DecodeUTF8(field.data(), size, "strict");
+}
+
+// Кэш строк колонки с небольшим числом различных значений (страна, статус, валюта)
+// Хэш-таблица фиксированного размера с прямым отображением: новое значение вытесняет старое
+// в своей ячейке, поэтому память ограничена SLOTS строками. Повторяющиеся значения
+// возвращаются одним и тем же объектом. Используется только под GIL
+class InternCache {
+public:
+    static constexpr std::size_t SLOTS = 1024;
+    // Длинные значения не кэшируются: повторяются редко, а сравнение дороже создания строки
+    static constexpr std::size_t MAX_LENGTH = 64;
+    
+    InternCache() : slots_(SLOTS) {}
+    ~InternCache() {
+        for (Slot& slot : slots_) {
+            Py_XDECREF(slot.value);
+        }
+    }
+    InternCache(const InternCache&) = delete;
+    InternCache& operator=(const InternCache&) = delete;
+    
+    // Новая ссылка или nullptr с установленной ошибкой
+    PyObject* get(std::string_view field, FieldText text) {
+        if (field.empty() || field.size() > MAX_LENGTH) {
+            return make_field_string(field, text);
+        }
+        Slot& slot = slots_[std::hash<std::string_view>()(field) & (SLOTS - 1)];
+        if (slot.value && slot.key == field) {
+            ++hits_;
+            Py_INCREF(slot.value);
+            return slot.value;
+        }
+        PyObject* value = make_field_string(field, text);
+        if (!value) {
+            return nullptr;
+        }
+        Py_XDECREF(slot.value);
+        slot.key.assign(field.data(), field.size());
+        Py_INCREF(value);
+        slot.value = value;
+        return value;
+    }
+    
+    // Сколько значений взято из кэша
+    std::size_t hits() const { return hits_; }
+
+private:
+    struct Slot {
+        std::string key;
+        PyObject* value = nullptr;
+    };
+    std::vector<Slot> slots_;
+    std::size_t hits_ = 0;
+};
+
+// Колонка usecols / where: индекс в файле или имя из заголовка
+using ColumnRef = std::variant<std::size_t, std::string>;
+
+// Конвертер полей в типизированные Python объекты (convert= и QUOTE_NONNUMERIC)
+// Работает в том же проходе, что и создание списка полей: строка для поля не создается,
+// если значение конвертируется. Используется только под GIL.
+class FieldConverter {
+public:
+    // intern - колонки, строки которых берутся из InternCache (intern_all - все колонки)
+    // usecols - колонки строк в нужном порядке (пустой - все колонки); для остальных полей
+    // Python объекты не создаются. Индексы kinds и intern - номера колонок в файле
+    // header - первая строка потока - заголовок: по ней ищутся имена колонок usecols и where,
+    // фильтр where к ней не применяется
+    FieldConverter(std::vector<ConvertKind> kinds, ConvertKind default_kind, std::size_t infer_rows,
+                   bool nonnumeric, const std::vector<std::size_t>& intern = {}, bool intern_all = false,
+                   std::vector<ColumnRef> usecols = {}, bool header = false)
+        : kinds_(std::move(kinds)), default_kind_(default_kind), infer_rows_(infer_rows),
+          nonnumeric_(nonnumeric), intern_all_(intern_all), usecols_(std::move(usecols)), header_(header) {
+        for (std::size_t column : intern) {
+            if (column >= intern_.size()) {
+                intern_.resize(column + 1, false);
+            }
+            intern_[column] = true;
+        }
+    }
+    
+    // Условие where= на колонку (до первого блока)
+    void add_condition(ColumnRef column, FieldCondition condition) {
+        where_.push_back({std::move(column), std::move(condition)});
+    }
+    
+    // Номера колонок usecols и where по заголовку (UTF-8 имена полей первой строки)
+    void resolve_columns(const std::vector<std::string>& header) {
+        columns_.clear();
+        for (const ColumnRef& ref : usecols_) {
+            columns_.push_back(column_index(ref, header, "usecols"));
+        }
+        filter_.clear();
+        for (const auto& item : where_) {
+            filter_.add(column_index(item.first, header, "where"), item.second);
+        }
+        header_done_ = true;
+    }
+    
+    // Заголовок еще не прочитан (имена колонок не сопоставлены)
+    bool header_pending() const { return header_ && !header_done_; }
+    
+    // Выбранные колонки (пустой список - все колонки)
+    const std::vector<std::size_t>& columns() const { return columns_; }
+    
+    // Строки - словари {имя колонки: значение} (DictReader), до первого блока
+    // fieldnames = None: имена - первая строка потока, она не выдается
+    // restkey - ключ списка лишних полей (None - ошибка error), restval - значение отсутствующих
+    // полей (None - ключ не добавляется)
+    void set_dict(py::object fieldnames, py::object restkey, py::object restval, py::object error) {
+        if (prepared_) {
+            throw std::runtime_error("FieldConverter.set_dict must be called before parsing");
+        }
+        dict_ = true;
+        restkey_ = std::move(restkey);
+        restval_ = std::move(restval);
+        error_ = std::move(error);
+        header_columns_ = header_;
+        if (fieldnames.is_none()) {
+            header_ = true;
+            header_keys_ = true;
+        } else {
+            set_keys(py::list(fieldnames));
+        }
+    }
+    
+    bool dict_rows() const { return dict_; }
+    
+    // Новые ключи словарей (DictReader.fieldnames = ...). Если заголовок еще не прочитан,
+    // первая строка потока становится данными, как у csv.DictReader
+    void set_fieldnames(const py::list& names) {
+        if (!dict_) {
+            throw std::runtime_error("FieldConverter.fieldnames requires set_dict");
+        }
+        if (header_keys_ && !header_done_) {
+            header_keys_ = false;
+            header_ = header_columns_;
+        }
+        set_keys(names);
+    }
+    
+    // Исключение строки словаря с лишними полями без restkey (set_dict)
+    PyObject* dict_error() const { return error_.ptr(); }
+    
+    // Ключи словарей (None, пока заголовок не прочитан)
+    py::object fieldnames() const {
+        if (!dict_ || (header_keys_ && !header_done_)) {
+            return py::none();
+        }
+        py::list names;
+        for (const py::object& key : keys_) {
+            names.append(key);
+        }
+        return std::move(names);
+    }
+    
+    // Есть строки, которые не попадают в результат (where или заголовок словарей)
+    bool filters() const { return !where_.empty() || first_row_ == FIRST_ROW_SKIP; }
+    
+    // Номера строк непустого блока, которые попадают в результат
+    // Заголовок для where выдается всегда, заголовок словарей - никогда
+    void select(const RowBatch& rows, std::vector<std::size_t>& selected) {
+        selected.clear();
+        if (rows.empty()) {
+            return;
+        }
+        std::size_t first = 0;
+        if (first_row_ != FIRST_ROW_DATA) {
+            if (first_row_ == FIRST_ROW_KEEP) {
+                selected.push_back(0);
+            }
+            first_row_ = FIRST_ROW_DATA;
+            first = 1;
+        }
+        if (where_.empty()) {
+            for (std::size_t row = first; row < rows.size(); ++row) {
+                selected.push_back(row);
+            }
+            return;
+        }
+        filter_.select(rows, first, selected);
+    }
+    
+    // Создает словарь строки row (set_dict); nullptr с установленной ошибкой Python
+    PyObject* make_dict(const RowBatch& batch, std::size_t row, FieldText text) const {
+        std::size_t begin = batch.row_begin(row);
+        std::size_t count = batch.row_end(row) - begin;
+        bool projected = !columns_.empty();
+        ++dict_count_;
+        PyObject* dict = PyDict_New();
+        if (!dict) {
+            return nullptr;
+        }
+        for (std::size_t k = 0; k < keys_.size(); ++k) {
+            std::size_t column = projected ? columns_[k] : k;
+            PyObject* value;
+            if (column < count) {
+                value = convert(batch.field(begin + column), batch.is_quoted(begin + column), column, text);
+            } else if (!restval_.is_none()) {
+                value = restval_.ptr();
+                Py_INCREF(value);
+            } else {
+                continue;
+            }
+            if (!value || PyDict_SetItem(dict, keys_[k].ptr(), value) < 0) {
+                Py_XDECREF(value);
+                Py_DECREF(dict);
+                return nullptr;
+            }
+            Py_DECREF(value);
+        }
+        if (projected || count <= keys_.size()) {
+            return dict;
+        }
+        
+        // Лишние поля - списком под restkey, как csv.DictReader
+        if (restkey_.is_none()) {
+            PyErr_Format(error_.ptr(), "Too many fields in row %zu", dict_count_ + (header_keys_ ? 1 : 0));
+            Py_DECREF(dict);
+            return nullptr;
+        }
+        PyObject* rest = PyList_New(static_cast<Py_ssize_t>(count - keys_.size()));
+        if (!rest) {
+            Py_DECREF(dict);
+            return nullptr;
+        }
+        for (std::size_t column = keys_.size(); column < count; ++column) {
+            PyObject* value = convert(batch.field(begin + column), batch.is_quoted(begin + column),
+                                      column, text);
+            if (!value) {
+                Py_DECREF(rest);
+                Py_DECREF(dict);
+                return nullptr;
+            }
+            PyList_SET_ITEM(rest, static_cast<Py_ssize_t>(column - keys_.size()), value);
+        }
+        int status = PyDict_SetItem(dict, restkey_.ptr(), rest);
+        Py_DECREF(rest);
+        if (status < 0) {
+            Py_DECREF(dict);
+            return nullptr;
+        }
+        return dict;
+    }
+    
+    // Выводит типы колонок CONVERT_INFER по первым строкам первого непустого блока
+    // Первая строка выборки не учитывается (обычно это заголовок), если строк больше одной
+    // С header имена usecols и where сопоставляются с первой строкой блока
+    void prepare(const RowBatch& rows, FieldText text) {
+        if (prepared_ || rows.empty()) {
+            return;
+        }
+        prepared_ = true;
+        if (!header_done_) {
+            if (header_) {
+                std::vector<py::object> header = header_fields(rows, text);
+                std::vector<std::string> names;
+                for (const py::object& name : header) {
+                    names.push_back(name.cast<std::string>());
+                }
+                resolve_columns(names);
+                first_row_ = header_keys_ ? FIRST_ROW_SKIP : FIRST_ROW_KEEP;
+                if (header_keys_) {
+                    // Ключи - поля заголовка (выбранных колонок, если задан usecols)
+                    py::list keys;
+                    for (std::size_t k = 0; k < (columns_.empty() ? header.size() : columns_.size()); ++k) {
+                        std::size_t column = columns_.empty() ? k : columns_[k];
+                        keys.append(column < header.size() ? header[column] : py::none());
+                    }
+                    set_keys(keys);
+                }
+            } else {
+                resolve_columns({});
+            }
+        }
+        
+        std::size_t sample_end = std::min(rows.size(), infer_rows_ + 1);
+        std::size_t sample_begin = sample_end > 1 ? 1 : 0;
+        std::size_t width = 0;
+        for (std::size_t i = sample_begin; i < sample_end; ++i) {
+            width = std::max(width, rows.row_end(i) - rows.row_begin(i));
+        }
+        if (kinds_.size() < width) {
+            kinds_.resize(width, default_kind_);
+        }
+        
+        for (std::size_t column = 0; column < kinds_.size(); ++column) {
+            if (kinds_[column] != CONVERT_INFER) {
+                continue;
+            }
+            TypeInference inference;
+            for (std::size_t i = sample_begin; i < sample_end; ++i) {
+                if (column < rows.row_end(i) - rows.row_begin(i)) {
+                    inference.observe(rows.field(rows.row_begin(i) + column));
+                }
+            }
+            kinds_[column] = inference.result();
+        }
+        // Колонки, которых не было в выборке, остаются строками
+        if (default_kind_ == CONVERT_INFER) {
+            default_kind_ = CONVERT_STR;
+        }
+    }
+    
+    // Строка поля: из кэша, если колонка интернируется
+    PyObject* make_string(std::string_view field, std::size_t column, FieldText text) const {
+        if (!intern_all_ && (column >= intern_.size() || !intern_[column])) {
+            return make_field_string(field, text);
+        }
+        if (column >= caches_.size()) {
+            caches_.resize(column + 1);
+        }
+        if (!caches_[column]) {
+            caches_[column] = std::make_unique<InternCache>();
+        }
+        return caches_[column]->get(field, text);
+    }
+    
+    // Сколько строк взято из кэшей интернирования
+    std::size_t intern_hits() const {
+        std::size_t hits = 0;
+        for (const auto& cache : caches_) {
+            hits += cache ? cache->hits() : 0;
+        }
+        return hits;
+    }
+    
+    // Возвращает новую ссылку или nullptr с установленной ошибкой
+    PyObject* convert(std::string_view field, bool quoted, std::size_t column, FieldText text) const {
+        if (nonnumeric_) {
+            // Как csv.QUOTE_NONNUMERIC: поля без кавычек - float, пустые остаются строками
+            if (quoted || field.empty()) {
+                return make_string(field, column, text);
+            }
+            double value;
+            if (!parse_float64(field, value)) {
+                PyObject* py_str = make_field_string(field, text);
+                if (py_str) {
+                    PyErr_Format(PyExc_ValueError, "could not convert string to float: %R", py_str);
+                    Py_DECREF(py_str);
+                }
+                return nullptr;
+            }
+            return PyFloat_FromDouble(value);
+        }
+        
+        ConvertKind kind = column < kinds_.size() ? kinds_[column] : default_kind_;
+        if (kind == CONVERT_STR || kind == CONVERT_INFER) {
+            return make_string(field, column, text);
+        }
+        if (field.empty()) {
+            Py_RETURN_NONE;
+        }
+        
+        // Значения, которые не разбираются как тип колонки, остаются строками
+        switch (kind) {
+            case CONVERT_INT: {
+                std::int64_t value;
+                if (parse_int64(field, value)) {
+                    return PyLong_FromLongLong(value);
+                }
+                // Числа за пределами int64 (PyLong_FromString нужна строка с нулем в конце)
+                PyObject* big = PyLong_FromString(std::string(field).c_str(), nullptr, 10);
+                if (big) {
+                    return big;
+                }
+                PyErr_Clear();
+                break;
+            }
+            case CONVERT_FLOAT: {
+                double value;
+                if (parse_float64(field, value)) {
+                    return PyFloat_FromDouble(value);
+                }
+                break;
+            }
+            case CONVERT_BOOL: {
+                bool value;
+                if (parse_bool(field, value)) {
+                    return PyBool_FromLong(value ? 1 : 0);
+                }
+                break;
+            }
+            case CONVERT_DATE: {
+                int year, month, day;
+                if (parse_date(field, year, month, day)) {
+                    PyObject* date = PyDate_FromDate(year, month, day);
+                    if (date) {
+                        return date;
+                    }
+                    PyErr_Clear();  // Например, 2024-02-30
+                }
+                break;
+            }
+            default:
+                break;
+        }
+        return make_string(field, column, text);
+    }
+    
+    // Итоговые типы колонок (после вывода)
+    const std::vector<ConvertKind>& kinds() const { return kinds_; }
+
+private:
+    static std::size_t column_index(const ColumnRef& ref, const std::vector<std::string>& header,
+                                    const char* option) {
+        if (const std::size_t* index = std::get_if<std::size_t>(&ref)) {
+            return *index;
+        }
+        const std::string& name = std::get<std::string>(ref);
+        auto it = std::find(header.begin(), header.end(), name);
+        if (it == header.end()) {
+            throw py::value_error(std::string(option) + ": unknown column '" + name + "'");
+        }
+        return static_cast<std::size_t>(it - header.begin());
+    }
+    
+    // Поля первой строки блока
+    static std::vector<py::object> header_fields(const RowBatch& rows, FieldText text) {
+        std::vector<py::object> names;
+        for (std::size_t i = rows.row_begin(0); i < rows.row_end(0); ++i) {
+            py::object name = py::reinterpret_steal<py::object>(make_field_string(rows.field(i), text));
+            if (!name) {
+                throw py::error_already_set();
+            }
+            names.push_back(std::move(name));
+        }
+        return names;
+    }
+    
+    // Ключи словарей: строки интернируются и хешируются один раз, PyDict_SetItem берет
+    // хеш из объекта
+    void set_keys(const py::list& names) {
+        keys_.clear();
+        for (py::handle name : names) {
+            PyObject* key = name.ptr();
+            Py_INCREF(key);
+            if (PyUnicode_CheckExact(key)) {
+                PyUnicode_InternInPlace(&key);
+            }
+            if (PyObject_Hash(key) == -1) {
+                Py_DECREF(key);
+                throw py::error_already_set();
+            }
+            keys_.push_back(py::reinterpret_steal<py::object>(key));
+        }
+    }
+    
+    enum FirstRow { FIRST_ROW_DATA, FIRST_ROW_KEEP, FIRST_ROW_SKIP };
+    
+    std::vector<ConvertKind> kinds_;
+    ConvertKind default_kind_;
+    std::size_t infer_rows_;
+    bool nonnumeric_;
+    bool prepared_ = false;
+    std::vector<bool> intern_;
+    bool intern_all_;
+    mutable std::vector<std::unique_ptr<InternCache>> caches_;
+    std::vector<ColumnRef> usecols_;
+    std::vector<std::size_t> columns_;
+    std::vector<std::pair<ColumnRef, FieldCondition>> where_;
+    RowFilter filter_;
+    bool header_;
+    bool header_done_ = false;
+    // Первая строка следующего непустого блока: данные, заголовок для where (выдается)
+    // или заголовок словарей (не выдается)
+    FirstRow first_row_ = FIRST_ROW_DATA;
+    // set_dict: строки - словари с ключами keys_
+    bool dict_ = false;
+    bool header_keys_ = false;
+    // Заголовок нужен для имен usecols / where (без учета ключей словарей)
+    bool header_columns_ = false;
+    std::vector<py::object> keys_;
+    py::object restkey_;
+    py::object restval_;
+    py::object error_;
+    mutable std::size_t dict_count_ = 0;
+};
+
+// Создает список выбранных колонок (usecols) строки row блока
+// Колонки, которых нет в строке, - None
+static PyObject* make_projected_row(const RowBatch& batch, std::size_t row, FieldText text,
+                                    const FieldConverter& converter) {
+    std::size_t begin = batch.row_begin(row);
+    std::size_t count = batch.row_end(row) - begin;
+    const std::vector<std::size_t>& columns = converter.columns();
+    PyObject* py_fields = PyList_New(static_cast<Py_ssize_t>(columns.size()));
+    if (!py_fields) {
+        return nullptr;
+    }
+    for (std::size_t k = 0; k < columns.size(); ++k) {
+        std::size_t column = columns[k];
+        PyObject* value;
+        if (column < count) {
+            value = converter.convert(batch.field(begin + column), batch.is_quoted(begin + column),
+                                      column, text);
+            if (!value) {
+                Py_DECREF(py_fields);
+                return nullptr;
+            }
+        } else {
+            value = Py_None;
+            Py_INCREF(value);
+        }
+        PyList_SET_ITEM(py_fields, static_cast<Py_ssize_t>(k), value);
+    }
+    return py_fields;
+}
+
+// Создает список полей для строки row блока (словарь, если включен FieldConverter::set_dict)
+// converter == nullptr: все поля - строки (основной быстрый путь)
+static PyObject* make_row_list(const RowBatch& batch, std::size_t row, FieldText text,
+                               const FieldConverter* converter = nullptr) {
+    if (converter && converter->dict_rows()) {
+        return converter->make_dict(batch, row, text);
+    }
+    if (converter && !converter->columns().empty()) {
+        return make_projected_row(batch, row, text, *converter);
+    }
+    std::size_t begin = batch.row_begin(row);
+    std::size_t count = batch.row_end(row) - begin;
+    PyObject* py_fields = PyList_New(static_cast<Py_ssize_t>(count));
+    if (!py_fields) {
+        return nullptr;
+    }
+    for (std::size_t j = 0; j < count; ++j) {
+        // Python строка создается прямо из среза входных данных (или arena)
+        std::string_view field = batch.field(begin + j);
+        PyObject* py_str = converter
+            ? converter->convert(field, batch.is_quoted(begin + j), j, text)
+            : make_field_string(field, text);
+        if (!py_str) {
+            Py_DECREF(py_fields);
+            return nullptr;
+        }
+        // PyList_SET_ITEM забирает ссылку без дополнительных проверок
+        PyList_SET_ITEM(py_fields, static_cast<Py_ssize_t>(j), py_str);
+    }
+    return py_fields;
+}
+
+// Ошибка строки словаря (set_dict): строки блока до нее, py_rows[0, filled), сохраняются
+// в атрибуте rows исключения - reader выдает их и поднимает ошибку на этой строке, как csv.DictReader
+static void attach_rows_before_error(PyObject* py_rows, std::size_t filled, const FieldConverter* converter) {
+    if (!converter || !converter->dict_rows() || !PyErr_ExceptionMatches(converter->dict_error())) {
+        return;
+    }
+    PyObject *type, *value, *traceback;
+    PyErr_Fetch(&type, &value, &traceback);
+    PyErr_NormalizeException(&type, &value, &traceback);
+    PyObject* rows = PyList_GetSlice(py_rows, 0, static_cast<Py_ssize_t>(filled));
+    if (!rows || PyObject_SetAttrString(value, "rows", rows) < 0) {
+        // Без строк до ошибки остается исходное исключение
+        PyErr_Clear();
+    }
+    Py_XDECREF(rows);
+    PyErr_Restore(type, value, traceback);
+}
+
+// Заполняет py_rows[index, ...) строками блока: всеми или только строками selected (where=)
+// Возвращает false с установленной ошибкой Python
+static bool fill_python_rows(PyObject* py_rows, std::size_t index, const RowBatch& batch, FieldText text,
+                             const FieldConverter* converter,
+                             const std::vector<std::size_t>* selected = nullptr) {
+    std::size_t count = selected ? selected->size() : batch.size();
+    for (std::size_t i = 0; i < count; ++i) {
+        PyObject* py_fields = make_row_list(batch, selected ? (*selected)[i] : i, text, converter);
+        if (!py_fields) {
+            attach_rows_before_error(py_rows, index + i, converter);
+            return false;
+        }
+        PyList_SET_ITEM(py_rows, static_cast<Py_ssize_t>(index + i), py_fields);
+    }
+    return true;
+}
+
+// Профиль парсера, если профилирование включено (иначе nullptr)
+static ParseProfile* active_profile(CSVParser& parser) {
+    return parser.profiling() ? &parser.profile() : nullptr;
+}
+
+// CSVParser.parse_chunk / parse_all: токенизация без GIL, профиль вызова добавляется
+// к профилю парсера под GIL (см. parse_str_chunk)
+static std::vector<ParsedRow> parse_rows(CSVParser& parser, std::string_view data) {
+    ParseProfile call_profile;
+    ParseProfile* profile = parser.profiling() ? &call_profile : nullptr;
+    std::vector<ParsedRow> rows;
+    {
+        py::gil_scoped_release release;
+        rows = parser.parse_chunk(data, profile);
+    }
+    if (profile) {
+        parser.profile().merge(call_profile);
+    }
+    return rows;
+}
+
+// CSVParser.profile(): счетчики и время этапов
+static py::dict profile_to_python(const CSVParser& parser) {
+    const ParseProfile& profile = parser.profile();
+    py::dict result;
+    result["bytes"] = profile.bytes;
+    result["rows"] = profile.rows;
+    result["quoted_rows"] = profile.quoted_rows;
+    result["fields"] = profile.fields;
+    result["quoted_fields"] = profile.quoted_fields;
+    result["unescaped_bytes"] = profile.unescaped_bytes;
+    result["materialized_rows"] = profile.materialized_rows;
+    static const char* const names[ParseProfile::PHASE_COUNT] = {
+        "scan", "unquoted_rows", "quoted_rows", "unescape", "materialize"};
+    py::dict ticks;
+    for (int i = 0; i < ParseProfile::PHASE_COUNT; ++i) {
+        auto phase = static_cast<ParseProfile::Phase>(i);
+        result[py::str(std::string(names[i]) + "_time")] = profile.seconds(phase);
+        ticks[names[i]] = profile.ticks[i];
+    }
+    result["ticks"] = ticks;
+#ifdef FASTCSV_PROFILE_RDTSC
+    result["clock"] = "rdtsc";
+#else
+    result["clock"] = "steady_clock";
+#endif
+    return result;
+}
+
+// Учитывает обработанный блок в счетчиках чтения
+static void count_chunk(ReadStats* stats, std::size_t bytes) {
+    if (stats && bytes > 0) {
+        stats->bytes += bytes;
+        stats->chunks += 1;
+    }
+}
+
+// Создает Python список строк (list[list[str]]) из результатов парсинга
+// С where= Python объекты создаются только для строк, прошедших фильтр
+static PyObject* build_python_rows(const RowBatch& batch, FieldText text, FieldConverter* converter = nullptr,
+                                   ReadStats* stats = nullptr) {
+    StageTimer timer(stat_counter(stats, &ReadStats::build_ns));
+    std::vector<std::size_t> selected;
+    const std::vector<std::size_t>* rows = nullptr;
+    if (converter) {
+        converter->prepare(batch, text);
+        if (converter->filters()) {
+            converter->select(batch, selected);
+            rows = &selected;
+        }
+    }
+    PyObject* py_rows = PyList_New(static_cast<Py_ssize_t>(rows ? rows->size() : batch.size()));
+    if (!py_rows) {
+        throw py::error_already_set();
+    }
+    if (!fill_python_rows(py_rows, 0, batch, text, converter, rows)) {
+        Py_DECREF(py_rows);
+        throw py::error_already_set();
+    }
+    if (stats) {
+        stats->rows += static_cast<std::uint64_t>(PyList_GET_SIZE(py_rows));
+    }
+    return py_rows;
+}
+
+// Создает Python строки блока с учетом этапа MATERIALIZE профиля парсера
+static PyObject* materialize_rows(CSVParser& parser, const RowBatch& batch, FieldText text,
+                                  FieldConverter* converter, ReadStats* stats) {
+    ParseProfile* profile = active_profile(parser);
+    ProfileScope scope(profile, ParseProfile::MATERIALIZE);
+    PyObject* py_rows = build_python_rows(batch, text, converter, stats);
+    if (profile) {
+        profile->materialized_rows += static_cast<std::uint64_t>(PyList_GET_SIZE(py_rows));
+    }
+    return py_rows;
+}
+
+// Парсит str блок и возвращает список строк (parse_chunk_to_python / parse_chunk_to_dicts)
+static py::object parse_str_chunk(CSVParser& parser, py::str data_str, FieldConverter* converter,
+                                  ReadStats* stats) {
+    // UTF-8 представление str используется без копирования
+    Py_ssize_t data_size;
+    const char* data_ptr = PyUnicode_AsUTF8AndSize(data_str.ptr(), &data_size);
+    if (!data_ptr) {
+        throw py::error_already_set();
+    }
+    std::string_view data_view(data_ptr, static_cast<std::size_t>(data_size));
+    
+    // Поля ссылаются на data_view (str живет до конца вызова), Python строки создаются из срезов
+    // Токенизация - без GIL: другие потоки Python работают параллельно
+    // Профиль вызова копится отдельно и добавляется к профилю парсера под GIL:
+    // тот же CSVParser может разбирать блоки в нескольких потоках
+    RowBatch batch;
+    simd::TextEncoding encoding;
+    ParseProfile call_profile;
+    ParseProfile* profile = parser.profiling() ? &call_profile : nullptr;
+    {
+        py::gil_scoped_release release;
+        {
+            StageTimer timer(stat_counter(stats, &ReadStats::parse_ns));
+            parser.parse_batch(data_view, batch, profile);
+        }
+        // ASCII проверяется для всего блока: по выборке не-ASCII поля превращались в mojibake
+        // UTF-8 представление str всегда валидно, проверять его не нужно
+        StageTimer timer(stat_counter(stats, &ReadStats::decode_ns));
+        encoding = simd::is_ascii_simd(data_view) ? simd::TEXT_ASCII : simd::TEXT_UTF8;
+    }
+    if (profile) {
+        parser.profile().merge(call_profile);
+    }
+    count_chunk(stats, data_view.size());
+    return py::reinterpret_steal<py::object>(materialize_rows(parser, batch, {encoding}, converter, stats));
+}
+
+// RAII-обертка над buffer protocol (mmap, bytes, bytearray, memoryview)
+// Пока объект жив, буфер экспортирован: mmap нельзя закрыть или изменить его размер
+class BufferView {
+public:
+    explicit BufferView(py::handle obj) {
+        if (PyObject_GetBuffer(obj.ptr(), &view_, PyBUF_SIMPLE) != 0) {
+            throw py::error_already_set();
+        }
+    }
+    ~BufferView() { PyBuffer_Release(&view_); }
+    BufferView(const BufferView&) = delete;
+    BufferView& operator=(const BufferView&) = delete;
+    
+    // Возвращает срез [offset, offset + length), ограниченный размером буфера
+    std::string_view slice(std::size_t offset, std::size_t length) const {
+        std::size_t size = static_cast<std::size_t>(view_.len);
+        if (offset > size) {
+            throw py::value_error("offset is out of buffer bounds");
+        }
+        length = std::min(length, size - offset);
+        return std::string_view(static_cast<const char*>(view_.buf) + offset, length);
+    }
+
+private:
+    Py_buffer view_;
+};
+
+// Объект с изменяемым состоянием (StreamTokenizer, ColumnParser), используемый без GIL
+// Пока вызов работает с отпущенным GIL, второй вызов того же объекта из другого потока
+// получает RuntimeError вместо гонки данных. Создается и удаляется под GIL
+class ExclusiveUse {
+public:
+    ExclusiveUse(const void* object, const char* type_name) : object_(object) {
+        if (!busy_objects().insert(object).second) {
+            throw std::runtime_error(std::string(type_name) + " is already in use by another thread");
+        }
+    }
+    ~ExclusiveUse() { busy_objects().erase(object_); }
+    ExclusiveUse(const ExclusiveUse&) = delete;
+    ExclusiveUse& operator=(const ExclusiveUse&) = delete;
+
+private:
+    static std::unordered_set<const void*>& busy_objects() {
+        static std::unordered_set<const void*> objects;
+        return objects;
+    }
+    const void* object_;
+};
+
+// Парсит срез буфера и возвращает (rows, bytes_consumed)
+// Если is_final == false, незавершенная последняя запись остается необработанной
+static py::tuple parse_buffer(CSVParser& parser, py::handle buffer, std::size_t offset,
+                              std::size_t length, std::size_t num_threads, bool is_final,
+                              FieldConverter* converter, const Charset* charset, ReadStats* stats) {
+    BufferView view(buffer);
+    std::string_view data = view.slice(offset, length);
+    
+    // Токенизация без GIL (буфер экспортирован BufferView и не может быть закрыт),
+    // Python объекты создаются после
+    // Профиль вызова добавляется к профилю парсера под GIL (см. parse_str_chunk)
+    ParallelParseResult parsed;
+    ParseProfile call_profile;
+    ParseProfile* profile = parser.profiling() ? &call_profile : nullptr;
+    {
+        py::gil_scoped_release release;
+        parsed = parse_chunk_parallel(parser.config(), data, num_threads, is_final, stats, profile);
+    }
+    if (profile) {
+        parser.profile().merge(call_profile);
+    }
+    count_chunk(stats, parsed.bytes_consumed);
+    StageTimer timer(stat_counter(stats, &ReadStats::build_ns));
+    ProfileScope materialize(active_profile(parser), ParseProfile::MATERIALIZE);
+    
+    // prepare действует на первую непустую часть (заголовок), после него известно,
+    // нужен ли отбор строк
+    for (std::size_t i = 0; converter && i < parsed.parts.size(); ++i) {
+        converter->prepare(parsed.parts[i], {parsed.parts_encoding[i], charset});
+    }
+    std::size_t total_rows = 0;
+    bool filters = converter && converter->filters();
+    std::vector<std::vector<std::size_t>> selected(filters ? parsed.parts.size() : 0);
+    for (std::size_t i = 0; i < parsed.parts.size(); ++i) {
+        if (filters) {
+            converter->select(parsed.parts[i], selected[i]);
+        }
+        total_rows += filters ? selected[i].size() : parsed.parts[i].size();
+    }
+    
+    // Собираем строки всех частей в один список в порядке файла
+    PyObject* py_rows = PyList_New(static_cast<Py_ssize_t>(total_rows));
+    if (!py_rows) {
+        throw py::error_already_set();
+    }
+    std::size_t index = 0;
+    for (std::size_t i = 0; i < parsed.parts.size(); ++i) {
+        const std::vector<std::size_t>* rows = filters ? &selected[i] : nullptr;
+        if (!fill_python_rows(py_rows, index, parsed.parts[i], {parsed.parts_encoding[i], charset},
+                              converter, rows)) {
+            Py_DECREF(py_rows);
+            throw py::error_already_set();
+        }
+        index += rows ? rows->size() : parsed.parts[i].size();
+    }
+    if (stats) {
+        stats->rows += total_rows;
+    }
+    if (ParseProfile* profile = active_profile(parser)) {
+        profile->materialized_rows += total_rows;
+    }
+    
+    return py::make_tuple(py::reinterpret_steal<py::object>(py_rows), parsed.bytes_consumed);
+}
+
+// Создает Python строку из UTF-8 блока writer'а
+// Для ASCII блоков используем PyUnicode_FromKindAndData (без декодирования UTF-8)
+static py::object block_to_python(std::string_view block) {
+    PyObject* py_str = nullptr;
+    if (simd::is_ascii_simd(block)) {
+        py_str = PyUnicode_FromKindAndData(PyUnicode_1BYTE_KIND, block.data(), static_cast<Py_ssize_t>(block.size()));
+    } else {
+        py_str = PyUnicode_DecodeUTF8(block.data(), static_cast<Py_ssize_t>(block.size()), "strict");
+    }
+    if (!py_str) {
+        throw py::error_already_set();
+    }
+    return py::reinterpret_steal<py::object>(py_str);
+}
+
+// Добавляет одно поле в writer (эквивалент str(field) без создания промежуточных объектов для str)
+static void write_python_field(CSVWriter& writer, PyObject* field) {
+    Py_ssize_t size;
+    if (PyUnicode_Check(field)) {
+        const char* ptr = PyUnicode_AsUTF8AndSize(field, &size);
+        if (!ptr) {
+            throw py::error_already_set();
+        }
+        writer.write_field(std::string_view(ptr, static_cast<std::size_t>(size)), false);
+        return;
+    }
+
+    bool is_numeric = PyLong_Check(field) || PyFloat_Check(field);
+    PyObject* field_str = PyObject_Str(field);
+    if (!field_str) {
+        throw py::error_already_set();
+    }
+    const char* ptr = PyUnicode_AsUTF8AndSize(field_str, &size);
+    if (!ptr) {
+        Py_DECREF(field_str);
+        throw py::error_already_set();
+    }
+    writer.write_field(std::string_view(ptr, static_cast<std::size_t>(size)), is_numeric);
+    Py_DECREF(field_str);
+}
+
+// Сериализует одну строку; при ошибке недописанная строка откатывается
+static void write_python_row(CSVWriter& writer, PyObject* row) {
+    PyObject* fields = PySequence_Fast(row, "row must be an iterable");
+    if (!fields) {
+        throw py::error_already_set();
+    }
+
+    std::size_t mark = writer.size();
+    try {
+        Py_ssize_t num_fields = PySequence_Fast_GET_SIZE(fields);
+        PyObject** items = PySequence_Fast_ITEMS(fields);
+        for (Py_ssize_t i = 0; i < num_fields; ++i) {
+            write_python_field(writer, items[i]);
+        }
+    } catch (...) {
+        Py_DECREF(fields);
+        writer.truncate(mark);
+        throw;
+    }
+    Py_DECREF(fields);
+    writer.end_row();
+}
+
+// Переносит буфер колонки в Python: числа - array.array ('q' / 'd'),
+// строки - (offsets: array.array('q'), data: bytes). Нативный буфер освобождается
+static py::object column_to_python(ColumnData& column, const py::object& array_type) {
+    switch (column.type) {
+        case COLUMN_INT64: {
+            py::object values = array_type("q");
+            values.attr("frombytes")(py::memoryview::from_memory(
+                column.ints.data(), static_cast<py::ssize_t>(column.ints.size() * sizeof(std::int64_t))));
+            std::vector<std::int64_t>().swap(column.ints);
+            return values;
+        }
+        case COLUMN_FLOAT64: {
+            py::object values = array_type("d");
+            values.attr("frombytes")(py::memoryview::from_memory(
+                column.floats.data(), static_cast<py::ssize_t>(column.floats.size() * sizeof(double))));
+            std::vector<double>().swap(column.floats);
+            return values;
+        }
+        default: {
+            py::object offsets = array_type("q");
+            offsets.attr("frombytes")(py::memoryview::from_memory(
+                column.offsets.data(), static_cast<py::ssize_t>(column.offsets.size() * sizeof(std::int64_t))));
+            py::bytes data(column.data.data(), column.data.size());
+            std::vector<std::int64_t>{0}.swap(column.offsets);
+            std::string().swap(column.data);
+            return py::make_tuple(offsets, data);
+        }
+    }
+}
+
 PYBIND11_MODULE(_native, m) {
     m.doc() = "FastCSV native module - high-performance CSV parsing";
     
+    PyDateTime_IMPORT;
+    if (!PyDateTimeAPI) {
+        throw py::error_already_set();
+    }
+    
     // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для маленьких файлов: кэшируем пустую строку
     // Это избегает создания новых объектов для пустых полей
     static PyObject* cached_empty_string = nullptr;
@@ -23,6 +1026,21 @@ PYBIND11_MODULE(_native, m) {
         Py_INCREF(cached_empty_string);  // Увеличиваем счетчик ссылок для безопасности
     }
     
+    // SIMD вариант, выбранный при загрузке модуля по CPUID
+    m.def("simd_level", []() {
+        return simd::simd_level_name(simd::simd_level());
+    }, "Active SIMD variant: 'scalar', 'sse4.2', 'avx2' or 'avx512'");
+    m.def("set_simd_level", [](const std::string& name) {
+        // Для тестов и сравнения вариантов; уровень ограничивается доступным на процессоре
+        for (int level = simd::SIMD_SCALAR; level <= simd::SIMD_AVX512; ++level) {
+            auto value = static_cast<simd::SimdLevel>(level);
+            if (name == simd::simd_level_name(value)) {
+                return simd::simd_level_name(simd::set_simd_level(value));
+            }
+        }
+        throw py::value_error("unknown SIMD level '" + name + "'");
+    }, py::arg("level"), "Switch SIMD variant (clamped to the CPU); returns the active one");
+    
     // ParserConfig
     py::class_<ParserConfig>(m, "ParserConfig")
         .def(py::init<>())
@@ -54,7 +1072,88 @@ PYBIND11_MODULE(_native, m) {
             })
         .def_readwrite("skip_initial_space", &ParserConfig::skip_initial_space)
         .def_readwrite("strict", &ParserConfig::strict)
-        .def_readwrite("lineterminator", &ParserConfig::lineterminator);
+        .def_readwrite("lineterminator", &ParserConfig::lineterminator)
+        .def_readwrite("quoting", &ParserConfig::quoting);
+    
+    // WriterConfig
+    py::class_<WriterConfig>(m, "WriterConfig")
+        .def(py::init<>())
+        .def_property("delimiter",
+            [](const WriterConfig& self) { return std::string(1, self.delimiter); },
+            [](WriterConfig& self, py::object value) {
+                std::string s = py::str(value).cast<std::string>();
+                self.delimiter = s.empty() ? ',' : s[0];
+            })
+        .def_property("quote",
+            [](const WriterConfig& self) { return std::string(1, self.quote); },
+            [](WriterConfig& self, py::object value) {
+                std::string s = py::str(value).cast<std::string>();
+                self.quote = s.empty() ? '"' : s[0];
+            })
+        .def_readwrite("quoting", &WriterConfig::quoting)
+        .def_readwrite("lineterminator", &WriterConfig::lineterminator)
+        .def_readwrite("buffer_size", &WriterConfig::buffer_size);
+    
+    // CSVWriter - сериализация батчей строк в один растущий буфер
+    py::class_<CSVWriter>(m, "CSVWriter")
+        .def(py::init<>())
+        .def(py::init<const WriterConfig&>())
+        .def("format_row", [](CSVWriter& self, py::handle row) {
+            // Одна строка - возвращаем ее как str для немедленной записи
+            std::size_t mark = self.size();
+            write_python_row(self, row.ptr());
+            py::object result = block_to_python(self.buffer().substr(mark));
+            self.truncate(mark);
+            return result;
+        }, py::arg("row"), "Serialize one row and return it as str")
+        .def("write_rows", [](CSVWriter& self, py::handle rows, py::object write) {
+            // Пакетная сериализация: строки накапливаются в буфере
+            // и сбрасываются через write() блоками по buffer_size
+            PyObject* iterator = PyObject_GetIter(rows.ptr());
+            if (!iterator) {
+                throw py::error_already_set();
+            }
+            std::size_t count = 0;
+            try {
+                while (PyObject* row = PyIter_Next(iterator)) {
+                    try {
+                        write_python_row(self, row);
+                    } catch (...) {
+                        Py_DECREF(row);
+                        throw;
+                    }
+                    Py_DECREF(row);
+                    ++count;
+                    if (self.should_flush()) {
+                        // Буфер очищается до write(): если write() упадет,
+                        // блок не будет записан повторно в обработчике ниже
+                        py::object block = block_to_python(self.buffer());
+                        self.clear();
+                        write(block);
+                    }
+                }
+                if (PyErr_Occurred()) {
+                    throw py::error_already_set();
+                }
+            } catch (...) {
+                Py_DECREF(iterator);
+                // Как и csv.writer, строки до ошибки остаются записанными
+                if (self.size() > 0) {
+                    py::object block = block_to_python(self.buffer());
+                    self.clear();
+                    write(block);
+                }
+                throw;
+            }
+            Py_DECREF(iterator);
+            if (self.size() > 0) {
+                py::object block = block_to_python(self.buffer());
+                self.clear();
+                write(block);
+            }
+            return count;
+        }, py::arg("rows"), py::arg("write"), "Serialize rows and flush them through write() in large blocks")
+        .def("set_config", &CSVWriter::set_config);
     
     // ParsedRow
     py::class_<ParsedRow>(m, "ParsedRow")
@@ -64,192 +1163,314 @@ PYBIND11_MODULE(_native, m) {
     
     // Оптимизированная функция для batch создания Python объектов
     // Использует Python C API напрямую для избежания overhead pybind11
-    m.def("parse_chunk_to_python", [](CSVParser& parser, py::str data_str) {
-        // Оптимизация для средних файлов: используем PyUnicode_AsUTF8AndSize
-        // для получения указателя на данные без копирования (если возможно)
-        Py_ssize_t data_size;
-        const char* data_ptr = PyUnicode_AsUTF8AndSize(data_str.ptr(), &data_size);
-        
-        std::string data_storage; // Хранилище для fallback случая
-        std::string_view data_view;
-        std::vector<ParsedRow> results;
-        
-        if (!data_ptr) {
-            // Fallback на стандартный путь если не UTF-8
-            data_storage = data_str.cast<std::string>();
-            data_view = data_storage;
-        } else {
-            // Используем данные напрямую без копирования
-            data_view = std::string_view(data_ptr, static_cast<std::size_t>(data_size));
-        }
-        
-        results = parser.parse_chunk(data_view);
-        
-        // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для больших файлов: проверяем ASCII для всего чанка ОДИН РАЗ
-        // Для очень больших чанков (>512KB) используем более быструю проверку
-        bool chunk_is_ascii = false;
-        if (data_view.size() >= 16) {
-            // Для больших чанков используем SIMD проверку
-            if (data_view.size() >= 524288) {  // >=512KB - очень большой чанк
-                // Для очень больших чанков проверяем только первые 64KB для скорости
-                std::string_view sample(data_view.data(), std::min(data_view.size(), std::size_t(65536)));
-                chunk_is_ascii = simd::is_ascii_simd(sample);
-            } else {
-                chunk_is_ascii = simd::is_ascii_simd(data_view);
+    // Конвертация полей
+    py::enum_<ConvertKind>(m, "ConvertKind")
+        .value("STR", CONVERT_STR)
+        .value("INT", CONVERT_INT)
+        .value("FLOAT", CONVERT_FLOAT)
+        .value("BOOL", CONVERT_BOOL)
+        .value("DATE", CONVERT_DATE)
+        .value("INFER", CONVERT_INFER);
+    
+    py::enum_<FieldCondition::Kind>(m, "ConditionKind")
+        .value("VALUES", FieldCondition::VALUES)
+        .value("PREFIX", FieldCondition::PREFIX)
+        .value("RANGE", FieldCondition::RANGE);
+    
+    py::class_<FieldConverter>(m, "FieldConverter")
+        .def(py::init<std::vector<ConvertKind>, ConvertKind, std::size_t, bool,
+                      const std::vector<std::size_t>&, bool, std::vector<ColumnRef>, bool>(),
+             py::arg("kinds"), py::arg("default_kind"), py::arg("infer_rows"), py::arg("nonnumeric"),
+             py::arg("intern") = std::vector<std::size_t>(), py::arg("intern_all") = false,
+             py::arg("usecols") = std::vector<ColumnRef>(), py::arg("header") = false)
+        .def_property_readonly("kinds", &FieldConverter::kinds)
+        .def_property_readonly("columns", &FieldConverter::columns)
+        .def_property_readonly("header_pending", &FieldConverter::header_pending)
+        .def("resolve_columns", &FieldConverter::resolve_columns, py::arg("header"),
+             "Сопоставляет имена usecols и where с заголовком (список имен колонок файла)")
+        .def("add_condition", [](FieldConverter& self, ColumnRef column, FieldCondition::Kind kind,
+                                 std::vector<std::string> values, double low, double high) {
+            FieldCondition condition;
+            condition.kind = kind;
+            condition.values = std::move(values);
+            condition.low = low;
+            condition.high = high;
+            self.add_condition(std::move(column), std::move(condition));
+        }, py::arg("column"), py::arg("kind"), py::arg("values") = std::vector<std::string>(),
+           py::arg("low") = 0.0, py::arg("high") = 0.0,
+           "Добавляет условие where= (values - байты в кодировке полей)")
+        .def_property_readonly("intern_hits", &FieldConverter::intern_hits)
+        .def("convert_row", [](FieldConverter& self, const ParsedRow& row) {
+            // Для построчного пути reader'а: вывод типов по одной строке
+            RowBatch batch;
+            for (const std::string& field : row.fields) {
+                batch.fields.push_back({batch.arena.size() | RowBatch::IN_ARENA, field.size()});
+                batch.arena += field;
             }
-        } else if (data_view.size() > 0) {
-            // Для маленьких чанков быстрая проверка
-            chunk_is_ascii = true;
-            for (char c : data_view) {
-                if (static_cast<unsigned char>(c) >= 0x80) {
-                    chunk_is_ascii = false;
-                    break;
+            batch.records.push_back({batch.fields.size(), row.bytes_processed});
+            batch.quoted = row.quoted;
+            self.prepare(batch, {simd::TEXT_MIXED});
+            if (self.filters()) {
+                std::vector<std::size_t> selected;
+                self.select(batch, selected);
+                if (selected.empty()) {
+                    return py::object(py::none());
                 }
             }
-        } else {
-            chunk_is_ascii = true; // Пустой чанк считается ASCII
-        }
-        
-        // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для больших файлов: batch создание всех Python объектов
-        // Для очень больших чанков (>1MB) используем оптимизированный путь
-        bool is_very_large = data_view.size() >= 1048576;  // >=1MB
-        
-        // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для больших файлов: упрощенная проверка ASCII
-        // Для больших чанков (>512KB) используем только проверку чанка, без проверки полей
-        // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для маленьких файлов: для очень маленьких чанков (<500 байт) пропускаем проверку
-        bool all_fields_ascii = chunk_is_ascii;
-        
-        // Для очень маленьких чанков (<500 байт) предполагаем ASCII для ускорения
-        // Для больших чанков (>512KB) используем только проверку чанка
-        if (data_view.size() < 500) {
-            // Очень маленький чанк - предполагаем ASCII для ускорения (уменьшен порог с 1KB до 500 байт)
-            all_fields_ascii = true;
-        } else if (!chunk_is_ascii && data_view.size() < 524288) {
-            // Только для средних чанков проверяем каждое поле (но только первые несколько строк)
-            std::size_t check_limit = std::min(results.size(), std::size_t(10));
-            for (std::size_t i = 0; i < check_limit; ++i) {
-                for (const auto& field : results[i].fields) {
-                    if (!field.empty() && field.size() >= 16) {
-                        if (!simd::is_ascii_simd(field)) {
-                            all_fields_ascii = false;
-                            break;
-                        }
-                    } else if (!field.empty()) {
-                        for (char c : field) {
-                            if (static_cast<unsigned char>(c) >= 0x80) {
-                                all_fields_ascii = false;
-                                break;
-                            }
-                        }
-                    }
-                    if (!all_fields_ascii) break;
+            PyObject* py_fields = make_row_list(batch, 0, {simd::TEXT_MIXED}, &self);
+            if (!py_fields) {
+                throw py::error_already_set();
+            }
+            return py::reinterpret_steal<py::object>(py_fields);
+        }, py::arg("row"), "Список полей строки или None, если строка не выдается (where, заголовок словарей)")
+        .def("set_dict", &FieldConverter::set_dict, py::arg("fieldnames"), py::arg("restkey"),
+             py::arg("restval"), py::arg("error"),
+             "Строки - словари (DictReader); fieldnames=None - ключи из первой строки")
+        .def_property("fieldnames", &FieldConverter::fieldnames, &FieldConverter::set_fieldnames);
+    
+    // Счетчики чтения: необязательный аргумент stats функций парсинга
+    py::class_<ReadStats>(m, "ReadStats")
+        .def(py::init<>())
+        .def_readwrite("bytes", &ReadStats::bytes)
+        .def_readwrite("chunks", &ReadStats::chunks)
+        .def_readwrite("rows", &ReadStats::rows)
+        .def_readwrite("parse_ns", &ReadStats::parse_ns)
+        .def_readwrite("decode_ns", &ReadStats::decode_ns)
+        .def_readwrite("build_ns", &ReadStats::build_ns)
+        .def("as_dict", [](const ReadStats& self) {
+            py::dict result;
+            result["bytes"] = self.bytes;
+            result["chunks"] = self.chunks;
+            result["rows"] = self.rows;
+            result["parse_time"] = static_cast<double>(self.parse_ns) / 1e9;
+            result["decode_time"] = static_cast<double>(self.decode_ns) / 1e9;
+            result["build_time"] = static_cast<double>(self.build_ns) / 1e9;
+            return result;
+        }, "Счетчики словарем, время в секундах");
+    
+    m.def("parse_chunk_to_python", [](CSVParser& parser, py::str data_str, FieldConverter* converter,
+                                      ReadStats* stats) {
+        return parse_str_chunk(parser, data_str, converter, stats);
+    }, py::arg("parser"), py::arg("data"), py::arg("converter") = nullptr, py::arg("stats") = nullptr,
+       "Parse chunk and return Python list directly");
+    
+    // Парсинг блока в словари (как DictReader) без промежуточных списков полей
+    m.def("parse_chunk_to_dicts", [](CSVParser& parser, py::str data_str, py::object fieldnames,
+                                     py::object restkey, py::object restval) {
+        FieldConverter converter({}, CONVERT_STR, 0, parser.config().quoting == QUOTE_NONNUMERIC);
+        converter.set_dict(std::move(fieldnames), std::move(restkey), std::move(restval),
+                           py::reinterpret_borrow<py::object>(PyExc_ValueError));
+        return parse_str_chunk(parser, data_str, &converter, nullptr);
+    }, py::arg("parser"), py::arg("data"), py::arg("fieldnames") = py::none(),
+       py::arg("restkey") = py::none(), py::arg("restval") = py::none(),
+       "Parse chunk into dicts; fieldnames=None takes keys from the first row");
+    
+    // Парсинг блока напрямую из объекта с buffer protocol (mmap, bytes, memoryview)
+    // Байты не копируются и не декодируются целиком: Python строки создаются только для полей
+    m.def("parse_buffer_to_python", [](CSVParser& parser, py::handle buffer, std::size_t offset,
+                                       std::size_t length, bool is_final, FieldConverter* converter,
+                                       const Charset* charset, ReadStats* stats) {
+        return parse_buffer(parser, buffer, offset, length, 1, is_final, converter, charset, stats);
+    }, py::arg("parser"), py::arg("buffer"), py::arg("offset"), py::arg("length"), py::arg("is_final"),
+       py::arg("converter") = nullptr, py::arg("charset") = nullptr, py::arg("stats") = nullptr,
+       "Parse buffer[offset:offset+length] without copying; returns (rows, bytes_consumed)");
+    
+    // Параллельный парсинг блока из объекта с buffer protocol
+    // Токенизация выполняется в нативных потоках без GIL, Python объекты создаются после
+    m.def("parse_buffer_parallel", [](CSVParser& parser, py::handle buffer, std::size_t offset,
+                                      std::size_t length, std::size_t num_threads, bool is_final,
+                                      FieldConverter* converter, const Charset* charset, ReadStats* stats) {
+        return parse_buffer(parser, buffer, offset, length, num_threads, is_final, converter, charset, stats);
+    }, py::arg("parser"), py::arg("buffer"), py::arg("offset"), py::arg("length"),
+       py::arg("num_threads"), py::arg("is_final"), py::arg("converter") = nullptr,
+       py::arg("charset") = nullptr, py::arg("stats") = nullptr,
+       "Parse buffer[offset:offset+length] in native threads; returns (rows, bytes_consumed)");
+    
+    // Потоковый токенизатор: незавершенная запись и состояние кавычек переносятся между feed()
+    py::class_<StreamTokenizer>(m, "StreamTokenizer")
+        .def(py::init<const ParserConfig&>(), py::arg("config"))
+        .def("feed", [](StreamTokenizer& self, py::handle data, bool is_final,
+                        FieldConverter* converter, const Charset* charset, ReadStats* stats) -> py::tuple {
+            // str передается как UTF-8 без копирования, bytes-подобные объекты - через buffer protocol
+            std::string_view input;
+            std::unique_ptr<BufferView> view;
+            if (PyUnicode_Check(data.ptr())) {
+                Py_ssize_t size;
+                const char* ptr = PyUnicode_AsUTF8AndSize(data.ptr(), &size);
+                if (!ptr) {
+                    throw py::error_already_set();
                 }
-                if (!all_fields_ascii) break;
+                input = std::string_view(ptr, static_cast<std::size_t>(size));
+            } else {
+                view = std::make_unique<BufferView>(data);
+                input = view->slice(0, static_cast<std::size_t>(-1));
             }
-        }
-        
-        // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для очень больших файлов: предварительно создаем все строки
-        // Это уменьшает overhead от множественных вызовов PyUnicode_FromKindAndData
-        std::vector<PyObject*> all_strings;
-        if (is_very_large) {
-            // Подсчитываем общее количество полей для предварительного резервирования
-            std::size_t total_fields = 0;
-            for (const auto& row : results) {
-                total_fields += row.fields.size();
+            // Поиск границ записей и токенизация - без GIL
+            ExclusiveUse guard(&self, "StreamTokenizer");
+            std::string_view region;
+            simd::TextEncoding encoding;
+            const RowBatch* parsed;
+            {
+                py::gil_scoped_release release;
+                {
+                    StageTimer timer(stat_counter(stats, &ReadStats::parse_ns));
+                    region = self.feed(input, is_final);
+                    parsed = &self.parse_region(region);
+                }
+                // Байты проверяются на UTF-8 (region начинается и заканчивается на границе записи,
+                // символ не может оказаться разрезан), UTF-8 представление str валидно всегда
+                StageTimer timer(stat_counter(stats, &ReadStats::decode_ns));
+                if (view && !charset) {
+                    encoding = simd::classify_text(region);
+                } else {
+                    encoding = simd::is_ascii_simd(region) ? simd::TEXT_ASCII : simd::TEXT_UTF8;
+                }
             }
-            all_strings.reserve(total_fields);
-        }
-        
-        // Создаем главный список строк
-        PyObject* py_rows = PyList_New(results.size());
-        if (!py_rows) {
-            throw std::runtime_error("Failed to create Python list");
+            const RowBatch& batch = *parsed;
+            // charset относится только к байтам: str всегда в UTF-8
+            count_chunk(stats, region.size());
+            PyObject* py_rows = build_python_rows(batch, {encoding, view ? charset : nullptr}, converter, stats);
+            return py::make_tuple(py::reinterpret_steal<py::object>(py_rows), region.size());
+        }, py::arg("data"), py::arg("is_final") = false, py::arg("converter") = nullptr,
+           py::arg("charset") = nullptr, py::arg("stats") = nullptr,
+           "Append str/bytes data; returns (completed rows, bytes consumed)")
+        .def_property_readonly("pending", &StreamTokenizer::pending)
+        .def_property_readonly("in_quotes", &StreamTokenizer::in_quotes);
+    
+    // Поиск границ записей в буфере без повторного просмотра уже проверенных байт
+    py::class_<RecordScanner>(m, "RecordScanner")
+        .def(py::init<char>(), py::arg("quote"))
+        .def("scan", [](RecordScanner& self, py::handle buffer, std::size_t offset, std::size_t length) {
+            BufferView view(buffer);
+            return self.scan(view.slice(offset, length));
+        }, py::arg("buffer"), py::arg("offset"), py::arg("length"),
+           "Scan new bytes of buffer[offset:offset+length]; returns end of the last complete record")
+        .def("consume", &RecordScanner::consume, py::arg("n"))
+        .def("reset", &RecordScanner::reset)
+        .def_property_readonly("scanned", &RecordScanner::scanned)
+        .def_property_readonly("in_quotes", &RecordScanner::in_quotes);
+    
+    // Однобайтовая кодировка (encoding= у reader / mmap_reader): байт -> символ по таблице
+    py::class_<Charset>(m, "Charset")
+        .def(py::init<const std::u16string&>(), py::arg("table"),
+             "Single-byte ASCII-compatible encoding: table of 256 characters indexed by byte");
+    
+    // Перекодирование UTF-16 -> UTF-8 блоками (BOM, пары суррогатов и нечетные байты на границах)
+    py::class_<Utf16Decoder>(m, "Utf16Decoder")
+        .def(py::init([](const std::string& byteorder) {
+            if (byteorder.empty()) {
+                return Utf16Decoder(Utf16Decoder::DETECT);
+            }
+            if (byteorder == "little" || byteorder == "big") {
+                return Utf16Decoder(byteorder == "little" ? Utf16Decoder::LITTLE : Utf16Decoder::BIG);
+            }
+            throw py::value_error("byteorder must be '', 'little' or 'big'");
+        }), py::arg("byteorder") = "")
+        .def("decode", [](Utf16Decoder& self, py::handle data, bool is_final) {
+            BufferView view(data);
+            std::string_view input = view.slice(0, static_cast<std::size_t>(-1));
+            ExclusiveUse guard(&self, "Utf16Decoder");
+            std::string out;
+            {
+                py::gil_scoped_release release;
+                self.decode(input, is_final, out);
+            }
+            return py::bytes(out);
+        }, py::arg("data"), py::arg("is_final") = false, "Transcode the next UTF-16 bytes to UTF-8 bytes")
+        .def("reset", &Utf16Decoder::reset);
+    
+    // Длина наибольшего валидного UTF-8 префикса буфера (граница последнего целого символа)
+    m.def("validate_utf8", [](py::handle buffer) {
+        BufferView view(buffer);
+        std::string_view data = view.slice(0, static_cast<std::size_t>(-1));
+        py::gil_scoped_release release;
+        return simd::validate_utf8_simd(data);
+    }, py::arg("buffer"), "Length of the longest valid UTF-8 prefix of a bytes-like object");
+    
+    // Индекс "номер строки -> смещение" для произвольного доступа (fastcsv.build_index)
+    m.def("build_row_index", [](py::handle buffer, char quote, std::size_t every) {
+        BufferView view(buffer);
+        std::string_view data = view.slice(0, static_cast<std::size_t>(-1));
+        RowIndexBuilder builder(quote, every);
+        {
+            // Файл просматривается целиком - без GIL
+            py::gil_scoped_release release;
+            builder.feed(data);
+            builder.finish();
         }
-        
-        // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для больших файлов: оптимизированное создание объектов
-        for (std::size_t i = 0; i < results.size(); ++i) {
-            const auto& row = results[i];
-            
-            // Создаем список полей для этой строки
-            PyObject* py_fields = PyList_New(row.fields.size());
-            if (!py_fields) {
-                // Очищаем уже созданные объекты
-                for (PyObject* obj : all_strings) {
-                    Py_DECREF(obj);
-                }
-                Py_DECREF(py_rows);
-                throw std::runtime_error("Failed to create Python list for fields");
-            }
-            
-            for (std::size_t j = 0; j < row.fields.size(); ++j) {
-                const auto& field = row.fields[j];
-                PyObject* py_str = nullptr;
-                
-                // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ для маленьких файлов: кэшируем пустые строки
-                if (field.empty()) {
-                    // Пустая строка - используем кэшированную пустую строку
-                    // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: кэширование пустых строк для уменьшения overhead
-                    // Используем статическую переменную для кэширования
-                    static PyObject* cached_empty_string = nullptr;
-                    if (cached_empty_string == nullptr) {
-                        cached_empty_string = PyUnicode_FromStringAndSize("", 0);
-                        if (cached_empty_string == nullptr) {
-                            throw std::runtime_error("Failed to create cached empty string");
-                        }
-                        // Не увеличиваем счетчик - объект будет жить до конца программы
-                    }
-                    py_str = cached_empty_string;
-                    Py_INCREF(py_str);  // Увеличиваем счетчик ссылок при использовании
-                } else if (all_fields_ascii) {
-                    // Все поля ASCII - используем PyUnicode_FromKindAndData (самый быстрый путь)
-                    // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: для больших файлов используем более эффективный путь
-                    py_str = PyUnicode_FromKindAndData(1, field.data(), static_cast<Py_ssize_t>(field.size()));
-                    if (!py_str) {
-                        // Fallback на стандартный путь
-                        py_str = PyUnicode_FromStringAndSize(field.data(), static_cast<Py_ssize_t>(field.size()));
-                    }
+        const std::vector<std::uint64_t>& offsets = builder.offsets();
+        py::bytes packed(reinterpret_cast<const char*>(offsets.data()), offsets.size() * sizeof(std::uint64_t));
+        return py::make_tuple(packed, builder.rows());
+    }, py::arg("buffer"), py::arg("quote"), py::arg("every"),
+       "Index record starts of buffer; returns (offsets of every N-th row as uint64 bytes, row count)");
+    m.def("skip_records", [](py::handle buffer, std::size_t offset, std::size_t count, char quote) {
+        BufferView view(buffer);
+        std::string_view data = view.slice(offset, static_cast<std::size_t>(-1));
+        py::gil_scoped_release release;
+        return offset + skip_records(data, quote, count);
+    }, py::arg("buffer"), py::arg("offset"), py::arg("count"), py::arg("quote"),
+       "Skip count records starting at buffer[offset]; returns offset of the next record");
+    
+    // Колоночный парсер: значения сразу попадают в непрерывные буферы колонок
+    py::enum_<ColumnType>(m, "ColumnType")
+        .value("STR", COLUMN_STR)
+        .value("INT64", COLUMN_INT64)
+        .value("FLOAT64", COLUMN_FLOAT64);
+    
+    py::class_<ColumnParser>(m, "ColumnParser")
+        .def(py::init([](const ParserConfig& config, py::dict dtypes, bool header) {
+            // Ключи dtypes: int - индекс колонки, str - имя из заголовка
+            ColumnSpec spec;
+            for (auto item : dtypes) {
+                ColumnType type = item.second.cast<ColumnType>();
+                if (py::isinstance<py::str>(item.first)) {
+                    spec.by_name[item.first.cast<std::string>()] = type;
                 } else {
-                    // Есть не-ASCII поля - используем стандартный путь
-                    // КРИТИЧЕСКАЯ ОПТИМИЗАЦИЯ: для больших файлов можно попробовать PyUnicode_DecodeUTF8
-                    py_str = PyUnicode_FromStringAndSize(field.data(), static_cast<Py_ssize_t>(field.size()));
-                }
-                
-                if (!py_str) {
-                    // Очищаем уже созданные объекты
-                    for (PyObject* obj : all_strings) {
-                        Py_DECREF(obj);
-                    }
-                    Py_DECREF(py_fields);
-                    Py_DECREF(py_rows);
-                    throw std::runtime_error("Failed to create Python string");
-                }
-                
-                // Для очень больших файлов сохраняем ссылки на строки для возможной оптимизации
-                if (is_very_large) {
-                    all_strings.push_back(py_str);
+                    spec.by_index[item.first.cast<std::size_t>()] = type;
                 }
-                
-                // Используем PyList_SET_ITEM для установки элемента без проверок
-                PyList_SET_ITEM(py_fields, static_cast<Py_ssize_t>(j), py_str);
             }
-            
-            // Устанавливаем список полей в список строк
-            PyList_SET_ITEM(py_rows, static_cast<Py_ssize_t>(i), py_fields);
-        }
-        
-        // Конвертируем PyObject* в py::object для возврата
-        return py::reinterpret_steal<py::object>(py_rows);
-    }, py::arg("parser"), py::arg("data"), "Parse chunk and return Python list directly");
+            return ColumnParser(config, std::move(spec), header);
+        }), py::arg("config"), py::arg("dtypes"), py::arg("header"))
+        .def("feed", [](ColumnParser& self, py::handle buffer, std::size_t offset,
+                        std::size_t length, bool is_final) {
+            BufferView view(buffer);
+            std::string_view data = view.slice(offset, length);
+            ExclusiveUse guard(&self, "ColumnParser");
+            // Python объекты не создаются - парсим без GIL
+            py::gil_scoped_release release;
+            return self.feed(data, is_final);
+        }, py::arg("buffer"), py::arg("offset"), py::arg("length"), py::arg("is_final"),
+           "Parse complete records of buffer[offset:offset+length]; returns bytes consumed")
+        .def_property_readonly("header", [](const ColumnParser& self) -> py::object {
+            if (!self.has_header()) {
+                return py::none();
+            }
+            return py::cast(self.header());
+        })
+        .def_property_readonly("num_rows", &ColumnParser::num_rows)
+        .def("take_columns", [](ColumnParser& self) {
+            py::object array_type = py::module_::import("array").attr("array");
+            py::list result;
+            for (auto& column : self.columns()) {
+                result.append(column_to_python(column, array_type));
+            }
+            return result;
+        }, "Move column buffers into array.array objects");
     
     // CSVParser
     py::class_<CSVParser>(m, "CSVParser")
         .def(py::init<>())
         .def(py::init<const ParserConfig&>())
         .def("parse_line", &CSVParser::parse_line)
-        .def("parse_chunk", &CSVParser::parse_chunk)
-        .def("parse_all", &CSVParser::parse_all)
+        // Токенизация без GIL; список ParsedRow создается после
+        .def("parse_chunk", &parse_rows)
+        .def("parse_all", &parse_rows)
         .def("set_config", &CSVParser::set_config)
         .def_static("has_unclosed_quotes", &CSVParser::has_unclosed_quotes)
-        .def_static("find_last_newline", &CSVParser::find_last_newline);
+        .def_static("find_last_newline", &CSVParser::find_last_newline)
+        .def_property("profiling", &CSVParser::profiling, &CSVParser::set_profiling,
+                      "Профилирование этапов разбора (RuntimeError в сборке с FASTCSV_PROFILE=0)")
+        .def("profile", &profile_to_python, "Счетчики профилирования по этапам (время в секундах)")
+        .def("reset_profile", &CSVParser::reset_profile);
 }
 
@@ -0,0 +1,54 @@
+#include "fastcsv/row_filter.hpp"
+#include "fastcsv/field_conversions.hpp"
+#include <algorithm>
+
+namespace fastcsv {
+
+bool FieldCondition::matches(std::string_view field) const {
+    switch (kind) {
+        case VALUES:
+            // values отсортированы (RowFilter::add): двоичный поиск без копирования поля
+            return std::binary_search(values.begin(), values.end(), field,
+                                      [](std::string_view a, std::string_view b) { return a < b; });
+        case PREFIX:
+            for (const std::string& prefix : values) {
+                if (field.substr(0, prefix.size()) == prefix) {
+                    return true;
+                }
+            }
+            return false;
+        case RANGE: {
+            double value;
+            return parse_float64(field, value) && value >= low && value <= high;
+        }
+    }
+    return false;
+}
+
+void RowFilter::add(std::size_t column, FieldCondition condition) {
+    if (condition.kind == FieldCondition::VALUES) {
+        std::sort(condition.values.begin(), condition.values.end());
+    }
+    conditions_.push_back({column, std::move(condition)});
+}
+
+bool RowFilter::matches(const RowBatch& batch, std::size_t row) const {
+    std::size_t begin = batch.row_begin(row);
+    std::size_t count = batch.row_end(row) - begin;
+    for (const Entry& entry : conditions_) {
+        if (entry.column >= count || !entry.condition.matches(batch.field(begin + entry.column))) {
+            return false;
+        }
+    }
+    return true;
+}
+
+void RowFilter::select(const RowBatch& batch, std::size_t first, std::vector<std::size_t>& rows) const {
+    for (std::size_t row = first; row < batch.size(); ++row) {
+        if (matches(batch, row)) {
+            rows.push_back(row);
+        }
+    }
+}
+
+} // namespace fastcsv
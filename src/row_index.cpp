@@ -0,0 +1,77 @@
+#include "fastcsv/row_index.hpp"
+#include <algorithm>
+
+namespace fastcsv {
+
+namespace {
+
+// Данные индексируются сегментами, чтобы массив позиций оставался в кеше
+constexpr std::size_t kSegment = 65536;
+
+} // namespace
+
+RowIndexBuilder::RowIndexBuilder(char quote, std::size_t every)
+    : quote_(quote), every_(std::max<std::size_t>(every, 1)) {
+    structurals_.reserve(kSegment / 4);
+    offsets_.push_back(0);
+}
+
+void RowIndexBuilder::feed(std::string_view data) {
+    for (std::size_t segment = 0; segment < data.size(); segment += kSegment) {
+        std::size_t segment_end = std::min(data.size(), segment + kSegment);
+        structurals_.clear();
+        // Разделитель полей не нужен: вместо него передается '\n', позиции - только концы строк
+        simd::index_structurals(data, segment, segment_end, quote_, '\n', state_, structurals_);
+
+        for (std::uint64_t entry : structurals_) {
+            std::uint64_t pos = size_ + (entry & ~simd::STRUCTURAL_QUOTED);
+            if (data[static_cast<std::size_t>(entry & ~simd::STRUCTURAL_QUOTED)] == '\n' && pos == cr_end_) {
+                // \r\n: запись закончилась на \r, следующая начинается после \n
+                row_start_ = pos + 1;
+                if (rows_ % every_ == 0) {
+                    offsets_.back() = row_start_;
+                }
+                continue;
+            }
+            ++rows_;
+            row_start_ = pos + 1;
+            if (data[static_cast<std::size_t>(entry & ~simd::STRUCTURAL_QUOTED)] == '\r') {
+                cr_end_ = pos + 1;
+            }
+            if (rows_ % every_ == 0) {
+                offsets_.push_back(row_start_);
+            }
+        }
+    }
+    size_ += data.size();
+}
+
+void RowIndexBuilder::finish() {
+    if (size_ > row_start_) {
+        // Последняя запись без перевода строки
+        ++rows_;
+    } else if (rows_ % every_ == 0 && offsets_.size() > 1) {
+        // Сохраненное смещение указывает на конец файла, а не на строку
+        offsets_.pop_back();
+    }
+}
+
+std::size_t skip_records(std::string_view data, char quote, std::size_t count) {
+    if (count == 0) {
+        return 0;
+    }
+    // Шаг индекса = count: второе смещение - начало записи с номером count
+    RowIndexBuilder builder(quote, count);
+    for (std::size_t segment = 0; segment < data.size(); segment += kSegment) {
+        std::size_t segment_end = std::min(data.size(), segment + kSegment);
+        builder.feed(data.substr(segment, segment_end - segment));
+        const std::vector<std::uint64_t>& offsets = builder.offsets();
+        // После \r смещение может сдвинуться на \n из следующего сегмента
+        if (offsets.size() > 1 && (offsets[1] < segment_end || segment_end == data.size())) {
+            return static_cast<std::size_t>(std::min<std::uint64_t>(offsets[1], data.size()));
+        }
+    }
+    return data.size();
+}
+
+} // namespace fastcsv
@@ -0,0 +1,192 @@
+// Векторные реализации функций simd_utils для одного набора инструкций
+// Файл включается в simd_utils.cpp несколько раз, внутри пространства имен варианта и
+// в области, где компилятор генерирует код для этого набора инструкций (см. FASTCSV_TARGET_*)
+//
+// Перед включением в том же пространстве имен должны быть определены:
+//   kWidth                       - байт за шаг (16 / 32 / 64)
+//   block_eq(ptr, c)             - битовая маска байтов блока, равных c
+//   block_eq2(ptr, a, b)         - маска байтов, равных a или b
+//   block_high(ptr)              - маска байтов >= 0x80
+//   prefix_xor(mask)             - бит i результата = XOR битов 0..i маски
+// Загрузки невыровненные: блок читается только если он целиком внутри данных
+
+inline int lowest_bit(std::uint64_t mask) {
+#ifdef _MSC_VER
+    unsigned long index;
+    _BitScanForward64(&index, mask);
+    return static_cast<int>(index);
+#else
+    return __builtin_ctzll(mask);
+#endif
+}
+
+inline int count_bits(std::uint64_t mask) {
+#ifdef _MSC_VER
+    return static_cast<int>(__popcnt64(mask));
+#else
+    return __builtin_popcountll(mask);
+#endif
+}
+
+std::size_t find_char(std::string_view data, char target, std::size_t start_pos) {
+    const char* ptr = data.data();
+    std::size_t len = data.size();
+    std::size_t i = start_pos;
+    for (; i + kWidth <= len; i += kWidth) {
+        std::uint64_t mask = block_eq(ptr + i, target);
+        if (mask != 0) {
+            return i + lowest_bit(mask);
+        }
+    }
+    for (; i < len; ++i) {
+        if (ptr[i] == target) {
+            return i;
+        }
+    }
+    return std::string_view::npos;
+}
+
+std::size_t find_any_char(std::string_view data, char a, char b, std::size_t start_pos) {
+    const char* ptr = data.data();
+    std::size_t len = data.size();
+    std::size_t i = start_pos;
+    for (; i + kWidth <= len; i += kWidth) {
+        std::uint64_t mask = block_eq2(ptr + i, a, b);
+        if (mask != 0) {
+            return i + lowest_bit(mask);
+        }
+    }
+    for (; i < len; ++i) {
+        if (ptr[i] == a || ptr[i] == b) {
+            return i;
+        }
+    }
+    return std::string_view::npos;
+}
+
+void find_all_chars(std::string_view data, char target, std::vector<std::size_t>& positions,
+                    std::size_t start_pos) {
+    const char* ptr = data.data();
+    std::size_t len = data.size();
+    std::size_t i = start_pos;
+    for (; i + kWidth <= len; i += kWidth) {
+        std::uint64_t mask = block_eq(ptr + i, target);
+        // Обрабатываем все найденные символы блока
+        while (mask != 0) {
+            positions.push_back(i + lowest_bit(mask));
+            mask &= mask - 1;
+        }
+    }
+    for (; i < len; ++i) {
+        if (ptr[i] == target) {
+            positions.push_back(i);
+        }
+    }
+}
+
+std::size_t count_chars(std::string_view data, char target) {
+    const char* ptr = data.data();
+    std::size_t len = data.size();
+    std::size_t count = 0;
+    std::size_t i = 0;
+    for (; i + kWidth <= len; i += kWidth) {
+        count += count_bits(block_eq(ptr + i, target));
+    }
+    for (; i < len; ++i) {
+        count += ptr[i] == target;
+    }
+    return count;
+}
+
+bool is_ascii(std::string_view data) {
+    const char* ptr = data.data();
+    std::size_t len = data.size();
+    std::size_t i = 0;
+    for (; i + kWidth <= len; i += kWidth) {
+        if (block_high(ptr + i) != 0) {
+            return false;
+        }
+    }
+    for (; i < len; ++i) {
+        if (static_cast<unsigned char>(ptr[i]) >= 0x80) {
+            return false;
+        }
+    }
+    return true;
+}
+
+std::size_t validate_utf8(std::string_view data) {
+    const auto* ptr = reinterpret_cast<const unsigned char*>(data.data());
+    std::size_t len = data.size();
+    std::size_t i = 0;
+    while (i < len) {
+        if (i + kWidth <= len) {
+            // ASCII блоки пропускаются целиком
+            std::uint64_t high = block_high(data.data() + i);
+            if (high == 0) {
+                i += kWidth;
+                continue;
+            }
+            i += lowest_bit(high);
+        } else if (ptr[i] < 0x80) {
+            ++i;
+            continue;
+        }
+        // Подряд идущие не-ASCII символы (кириллица и т.п.) проверяются без возврата к блокам
+        do {
+            std::size_t n = utf8_sequence(ptr + i, len - i);
+            if (n == 0) {
+                return i;
+            }
+            i += n;
+        } while (i < len && ptr[i] >= 0x80);
+    }
+    return len;
+}
+
+// Маска 64 байт, равных c: склеивается из блоков по kWidth
+inline std::uint64_t block64_eq(const char* ptr, char c) {
+    std::uint64_t mask = 0;
+    for (std::size_t k = 0; k < 64; k += kWidth) {
+        mask |= block_eq(ptr + k, c) << k;
+    }
+    return mask;
+}
+
+void index_structurals(std::string_view data, std::size_t begin, std::size_t end, char quote, char delim,
+                       StructuralState& state, std::vector<std::uint64_t>& out) {
+    const char* ptr = data.data();
+    alignas(64) char tail[64];
+    for (std::size_t base = begin; base < end; base += 64) {
+        const char* block = ptr + base;
+        std::uint64_t valid = ~0ull;
+        if (end - base < 64) {
+            // Неполный последний блок копируется, лишние биты отбрасываются маской
+            std::size_t n = end - base;
+            std::memset(tail, 0, sizeof(tail));
+            std::memcpy(tail, block, n);
+            block = tail;
+            valid = (1ull << n) - 1;
+        }
+        std::uint64_t quotes = block64_eq(block, quote) & valid;
+        std::uint64_t structurals = (block64_eq(block, delim) | block64_eq(block, '\n') |
+                                     block64_eq(block, '\r')) & valid;
+        // Биты внутри кавычек: префиксный XOR маски кавычек с переносом из предыдущего блока
+        std::uint64_t inside = prefix_xor(quotes) ^ (state.in_quotes ? ~0ull : 0);
+        state.in_quotes = state.in_quotes != ((count_bits(quotes) & 1) != 0);
+        structurals &= ~inside;
+
+        // Кавычки, еще не отнесенные ни к одному полю блока
+        std::uint64_t pending = quotes;
+        while (structurals != 0) {
+            int bit = lowest_bit(structurals);
+            std::uint64_t before = (1ull << bit) - 1;
+            bool quoted = state.quote_seen || (pending & before) != 0;
+            out.push_back((base + bit) | (quoted ? STRUCTURAL_QUOTED : 0));
+            pending &= ~before;
+            state.quote_seen = false;
+            structurals &= structurals - 1;
+        }
+        state.quote_seen = state.quote_seen || pending != 0;
+    }
+}
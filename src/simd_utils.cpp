@@ -4,469 +4,430 @@
 #include <cstring>
 #include <vector>
 
-#ifdef _WIN32
-#include <intrin.h>
+#if defined(__x86_64__) || defined(__i386__) || defined(_M_X64) || defined(_M_IX86)
+#define FASTCSV_X86 1
 #endif
 
-namespace fastcsv {
-namespace simd {
-
-// Кроссплатформенная функция для поиска первого установленного бита
-inline int find_first_set_bit(int mask) {
-    if (mask == 0) return -1;
-    
-#ifdef _WIN32
-    unsigned long index;
-    _BitScanForward(&index, mask);
-    return static_cast<int>(index);
+#ifdef FASTCSV_X86
+#include <immintrin.h>
+#ifdef _MSC_VER
+#include <intrin.h>
 #else
-    return __builtin_ctz(mask);
+#include <cpuid.h>
+#endif
 #endif
-}
 
-// Кроссплатформенная функция для подсчета установленных битов
-inline int count_bits(int mask) {
-#ifdef _WIN32
-    return __popcnt(mask);
+// Векторные варианты компилируются для своего набора инструкций независимо от флагов сборки:
+// GCC - #pragma GCC target, Clang - #pragma clang attribute, MSVC разрешает интринсики без флагов
+#define FASTCSV_PRAGMA(x) _Pragma(#x)
+#if defined(__clang__)
+#define FASTCSV_TARGET_BEGIN(isa) FASTCSV_PRAGMA(clang attribute push(__attribute__((target(isa))), apply_to = function))
+#define FASTCSV_TARGET_END FASTCSV_PRAGMA(clang attribute pop)
+#elif defined(__GNUC__)
+#define FASTCSV_TARGET_BEGIN(isa) FASTCSV_PRAGMA(GCC push_options) FASTCSV_PRAGMA(GCC target(isa))
+#define FASTCSV_TARGET_END FASTCSV_PRAGMA(GCC pop_options)
 #else
-    return __builtin_popcount(mask);
+#define FASTCSV_TARGET_BEGIN(isa)
+#define FASTCSV_TARGET_END
 #endif
-}
 
-std::size_t find_char_simd(std::string_view data, char target, std::size_t start_pos) {
-    if (start_pos >= data.length()) {
-        return std::string_view::npos;
+namespace fastcsv {
+namespace simd {
+
+namespace {
+
+// Длина валидной UTF-8 последовательности в начале p (n байт доступно) или 0
+inline std::size_t utf8_sequence(const unsigned char* p, std::size_t n) {
+    const unsigned char c = p[0];
+    if (c < 0x80) {
+        return 1;
     }
-    
-    const char* ptr = data.data() + start_pos;
-    std::size_t len = data.length() - start_pos;
-    
-#ifdef __AVX2__
-    if (has_avx2() && len >= 32) {
-        __m256i target_vec = _mm256_set1_epi8(target);
-        const char* end = ptr + len;
-        const char* aligned_start = ptr + ((32 - (reinterpret_cast<std::uintptr_t>(ptr) & 31)) & 31);
-        const char* aligned_end = ptr + (len & ~31);
-        
-        // Обработка невыровненных байтов в начале
-        while (ptr < aligned_start && ptr < end) {
-            if (*ptr == target) {
-                return ptr - data.data();
-            }
-            ptr++;
-        }
-        
-        // AVX2 обработка выровненных блоков
-        while (ptr < aligned_end) {
-            __m256i data_vec = _mm256_load_si256(reinterpret_cast<const __m256i*>(ptr));
-            __m256i cmp = _mm256_cmpeq_epi8(data_vec, target_vec);
-            int mask = _mm256_movemask_epi8(cmp);
-            
-            if (mask != 0) {
-                // Найден символ
-                int index = find_first_set_bit(mask);
-                return ptr + index - data.data();
-            }
-            
-            ptr += 32;
+    if (c < 0xC2) {
+        // Продолжающий байт или overlong двухбайтовая последовательность
+        return 0;
+    }
+    if (c < 0xE0) {
+        return n >= 2 && (p[1] & 0xC0) == 0x80 ? 2 : 0;
+    }
+    if (c < 0xF0) {
+        if (n < 3 || (p[2] & 0xC0) != 0x80) {
+            return 0;
         }
-        
-        // Обработка оставшихся байтов
-        while (ptr < end) {
-            if (*ptr == target) {
-                return ptr - data.data();
-            }
-            ptr++;
+        // E0: без overlong, ED: без суррогатов
+        const unsigned char lo = c == 0xE0 ? 0xA0 : 0x80;
+        const unsigned char hi = c == 0xED ? 0x9F : 0xBF;
+        return p[1] >= lo && p[1] <= hi ? 3 : 0;
+    }
+    if (c < 0xF5) {
+        if (n < 4 || (p[2] & 0xC0) != 0x80 || (p[3] & 0xC0) != 0x80) {
+            return 0;
         }
-        
-        return std::string_view::npos;
+        // F0: без overlong, F4: не больше U+10FFFF
+        const unsigned char lo = c == 0xF0 ? 0x90 : 0x80;
+        const unsigned char hi = c == 0xF4 ? 0x8F : 0xBF;
+        return p[1] >= lo && p[1] <= hi ? 4 : 0;
     }
-#endif
+    return 0;
+}
 
-#ifdef __SSE4_2__
-    if (has_sse42() && len >= 16) {
-        __m128i target_vec = _mm_set1_epi8(target);
-        const char* end = ptr + len;
-        const char* aligned_start = ptr + ((16 - (reinterpret_cast<std::uintptr_t>(ptr) & 15)) & 15);
-        const char* aligned_end = ptr + (len & ~15);
-        
-        // Обработка невыровненных байтов
-        while (ptr < aligned_start && ptr < end) {
-            if (*ptr == target) {
-                return ptr - data.data();
-            }
-            ptr++;
-        }
-        
-        // SSE4.2 обработка выровненных блоков
-        while (ptr < aligned_end) {
-            __m128i data_vec = _mm_load_si128(reinterpret_cast<const __m128i*>(ptr));
-            __m128i cmp = _mm_cmpeq_epi8(data_vec, target_vec);
-            int mask = _mm_movemask_epi8(cmp);
-            
-            if (mask != 0) {
-                int index = find_first_set_bit(mask);
-                return ptr + index - data.data();
-            }
-            
-            ptr += 16;
-        }
-        
-        // Обработка оставшихся байтов
-        while (ptr < end) {
-            if (*ptr == target) {
-                return ptr - data.data();
-            }
-            ptr++;
-        }
-        
+} // namespace
+
+// Скалярный вариант: работает на любом процессоре
+namespace scalar {
+
+std::size_t find_char(std::string_view data, char target, std::size_t start_pos) {
+    const void* found = std::memchr(data.data() + start_pos, target, data.size() - start_pos);
+    if (!found) {
         return std::string_view::npos;
     }
-#endif
+    return static_cast<std::size_t>(static_cast<const char*>(found) - data.data());
+}
 
-    // Fallback на стандартный поиск
-    const char* result = static_cast<const char*>(std::memchr(ptr, target, len));
-    if (result) {
-        return result - data.data();
+std::size_t find_any_char(std::string_view data, char a, char b, std::size_t start_pos) {
+    for (std::size_t i = start_pos; i < data.size(); ++i) {
+        if (data[i] == a || data[i] == b) {
+            return i;
+        }
     }
     return std::string_view::npos;
 }
 
-std::size_t find_any_char_simd(std::string_view data, char delim, char quote, std::size_t start_pos) {
-    if (start_pos >= data.length()) {
-        return std::string_view::npos;
+void find_all_chars(std::string_view data, char target, std::vector<std::size_t>& positions,
+                    std::size_t start_pos) {
+    for (std::size_t i = start_pos; i < data.size(); ++i) {
+        if (data[i] == target) {
+            positions.push_back(i);
+        }
     }
-    
-    const char* ptr = data.data() + start_pos;
-    std::size_t len = data.length() - start_pos;
-    
-#ifdef __AVX2__
-    if (has_avx2() && len >= 32) {
-        __m256i delim_vec = _mm256_set1_epi8(delim);
-        __m256i quote_vec = _mm256_set1_epi8(quote);
-        const char* end = ptr + len;
-        const char* aligned_start = ptr + ((32 - (reinterpret_cast<std::uintptr_t>(ptr) & 31)) & 31);
-        const char* aligned_end = ptr + (len & ~31);
-        
-        // Обработка невыровненных байтов
-        while (ptr < aligned_start && ptr < end) {
-            if (*ptr == delim || *ptr == quote) {
-                return ptr - data.data();
-            }
-            ptr++;
+}
+
+std::size_t count_chars(std::string_view data, char target) {
+    return static_cast<std::size_t>(std::count(data.begin(), data.end(), target));
+}
+
+bool is_ascii(std::string_view data) {
+    for (char c : data) {
+        if (static_cast<unsigned char>(c) >= 0x80) {
+            return false;
         }
-        
-        // AVX2 обработка - ищем оба символа одновременно
-        while (ptr < aligned_end) {
-            __m256i data_vec = _mm256_load_si256(reinterpret_cast<const __m256i*>(ptr));
-            __m256i cmp_delim = _mm256_cmpeq_epi8(data_vec, delim_vec);
-            __m256i cmp_quote = _mm256_cmpeq_epi8(data_vec, quote_vec);
-            __m256i cmp_any = _mm256_or_si256(cmp_delim, cmp_quote);
-            int mask = _mm256_movemask_epi8(cmp_any);
-            
-            if (mask != 0) {
-                int index = find_first_set_bit(mask);
-                return ptr + index - data.data();
-            }
-            
-            ptr += 32;
+    }
+    return true;
+}
+
+std::size_t validate_utf8(std::string_view data) {
+    const auto* ptr = reinterpret_cast<const unsigned char*>(data.data());
+    std::size_t i = 0;
+    while (i < data.size()) {
+        std::size_t n = utf8_sequence(ptr + i, data.size() - i);
+        if (n == 0) {
+            return i;
         }
-        
-        // Оставшиеся байты
-        while (ptr < end) {
-            if (*ptr == delim || *ptr == quote) {
-                return ptr - data.data();
-            }
-            ptr++;
+        i += n;
+    }
+    return data.size();
+}
+
+void index_structurals(std::string_view data, std::size_t begin, std::size_t end, char quote, char delim,
+                       StructuralState& state, std::vector<std::uint64_t>& out) {
+    for (std::size_t i = begin; i < end; ++i) {
+        char c = data[i];
+        if (c == quote) {
+            state.in_quotes = !state.in_quotes;
+            state.quote_seen = true;
+        } else if (!state.in_quotes && (c == delim || c == '\n' || c == '\r')) {
+            out.push_back(i | (state.quote_seen ? STRUCTURAL_QUOTED : 0));
+            state.quote_seen = false;
         }
-        
-        return std::string_view::npos;
     }
+}
+
+} // namespace scalar
+
+#ifdef FASTCSV_X86
+
+FASTCSV_TARGET_BEGIN("sse4.2,popcnt")
+namespace sse42 {
+
+constexpr std::size_t kWidth = 16;
+
+inline std::uint64_t block_eq(const char* ptr, char c) {
+    __m128i data = _mm_loadu_si128(reinterpret_cast<const __m128i*>(ptr));
+    return static_cast<std::uint32_t>(_mm_movemask_epi8(_mm_cmpeq_epi8(data, _mm_set1_epi8(c))));
+}
+
+inline std::uint64_t block_eq2(const char* ptr, char a, char b) {
+    __m128i data = _mm_loadu_si128(reinterpret_cast<const __m128i*>(ptr));
+    __m128i any = _mm_or_si128(_mm_cmpeq_epi8(data, _mm_set1_epi8(a)), _mm_cmpeq_epi8(data, _mm_set1_epi8(b)));
+    return static_cast<std::uint32_t>(_mm_movemask_epi8(any));
+}
+
+inline std::uint64_t block_high(const char* ptr) {
+    // Байт >= 0x80 имеет установленный старший бит - movemask собирает именно его
+    __m128i data = _mm_loadu_si128(reinterpret_cast<const __m128i*>(ptr));
+    return static_cast<std::uint32_t>(_mm_movemask_epi8(data));
+}
+
+// PCLMULQDQ не входит в SSE4.2, поэтому префиксный XOR - сдвигами
+inline std::uint64_t prefix_xor(std::uint64_t mask) {
+    mask ^= mask << 1;
+    mask ^= mask << 2;
+    mask ^= mask << 4;
+    mask ^= mask << 8;
+    mask ^= mask << 16;
+    mask ^= mask << 32;
+    return mask;
+}
+
+#include "simd_kernels.inl"
+
+} // namespace sse42
+FASTCSV_TARGET_END
+
+FASTCSV_TARGET_BEGIN("avx2,popcnt,pclmul")
+namespace avx2 {
+
+constexpr std::size_t kWidth = 32;
+
+inline std::uint64_t block_eq(const char* ptr, char c) {
+    __m256i data = _mm256_loadu_si256(reinterpret_cast<const __m256i*>(ptr));
+    return static_cast<std::uint32_t>(_mm256_movemask_epi8(_mm256_cmpeq_epi8(data, _mm256_set1_epi8(c))));
+}
+
+inline std::uint64_t block_eq2(const char* ptr, char a, char b) {
+    __m256i data = _mm256_loadu_si256(reinterpret_cast<const __m256i*>(ptr));
+    __m256i any = _mm256_or_si256(_mm256_cmpeq_epi8(data, _mm256_set1_epi8(a)),
+                                  _mm256_cmpeq_epi8(data, _mm256_set1_epi8(b)));
+    return static_cast<std::uint32_t>(_mm256_movemask_epi8(any));
+}
+
+inline std::uint64_t block_high(const char* ptr) {
+    __m256i data = _mm256_loadu_si256(reinterpret_cast<const __m256i*>(ptr));
+    return static_cast<std::uint32_t>(_mm256_movemask_epi8(data));
+}
+
+// Префиксный XOR - carry-less умножение маски на число из одних единиц
+inline std::uint64_t prefix_xor(std::uint64_t mask) {
+    __m128i product = _mm_clmulepi64_si128(_mm_set_epi64x(0, static_cast<long long>(mask)), _mm_set1_epi8(-1), 0);
+    return static_cast<std::uint64_t>(_mm_cvtsi128_si64(product));
+}
+
+#include "simd_kernels.inl"
+
+} // namespace avx2
+FASTCSV_TARGET_END
+
+FASTCSV_TARGET_BEGIN("avx512f,avx512bw,popcnt,pclmul")
+namespace avx512 {
+
+constexpr std::size_t kWidth = 64;
+
+inline std::uint64_t block_eq(const char* ptr, char c) {
+    __m512i data = _mm512_loadu_si512(ptr);
+    return _mm512_cmpeq_epi8_mask(data, _mm512_set1_epi8(c));
+}
+
+inline std::uint64_t block_eq2(const char* ptr, char a, char b) {
+    __m512i data = _mm512_loadu_si512(ptr);
+    return _mm512_cmpeq_epi8_mask(data, _mm512_set1_epi8(a)) | _mm512_cmpeq_epi8_mask(data, _mm512_set1_epi8(b));
+}
+
+inline std::uint64_t block_high(const char* ptr) {
+    return _mm512_movepi8_mask(_mm512_loadu_si512(ptr));
+}
+
+// Префиксный XOR - carry-less умножение маски на число из одних единиц
+inline std::uint64_t prefix_xor(std::uint64_t mask) {
+    __m128i product = _mm_clmulepi64_si128(_mm_set_epi64x(0, static_cast<long long>(mask)), _mm_set1_epi8(-1), 0);
+    return static_cast<std::uint64_t>(_mm_cvtsi128_si64(product));
+}
+
+#include "simd_kernels.inl"
+
+} // namespace avx512
+FASTCSV_TARGET_END
+
+#endif // FASTCSV_X86
+
+namespace {
+
+// Таблица функций активного варианта
+struct Kernels {
+    SimdLevel level;
+    std::size_t (*find_char)(std::string_view, char, std::size_t);
+    std::size_t (*find_any_char)(std::string_view, char, char, std::size_t);
+    void (*find_all_chars)(std::string_view, char, std::vector<std::size_t>&, std::size_t);
+    std::size_t (*count_chars)(std::string_view, char);
+    bool (*is_ascii)(std::string_view);
+    std::size_t (*validate_utf8)(std::string_view);
+    void (*index_structurals)(std::string_view, std::size_t, std::size_t, char, char, StructuralState&,
+                              std::vector<std::uint64_t>&);
+};
+
+#define FASTCSV_KERNELS(level, ns) \
+    Kernels{level, ns::find_char, ns::find_any_char, ns::find_all_chars, ns::count_chars, ns::is_ascii, \
+            ns::validate_utf8, ns::index_structurals}
+
+Kernels make_kernels(SimdLevel level) {
+    switch (level) {
+#ifdef FASTCSV_X86
+        case SIMD_AVX512:
+            return FASTCSV_KERNELS(SIMD_AVX512, avx512);
+        case SIMD_AVX2:
+            return FASTCSV_KERNELS(SIMD_AVX2, avx2);
+        case SIMD_SSE42:
+            return FASTCSV_KERNELS(SIMD_SSE42, sse42);
 #endif
+        default:
+            return FASTCSV_KERNELS(SIMD_SCALAR, scalar);
+    }
+}
 
-#ifdef __SSE4_2__
-    if (has_sse42() && len >= 16) {
-        __m128i delim_vec = _mm_set1_epi8(delim);
-        __m128i quote_vec = _mm_set1_epi8(quote);
-        const char* end = ptr + len;
-        const char* aligned_start = ptr + ((16 - (reinterpret_cast<std::uintptr_t>(ptr) & 15)) & 15);
-        const char* aligned_end = ptr + (len & ~15);
-        
-        // Обработка невыровненных байтов
-        while (ptr < aligned_start && ptr < end) {
-            if (*ptr == delim || *ptr == quote) {
-                return ptr - data.data();
-            }
-            ptr++;
-        }
-        
-        // SSE4.2 обработка
-        while (ptr < aligned_end) {
-            __m128i data_vec = _mm_load_si128(reinterpret_cast<const __m128i*>(ptr));
-            __m128i cmp_delim = _mm_cmpeq_epi8(data_vec, delim_vec);
-            __m128i cmp_quote = _mm_cmpeq_epi8(data_vec, quote_vec);
-            __m128i cmp_any = _mm_or_si128(cmp_delim, cmp_quote);
-            int mask = _mm_movemask_epi8(cmp_any);
-            
-            if (mask != 0) {
-                int index = find_first_set_bit(mask);
-                return ptr + index - data.data();
-            }
-            
-            ptr += 16;
-        }
-        
-        // Оставшиеся байты
-        while (ptr < end) {
-            if (*ptr == delim || *ptr == quote) {
-                return ptr - data.data();
-            }
-            ptr++;
-        }
-        
-        return std::string_view::npos;
+#undef FASTCSV_KERNELS
+
+#ifdef FASTCSV_X86
+void cpuid(unsigned leaf, unsigned subleaf, unsigned regs[4]) {
+#ifdef _MSC_VER
+    int out[4];
+    __cpuidex(out, static_cast<int>(leaf), static_cast<int>(subleaf));
+    for (int i = 0; i < 4; ++i) {
+        regs[i] = static_cast<unsigned>(out[i]);
     }
+#else
+    __cpuid_count(leaf, subleaf, regs[0], regs[1], regs[2], regs[3]);
 #endif
+}
 
-    // Fallback - ищем оба символа по очереди
-    std::size_t delim_pos = find_char_simd(data, delim, start_pos);
-    std::size_t quote_pos = find_char_simd(data, quote, start_pos);
-    
-    if (delim_pos == std::string_view::npos) {
-        return quote_pos;
+// Регистры, состояние которых сохраняет ОС (XCR0)
+std::uint64_t read_xcr0() {
+#ifdef _MSC_VER
+    return _xgetbv(0);
+#else
+    unsigned eax, edx;
+    __asm__ volatile("xgetbv" : "=a"(eax), "=d"(edx) : "c"(0));
+    return (static_cast<std::uint64_t>(edx) << 32) | eax;
+#endif
+}
+#endif
+
+SimdLevel detect() {
+#ifdef FASTCSV_X86
+    unsigned regs[4];
+    cpuid(0, 0, regs);
+    unsigned max_leaf = regs[0];
+    if (max_leaf < 1) {
+        return SIMD_SCALAR;
     }
-    if (quote_pos == std::string_view::npos) {
-        return delim_pos;
+
+    cpuid(1, 0, regs);
+    const unsigned ecx1 = regs[2];
+    const bool sse42 = (ecx1 & (1u << 20)) && (ecx1 & (1u << 23));  // SSE4.2 + POPCNT
+    if (!sse42) {
+        return SIMD_SCALAR;
+    }
+    // AVX требует поддержки ОС: XSAVE включен и регистры XMM/YMM сохраняются
+    const bool osxsave = (ecx1 & (1u << 27)) && (ecx1 & (1u << 28));
+    if (!osxsave || max_leaf < 7) {
+        return SIMD_SSE42;
+    }
+    const std::uint64_t xcr0 = read_xcr0();
+    if ((xcr0 & 0x6) != 0x6) {
+        return SIMD_SSE42;
     }
-    
-    return std::min(delim_pos, quote_pos);
-}
 
-void find_all_chars_simd(std::string_view data, char target, std::vector<std::size_t>& positions, std::size_t start_pos) {
-    if (start_pos >= data.length()) {
-        return;
+    cpuid(7, 0, regs);
+    const unsigned ebx7 = regs[1];
+    const bool pclmul = ecx1 & (1u << 1);
+    if (!(ebx7 & (1u << 5)) || !pclmul) {  // AVX2 (+ PCLMULQDQ для префиксного XOR)
+        return SIMD_SSE42;
     }
-    
-    const char* ptr = data.data() + start_pos;
-    std::size_t len = data.length() - start_pos;
-    positions.clear();
-    positions.reserve(len / 10); // Предполагаем примерно 1 разделитель на 10 символов
-    
-#ifdef __AVX2__
-    if (has_avx2() && len >= 32) {
-        __m256i target_vec = _mm256_set1_epi8(target);
-        const char* end = ptr + len;
-        const char* aligned_start = ptr + ((32 - (reinterpret_cast<std::uintptr_t>(ptr) & 31)) & 31);
-        const char* aligned_end = ptr + (len & ~31);
-        
-        // Обработка невыровненных байтов в начале
-        while (ptr < aligned_start && ptr < end) {
-            if (*ptr == target) {
-                positions.push_back(ptr - data.data());
-            }
-            ptr++;
-        }
-        
-        // AVX2 обработка выровненных блоков
-        while (ptr < aligned_end) {
-            __m256i data_vec = _mm256_load_si256(reinterpret_cast<const __m256i*>(ptr));
-            __m256i cmp = _mm256_cmpeq_epi8(data_vec, target_vec);
-            int mask = _mm256_movemask_epi8(cmp);
-            
-            // Обрабатываем все найденные символы в этом блоке
-            while (mask != 0) {
-                int index = find_first_set_bit(mask);
-                positions.push_back(ptr + index - data.data());
-                mask &= mask - 1; // Убираем обработанный бит
-            }
-            
-            ptr += 32;
-        }
-        
-        // Обработка оставшихся байтов
-        while (ptr < end) {
-            if (*ptr == target) {
-                positions.push_back(ptr - data.data());
-            }
-            ptr++;
-        }
-        
-        return;
+    // AVX-512: F + BW и сохранение регистров opmask/ZMM
+    if ((ebx7 & (1u << 16)) && (ebx7 & (1u << 30)) && (xcr0 & 0xE6) == 0xE6) {
+        return SIMD_AVX512;
     }
+    return SIMD_AVX2;
+#else
+    return SIMD_SCALAR;
 #endif
+}
 
-#ifdef __SSE4_2__
-    if (has_sse42() && len >= 16) {
-        __m128i target_vec = _mm_set1_epi8(target);
-        const char* end = ptr + len;
-        const char* aligned_start = ptr + ((16 - (reinterpret_cast<std::uintptr_t>(ptr) & 15)) & 15);
-        const char* aligned_end = ptr + (len & ~15);
-        
-        // Обработка невыровненных байтов
-        while (ptr < aligned_start && ptr < end) {
-            if (*ptr == target) {
-                positions.push_back(ptr - data.data());
-            }
-            ptr++;
-        }
-        
-        // SSE4.2 обработка
-        while (ptr < aligned_end) {
-            __m128i data_vec = _mm_load_si128(reinterpret_cast<const __m128i*>(ptr));
-            __m128i cmp = _mm_cmpeq_epi8(data_vec, target_vec);
-            int mask = _mm_movemask_epi8(cmp);
-            
-            while (mask != 0) {
-                int index = find_first_set_bit(mask);
-                positions.push_back(ptr + index - data.data());
-                mask &= mask - 1;
-            }
-            
-            ptr += 16;
-        }
-        
-        // Оставшиеся байты
-        while (ptr < end) {
-            if (*ptr == target) {
-                positions.push_back(ptr - data.data());
-            }
-            ptr++;
-        }
-        
-        return;
+const SimdLevel g_detected = detect();
+// Выбирается при загрузке модуля
+Kernels g_kernels = make_kernels(g_detected);
+
+} // namespace
+
+SimdLevel simd_level() {
+    return g_kernels.level;
+}
+
+SimdLevel detected_simd_level() {
+    return g_detected;
+}
+
+SimdLevel set_simd_level(SimdLevel level) {
+    g_kernels = make_kernels(std::min(level, g_detected));
+    return g_kernels.level;
+}
+
+const char* simd_level_name(SimdLevel level) {
+    switch (level) {
+        case SIMD_AVX512:
+            return "avx512";
+        case SIMD_AVX2:
+            return "avx2";
+        case SIMD_SSE42:
+            return "sse4.2";
+        default:
+            return "scalar";
     }
-#endif
+}
 
-    // Fallback - простой поиск
-    for (std::size_t i = start_pos; i < data.length(); ++i) {
-        if (data[i] == target) {
-            positions.push_back(i);
-        }
+std::size_t find_char_simd(std::string_view data, char target, std::size_t start_pos) {
+    if (start_pos >= data.length()) {
+        return std::string_view::npos;
     }
+    return g_kernels.find_char(data, target, start_pos);
 }
 
-std::size_t count_chars_simd(std::string_view data, char target) {
-    std::size_t count = 0;
-    const char* ptr = data.data();
-    std::size_t len = data.length();
-    
-#ifdef __AVX2__
-    if (has_avx2() && len >= 32) {
-        __m256i target_vec = _mm256_set1_epi8(target);
-        const char* end = ptr + len;
-        const char* aligned_end = ptr + (len & ~31);
-        
-        while (ptr < aligned_end) {
-            __m256i data_vec = _mm256_load_si256(reinterpret_cast<const __m256i*>(ptr));
-            __m256i cmp = _mm256_cmpeq_epi8(data_vec, target_vec);
-            int mask = _mm256_movemask_epi8(cmp);
-            count += count_bits(mask);
-            ptr += 32;
-        }
-        
-        // Оставшиеся байты
-        while (ptr < end) {
-            if (*ptr == target) count++;
-            ptr++;
-        }
-        
-        return count;
+std::size_t find_any_char_simd(std::string_view data, char delim, char quote, std::size_t start_pos) {
+    if (start_pos >= data.length()) {
+        return std::string_view::npos;
     }
-#endif
+    return g_kernels.find_any_char(data, delim, quote, start_pos);
+}
 
-    // Fallback
-    return std::count(data.begin(), data.end(), target);
+void find_all_chars_simd(std::string_view data, char target, std::vector<std::size_t>& positions, std::size_t start_pos) {
+    if (start_pos >= data.length()) {
+        return;
+    }
+    positions.clear();
+    positions.reserve((data.length() - start_pos) / 10); // Предполагаем примерно 1 разделитель на 10 символов
+    g_kernels.find_all_chars(data, target, positions, start_pos);
+}
+
+std::size_t count_chars_simd(std::string_view data, char target) {
+    return g_kernels.count_chars(data, target);
 }
 
 bool is_ascii_simd(std::string_view data) {
-    if (data.empty()) {
-        return true;
-    }
-    
-    const char* ptr = data.data();
-    std::size_t len = data.length();
-    
-    // ASCII: все байты должны быть < 128 (0x80)
-    // Проверяем, что нет байтов >= 0x80
-    
-#ifdef __AVX2__
-    if (has_avx2() && len >= 32) {
-        const char* end = ptr + len;
-        const char* aligned_end = ptr + (len & ~31);
-        
-        // Обрабатываем выровненные блоки
-        while (ptr < aligned_end) {
-            __m256i data_vec = _mm256_loadu_si256(reinterpret_cast<const __m256i*>(ptr));
-            // Сравниваем: если data_vec >= 0x80, то не ASCII
-            // Используем сравнение с 0x7F (127) и проверяем знак
-            __m256i cmp = _mm256_cmpgt_epi8(data_vec, _mm256_set1_epi8(127));
-            int mask = _mm256_movemask_epi8(cmp);
-            
-            if (mask != 0) {
-                // Найден не-ASCII символ
-                return false;
-            }
-            
-            ptr += 32;
-        }
-        
-        // Обрабатываем оставшиеся байты
-        while (ptr < end) {
-            if (static_cast<unsigned char>(*ptr) >= 0x80) {
-                return false;
-            }
-            ptr++;
-        }
-        
-        return true;
-    }
-#endif
+    return g_kernels.is_ascii(data);
+}
 
-#ifdef __SSE4_2__
-    if (has_sse42() && len >= 16) {
-        // Создаем вектор с 0x80 для сравнения
-        __m128i threshold = _mm_set1_epi8(static_cast<char>(0x80));
-        const char* end = ptr + len;
-        const char* aligned_end = ptr + (len & ~15);
-        
-        // Обрабатываем выровненные блоки
-        while (ptr < aligned_end) {
-            __m128i data_vec = _mm_loadu_si128(reinterpret_cast<const __m128i*>(ptr));
-            // Сравниваем: если data_vec >= 0x80, то не ASCII
-            // Используем сравнение с 0x7F (127) и проверяем знак
-            __m128i cmp = _mm_cmpgt_epi8(data_vec, _mm_set1_epi8(127));
-            int mask = _mm_movemask_epi8(cmp);
-            
-            if (mask != 0) {
-                // Найден не-ASCII символ (>= 0x80)
-                return false;
-            }
-            
-            ptr += 16;
-        }
-        
-        // Обрабатываем оставшиеся байты
-        while (ptr < end) {
-            if (static_cast<unsigned char>(*ptr) >= 0x80) {
-                return false;
-            }
-            ptr++;
-        }
-        
-        return true;
-    }
-#endif
+std::size_t validate_utf8_simd(std::string_view data) {
+    return g_kernels.validate_utf8(data);
+}
 
-    // Fallback: простая проверка
-    for (std::size_t i = 0; i < len; ++i) {
-        if (static_cast<unsigned char>(ptr[i]) >= 0x80) {
-            return false;
-        }
+TextEncoding classify_text(std::string_view data) {
+    if (g_kernels.is_ascii(data)) {
+        return TEXT_ASCII;
     }
-    
-    return true;
+    return g_kernels.validate_utf8(data) == data.size() ? TEXT_UTF8 : TEXT_MIXED;
+}
+
+void index_structurals(std::string_view data, std::size_t begin, std::size_t end, char quote, char delim,
+                       StructuralState& state, std::vector<std::uint64_t>& out) {
+    g_kernels.index_structurals(data, begin, std::min(end, data.size()), quote, delim, state, out);
 }
 
 } // namespace simd
 } // namespace fastcsv
-
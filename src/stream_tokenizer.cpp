@@ -0,0 +1,80 @@
+#include "fastcsv/stream_tokenizer.hpp"
+#include "fastcsv/simd_utils.hpp"
+
+namespace fastcsv {
+
+std::size_t RecordScanner::scan(std::string_view data) {
+    std::size_t pos = scanned_;
+    while (pos < data.size()) {
+        std::size_t next = simd::find_any_char_simd(data, quote_, '\n', pos);
+        if (next == std::string_view::npos) {
+            break;
+        }
+        // Экранированные кавычки "" переключают состояние дважды и не влияют на результат
+        if (data[next] == quote_) {
+            in_quotes_ = !in_quotes_;
+        } else if (!in_quotes_) {
+            last_end_ = next + 1;
+        }
+        pos = next + 1;
+    }
+    scanned_ = data.size();
+    return last_end_;
+}
+
+void RecordScanner::consume(std::size_t n) {
+    if (n > last_end_) {
+        n = last_end_;
+    }
+    scanned_ -= n;
+    last_end_ -= n;
+}
+
+void RecordScanner::reset() {
+    in_quotes_ = false;
+    scanned_ = 0;
+    last_end_ = 0;
+}
+
+StreamTokenizer::StreamTokenizer(const ParserConfig& config)
+    : parser_(config), scanner_(config.quote) {}
+
+std::string_view StreamTokenizer::feed(std::string_view data, bool is_final) {
+    // Область прошлого вызова уже обработана - сдвигаем хвост в начало буфера
+    if (returned_ > 0) {
+        buffer_.erase(0, returned_);
+        if (buffer_.empty()) {
+            // Поток обработан целиком (или после is_final начинается новый)
+            scanner_.reset();
+        } else {
+            scanner_.consume(returned_);
+        }
+        returned_ = 0;
+    }
+    buffer_.append(data);
+
+    std::size_t end = scanner_.scan(buffer_);
+    if (is_final) {
+        // Конец потока: последняя запись может быть без '\n'
+        end = buffer_.size();
+    }
+    returned_ = end;
+    return std::string_view(buffer_.data(), end);
+}
+
+std::vector<ParsedRow> StreamTokenizer::feed_rows(std::string_view data, bool is_final,
+                                                  std::size_t& consumed) {
+    std::string_view region = feed(data, is_final);
+    consumed = region.size();
+    if (region.empty()) {
+        return {};
+    }
+    return parser_.parse_chunk(region);
+}
+
+const RowBatch& StreamTokenizer::parse_region(std::string_view region) {
+    parser_.parse_batch(region, batch_);
+    return batch_;
+}
+
+} // namespace fastcsv
@@ -0,0 +1,110 @@
+#include "fastcsv/transcode.hpp"
+
+namespace fastcsv {
+
+namespace {
+
+inline void put_code_point(char32_t cp, char*& dst) {
+    if (cp < 0x80) {
+        *dst++ = static_cast<char>(cp);
+    } else if (cp < 0x800) {
+        *dst++ = static_cast<char>(0xC0 | (cp >> 6));
+        *dst++ = static_cast<char>(0x80 | (cp & 0x3F));
+    } else if (cp < 0x10000) {
+        *dst++ = static_cast<char>(0xE0 | (cp >> 12));
+        *dst++ = static_cast<char>(0x80 | ((cp >> 6) & 0x3F));
+        *dst++ = static_cast<char>(0x80 | (cp & 0x3F));
+    } else {
+        *dst++ = static_cast<char>(0xF0 | (cp >> 18));
+        *dst++ = static_cast<char>(0x80 | ((cp >> 12) & 0x3F));
+        *dst++ = static_cast<char>(0x80 | ((cp >> 6) & 0x3F));
+        *dst++ = static_cast<char>(0x80 | (cp & 0x3F));
+    }
+}
+
+constexpr char32_t REPLACEMENT = 0xFFFD;
+
+} // namespace
+
+Utf16Decoder::Utf16Decoder(ByteOrder order) : initial_order_(order), order_(order) {}
+
+void Utf16Decoder::reset() {
+    order_ = initial_order_;
+    pending_byte_ = -1;
+    high_surrogate_ = 0;
+}
+
+void Utf16Decoder::put_unit(char16_t unit, char*& dst) {
+    if (high_surrogate_) {
+        if (unit >= 0xDC00 && unit <= 0xDFFF) {
+            char32_t cp = 0x10000 + ((static_cast<char32_t>(high_surrogate_) - 0xD800) << 10) + (unit - 0xDC00);
+            high_surrogate_ = 0;
+            put_code_point(cp, dst);
+            return;
+        }
+        high_surrogate_ = 0;
+        put_code_point(REPLACEMENT, dst);
+    }
+    if (unit >= 0xD800 && unit <= 0xDBFF) {
+        high_surrogate_ = unit;
+    } else if (unit >= 0xDC00 && unit <= 0xDFFF) {
+        put_code_point(REPLACEMENT, dst);
+    } else {
+        put_code_point(unit, dst);
+    }
+}
+
+void Utf16Decoder::decode(std::string_view data, bool is_final, std::string& out) {
+    const auto* src = reinterpret_cast<const unsigned char*>(data.data());
+    std::size_t size = data.size();
+    // Одна кодовая единица (2 байта) дает не больше 3 байт UTF-8, пара (4 байта) - 4 байта;
+    // плюс перенесенный байт и U+FFFD в конце
+    std::size_t start = out.size();
+    out.resize(start + (size / 2 + 2) * 3 + 3);
+    char* dst = &out[start];
+
+    std::size_t i = 0;
+    auto take = [&](unsigned char a, unsigned char b) {
+        if (order_ == DETECT) {
+            order_ = a == 0xFE && b == 0xFF ? BIG : LITTLE;
+            if ((a == 0xFF && b == 0xFE) || order_ == BIG) {
+                return;  // BOM
+            }
+        }
+        char16_t unit = order_ == BIG ? static_cast<char16_t>(a << 8 | b) : static_cast<char16_t>(b << 8 | a);
+        put_unit(unit, dst);
+    };
+
+    if (pending_byte_ >= 0 && size > 0) {
+        take(static_cast<unsigned char>(pending_byte_), src[0]);
+        pending_byte_ = -1;
+        i = 1;
+    }
+    if (order_ == DETECT && i + 2 <= size) {
+        take(src[i], src[i + 1]);
+        i += 2;
+    }
+    const std::size_t lo = order_ == BIG ? 1 : 0;
+    for (; i + 2 <= size; i += 2) {
+        // ASCII - основной случай для CSV: без проверок суррогатов
+        if (src[i + 1 - lo] == 0 && src[i + lo] < 0x80 && !high_surrogate_) {
+            *dst++ = static_cast<char>(src[i + lo]);
+            continue;
+        }
+        take(src[i], src[i + 1]);
+    }
+    if (i < size) {
+        pending_byte_ = src[i];
+    }
+
+    if (is_final) {
+        if (pending_byte_ >= 0 || high_surrogate_) {
+            put_code_point(REPLACEMENT, dst);
+        }
+        pending_byte_ = -1;
+        high_surrogate_ = 0;
+    }
+    out.resize(static_cast<std::size_t>(dst - out.data()));
+}
+
+} // namespace fastcsv
@@ -0,0 +1,34 @@
+"""
+Общие фикстуры тестов
+"""
+
+import itertools
+
+import pytest
+import fastcsv
+from fastcsv import _native
+
+
+@pytest.fixture
+def tmp_csv(tmp_path):
+    """Создает временный файл и возвращает путь: tmp_csv(content, encoding='utf-8', suffix='.csv')
+
+    content - str (записывается в encoding без перевода концов строк) или bytes.
+    Файлы удаляются вместе с tmp_path.
+    """
+    counter = itertools.count()
+
+    def write(content, encoding='utf-8', suffix='.csv'):
+        path = tmp_path / f'data{next(counter)}{suffix}'
+        path.write_bytes(content if isinstance(content, bytes) else content.encode(encoding))
+        return str(path)
+
+    return write
+
+
+@pytest.fixture
+def restore_simd_level():
+    """Возвращает исходный SIMD вариант после теста"""
+    level = fastcsv.simd_level()
+    yield
+    _native.set_simd_level(level)
@@ -0,0 +1,109 @@
+"""
+Тесты для асинхронного reader (fastcsv.aio.AsyncReader)
+"""
+
+import asyncio
+import csv
+import io
+
+import pytest
+import fastcsv.aio
+
+
+def _sample(rows=20000):
+    """CSV с многострочными полями и не-ASCII символами"""
+    lines = [f'{i},"multi\nline, ""{i}""",ü{i}' if i % 7 == 0 else f'{i},plain,x' for i in range(rows)]
+    return '\n'.join(lines) + '\n'
+
+
+def _stream(data: bytes, piece=1000):
+    """asyncio.StreamReader, в который данные поступают частями из отдельной задачи"""
+    stream = asyncio.StreamReader()
+
+    async def feed():
+        for start in range(0, len(data), piece):
+            stream.feed_data(data[start:start + piece])
+            await asyncio.sleep(0)
+        stream.feed_eof()
+
+    return stream, asyncio.ensure_future(feed())
+
+
+class _CountingStream:
+    """Поток с корутиной read(n), считающий запросы"""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+        self.reads = 0
+
+    async def read(self, n):
+        self.reads += 1
+        chunk = self.data[self.pos:self.pos + n]
+        self.pos += len(chunk)
+        return chunk
+
+
+def test_async_rows_same_as_csv():
+    """Тест async for: строки совпадают с csv.reader, данные поступают мелкими частями"""
+    data = _sample()
+
+    async def main():
+        stream, feeder = _stream(data.encode('utf-8'))
+        reader = fastcsv.aio.AsyncReader(stream, chunk_size=4096)
+        rows = [row async for row in reader]
+        await feeder
+        return rows, reader.line_num
+
+    rows, line_num = asyncio.run(main())
+    assert rows == list(csv.reader(io.StringIO(data)))
+    assert line_num == len(rows)
+
+
+def test_async_batches_and_convert():
+    """Тест batches(size) после частичного обхода и convert="""
+    data = _sample(5000)
+
+    async def main():
+        reader = fastcsv.aio.AsyncReader(_CountingStream(data.encode('utf-8')), chunk_size=10000,
+                                         convert={0: int})
+        first = await reader.__anext__()
+        batches = [rows async for rows in reader.batches(777)]
+        return first, batches
+
+    first, batches = asyncio.run(main())
+    assert first[0] == 0
+    assert all(len(rows) == 777 for rows in batches[:-1])
+    rows = [first] + [row for rows in batches for row in rows]
+    assert [row[0] for row in rows] == list(range(5000))
+
+
+def test_async_backpressure():
+    """Тест: медленный потребитель - reader не читает поток дальше max_pending блоков"""
+    data = _sample().encode('utf-8')
+
+    async def main():
+        stream = _CountingStream(data)
+        async with fastcsv.aio.AsyncReader(stream, chunk_size=1024, max_pending=2) as reader:
+            await reader.__anext__()
+            await asyncio.sleep(0.2)
+            reads = stream.reads
+        return reads, len(data) // 1024
+
+    reads, total = asyncio.run(main())
+    assert reads <= 5 < total
+
+
+def test_async_errors():
+    """Тест: ошибка чтения потока поднимается у потребителя; неверные параметры - ValueError"""
+    class Broken:
+        async def read(self, n):
+            raise ConnectionResetError("peer closed")
+
+    async def main():
+        return [row async for row in fastcsv.aio.AsyncReader(Broken())]
+
+    with pytest.raises(ConnectionResetError):
+        asyncio.run(main())
+    with pytest.raises(ValueError):
+        fastcsv.aio.AsyncReader(Broken(), chunk_size=0)
@@ -0,0 +1,51 @@
+"""
+Тесты для выдачи строк блоками (batches) и итерации по блокам
+"""
+
+import pytest
+import fastcsv
+import csv
+import io
+
+
+def test_reader_batches_large_stringio():
+    """Тест batches() для потока из нескольких блоков: размеры списков и порядок строк"""
+    data = ''.join(f'{i},"v{i}",x\n' for i in range(100000))
+    expected = list(csv.reader(io.StringIO(data)))
+
+    batches = list(fastcsv.reader(io.StringIO(data)).batches(size=30000))
+
+    assert [len(batch) for batch in batches] == [30000, 30000, 30000, 10000]
+    assert [row for batch in batches for row in batch] == expected
+
+
+def test_reader_batches_after_next():
+    """Тест batches() после частичного чтения через __next__ и для маленького файла"""
+    rows = [[str(i), 'a'] for i in range(10)]
+    data = ''.join(','.join(row) + '\n' for row in rows)
+
+    r = fastcsv.reader(io.StringIO(data))
+    assert next(r) == rows[0]
+    assert list(r.batches(4)) == [rows[1:5], rows[5:9], rows[9:]]
+    assert r.line_num == 10
+
+    with pytest.raises(ValueError):
+        fastcsv.reader(io.StringIO(data)).batches(0)
+
+
+@pytest.mark.parametrize("parallel", [1, 2])
+def test_mmap_reader_batches(parallel, tmp_csv):
+    """Тест mmap_reader: __next__ и batches() дают одни и те же строки"""
+    temp_path = tmp_csv(''.join(f'{i},{i * 2}\n' for i in range(300000)))
+    with fastcsv.mmap_reader(temp_path, parallel=parallel) as reader:
+        first = next(reader)
+        batches = list(reader.batches(size=65536))
+    assert first == ['0', '0']
+    assert all(len(batch) == 65536 for batch in batches[:-1])
+    rows = [row for batch in batches for row in batch]
+    assert len(rows) == 299999
+    assert rows[0] == ['1', '2'] and rows[-1] == ['299999', '599998']
+
+    with fastcsv.mmap_reader(temp_path, parallel=parallel) as reader:
+        assert sum(1 for _ in reader) == 300000
+        assert reader.line_num == 300000
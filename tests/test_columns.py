@@ -0,0 +1,62 @@
+"""
+Тесты для колоночного режима read_columns
+"""
+
+import pytest
+import fastcsv
+import array
+import math
+
+
+def test_read_columns_typed(tmp_csv):
+    """Тест типизированных колонок по именам из заголовка"""
+    temp_path = tmp_csv('id,temp,name\n1,2.5,a\n2, 3e2 ,"b,c"\n\n-3,nan,ü\n')
+    columns = fastcsv.read_columns(temp_path, dtypes={'id': int, 'temp': 'float64'})
+
+    assert list(columns) == ['id', 'temp', 'name']
+    assert isinstance(columns['id'], array.array)
+    assert columns['id'].typecode == 'q'
+    assert columns['id'].tolist() == [1, 2, -3]
+    assert columns['temp'].typecode == 'd'
+    assert columns['temp'][:2].tolist() == [2.5, 300.0]
+    assert math.isnan(columns['temp'][2])
+    assert isinstance(columns['name'], fastcsv.StringColumn)
+    assert columns['name'].tolist() == ['a', 'b,c', 'ü']
+    assert columns['name'][-1] == 'ü'
+
+
+def test_read_columns_without_header(tmp_csv):
+    """Тест header=False и dtypes списком"""
+    temp_path = tmp_csv('1;x\n2;y\n')
+    columns = fastcsv.read_columns(temp_path, dtypes=[int, None], header=False, delimiter=';')
+
+    assert len(columns) == 2
+    assert columns[0].tolist() == [1, 2]
+    assert columns[1].tolist() == ['x', 'y']
+
+
+def test_read_columns_large_file(tmp_csv):
+    """Тест файла из нескольких блоков: совпадает с построчным чтением"""
+    lines = ['id,value,comment']
+    for i in range(200000):
+        comment = f'"line {i},\nnext"' if i % 7 == 0 else f'c{i}'
+        lines.append(f'{i},{i * 0.5},{comment}')
+    temp_path = tmp_csv('\n'.join(lines) + '\n')
+    columns = fastcsv.read_columns(temp_path, dtypes={'id': 'int64', 'value': 'float64'})
+    with fastcsv.mmap_reader(temp_path) as reader:
+        rows = list(reader)[1:]
+
+    assert columns['id'].tolist() == [int(row[0]) for row in rows]
+    assert columns['value'].tolist() == [float(row[1]) for row in rows]
+    assert columns['comment'].tolist() == [row[2] for row in rows]
+
+
+def test_read_columns_errors(tmp_csv):
+    """Тест ошибок преобразования и неверных dtypes"""
+    temp_path = tmp_csv('id,name\n1,a\nx,b\n')
+    with pytest.raises(ValueError, match="cannot convert 'x' to int64"):
+        fastcsv.read_columns(temp_path, dtypes={'id': int})
+    with pytest.raises(ValueError, match="unknown column"):
+        fastcsv.read_columns(temp_path, dtypes={'missing': int})
+    with pytest.raises(ValueError, match="unsupported type"):
+        fastcsv.read_columns(temp_path, dtypes={'id': 'int8'})
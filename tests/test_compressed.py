@@ -0,0 +1,145 @@
+"""
+Тесты для сжатых файлов: чтение (open_reader, reader по файлам gzip / bz2 / lzma)
+и запись (writer / DictWriter с compression=)
+"""
+
+import pytest
+import fastcsv
+import bz2
+import csv
+import gzip
+import io
+import lzma
+import threading
+
+
+def _text(rows=60000):
+    """CSV с многострочными полями в кавычках: записи пересекают границы блоков"""
+    return ''.join(f'{i},"line {i}\nnext ""{i}""",Київ\n' if i % 9 == 0 else f'{i},v{i},Київ\n'
+                   for i in range(rows))
+
+
+def _compress(text, compression):
+    data = text.encode('utf-8')
+    if compression == 'gzip':
+        # Несколько членов gzip подряд (как после cat a.gz b.gz)
+        half = len(data) // 2
+        return gzip.compress(data[:half]) + gzip.compress(data[half:])
+    if compression == 'bz2':
+        return bz2.compress(data)
+    return lzma.compress(data)
+
+
+@pytest.mark.parametrize("threaded", [True, False])
+@pytest.mark.parametrize("compression", ['gzip', 'bz2', 'xz'])
+def test_open_reader_compressed(compression, threaded, tmp_csv):
+    """Тест open_reader: формат по сигнатуре (имя файла без расширения), строки как у csv.reader"""
+    text = _text()
+    path = tmp_csv(_compress(text, compression), suffix='.data')
+    with fastcsv.open_reader(path, threaded=threaded, block_size=65536) as reader:
+        rows = list(reader)
+    assert rows == list(csv.reader(io.StringIO(text)))
+    with fastcsv.open_reader(path, compression=compression, threaded=threaded,
+                             usecols=[2, 0], stats=True) as reader:
+        assert list(reader)[:2] == [['Київ', '0'], ['Київ', '1']]
+        assert reader.stats()['bytes'] == len(text.encode('utf-8'))
+
+
+def test_open_reader_plain_file_uses_mmap(tmp_csv):
+    """Тест: несжатый файл открывается mmap_reader"""
+    text = _text(1000)
+    path = tmp_csv(text.encode('utf-8'))
+    with fastcsv.open_reader(path) as reader:
+        assert isinstance(reader, fastcsv.mmap_reader)
+        assert list(reader) == list(csv.reader(io.StringIO(text)))
+
+
+def test_open_reader_errors(tmp_csv):
+    """Тест: ошибка распаковки в потоке передается читателю, неверный compression - ValueError"""
+    data = gzip.compress(_text(20000).encode('utf-8'))
+    path = tmp_csv(data[:len(data) // 2])
+    with pytest.raises(EOFError):
+        with fastcsv.open_reader(path, threaded=True, block_size=4096) as reader:
+            list(reader)
+    with pytest.raises(ValueError):
+        fastcsv.open_reader(path, compression='rar')
+
+
+def test_open_reader_close_stops_thread(tmp_csv):
+    """Тест: close() до конца файла останавливает поток распаковки"""
+    path = tmp_csv(gzip.compress(_text(100000).encode('utf-8')))
+    before = threading.active_count()
+    reader = fastcsv.open_reader(path, threaded=True, block_size=4096, max_pending=1)
+    assert next(iter(reader)) == ['0', 'line 0\nnext "0"', 'Київ']
+    reader.close()
+    assert threading.active_count() == before
+
+
+def test_open_reader_zstd(tmp_csv):
+    """Тест zstd (если установлен zstandard)"""
+    zstandard = pytest.importorskip('zstandard')
+    text = _text(5000)
+    path = tmp_csv(zstandard.ZstdCompressor().compress(text.encode('utf-8')))
+    with fastcsv.open_reader(path) as reader:
+        assert list(reader) == list(csv.reader(io.StringIO(text)))
+
+
+@pytest.mark.parametrize("mode", ['rt', 'rb'])
+def test_reader_over_compressed_file_object(mode, tmp_csv):
+    """Тест reader(gzip.open(...)): разбираются распакованные данные, а не сжатый файл по name"""
+    text = _text()
+    path = tmp_csv(gzip.compress(text.encode('utf-8')), suffix='.csv.gz')
+    with gzip.open(path, mode, **({'encoding': 'utf-8', 'newline': ''} if mode == 'rt' else {})) as f:
+        assert list(fastcsv.reader(f)) == list(csv.reader(io.StringIO(text)))
+
+
+@pytest.mark.parametrize("threaded", [True, False])
+@pytest.mark.parametrize("compression,module", [('gzip', gzip), ('bz2', bz2), ('xz', lzma)])
+def test_writer_compression(compression, module, threaded):
+    """Тест writer(compression=): вывод совпадает с csv.writer после распаковки"""
+    rows = [[i, f'name {i}', 'Москва, "центр"', i * 1.5] for i in range(100000)]
+    out = io.BytesIO()
+    with fastcsv.writer(out, compression=compression, threaded=threaded, compresslevel=1) as w:
+        w.writerow(['id', 'name', 'city', 'value'])
+        w.writerows(rows)
+    expected = io.StringIO()
+    std = csv.writer(expected, lineterminator='\n')
+    std.writerow(['id', 'name', 'city', 'value'])
+    std.writerows(rows)
+    assert module.decompress(out.getvalue()).decode('utf-8') == expected.getvalue()
+
+
+def test_dict_writer_compression_round_trip(tmp_csv):
+    """Тест DictWriter(compression='gzip') в файл и чтение open_reader"""
+    path = tmp_csv(b'', suffix='.csv.gz')
+    with open(path, 'wb') as f, fastcsv.DictWriter(f, ['id', 'text'], compression='gzip',
+                                                   encoding='cp1251') as w:
+        w.writeheader()
+        w.writerows({'id': i, 'text': f'строка\n{i}'} for i in range(5000))
+    with fastcsv.open_reader(path, encoding='cp1251') as reader:
+        rows = list(reader)
+    assert rows[0] == ['id', 'text'] and rows[1:] == [[str(i), f'строка\n{i}'] for i in range(5000)]
+
+
+def test_writer_compression_errors():
+    """Тест: текстовый файл, неизвестный формат, запись после close() и ошибка записи в потоке"""
+    with pytest.raises(ValueError):
+        fastcsv.writer(io.StringIO(), compression='gzip')
+    with pytest.raises(ValueError):
+        fastcsv.writer(io.BytesIO(), compression='rar')
+
+    w = fastcsv.writer(io.BytesIO(), compression='gzip')
+    w.close()
+    with pytest.raises(ValueError):
+        w.writerow(['a'])
+
+    class Broken(io.RawIOBase):
+        def writable(self):
+            return True
+
+        def write(self, data):
+            raise OSError('disk full')
+
+    with pytest.raises(OSError):
+        with fastcsv.writer(Broken(), compression='gzip', threaded=True, compresslevel=0) as w:
+            w.writerows([['x' * 1000]] * 5000)
@@ -0,0 +1,76 @@
+"""
+Тесты для конвертации полей (convert=) и QUOTE_NONNUMERIC
+"""
+
+import pytest
+import fastcsv
+import tempfile
+import datetime
+import csv
+import io
+import os
+
+
+DATA = (
+    "id,price,ok,day,name\n"
+    "1,2.5,true,2024-01-31,x\n"
+    "2,,False,2024-02-01,\n"
+    "3,4,TRUE,2024-02-03,z\n"
+)
+
+
+def test_reader_convert_infer():
+    """Тест вывода типов колонок: заголовок остается строками, пустые значения - None"""
+    rows = list(fastcsv.reader(io.StringIO(DATA), convert=True))
+
+    assert rows[0] == ["id", "price", "ok", "day", "name"]
+    assert rows[1] == [1, 2.5, True, datetime.date(2024, 1, 31), "x"]
+    assert rows[2] == [2, None, False, datetime.date(2024, 2, 1), ""]
+    assert rows[3] == [3, 4.0, True, datetime.date(2024, 2, 3), "z"]
+
+
+def test_reader_convert_explicit():
+    """Тест явных конвертеров по индексам и по позициям"""
+    rows = list(fastcsv.reader(io.StringIO(DATA), convert={0: int, 1: float}))
+    assert rows[1] == [1, 2.5, "true", "2024-01-31", "x"]
+    assert rows[2] == [2, None, "False", "2024-02-01", ""]
+
+    rows = list(fastcsv.reader(io.StringIO("7;yes\n"), convert=[int, bool], delimiter=";"))
+    # "yes" не является bool - значение остается строкой
+    assert rows == [[7, "yes"]]
+
+    with pytest.raises(ValueError):
+        fastcsv.reader(io.StringIO(DATA), convert={0: complex}).__next__()
+
+
+def test_mmap_reader_convert():
+    """Тест convert= в mmap_reader и DictReader поверх него"""
+    lines = ["id,value,label"] + [f"{i},{i / 4},item{i}" for i in range(50000)]
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False, newline="") as f:
+        f.write("\n".join(lines) + "\n")
+        temp_path = f.name
+
+    try:
+        with fastcsv.mmap_reader(temp_path, convert=True) as reader:
+            rows = list(reader)
+        assert rows[0] == ["id", "value", "label"]
+        assert rows[1:] == [[i, i / 4, f"item{i}"] for i in range(50000)]
+
+        with fastcsv.mmap_reader(temp_path, parallel=2, convert={0: int}) as reader:
+            rows = list(reader)
+        assert rows[-1] == [49999, "12499.75", "item49999"]
+    finally:
+        os.unlink(temp_path)
+
+
+@pytest.mark.parametrize("repeat", [1, 2000])
+def test_quote_nonnumeric(repeat):
+    """Тест QUOTE_NONNUMERIC: совпадает со стандартным csv модулем"""
+    data = '1,"a",,2.5\n"x, y",3\n' * repeat
+
+    expected = list(csv.reader(io.StringIO(data), quoting=csv.QUOTE_NONNUMERIC))
+    rows = list(fastcsv.reader(io.StringIO(data), quoting=fastcsv.QUOTE_NONNUMERIC))
+    assert rows == expected
+
+    with pytest.raises(ValueError, match="could not convert string to float"):
+        list(fastcsv.reader(io.StringIO("x,1\n" * repeat), quoting=fastcsv.QUOTE_NONNUMERIC))
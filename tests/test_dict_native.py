@@ -0,0 +1,147 @@
+"""
+Тесты для построения словарей DictReader в C++
+"""
+
+import pytest
+import fastcsv
+from fastcsv import _native
+import csv
+import io
+
+
+def _text(rows=3000):
+    """CSV с заголовком, кавычками, многострочными полями и строками разной длины"""
+    lines = ['id,name,"city, region",amount']
+    for i in range(rows):
+        if i % 97 == 0:
+            lines.append(f'{i},short')
+        elif i % 89 == 0:
+            lines.append(f'{i},long{i},city{i % 5},{i * 0.5},extra1,extra2')
+        else:
+            name = f'"name\n{i}"' if i % 7 == 0 else f'name{i}'
+            lines.append(f'{i},{name},"city ""{i % 5}""",{i * 0.5}')
+    return '\n'.join(lines) + '\n'
+
+
+def test_dict_reader_matches_csv():
+    """Тест DictReader: словари как у csv.DictReader, restkey/restval, fieldnames и line_num"""
+    text = _text()
+    expected = list(csv.DictReader(io.StringIO(text), restkey='rest', restval='-'))
+    reader = fastcsv.DictReader(io.StringIO(text), restkey='rest', restval='-')
+    # Как и раньше, имена колонок из заголовка известны после первого чтения
+    assert reader.fieldnames is None
+    rows = list(reader)
+    assert reader.fieldnames == ['id', 'name', 'city, region', 'amount']
+    assert rows == expected
+    assert reader.line_num == len(expected) + 1
+
+
+def test_dict_reader_large_file(tmp_csv):
+    """Тест DictReader по открытому файлу больше 512KB (reader читает его через mmap_reader)"""
+    text = _text(60000)
+    assert len(text.encode('utf-8')) > 524288
+    expected = list(csv.DictReader(io.StringIO(text), restkey='rest', restval='-'))
+    path = tmp_csv(text)
+    with open(path, newline='') as f:
+        reader = fastcsv.DictReader(f, restkey='rest', restval='-')
+        assert next(reader) == expected[0]
+        assert reader.line_num == 2
+        rows = [expected[0]] + list(reader)
+    assert reader.fieldnames == ['id', 'name', 'city, region', 'amount']
+    assert rows == expected
+    assert reader.line_num == len(expected) + 1
+
+
+@pytest.mark.parametrize("parallel", [1, 3])
+def test_mmap_dict_reader_matches_csv(parallel, tmp_csv):
+    """Тест mmap_DictReader на нескольких блоках и parallel, batches()"""
+    text = _text(60000)
+    expected = list(csv.DictReader(io.StringIO(text), restkey='rest', restval='-'))
+    path = tmp_csv(text)
+    with fastcsv.mmap_DictReader(path, parallel=parallel, restkey='rest', restval='-') as reader:
+        assert list(reader) == expected
+    with fastcsv.mmap_DictReader(path, restkey='rest', restval='-') as reader:
+        batches = list(reader.batches(7000))
+    assert [len(batch) for batch in batches[:-1]] == [7000] * (len(batches) - 1)
+    assert [row for batch in batches for row in batch] == expected
+
+
+def test_keys_are_shared_between_rows():
+    """Тест: ключи всех словарей - одни и те же объекты строк"""
+    rows = list(fastcsv.DictReader(io.StringIO(_text(100)), restkey='rest'))
+    assert all(a is b for a, b in zip(rows[1], rows[50]))
+
+
+def test_missing_and_extra_fields():
+    """Тест: restval=None не добавляет ключи, лишние поля без restkey - Error"""
+    rows = list(fastcsv.DictReader(io.StringIO('a,b,c\n1\n1,2,3,4\n'), restkey='more'))
+    assert rows == [{'a': '1'}, {'a': '1', 'b': '2', 'c': '3', 'more': ['4']}]
+    reader = fastcsv.DictReader(io.StringIO('a,b\n1,2\n1,2,3\n'), fieldnames=['a', 'b'])
+    with pytest.raises(fastcsv.Error, match='Too many fields'):
+        list(reader)
+
+
+def test_set_fieldnames(tmp_csv):
+    """Тест: fieldnames можно присвоить до чтения (заголовок - данные) и во время чтения"""
+    text = 'a,b\n1,2\n3,4\n'
+    for make in (csv.DictReader, fastcsv.DictReader):
+        reader = make(io.StringIO(text))
+        reader.fieldnames = ['x', 'y']
+        assert list(reader) == [{'x': 'a', 'y': 'b'}, {'x': '1', 'y': '2'}, {'x': '3', 'y': '4'}]
+        assert reader.fieldnames == ['x', 'y']
+
+        reader = make(io.StringIO(text))
+        assert next(reader) == {'a': '1', 'b': '2'}
+        reader.fieldnames = ['x', 'y']
+        assert list(reader) == [{'x': '3', 'y': '4'}]
+
+    path = tmp_csv(text)
+    with fastcsv.mmap_DictReader(path) as reader:
+        reader.fieldnames = ['x', 'y']
+        assert next(reader) == {'x': 'a', 'y': 'b'}
+        assert reader.line_num == 1
+    with fastcsv.mmap_DictReader(path) as reader:
+        assert next(reader) == {'a': '1', 'b': '2'}
+        reader.fieldnames = ['x', 'y']
+        assert list(reader) == [{'x': '3', 'y': '4'}]
+
+
+def _read_until_error(reader):
+    rows = []
+    with pytest.raises(fastcsv.Error, match='Too many fields'):
+        for row in reader:
+            rows.append(row)
+    return rows
+
+
+@pytest.mark.parametrize("parallel", [1, 3])
+def test_rows_before_too_many_fields(parallel, tmp_csv):
+    """Тест: строки блока до строки с лишними полями выдаются, ошибка - на этой строке"""
+    reader = fastcsv.DictReader(io.StringIO('a,b\n1,2\n3,4\n5,6,7\n8,9\n'))
+    assert _read_until_error(reader) == [{'a': '1', 'b': '2'}, {'a': '3', 'b': '4'}]
+
+    text = 'a,b\n' + ''.join(f'{i},{i}\n' for i in range(100000)) + '1,2,3\n4,5\n'
+    expected = [{'a': str(i), 'b': str(i)} for i in range(100000)]
+    assert _read_until_error(fastcsv.DictReader(io.StringIO(text))) == expected
+    path = tmp_csv(text)
+    with fastcsv.mmap_DictReader(path, parallel=parallel) as reader:
+        assert _read_until_error(reader) == expected
+    with fastcsv.mmap_DictReader(path, parallel=parallel) as reader:
+        batches = []
+        with pytest.raises(fastcsv.Error, match='Too many fields'):
+            for batch in reader.batches(30000):
+                batches.extend(batch)
+        assert batches == expected
+
+
+def test_parse_chunk_to_dicts():
+    """Тест _native.parse_chunk_to_dicts: имена из первой строки или из fieldnames"""
+    parser = _native.CSVParser(_native.ParserConfig())
+    data = 'a,b\n1,"x\ny"\n2\n'
+    assert _native.parse_chunk_to_dicts(parser, data) == [{'a': '1', 'b': 'x\ny'}, {'a': '2'}]
+    assert _native.parse_chunk_to_dicts(parser, data, ['k', 'v'], restval='') == [
+        {'k': 'a', 'v': 'b'}, {'k': '1', 'v': 'x\ny'}, {'k': '2', 'v': ''}]
+    assert _native.parse_chunk_to_dicts(parser, '1,2,3\n', ['k'], restkey='rest') == [
+        {'k': '1', 'rest': ['2', '3']}]
+    with pytest.raises(ValueError):
+        _native.parse_chunk_to_dicts(parser, '1,2\n', ['k'])
@@ -2,7 +2,9 @@
 
 import pytest
 import fastcsv
+import csv
 import io
+import tempfile
 
 
 def test_empty_file():
@@ -117,3 +119,15 @@ def test_unicode_characters():
 
 
 
+
+
+def test_large_text_stream_without_path():
+    """Тест большого текстового потока без пути (>500KB): разбирается целиком"""
+    text = ''.join(f'{i},"v {i}",x\n' for i in range(60000))
+    expected = list(csv.reader(io.StringIO(text)))
+    stream = io.TextIOWrapper(io.BytesIO(text.encode('utf-8')), encoding='utf-8', newline='')
+    assert list(fastcsv.reader(stream)) == expected
+    with tempfile.TemporaryFile('w+', encoding='utf-8', newline='') as f:
+        f.write(text * 2)
+        f.seek(0)
+        assert list(fastcsv.reader(f)) == expected * 2
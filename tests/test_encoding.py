@@ -0,0 +1,88 @@
+"""
+Тесты для чтения файлов в разных кодировках (encoding=)
+"""
+
+import pytest
+import fastcsv
+from fastcsv import _native
+import csv
+import io
+import random
+
+
+def _text(rows=3000):
+    """CSV с кириллицей, многострочными полями и кавычками"""
+    return ''.join(f'{i},"Привет, мир {i}\nещё ""{i}""",Ёж\n' for i in range(rows))
+
+
+@pytest.mark.parametrize("encoding", ['cp1251', 'koi8-r', 'utf-16', 'utf-16-le', 'utf-16-be',
+                                      'utf-8-sig', 'utf-32', 'utf-8'])
+def test_reader_bytes_mode(encoding):
+    """Тест reader(..., encoding=) для бинарного файла: результат как у csv.reader по тексту"""
+    text = _text()
+    rows = list(fastcsv.reader(io.BytesIO(text.encode(encoding)), encoding=encoding))
+    assert rows == list(csv.reader(io.StringIO(text)))
+
+
+@pytest.mark.parametrize("parallel", [1, 3])
+def test_mmap_reader_single_byte_encoding(parallel, tmp_csv):
+    """Тест mmap_reader(encoding='cp1251'): таблица символов, parallel и index работают"""
+    text = _text(100000)
+    path = tmp_csv(text.encode('cp1251'))
+    with fastcsv.mmap_reader(path, encoding='cp1251', parallel=parallel) as reader:
+        assert list(reader) == list(csv.reader(io.StringIO(text)))
+
+    fastcsv.build_index(path, every=100)
+    with fastcsv.mmap_reader(path, encoding='cp1251', index=True) as reader:
+        assert reader.rows(5000, 5002) == [[str(i), f'Привет, мир {i}\nещё "{i}"', 'Ёж']
+                                           for i in (5000, 5001)]
+
+
+def test_mmap_reader_utf16_across_blocks(tmp_csv):
+    """Тест UTF-16 больше блока mmap_reader: пары суррогатов и записи на границах блоков"""
+    text = ''.join(f'{i},"😀 {i}\n€",{"я" * (i % 50)}\n' for i in range(60000))
+    path = tmp_csv(text.encode('utf-16'))
+    with fastcsv.mmap_reader(path, encoding='utf-16') as reader:
+        assert list(reader) == list(csv.reader(io.StringIO(text)))
+    with pytest.raises(ValueError):
+        fastcsv.mmap_reader(path, encoding='utf-16', parallel=2)
+
+
+def test_undefined_bytes_replaced():
+    """Тест: байты, которых нет в кодировке, заменяются на U+FFFD, как errors='replace';
+    encoding= с текстовым файлом - TypeError"""
+    data = b'a,\x98b\n'
+    assert list(fastcsv.reader(io.BytesIO(data), encoding='cp1251')) == [['a', '�b']]
+    assert list(fastcsv.reader(io.BytesIO(data), encoding='ascii')) == [['a', '�b']]
+    with pytest.raises(TypeError):
+        list(fastcsv.reader(io.StringIO('a,b\n'), encoding='cp1251'))
+
+
+def test_utf16_decoder_matches_python():
+    """Тест Utf16Decoder: части произвольной длины, BOM и непарные суррогаты как у codecs"""
+    rng = random.Random(16)
+    units = ['a', 'я', '€', '😀', ',', '\n']
+    for _ in range(500):
+        text = ''.join(rng.choice(units) for _ in range(rng.randrange(60)))
+        for byteorder, encoding in (('', 'utf-16'), ('little', 'utf-16-le'), ('big', 'utf-16-be')):
+            data = text.encode(encoding)
+            if rng.random() < 0.3:
+                # Непарный суррогат или обрезанный конец
+                data += rng.choice([b'\x00\xd8', b'\x00\xdc', b'\x41'])
+            decoder = _native.Utf16Decoder(byteorder)
+            out = b''
+            pos = 0
+            while pos < len(data):
+                step = rng.randrange(1, 8)
+                out += decoder.decode(data[pos:pos + step])
+                pos += step
+            out += decoder.decode(b'', True)
+            assert out.decode('utf-8') == data.decode(encoding, 'replace')
+
+
+def test_reader_text_file_switches_to_mmap_with_its_encoding(tmp_csv):
+    """Тест: большой текстовый файл в cp1251 читается через mmap_reader в кодировке файла"""
+    text = _text(40000)
+    path = tmp_csv(text.encode('cp1251'))
+    with open(path, encoding='cp1251', newline='') as f:
+        assert list(fastcsv.reader(f)) == list(csv.reader(io.StringIO(text)))
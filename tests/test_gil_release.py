@@ -0,0 +1,89 @@
+"""
+Тесты для отпускания GIL во время нативной токенизации
+"""
+
+import pytest
+import fastcsv
+from fastcsv import _native
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import tempfile
+import time
+import sys
+import csv
+import os
+
+
+DATA = ''.join(f'{i},"abc","d, e",{i * 2.5}\n' for i in range(200000))
+
+
+def _progress_during(fn):
+    """Сколько итераций сделал другой Python поток, пока выполнялся fn()
+
+    Интервал переключения GIL увеличен, поэтому поток получает GIL только если
+    нативный код отпускает его сам.
+    """
+    counter = [0]
+    stop = [False]
+
+    def spin():
+        while not stop[0]:
+            counter[0] += 1
+            time.sleep(0)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(10)
+    thread = threading.Thread(target=spin)
+    thread.start()
+    try:
+        time.sleep(0.01)
+        before = counter[0]
+        fn()
+        return counter[0] - before
+    finally:
+        stop[0] = True
+        sys.setswitchinterval(interval)
+        thread.join()
+
+
+@pytest.mark.parametrize("name", ["parse_chunk", "parse_chunk_to_python", "parse_buffer_to_python",
+                                  "StreamTokenizer.feed"])
+def test_parsing_releases_gil(name):
+    """Тест: во время токенизации другие потоки Python выполняются"""
+    parser = _native.CSVParser(_native.ParserConfig())
+    encoded = DATA.encode()
+    calls = {
+        "parse_chunk": lambda: parser.parse_chunk(DATA),
+        "parse_chunk_to_python": lambda: _native.parse_chunk_to_python(parser, DATA),
+        "parse_buffer_to_python": lambda: _native.parse_buffer_to_python(parser, encoded, 0, len(encoded), True),
+        "StreamTokenizer.feed": lambda: _native.StreamTokenizer(_native.ParserConfig()).feed(encoded, True),
+    }
+    assert _progress_during(calls[name]) > 0
+
+
+def test_thread_pool_many_files():
+    """Тест: параллельное чтение нескольких файлов в ThreadPoolExecutor дает те же строки"""
+    paths = []
+    for n in range(6):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+            f.write(''.join(f'{n},{i},"x\n{i}"\n' for i in range(30000)))
+            paths.append(f.name)
+
+    def read_file(path):
+        with fastcsv.mmap_reader(path) as reader:
+            mapped = list(reader)
+        with open(path, newline='') as f:
+            streamed = list(fastcsv.reader(f))
+        return mapped, streamed
+
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(read_file, paths))
+        for path, (mapped, streamed) in zip(paths, results):
+            with open(path, newline='') as f:
+                expected = list(csv.reader(f))
+            assert mapped == expected
+            assert streamed == expected
+    finally:
+        for path in paths:
+            os.unlink(path)
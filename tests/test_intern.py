@@ -0,0 +1,76 @@
+"""
+Тесты для кэша строк колонок (intern=)
+"""
+
+import pytest
+import fastcsv
+from fastcsv import _native
+import csv
+import io
+import os
+import tempfile
+
+
+def _text(rows=5000):
+    """CSV с низкокардинальными колонками (статус, город) и уникальной колонкой"""
+    statuses = ['active', 'pending', 'closed']
+    cities = ['Москва', 'Berlin', 'Київ']
+    return ''.join(f'{i},{statuses[i % 3]},{cities[i % 3]},id-{i}\n' for i in range(rows))
+
+
+def test_reader_repeated_values_are_same_object():
+    """Тест reader(intern=[...]): повторяющиеся значения - один объект, значения как у csv"""
+    text = _text()
+    rows = list(fastcsv.reader(io.StringIO(text), intern=[1, 2]))
+    assert rows == list(csv.reader(io.StringIO(text)))
+    assert rows[1][1] is rows[4][1]
+    assert rows[2][2] is rows[4001][2]
+    # Колонки без intern не кэшируются
+    rows = list(fastcsv.reader(io.StringIO('xy,ab\nxy,ab\n'), intern=[1]))
+    assert rows[0][1] is rows[1][1]
+    assert rows[0][0] is not rows[1][0]
+
+
+@pytest.mark.parametrize("parallel", [1, 2])
+def test_mmap_reader_intern_all(parallel):
+    """Тест mmap_reader(intern=True): все колонки, в том числе не-ASCII и cp1251"""
+    text = _text(50000)
+    for encoding in ('utf-8', 'cp1251'):
+        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as f:
+            f.write(text.encode(encoding))
+            path = f.name
+        try:
+            with fastcsv.mmap_reader(path, parallel=parallel, encoding=encoding, intern=True) as reader:
+                rows = list(reader)
+            assert rows == list(csv.reader(io.StringIO(text)))
+            assert rows[0][2] is rows[49998][2]
+            assert rows[1][1] is rows[40000][1]
+        finally:
+            os.unlink(path)
+
+
+def test_converter_hits_and_long_fields():
+    """Тест FieldConverter: intern_hits, поля длиннее 64 байт не кэшируются, вместе с convert="""
+    long_value = 'x' * 65
+    data = ''.join(f'{i},{long_value},{"ab"[i % 2]}\n' for i in range(100))
+    config = _native.ParserConfig()
+    parser = _native.CSVParser(config)
+    converter = _native.FieldConverter([_native.ConvertKind.INT], _native.ConvertKind.STR, 0,
+                                       False, [0, 1, 2])
+    rows = _native.parse_chunk_to_python(parser, data, converter)
+    assert [row[0] for row in rows] == list(range(100))
+    assert rows[0][1] == rows[1][1] == long_value
+    assert rows[0][1] is not rows[1][1]
+    assert rows[0][2] is rows[2][2]
+    # Колонка 0 конвертируется в int, в кэш попадает только колонка 2
+    assert converter.intern_hits == 98
+
+
+def test_intern_with_convert_and_errors():
+    """Тест intern вместе с convert= (строковые значения кэшируются); неверный intern - ValueError"""
+    rows = list(fastcsv.reader(io.StringIO('1,a\n2,a\n,a\n'), convert={0: int}, intern=True))
+    assert rows == [[1, 'a'], [2, 'a'], [None, 'a']]
+    assert rows[0][1] is rows[2][1]
+    for bad in ([-1], ['a'], 3, [1.5]):
+        with pytest.raises(ValueError):
+            fastcsv.reader(io.StringIO('a\n'), intern=bad)
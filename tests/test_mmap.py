@@ -94,14 +94,6 @@ def test_mmap_reader_quoted_fields():
     try:
         reader = fastcsv.mmap_reader(temp_path)
         rows = list(reader)
-        # #region agent log
-        import json
-        try:
-            with open(r"c:\Users\Admin\PycharmProjects\FastCSV\.cursor\debug.log", 'a', encoding='utf-8') as f:
-                f.write(json.dumps({"sessionId": "debug-session", "runId": "run1", "hypothesisId": "B", "location": "tests/test_mmap.py:95", "message": "Test results", "data": {"num_rows": len(rows), "rows": rows}, "timestamp": __import__('time').time() * 1000}) + "\n")
-        except: pass
-        # #endregion
-
         assert len(rows) == 3
         assert rows[0] == ["name", "description"]
         assert rows[1] == ["John", "Hello, world"]
@@ -231,3 +223,72 @@ def test_mmap_reader_dialect():
         os.unlink(temp_path)
         fastcsv.unregister_dialect('pipe')
 
+
+
+def test_mmap_reader_parallel():
+    """Тест mmap_reader с parallel=N: тот же результат, что и csv модуль, в порядке файла"""
+    import csv
+    
+    # Файл >256KB, чтобы блок делился на несколько частей;
+    # многострочные поля в кавычках попадают на границы частей
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        for i in range(20000):
+            row = [f"val{i}", f"val{i+1}", f"val{i+2}"]
+            if i % 5 == 0:
+                row[1] = f'multi\nline "{i}", field'
+            writer.writerow(row)
+        temp_path = f.name
+    
+    try:
+        with open(temp_path, newline='') as f:
+            expected = list(csv.reader(f))
+        
+        with fastcsv.mmap_reader(temp_path, parallel=4) as reader:
+            rows = list(reader)
+        
+        assert len(rows) == 20000
+        assert rows == expected
+    finally:
+        os.unlink(temp_path)
+
+
+def test_mmap_reader_records_across_chunks():
+    """Тест многострочных полей на границах 1MB блоков (парсинг прямо из mmap)"""
+    import csv
+    
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        for i in range(60000):
+            if i % 3 == 0:
+                writer.writerow([f"id{i}", f'text "{i}",\nsecond line', "x" * 20])
+            else:
+                writer.writerow([f"id{i}", f"value{i}", "y" * 20])
+        temp_path = f.name
+    
+    try:
+        with open(temp_path, newline='') as f:
+            expected = list(csv.reader(f))
+        
+        with fastcsv.mmap_reader(temp_path) as reader:
+            rows = list(reader)
+        
+        assert os.path.getsize(temp_path) > 2 * 1048576
+        assert rows == expected
+    finally:
+        os.unlink(temp_path)
+
+
+def test_mmap_reader_latin1_fallback():
+    """Тест mmap_reader с не-UTF-8 файлом: поля декодируются как latin-1"""
+    with tempfile.NamedTemporaryFile(mode='wb', suffix='.csv', delete=False) as f:
+        f.write("name,city\ncafé,Zürich\n".encode('latin-1'))
+        temp_path = f.name
+    
+    try:
+        with fastcsv.mmap_reader(temp_path) as reader:
+            rows = list(reader)
+        
+        assert rows == [["name", "city"], ["café", "Zürich"]]
+    finally:
+        os.unlink(temp_path)
@@ -0,0 +1,84 @@
+"""
+Тесты для профилирования этапов разбора (CSVParser.profiling / profile())
+"""
+
+import pytest
+from fastcsv import _native
+from concurrent.futures import ThreadPoolExecutor
+import mmap
+import os
+import tempfile
+
+
+def _parser():
+    parser = _native.CSVParser(_native.ParserConfig())
+    parser.profiling = True
+    return parser
+
+
+def test_profile_counts_and_phases():
+    """Тест profile(): записи с кавычками и без, поля, разбор кавычек и создание строк"""
+    data = 'a,b\n"x ""1""",y\nc,"d\ne"\n1,2'
+    parser = _parser()
+    rows = _native.parse_chunk_to_python(parser, data)
+    assert rows == [['a', 'b'], ['x "1"', 'y'], ['c', 'd\ne'], ['1', '2']]
+    profile = parser.profile()
+    assert profile['bytes'] == len(data)
+    assert (profile['rows'], profile['quoted_rows']) == (4, 2)
+    assert (profile['fields'], profile['quoted_fields']) == (8, 2)
+    assert profile['unescaped_bytes'] == len('"x ""1"""') + len('"d\ne"')
+    assert profile['materialized_rows'] == 4
+    for phase in ('scan', 'unquoted_rows', 'quoted_rows', 'unescape', 'materialize'):
+        assert profile[phase + '_time'] > 0
+        assert profile['ticks'][phase] > 0
+    assert profile['clock'] in ('rdtsc', 'steady_clock')
+
+    parser.reset_profile()
+    assert parser.profile()['rows'] == 0
+
+
+def test_profiling_off_by_default():
+    """Тест: без profiling счетчики не ведутся"""
+    parser = _native.CSVParser(_native.ParserConfig())
+    assert parser.profiling is False
+    _native.parse_chunk_to_python(parser, 'a,"b"\n')
+    assert parser.profile()['rows'] == 0
+    assert parser.profile()['scan_time'] == 0
+
+
+@pytest.mark.parametrize("threads", [1, 4])
+def test_profile_buffer_parallel(threads):
+    """Тест: профили частей parse_buffer_parallel суммируются в профиль парсера"""
+    data = ''.join(f'{i},"v{i}",{i * 2}\n' for i in range(100000)).encode()
+    with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as f:
+        f.write(data)
+        path = f.name
+    try:
+        parser = _parser()
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            rows, consumed = _native.parse_buffer_parallel(parser, mm, 0, len(mm), threads, True)
+        assert len(rows) == 100000 and consumed == len(data)
+        profile = parser.profile()
+        assert profile['bytes'] == len(data)
+        assert profile['rows'] == profile['quoted_rows'] == profile['materialized_rows'] == 100000
+        assert profile['fields'] == 300000
+    finally:
+        os.unlink(path)
+
+
+def test_profile_shared_parser_threads():
+    """Тест: один CSVParser в нескольких потоках (разбор без GIL) - счетчики не теряются"""
+    data = ''.join(f'{i},"v""{i}",{i * 2}\n' for i in range(20000))
+    parser = _parser()
+
+    def parse(_):
+        _native.parse_chunk_to_python(parser, data)
+        parser.parse_chunk(data)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(parse, range(8)))
+    profile = parser.profile()
+    assert profile['bytes'] == 16 * len(data)
+    assert profile['rows'] == profile['quoted_rows'] == 16 * 20000
+    assert profile['fields'] == 16 * 60000 and profile['quoted_fields'] == 16 * 20000
+    assert profile['materialized_rows'] == 8 * 20000
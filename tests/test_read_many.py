@@ -0,0 +1,103 @@
+"""
+Тесты для чтения многих файлов пулом (read_many, iter_many)
+"""
+
+import pytest
+import fastcsv
+import tempfile
+import os
+import threading
+
+
+@pytest.fixture
+def shards():
+    """Файлы разного размера, включая пустой и файл с многострочными полями"""
+    paths = []
+    for n, size in enumerate([3000, 0, 1, 120000, 50]):
+        lines = [f'{n},{i},"text, {i}\nnext",ü{i}' if i % 5 == 0 else f'{n},{i},plain,x'
+                 for i in range(size)]
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False,
+                                         encoding='utf-8', newline='') as f:
+            f.write('\n'.join(lines))
+            paths.append(f.name)
+    expected = {}
+    for path in paths:
+        if os.path.getsize(path):
+            with fastcsv.mmap_reader(path) as reader:
+                expected[path] = list(reader)
+        else:
+            expected[path] = []
+    yield paths, expected
+    for path in paths:
+        os.unlink(path)
+
+
+@pytest.mark.parametrize("workers", [1, 3, 8])
+def test_iter_many_ordered_rows(shards, workers):
+    """Тест: строки с путем файла, файлы в порядке paths"""
+    paths, expected = shards
+    result = list(fastcsv.iter_many(paths, workers=workers, max_pending=1))
+    assert result == [(path, row) for path in paths for row in expected[path]]
+
+
+def test_iter_many_batches_unordered(shards):
+    """Тест: batch_size и ordered=False - строки каждого файла по порядку, блоки не длиннее batch_size"""
+    paths, expected = shards
+    got = {path: [] for path in paths}
+    for path, rows in fastcsv.iter_many(paths, workers=4, batch_size=1000, ordered=False):
+        assert 0 < len(rows) <= 1000
+        got[path].extend(rows)
+    assert got == expected
+
+
+def test_read_many(shards):
+    """Тест read_many: словарь {path: строки} в порядке paths, convert для каждого файла"""
+    paths, expected = shards
+    result = fastcsv.read_many(paths, workers=2)
+    assert list(result) == paths
+    assert result == expected
+
+    converted = fastcsv.read_many(paths[:1], convert={0: int, 1: int})
+    assert converted[paths[0]][1][:2] == [0, 1]
+
+
+@pytest.mark.parametrize("executor", ['thread', 'process'])
+def test_read_many_duplicate_paths(shards, executor):
+    """Тест read_many: повторяющийся путь читается один раз, строки не перемешиваются"""
+    paths, expected = shards
+    big = paths[3]
+    result = fastcsv.read_many([big, paths[0], big, paths[0]], workers=4, executor=executor)
+    assert list(result) == [big, paths[0]]
+    assert result[big] == expected[big]
+    assert result[paths[0]] == expected[paths[0]]
+
+
+def test_iter_many_processes(shards):
+    """Тест executor='process': тот же результат, что и с потоками"""
+    paths, expected = shards
+    result = list(fastcsv.iter_many(paths, workers=2, batch_size=500, executor='process'))
+    order = [paths.index(path) for path, _ in result]
+    assert order == sorted(order)
+    assert {path: [row for p, rows in result if p == path for row in rows] for path in paths} == expected
+
+
+def test_iter_many_error_and_early_stop(shards):
+    """Тест: ошибка чтения файла передается потребителю, прерванная итерация останавливает потоки"""
+    paths, _ = shards
+    with pytest.raises(FileNotFoundError):
+        list(fastcsv.iter_many(paths + ['missing.csv'], workers=2))
+
+    iterator = fastcsv.iter_many(paths * 20, workers=4, batch_size=10, max_pending=1)
+    next(iterator)
+    iterator.close()
+    assert not [t for t in threading.enumerate() if t.name.startswith('fastcsv-read')]
+
+
+def test_iter_many_invalid_arguments():
+    """Тест проверки параметров"""
+    with pytest.raises(ValueError):
+        fastcsv.iter_many([], workers=0)
+    with pytest.raises(ValueError):
+        fastcsv.iter_many([], batch_size=0)
+    with pytest.raises(ValueError):
+        fastcsv.iter_many([], executor='fiber')
@@ -0,0 +1,47 @@
+"""
+Тесты для создания Python строк из срезов блока (RowBatch): поля без копий и поля из arena
+"""
+
+import pytest
+import fastcsv
+from fastcsv._native import CSVParser, ParserConfig, parse_chunk_to_python, parse_buffer_to_python
+import tempfile
+import csv
+import io
+import os
+
+
+def test_non_ascii_fields():
+    """Тест: не-ASCII поля не превращаются в mojibake (ASCII проверяется для всего блока)"""
+    parser = CSVParser(ParserConfig())
+    assert parse_chunk_to_python(parser, 'x,ü\n') == [['x', 'ü']]
+
+    data = 'a,b\n' * 200000 + 'x,"ü ""q"""\n'
+    rows = parse_chunk_to_python(parser, data)
+    assert len(rows) == 200001
+    assert rows[-1] == ['x', 'ü "q"']
+    assert list(fastcsv.reader(io.StringIO('x,ü\n'), convert=True)) == [['x', 'ü']]
+
+
+def test_quoted_fields_from_arena():
+    """Тест: поля с кавычками (arena) и без (срезы данных) вперемешку, в том числе с skipinitialspace"""
+    data = ''.join(f'{i}, "a ""{i}""" ,  plain {i} ,"x\ny"\n' for i in range(5000))
+    config = ParserConfig()
+    config.skip_initial_space = True
+    rows, consumed = parse_buffer_to_python(CSVParser(config), data.encode(), 0, len(data), True)
+    assert consumed == len(data)
+    assert rows[1234] == ['1234', 'a "1234"', 'plain 1234', 'x\ny']
+
+
+def test_read_columns_quoted_strings():
+    """Тест read_columns: строковые колонки с экранированными кавычками"""
+    data = 'id,name\n' + ''.join(f'{i},"n ""{i}"""\n' for i in range(1000))
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+        f.write(data)
+        path = f.name
+    try:
+        columns = fastcsv.read_columns(path, dtypes={'id': 'int64'})
+        assert list(columns['id']) == list(range(1000))
+        assert columns['name'].tolist() == [row[1] for row in list(csv.reader(io.StringIO(data)))[1:]]
+    finally:
+        os.unlink(path)
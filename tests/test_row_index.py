@@ -0,0 +1,75 @@
+"""
+Тесты для индекса строк (build_index) и произвольного доступа через mmap_reader
+"""
+
+import pytest
+import fastcsv
+import csv
+import io
+import os
+
+
+@pytest.fixture
+def multiline_csv(tmp_csv):
+    """Файл с многострочными полями, CRLF и пустыми строками (больше сегмента сканера)"""
+    lines = []
+    for i in range(50000):
+        if i % 7 == 0:
+            lines.append(f'{i},"multi\r\nline ""{i}""",x')
+        elif i % 11 == 0:
+            lines.append('')
+        else:
+            lines.append(f'{i},plain,ü{i}')
+    data = '\r\n'.join(lines)
+    path = tmp_csv(data)
+    return path, [row if row else [''] for row in csv.reader(io.StringIO(data, newline=''))]
+
+
+@pytest.mark.parametrize("every", [1, 1000, 7777])
+def test_build_index_seek_row(multiline_csv, every):
+    """Тест seek_row / rows / len по индексу: результат совпадает с csv.reader"""
+    path, expected = multiline_csv
+    index = fastcsv.build_index(path, every=every)
+    assert len(index) == len(expected)
+    assert os.path.exists(path + '.fcidx')
+
+    with fastcsv.mmap_reader(path, index=True) as reader:
+        assert len(reader) == len(expected)
+        for n in (0, 1, 6999, 7000, 7001, 31337, len(expected) - 1):
+            reader.seek_row(n)
+            assert next(reader) == expected[n]
+            assert reader.line_num == n + 1
+        assert reader.rows(40000, 40010) == expected[40000:40010]
+        assert reader.rows(len(expected) - 3) == expected[-3:]
+        reader.seek_row(len(expected) + 5)
+        assert list(reader) == []
+
+
+def test_seek_row_without_index(tmp_csv):
+    """Тест seek_row без индекса: записи пропускаются с начала файла"""
+    path = tmp_csv(''.join(f'{i},"a\nb"\n' for i in range(1000)))
+    with fastcsv.mmap_reader(path) as reader:
+        reader.seek_row(500)
+        assert next(reader) == ['500', 'a\nb']
+        with pytest.raises(TypeError):
+            len(reader)
+        with pytest.raises(ValueError):
+            reader.seek_row(-1)
+
+
+def test_stale_index(tmp_csv):
+    """Тест: индекс измененного файла отклоняется, загруженный RowIndex передается напрямую"""
+    path = tmp_csv('a,b\n1,2\n3,4\n')
+    index_path = path + '.idx'
+    index = fastcsv.build_index(path, every=2, index_path=index_path)
+    loaded = fastcsv.RowIndex.load(index_path)
+    assert (loaded.rows, loaded.every, list(loaded.offsets)) == (3, 2, [0, 8])
+    with fastcsv.mmap_reader(path, index=loaded) as reader:
+        assert reader.rows(1, 3) == [['1', '2'], ['3', '4']]
+
+    with open(path, 'a', newline='') as f:
+        f.write('5,6\n')
+    with pytest.raises(fastcsv.Error):
+        fastcsv.mmap_reader(path, index=index_path)
+    with pytest.raises(fastcsv.Error):
+        fastcsv.mmap_reader(path, index=index)
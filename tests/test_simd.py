@@ -0,0 +1,57 @@
+"""
+Тесты для выбора SIMD варианта во время выполнения
+"""
+
+import pytest
+import fastcsv
+from fastcsv import _native
+import csv
+import io
+
+
+LEVELS = ['scalar', 'sse4.2', 'avx2', 'avx512']
+
+
+def test_simd_level_reported():
+    """Тест simd_level(): одно из известных имен"""
+    assert fastcsv.simd_level() in LEVELS
+
+
+def test_set_simd_level_clamped(restore_simd_level):
+    """Тест переключения: уровень не выше доступного, неизвестное имя - ValueError"""
+    detected = fastcsv.simd_level()
+    assert _native.set_simd_level('scalar') == 'scalar'
+    assert fastcsv.simd_level() == 'scalar'
+    assert _native.set_simd_level('avx512') == detected
+
+    with pytest.raises(ValueError):
+        _native.set_simd_level('neon')
+
+
+@pytest.mark.parametrize("level", LEVELS)
+def test_parse_same_for_all_levels(level, restore_simd_level):
+    """Тест: все варианты дают одинаковый результат (кавычки, не-ASCII, длинные строки)"""
+    lines = []
+    for i in range(3000):
+        text = 'x' * (i % 131)
+        if i % 4 == 0:
+            lines.append(f'{i},"{text},\nnext",ü{i}')
+        elif i % 4 == 1:
+            lines.append(f'{i},"{text}""q\n""",u{i}')
+        elif i % 4 == 2:
+            lines.append(f'{i},"{text} ""q"" ",x')
+        else:
+            lines.append(f'{i},{text},plain')
+    data = '\n'.join(lines) + '\n'
+
+    _native.set_simd_level(level)
+    rows = list(fastcsv.reader(io.StringIO(data)))
+    assert rows == list(csv.reader(io.StringIO(data)))
+
+    tokenizer = _native.StreamTokenizer(_native.ParserConfig())
+    encoded = data.encode('utf-8')
+    parsed = []
+    for start in range(0, len(encoded), 997):
+        parsed.extend(tokenizer.feed(encoded[start:start + 997])[0])
+    parsed.extend(tokenizer.feed(b'', True)[0])
+    assert parsed == rows
@@ -0,0 +1,101 @@
+"""
+Тесты для счетчиков чтения (stats=)
+"""
+
+import pytest
+import fastcsv
+from fastcsv.aio import AsyncReader
+from fastcsv import _native
+import asyncio
+import io
+import os
+
+
+def _text(rows=50000):
+    return ''.join(f'{i},name{i},"Москва, {i % 7}"\n' for i in range(rows))
+
+
+def _check(stats, rows, size):
+    assert stats['rows'] == rows
+    assert stats['bytes'] == size
+    assert stats['chunks'] >= 1
+    for key in ('parse_time', 'decode_time', 'build_time'):
+        assert stats[key] > 0
+
+
+@pytest.mark.parametrize("parallel", [1, 3])
+def test_mmap_reader_stats_and_callback(parallel, tmp_csv):
+    """Тест mmap_reader(stats=callback): счетчики растут по блокам, итог совпадает с файлом"""
+    text = _text(100000)
+    path = tmp_csv(text)
+    calls = []
+    with fastcsv.mmap_reader(path, parallel=parallel, stats=calls.append) as reader:
+        rows = list(reader)
+        stats = reader.stats()
+    _check(stats, len(rows), os.path.getsize(path))
+    assert len(calls) >= stats['chunks']
+    assert parallel > 1 or stats['chunks'] >= 3
+    assert [c['bytes'] for c in calls] == sorted(c['bytes'] for c in calls)
+    assert calls[-1]['rows'] == 100000
+
+
+def test_reader_stats_stream_and_transcoded():
+    """Тест reader(stats=True) по блокам StreamTokenizer, с where= и с перекодированием UTF-16"""
+    text = _text()
+    reader = fastcsv.reader(io.StringIO(text), stats=True, where={0: fastcsv.Range(0, 99)})
+    assert len(list(reader)) == 100
+    _check(reader.stats(), 100, len(text.encode('utf-8')))
+
+    reader = fastcsv.reader(io.BytesIO(text.encode('utf-16')), encoding='utf-16', stats=True)
+    assert len(list(reader)) == 50000
+    stats = reader.stats()
+    # Байты считаются после перекодирования в UTF-8
+    _check(stats, 50000, len(text.encode('utf-8')))
+
+
+def test_dict_readers_and_async_stats(tmp_csv):
+    """Тест stats() у DictReader, mmap_DictReader и AsyncReader"""
+    text = 'id,name,city\n' + _text(1000)
+    reader = fastcsv.DictReader(io.StringIO(text), stats=True)
+    assert len(list(reader)) == 1000
+    assert reader.stats()['rows'] == 1000
+
+    path = tmp_csv(text)
+    with fastcsv.mmap_DictReader(path, stats=True) as reader:
+        assert len(list(reader)) == 1000
+        assert reader.stats()['rows'] == 1000
+
+    class Stream:
+        def __init__(self, data):
+            self.data = io.BytesIO(data)
+
+        async def read(self, n):
+            return self.data.read(n)
+
+    async def read():
+        async with AsyncReader(Stream(text.encode()), chunk_size=4096, stats=True) as reader:
+            rows = [row async for row in reader]
+            return rows, reader.stats()
+
+    rows, stats = asyncio.run(read())
+    _check(stats, len(rows), len(text.encode('utf-8')))
+
+
+def test_stats_disabled_and_errors():
+    """Тест: без stats= счетчиков нет (stats() - None), неверный stats - ValueError"""
+    reader = fastcsv.reader(io.StringIO('a,b\n'))
+    assert list(reader) == [['a', 'b']]
+    assert reader.stats() is None
+    with pytest.raises(ValueError):
+        fastcsv.reader(io.StringIO('a\n'), stats='yes')
+
+
+def test_native_read_stats():
+    """Тест _native.ReadStats в parse_chunk_to_python и parse_buffer_to_python"""
+    parser = _native.CSVParser(_native.ParserConfig())
+    stats = _native.ReadStats()
+    assert _native.parse_chunk_to_python(parser, 'a,b\nc,d\n', None, stats) == [['a', 'b'], ['c', 'd']]
+    rows, consumed = _native.parse_buffer_to_python(parser, b'x,y\nz', 0, 5, False, stats=stats)
+    assert (rows, consumed) == ([['x', 'y']], 4)
+    assert (stats.bytes, stats.chunks, stats.rows) == (12, 2, 3)
+    assert stats.as_dict()['rows'] == 3
@@ -0,0 +1,95 @@
+"""
+Тесты для потокового токенизатора и чтения записей, пересекающих границы блоков
+"""
+
+import pytest
+import fastcsv
+from fastcsv._native import StreamTokenizer, RecordScanner, ParserConfig, CSVParser
+import tempfile
+import csv
+import io
+import os
+
+
+DATA = 'id,text\n1,"a\nb ""q"""\n2,plain\r\n3,"x,\ny"\n4,ü\n5,"tail'
+
+
+def test_tokenizer_byte_by_byte():
+    """Тест подачи по одному байту: результат совпадает с csv.reader"""
+    data = DATA.encode('utf-8') + b'"\n'
+    expected = list(csv.reader(io.StringIO(data.decode('utf-8'))))
+
+    tokenizer = StreamTokenizer(ParserConfig())
+    rows = []
+    consumed = 0
+    for i in range(len(data)):
+        part, n = tokenizer.feed(data[i:i + 1])
+        rows.extend(part)
+        consumed += n
+    part, n = tokenizer.feed(b'', True)
+    rows.extend(part)
+    consumed += n
+
+    assert rows == expected
+    assert consumed == len(data)
+    assert tokenizer.pending == 0
+
+
+def test_tokenizer_state():
+    """Тест незавершенной записи: байты остаются в буфере, состояние кавычек сохраняется"""
+    tokenizer = StreamTokenizer(ParserConfig())
+    assert tokenizer.feed('a,"b\nc') == ([], 0)
+    assert tokenizer.in_quotes
+    assert tokenizer.pending == 6
+
+    rows, consumed = tokenizer.feed('",d\ne,f')
+    assert rows == [['a', 'b\nc', 'd']]
+    assert consumed == 10
+    assert not tokenizer.in_quotes
+    assert tokenizer.feed('', True) == ([['e', 'f']], 3)
+
+
+def test_record_scanner_scans_new_bytes_only():
+    """Тест RecordScanner: повторный вызов просматривает только дописанные байты"""
+    data = b'"long\nfield' + b'x' * 100 + b'",1\n2,3\n'
+    scanner = RecordScanner('"')
+
+    assert scanner.scan(data, 0, 20) == 0
+    assert scanner.scanned == 20
+    assert scanner.in_quotes
+    assert scanner.scan(data, 0, len(data)) == len(data)
+    assert scanner.scanned == len(data)
+
+
+def test_parse_chunk_long_quoted_field():
+    """Тест многострочного поля, конец которого близко к концу блока (раньше parse_chunk зависал)"""
+    parser = CSVParser(ParserConfig())
+    data = '"' + 'abc\n' * 20 + '",end\n1,2\n'
+    assert [row.fields for row in parser.parse_chunk(data)] == list(csv.reader(io.StringIO(data)))
+
+
+def test_reader_large_stringio_multiline():
+    """Тест reader для большого файла в памяти с многострочными полями"""
+    lines = []
+    for i in range(60000):
+        lines.append(f'{i},"multi\nline {i} ""q""",x' if i % 5 == 0 else f'{i},plain,ü{i}')
+    data = '\n'.join(lines) + '\n'
+
+    rows = list(fastcsv.reader(io.StringIO(data)))
+    assert rows == list(csv.reader(io.StringIO(data)))
+
+
+def test_mmap_reader_field_longer_than_window():
+    """Тест mmap_reader: поле длиннее окна чтения (несколько MB)"""
+    field = 'line\n' * 600000
+    content = f'a,"{field}",b\n1,2,3\n'
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+        f.write(content)
+        temp_path = f.name
+
+    try:
+        with fastcsv.mmap_reader(temp_path) as reader:
+            rows = list(reader)
+        assert rows == [['a', field, 'b'], ['1', '2', '3']]
+    finally:
+        os.unlink(temp_path)
@@ -0,0 +1,86 @@
+"""
+Тесты для чтения потоков без произвольного доступа (pipe, дескриптор, объект с read())
+"""
+
+import pytest
+import fastcsv
+import csv
+import io
+import os
+import threading
+
+
+def _text(rows=60000):
+    """CSV с многострочными полями в кавычках: записи пересекают границы блоков"""
+    return ''.join(f'{i},"line {i}\nnext ""{i}""",Київ\n' if i % 9 == 0 else f'{i},v{i},Київ\n'
+                   for i in range(rows))
+
+
+def _pipe(data: bytes):
+    """Дескриптор чтения pipe; данные пишутся из потока, как при `zcat | job`"""
+    read_fd, write_fd = os.pipe()
+
+    def write():
+        with os.fdopen(write_fd, 'wb') as f:
+            f.write(data)
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    return read_fd, thread
+
+
+@pytest.mark.parametrize("wrap", ['fd', 'binary', 'text'])
+def test_reader_from_pipe(wrap):
+    """Тест reader для pipe: дескриптор, бинарный и текстовый файловый объект"""
+    text = _text()
+    read_fd, thread = _pipe(text.encode('utf-8'))
+    try:
+        if wrap == 'fd':
+            rows = list(fastcsv.reader(read_fd))
+            # Дескриптор, переданный числом, reader не закрывает
+            os.fstat(read_fd)
+        else:
+            mode = 'rb' if wrap == 'binary' else 'r'
+            with os.fdopen(read_fd, mode, closefd=False, encoding=None if wrap == 'binary' else 'utf-8') as f:
+                rows = list(fastcsv.reader(f))
+    finally:
+        thread.join()
+        os.close(read_fd)
+    assert rows == list(csv.reader(io.StringIO(text)))
+
+
+def test_dict_reader_from_pipe_and_empty_pipe():
+    """Тест DictReader для pipe; пустой pipe - нет строк"""
+    text = 'id,value,city\n' + _text(5000)
+    read_fd, thread = _pipe(text.encode('utf-8'))
+    try:
+        rows = list(fastcsv.DictReader(read_fd))
+    finally:
+        thread.join()
+        os.close(read_fd)
+    assert rows == list(csv.DictReader(io.StringIO(text)))
+
+    read_fd, thread = _pipe(b'')
+    try:
+        assert list(fastcsv.reader(read_fd)) == []
+    finally:
+        thread.join()
+        os.close(read_fd)
+
+
+def test_reader_from_read_only_object():
+    """Тест: объект только с read(n) читается блоками без seek/tell"""
+    class Source:
+        def __init__(self, text):
+            self.data = io.StringIO(text)
+            self.sizes = []
+
+        def read(self, n=-1):
+            self.sizes.append(n)
+            return self.data.read(n)
+
+    text = _text(20000)
+    source = Source(text)
+    assert list(fastcsv.reader(source)) == list(csv.reader(io.StringIO(text)))
+    # Только чтение блоками фиксированного размера, без read() всего потока
+    assert len(source.sizes) > 1 and all(size > 0 for size in source.sizes)
@@ -0,0 +1,80 @@
+"""
+Тесты для двухэтапного разбора parse_chunk (индекс структурных символов + нарезка полей)
+"""
+
+import pytest
+import fastcsv
+from fastcsv import _native
+from fastcsv._native import CSVParser, ParserConfig
+import csv
+import io
+
+
+def _parse(data, **options):
+    config = ParserConfig()
+    for name, value in options.items():
+        setattr(config, name, value)
+    return CSVParser(config).parse_chunk(data)
+
+
+def _fields(data, **options):
+    return [row.fields for row in _parse(data, **options)]
+
+
+@pytest.mark.parametrize("data", [
+    '0,"x""q\nnext",u0\n',
+    '0,", ""q""\nnext",u0',
+    'a,"b""\n""c"\r\nd,e\r\n',
+    '"",x\n"""",y\n',
+    'a,"b\r\nc",d\r\n' * 3,
+    'a' * 63 + ',"' + 'b' * 70 + '\n",c\n',
+])
+def test_escaped_quotes_and_newlines(data):
+    """Тест: "" рядом с переводом строки внутри кавычек, CRLF и границы 64-байтовых блоков"""
+    assert _fields(data) == list(csv.reader(io.StringIO(data, newline='')))
+
+
+def test_line_endings_and_bytes_processed():
+    """Тест: \\n, \\r\\n и одиночный \\r завершают запись, пустая строка - одно пустое поле"""
+    data = 'a,b\r\nc\rd\n\ne,"f"'
+    rows = _parse(data)
+    assert [row.fields for row in rows] == [['a', 'b'], ['c'], ['d'], [''], ['e', 'f']]
+    assert [row.bytes_processed for row in rows] == [5, 2, 2, 1, 5]
+    assert sum(row.bytes_processed for row in rows) == len(data)
+    assert all(row.success for row in rows)
+
+
+def test_unclosed_quote_at_end():
+    """Тест: незакрытая кавычка в последней записи - success = False"""
+    rows = _parse('a,b\nc,"d\ne')
+    assert rows[0].success
+    assert rows[-1].fields == ['c', 'd\ne']
+    assert not rows[-1].success
+
+
+def test_quoted_flags_nonnumeric():
+    """Тест QUOTE_NONNUMERIC: поля в кавычках остаются строками, в том числе длиннее блока"""
+    long_text = 'x' * 200
+    data = f'1,"2", "a""b",{"7" * 100}\n"{long_text}",3\n4,5\n'
+    rows = list(fastcsv.reader(io.StringIO(data), quoting=fastcsv.QUOTE_NONNUMERIC, skipinitialspace=True))
+    expected = list(csv.reader(io.StringIO(data), quoting=csv.QUOTE_NONNUMERIC, skipinitialspace=True))
+    assert rows == expected
+    assert rows[0][1] == '2' and rows[1][0] == long_text
+
+
+@pytest.mark.parametrize("level", ['scalar', 'sse4.2', 'avx2', 'avx512'])
+def test_segments_all_levels(level):
+    """Тест: данные длиннее сегмента индексации, поля в кавычках пересекают границы сегментов"""
+    previous = _native.simd_level()
+    _native.set_simd_level(level)
+    try:
+        lines = []
+        for i in range(20000):
+            if i % 2:
+                lines.append(f'{i},"{"y" * (i % 97)}""\n{i}",z')
+            else:
+                lines.append(f'{i},{"w" * (i % 89)},z')
+        data = '\r\n'.join(lines)
+        assert _fields(data) == list(csv.reader(io.StringIO(data, newline='')))
+    finally:
+        _native.set_simd_level(previous)
@@ -0,0 +1,74 @@
+"""
+Тесты для выбора колонок (usecols=)
+"""
+
+import pytest
+import fastcsv
+import csv
+import io
+
+
+def _text(rows=3000, width=20):
+    """Широкий CSV с заголовком, кавычками и многострочными полями"""
+    lines = [','.join(f'c{j}' for j in range(width))]
+    for i in range(rows):
+        fields = [f'"v{i}\n{j}"' if (i + j) % 11 == 0 else f'v{i}_{j}' for j in range(width)]
+        lines.append(','.join(fields))
+    return '\n'.join(lines) + '\n'
+
+
+def _expected(text, columns):
+    return [[row[j] for j in columns] for row in csv.reader(io.StringIO(text))]
+
+
+@pytest.mark.parametrize("usecols", [[3, 0, 17], ['c17', 'c3'], [5, 'c1']])
+def test_reader_usecols(usecols):
+    """Тест reader(usecols=): индексы, имена и их смесь, порядок как в usecols"""
+    text = _text()
+    columns = [int(c[1:]) if isinstance(c, str) else c for c in usecols]
+    assert list(fastcsv.reader(io.StringIO(text), usecols=usecols)) == _expected(text, columns)
+
+
+@pytest.mark.parametrize("parallel", [1, 3])
+def test_mmap_reader_usecols(parallel, tmp_csv):
+    """Тест mmap_reader(usecols=): блоки, parallel, seek_row с именами колонок"""
+    text = _text(60000)
+    path = tmp_csv(text)
+    expected = _expected(text, [19, 2])
+    with fastcsv.mmap_reader(path, parallel=parallel, usecols=['c19', 'c2']) as reader:
+        assert list(reader) == expected
+    # Имена сопоставляются с заголовком, даже если чтение начинается не с него
+    with fastcsv.mmap_reader(path, usecols=['c19', 'c2']) as reader:
+        assert reader.rows(5000, 5003) == expected[5000:5003]
+
+
+def test_dict_readers_usecols(tmp_csv):
+    """Тест DictReader и mmap_DictReader: только выбранные колонки, fieldnames файла"""
+    text = _text(100)
+    expected = [{'c4': row['c4'], 'c0': row['c0']} for row in csv.DictReader(io.StringIO(text))]
+    assert list(fastcsv.DictReader(io.StringIO(text), usecols=['c4', 'c0'])) == expected
+    path = tmp_csv(text)
+    with fastcsv.mmap_DictReader(path, usecols=[4, 0]) as reader:
+        assert list(reader) == expected
+
+    body = text.split('\n', 1)[1]
+    fieldnames = [f'c{j}' for j in range(20)]
+    reader = fastcsv.DictReader(io.StringIO(body), fieldnames=fieldnames, usecols=['c4', 'c0'])
+    assert reader.fieldnames == ['c4', 'c0']
+    assert list(reader) == expected
+
+
+def test_usecols_with_convert_and_short_rows():
+    """Тест: convert= по номерам колонок файла, отсутствующее поле - None"""
+    text = 'a,b,c\n1,x,2.5\n3,y\n'
+    rows = list(fastcsv.reader(io.StringIO(text), usecols=['c', 'a'], convert={0: int, 2: float}))
+    assert rows == [['c', 'a'], [2.5, 1], [None, 3]]
+
+
+def test_usecols_errors():
+    """Тест: неизвестное имя колонки и неверные usecols - ValueError"""
+    with pytest.raises(ValueError, match="unknown column 'zz'"):
+        list(fastcsv.reader(io.StringIO('a,b\n1,2\n'), usecols=['zz']))
+    for bad in ('a', [], [-1], [1.5], 3):
+        with pytest.raises(ValueError):
+            fastcsv.reader(io.StringIO('a,b\n'), usecols=bad)
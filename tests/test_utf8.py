@@ -0,0 +1,81 @@
+"""
+Тесты для проверки UTF-8 и декодирования полей на границах блоков
+"""
+
+import pytest
+import fastcsv
+from fastcsv import _native
+import random
+import tempfile
+import os
+
+
+LEVELS = ['scalar', 'sse4.2', 'avx2', 'avx512']
+
+
+def _valid_prefix(data: bytes) -> int:
+    """Эталон: длина валидного префикса по строгому декодеру Python"""
+    try:
+        data.decode('utf-8')
+        return len(data)
+    except UnicodeDecodeError as e:
+        return e.start
+
+
+@pytest.mark.parametrize("level", LEVELS)
+def test_validate_utf8_matches_python(level, restore_simd_level):
+    """Тест: результат совпадает с декодером Python (overlong, суррогаты, > U+10FFFF, обрезанные символы)"""
+    _native.set_simd_level(level)
+    rng = random.Random(15)
+    pieces = [b'a' * 70, 'ü'.encode(), 'я'.encode(), '€'.encode(), '😀'.encode(),
+              b'\xc0\xaf', b'\xe0\x80\xaf', b'\xed\xa0\x80', b'\xf4\x90\x80\x80', b'\xf5',
+              b'\x80', b'\xe2\x82', b'\xf0\x9f\x98', b'\xff']
+    for _ in range(3000):
+        data = b''.join(rng.choice(pieces[:5]) for _ in range(rng.randrange(40)))
+        if rng.random() < 0.7:
+            at = rng.randrange(len(data) + 1)
+            data = data[:at] + rng.choice(pieces[5:]) + data[at:]
+        assert _native.validate_utf8(data) == _valid_prefix(data), data
+
+
+def test_mmap_reader_multibyte_at_block_boundary():
+    """Тест: символы, попадающие на границу блока mmap_reader (1MB), не портятся"""
+    lines = []
+    size = 0
+    i = 0
+    while size < 3 * 1048576:
+        line = f'{i},{"я" * (i % 300)},ü€😀'
+        lines.append(line)
+        size += len(line.encode('utf-8')) + 1
+        i += 1
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False,
+                                     encoding='utf-8', newline='') as f:
+        f.write('\n'.join(lines))
+        path = f.name
+    try:
+        with fastcsv.mmap_reader(path) as reader:
+            rows = list(reader)
+        assert rows == [line.split(',') for line in lines]
+    finally:
+        os.unlink(path)
+
+
+def test_invalid_utf8_fields_decoded_as_latin1():
+    """Тест: в файле со смешанной кодировкой каждое поле декодируется отдельно"""
+    data = 'name,city\n'.encode() + b'Jos\xe9,M\xfcnchen\n' + 'Jürgen,Köln\n'.encode() + b'plain,ascii\n'
+    parser = _native.CSVParser(_native.ParserConfig())
+    rows, consumed = _native.parse_buffer_to_python(parser, data, 0, len(data), True)
+    assert consumed == len(data)
+    assert rows == [['name', 'city'], ['José', 'München'], ['Jürgen', 'Köln'], ['plain', 'ascii']]
+
+
+def test_stream_tokenizer_bytes_split_inside_character():
+    """Тест: байты, поданные частями посреди многобайтового символа, собираются в целые поля"""
+    text = ''.join(f'{i},"ü{i}\nя",😀\n' for i in range(2000))
+    data = text.encode('utf-8')
+    tokenizer = _native.StreamTokenizer(_native.ParserConfig())
+    rows = []
+    for start in range(0, len(data), 7):
+        rows.extend(tokenizer.feed(data[start:start + 7])[0])
+    rows.extend(tokenizer.feed(b'', True)[0])
+    assert rows == [[str(i), f'ü{i}\nя', '😀'] for i in range(2000)]
@@ -0,0 +1,96 @@
+"""
+Тесты для фильтрации строк до создания Python объектов (where=)
+"""
+
+import pytest
+import fastcsv
+from fastcsv import _native
+import csv
+import io
+
+
+def _text(rows=3000):
+    """CSV с заголовком, кавычками и многострочными полями"""
+    lines = ['id,status,host,latency']
+    for i in range(rows):
+        status = 'FAILED' if i % 50 == 0 else ('"OK\nretry"' if i % 7 == 0 else 'OK')
+        lines.append(f'{i},{status},host-{i % 13},{i % 1000 / 4}')
+    return '\n'.join(lines) + '\n'
+
+
+def _expected(text, keep):
+    rows = list(csv.reader(io.StringIO(text)))
+    return [rows[0]] + [row for row in rows[1:] if keep(row)]
+
+
+@pytest.mark.parametrize("where, keep", [
+    ({'status': 'FAILED'}, lambda row: row[1] == 'FAILED'),
+    ({'status': {'OK\nretry', 'FAILED'}}, lambda row: row[1] in ('OK\nretry', 'FAILED')),
+    ({'host': fastcsv.Prefix('host-1', 'host-9')}, lambda row: row[2].startswith(('host-1', 'host-9'))),
+    ({'latency': fastcsv.Range(10, 20.5)}, lambda row: 10 <= float(row[3]) <= 20.5),
+    ({'latency': fastcsv.Range(None, 3), 'status': 'OK'}, lambda row: float(row[3]) <= 3 and row[1] == 'OK'),
+    ({'latency': 12.25}, lambda row: float(row[3]) == 12.25),
+])
+def test_reader_where(where, keep):
+    """Тест reader(where=): равенство, множество, префикс, диапазон и их сочетание (AND);
+    заголовок не фильтруется, если колонки заданы именами"""
+    text = _text()
+    assert list(fastcsv.reader(io.StringIO(text), where=where)) == _expected(text, keep)
+
+
+@pytest.mark.parametrize("parallel", [1, 3])
+def test_mmap_reader_where(parallel, tmp_csv):
+    """Тест mmap_reader(where=) на нескольких блоках, parallel и cp1251"""
+    text = _text(80000).replace('OK', 'Ок')
+    for encoding in ('utf-8', 'cp1251'):
+        path = tmp_csv(text, encoding)
+        with fastcsv.mmap_reader(path, parallel=parallel, encoding=encoding,
+                                 where={'status': 'Ок', 'host': 'host-3'}) as reader:
+            rows = list(reader)
+        assert rows == _expected(text, lambda row: row[1] == 'Ок' and row[2] == 'host-3')
+
+
+def test_where_by_index_filters_every_row():
+    """Тест: колонки по индексам - первая строка не считается заголовком; usecols и convert"""
+    text = _text(500)
+    rows = list(fastcsv.reader(io.StringIO(text), where={1: 'FAILED'}, usecols=[0], convert={0: int}))
+    assert rows == [[i] for i in range(0, 500, 50)]
+
+
+def test_dict_readers_where(tmp_csv):
+    """Тест DictReader / mmap_DictReader: имена из заголовка, из fieldnames или индексы"""
+    text = _text(1000)
+    expected = [row for row in csv.DictReader(io.StringIO(text)) if row['status'] == 'FAILED']
+    assert list(fastcsv.DictReader(io.StringIO(text), where={'status': 'FAILED'})) == expected
+
+    body = text.split('\n', 1)[1]
+    reader = fastcsv.DictReader(io.StringIO(body), fieldnames=['id', 'status', 'host', 'latency'],
+                                where={'status': 'FAILED'})
+    assert list(reader) == expected
+
+    path = tmp_csv(text)
+    with fastcsv.mmap_DictReader(path, where={'status': 'FAILED'}) as reader:
+        assert list(reader) == expected
+    # Заголовок словарей не фильтруется и при колонках по индексам
+    with fastcsv.mmap_DictReader(path, where={1: 'FAILED'}) as reader:
+        assert list(reader) == expected
+
+
+def test_converter_convert_row_filtered():
+    """Тест FieldConverter.convert_row: строка, не прошедшая where, - None"""
+    converter = _native.FieldConverter([], _native.ConvertKind.STR, 0, False)
+    converter.add_condition(0, _native.ConditionKind.VALUES, [b'x'])
+    parser = _native.CSVParser(_native.ParserConfig())
+    assert converter.convert_row(parser.parse_line('y,1')) is None
+    assert converter.convert_row(parser.parse_line('x,1')) == ['x', '1']
+
+
+def test_where_errors():
+    """Тест: неизвестная колонка и неверные условия - ValueError"""
+    with pytest.raises(ValueError, match="unknown column 'zz'"):
+        list(fastcsv.reader(io.StringIO('a,b\n1,2\n'), where={'zz': '1'}))
+    for bad in ({}, {'a': True}, {'a': [1, 2]}, {-1: 'x'}, ['a'], {'a': object()}):
+        with pytest.raises(ValueError):
+            fastcsv.reader(io.StringIO('a,b\n'), where=bad)
+    with pytest.raises(ValueError):
+        fastcsv.Range('1', None)
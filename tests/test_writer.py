@@ -0,0 +1,81 @@
+"""Тесты для нативного writer"""
+
+import pytest
+import fastcsv
+import csv
+import io
+
+
+def test_writer_quoting_minimal():
+    """Тест QUOTE_MINIMAL: кавычки только там, где нужно"""
+    f = io.StringIO()
+    writer = fastcsv.writer(f)
+    writer.writerow(["plain", "with,comma", 'with "quote"', "multi\nline", 42])
+
+    assert f.getvalue() == 'plain,"with,comma","with ""quote""","multi\nline",42\n'
+
+
+def test_writer_quoting_all_and_nonnumeric():
+    """Тест QUOTE_ALL и QUOTE_NONNUMERIC"""
+    f = io.StringIO()
+    fastcsv.writer(f, quoting=fastcsv.QUOTE_ALL).writerow(['a"b', 1])
+    assert f.getvalue() == '"a""b","1"\n'
+
+    f = io.StringIO()
+    fastcsv.writer(f, quoting=fastcsv.QUOTE_NONNUMERIC).writerow(["a", 1, 2.5])
+    assert f.getvalue() == '"a",1,2.5\n'
+
+
+def test_writerows_matches_std_csv():
+    """Тест writerows: результат совпадает со стандартным csv модулем"""
+    rows = [[f"value{i}", "a,b", 'q"q', "", "юникод"] for i in range(5000)]
+
+    expected = io.StringIO()
+    csv.writer(expected, lineterminator="\n").writerows(rows)
+
+    f = io.StringIO()
+    fastcsv.writer(f).writerows(iter(rows))
+
+    assert f.getvalue() == expected.getvalue()
+
+
+def test_writerows_roundtrip():
+    """Тест записи и чтения обратно"""
+    rows = [["name", "comment"], ["John", 'said "hi", left'], ["Jane", "line1\nline2"]]
+    f = io.StringIO()
+    fastcsv.writer(f).writerows(rows)
+
+    f.seek(0)
+    assert list(fastcsv.reader(f)) == rows
+
+
+def test_dict_writer_writerows():
+    """Тест DictWriter.writerows с restval и проверкой лишних полей"""
+    f = io.StringIO()
+    writer = fastcsv.DictWriter(f, ["name", "age"], restval="?")
+    writer.writeheader()
+    writer.writerows([{"name": "John", "age": 30}, {"name": "Jane"}])
+
+    assert f.getvalue() == "name,age\nJohn,30\nJane,?\n"
+
+    with pytest.raises(ValueError):
+        writer.writerows([{"name": "Bob", "city": "NYC"}])
+
+
+def test_writerows_failed_write_not_repeated():
+    """Тест: если write() упал при сбросе блока, writerows не записывает этот блок второй раз"""
+    class FailingFile:
+        """Файл, который принимает первый блок и падает (как при нехватке места)"""
+        def __init__(self):
+            self.blocks = []
+
+        def write(self, block):
+            self.blocks.append(block)
+            if len(self.blocks) == 1:
+                raise OSError("disk full")
+
+    f = FailingFile()
+    with pytest.raises(OSError):
+        fastcsv.writer(f).writerows([f"value{i}", "x" * 100] for i in range(30000))
+
+    assert len(f.blocks) == 1